@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Annotated
+from typing import Annotated, Any
 
 from authx import TokenPayload
 from authx.schema import RequestToken
@@ -15,6 +15,17 @@ def get_deps(request: Request) -> AppDependencies:
     return request.app.state.deps
 
 
+def get_request_user(request: Request | None, payload: TokenPayload) -> Any | None:
+    """
+    Return the user already loaded by `get_current_payload` for this request (if any).
+    """
+    state = getattr(request, "state", None)
+    user = getattr(state, "auth_user", None)
+    if user is None or str(getattr(user, "user_id", "")) != str(payload.sub):
+        return None
+    return user
+
+
 async def get_current_payload(request: Request) -> TokenPayload:
     """
     Resolve the current access-token payload.
@@ -87,6 +98,8 @@ async def get_current_payload(request: Request) -> TokenPayload:
         if not ok:
             raise HTTPException(status_code=401, detail=f"session_invalid:{reason}")
 
+    # Share the loaded user with `get_auth_context` so a request hits the users table once.
+    request.state.auth_user = user
     return payload
 
 
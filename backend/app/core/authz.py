@@ -1,15 +1,17 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import cached_property
 from typing import Annotated, Any
 
 from authx import TokenPayload
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Request
 import sqlite3
 
-from backend.app.core.auth import get_current_payload, get_deps
-from backend.app.core.permission_resolver import PermissionSnapshot, resolve_permissions
+from backend.app.core.auth import get_current_payload, get_deps, get_request_user
+from backend.app.core.permission_resolver import PermissionSnapshot, resolve_permissions_cached
 from backend.app.dependencies import AppDependencies
+from backend.services.audit_helpers import actor_fields_from_user
 
 
 @dataclass(frozen=True)
@@ -19,20 +21,28 @@ class AuthContext:
     user: Any
     snapshot: PermissionSnapshot
 
+    @cached_property
+    def actor_fields(self) -> dict[str, Any]:
+        """Denormalized actor columns for audit rows; resolved at most once per request."""
+        return actor_fields_from_user(self.deps, self.user)
+
 
 def get_auth_context(
     payload: TokenPayload = Depends(get_current_payload),
     deps: AppDependencies = Depends(get_deps),
+    request: Request = None,  # type: ignore[assignment]
 ) -> AuthContext:
-    try:
-        user = deps.user_store.get_by_user_id(payload.sub)
-    except sqlite3.OperationalError as e:
-        # Avoid leaking transient sqlite errors as 500s (e.g. during backup/restore IO).
-        raise HTTPException(status_code=503, detail=f"db_unavailable: {e}") from e
+    user = get_request_user(request, payload)
+    if user is None:
+        try:
+            user = deps.user_store.get_by_user_id(payload.sub)
+        except sqlite3.OperationalError as e:
+            # Avoid leaking transient sqlite errors as 500s (e.g. during backup/restore IO).
+            raise HTTPException(status_code=503, detail=f"db_unavailable: {e}") from e
     if not user:
         # Treat missing user for an authenticated token as unauthorized.
         raise HTTPException(status_code=401, detail="用户不存在")
-    snapshot = resolve_permissions(deps, user)
+    snapshot = resolve_permissions_cached(deps, user)
     return AuthContext(deps=deps, payload=payload, user=user, snapshot=snapshot)
 
 
@@ -43,6 +43,66 @@ class Settings(BaseSettings):
         ".jpeg",
     }
 
+    # Batch approval: concurrent RAGFlow uploads per dataset (one parse trigger per dataset afterwards)
+    REVIEW_BATCH_UPLOAD_CONCURRENCY: int = 4
+
+    # Converted preview cache (content-addressed; 0 bytes disables it)
+    PREVIEW_CACHE_DIR: str = "data/preview_cache"
+    PREVIEW_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    PREVIEW_CACHE_MAX_AGE_S: int = 7 * 24 * 3600
+
+    # Signed preview URLs (delivery=url): bodies are streamed from disk instead of base64 JSON.
+    # PREVIEW_URL_SECRET falls back to JWT_SECRET_KEY when empty.
+    PREVIEW_BLOB_DIR: str = "data/preview_blobs"
+    PREVIEW_BLOB_MAX_BYTES: int = 2 * 1024 * 1024 * 1024
+    PREVIEW_URL_TTL_S: int = 600
+    PREVIEW_URL_SECRET: str = ""
+
+    # Long-lived LibreOffice workers for office -> pdf/html conversion (see services/office_worker_pool.py)
+    OFFICE_POOL_WORKERS: int = 2
+    OFFICE_POOL_MAX_QUEUE: int = 32
+    OFFICE_CONVERT_TIMEOUT_S: int = 120
+    OFFICE_WORKER_MAX_JOBS: int = 200
+    OFFICE_PROFILE_DIR: str = "data/soffice_profiles"
+    # Interpreter with the `uno` module for the listener bridge when the app's Python lacks it; empty = auto-detect
+    # (python bundled next to soffice, then /usr/bin/python3 with Debian's python3-uno)
+    OFFICE_UNO_PYTHON: str = ""
+
+    # Worker pools for blocking work started from async routes (see app/core/executors.py)
+    EXECUTOR_RAGFLOW_IO_WORKERS: int = 16
+    EXECUTOR_SQLITE_WORKERS: int = 8
+    EXECUTOR_CONVERSION_WORKERS: int = 2
+    EXECUTOR_ARCHIVE_WORKERS: int = 2
+    EXECUTOR_MAX_QUEUE: int = 256
+
+    # Batch ZIP downloads from RAGFlow: bodies fetched in parallel, spooled to disk past the limit
+    BATCH_DOWNLOAD_CONCURRENCY: int = 4
+    BATCH_DOWNLOAD_SPOOL_BYTES: int = 8 * 1024 * 1024
+
+    # Local mirror of RAGFlow document metadata (see services/ragflow/document_catalog.py); 0 disables the reconciler
+    RAGFLOW_CATALOG_SYNC_INTERVAL_S: int = 300
+
+    # ragflow_config.json hot reload (see services/ragflow_config_watcher.py): inotify via watchfiles when
+    # available, else (or with FORCE_POLLING, for mounts that drop events) a stat() every POLL_INTERVAL_S
+    RAGFLOW_CONFIG_WATCH_ENABLED: bool = True
+    RAGFLOW_CONFIG_POLL_INTERVAL_S: float = 2.0
+    RAGFLOW_CONFIG_FORCE_POLLING: bool = False
+
+    # Chat answer sources: "reference" uses the chunks RAGFlow returns with the completion (one retrieval
+    # per question); "retrieval" always runs a separate retrieve_chunks call as before.
+    CHAT_SOURCES_MODE: str = "reference"
+
+    # Relay completion frames to the browser as the raw upstream bytes when they need no rewriting
+    # (no reference chunks to screen, no delta framing requested).
+    CHAT_SSE_PASSTHROUGH: bool = True
+
+    # Write-behind for audit/download/deletion log rows (see database/write_behind.py); rows are spooled
+    # next to auth.db and inserted in batches. Disabled or full -> synchronous insert per row.
+    LOG_WRITE_BEHIND_ENABLED: bool = True
+    LOG_WRITE_BEHIND_MAX_QUEUE: int = 10000
+    LOG_WRITE_BEHIND_BATCH_SIZE: int = 200
+    LOG_WRITE_BEHIND_FLUSH_INTERVAL_S: float = 0.5
+
     # CORS
     CORS_ORIGINS: list[str] = ["*"]
 
@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterator, TypeVar
+
+import anyio
+from fastapi import HTTPException
+
+from backend.app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Named pools for blocking work started from async routes. Keeping them separate means a burst
+# of slow conversions or ZIP builds cannot starve quick SQLite lookups or RAGFlow calls.
+RAGFLOW_IO = "ragflow_io"
+SQLITE = "sqlite"
+CONVERSION = "conversion"
+ARCHIVE = "archive"
+
+
+class ExecutorSaturated(RuntimeError):
+    def __init__(self, name: str):
+        super().__init__(f"executor_saturated:{name}")
+        self.name = name
+
+
+class BoundedExecutor:
+    """
+    Thread pool with a bounded backlog and queue-depth / wait-time counters.
+
+    `submit` raises `ExecutorSaturated` instead of queueing more than `max_queue` jobs, so an
+    overloaded pool sheds load quickly rather than letting requests time out in the queue.
+    """
+
+    def __init__(self, name: str, *, max_workers: int, max_queue: int):
+        self.name = name
+        self._max_workers = max(1, int(max_workers))
+        self._max_queue = max(1, int(max_queue))
+        self._pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix=f"{name}_worker")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._wait_total_s = 0.0
+        self._wait_max_s = 0.0
+        self._run_total_s = 0.0
+
+    def submit(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> "Future[T]":
+        with self._lock:
+            if self._queued >= self._max_queue:
+                self._rejected += 1
+                raise ExecutorSaturated(self.name)
+            self._queued += 1
+            self._submitted += 1
+        enqueued_at = time.monotonic()
+
+        def run() -> T:
+            started_at = time.monotonic()
+            waited = started_at - enqueued_at
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._wait_total_s += waited
+                self._wait_max_s = max(self._wait_max_s, waited)
+            failed = False
+            try:
+                return fn(*args, **kwargs)
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    self._run_total_s += time.monotonic() - started_at
+                    if failed:
+                        self._failed += 1
+
+        try:
+            return self._pool.submit(run)
+        except RuntimeError:
+            # Pool already shut down (process exit); don't leave the slot counted as queued.
+            with self._lock:
+                self._queued -= 1
+            raise
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            started = self._completed + self._running
+            return {
+                "max_workers": self._max_workers,
+                "max_queue": self._max_queue,
+                "queued": self._queued,
+                "running": self._running,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "wait_avg_ms": round(self._wait_total_s * 1000 / started, 2) if started else 0.0,
+                "wait_max_ms": round(self._wait_max_s * 1000, 2),
+                "run_avg_ms": round(self._run_total_s * 1000 / self._completed, 2) if self._completed else 0.0,
+            }
+
+    def shutdown(self, *, wait: bool = False) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+_registry_lock = threading.Lock()
+_executors: dict[str, BoundedExecutor] = {}
+
+
+def _pool_size(name: str) -> int:
+    sizes = {
+        RAGFLOW_IO: settings.EXECUTOR_RAGFLOW_IO_WORKERS,
+        SQLITE: settings.EXECUTOR_SQLITE_WORKERS,
+        CONVERSION: settings.EXECUTOR_CONVERSION_WORKERS,
+        ARCHIVE: settings.EXECUTOR_ARCHIVE_WORKERS,
+    }
+    if name not in sizes:
+        raise KeyError(f"unknown_executor:{name}")
+    return sizes[name]
+
+
+def get_executor(name: str) -> BoundedExecutor:
+    with _registry_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            executor = BoundedExecutor(name, max_workers=_pool_size(name), max_queue=settings.EXECUTOR_MAX_QUEUE)
+            _executors[name] = executor
+        return executor
+
+
+async def offload(pool: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run blocking `fn(*args, **kwargs)` on the named pool and await its result.
+
+    Context variables (request id, etc.) are propagated like `asyncio.to_thread`. A saturated pool
+    surfaces as 503 `server_busy:<pool>`.
+    """
+    ctx = contextvars.copy_context()
+    try:
+        future = get_executor(pool).submit(ctx.run, fn, *args, **kwargs)
+    except ExecutorSaturated as e:
+        logger.warning("Executor %s saturated; rejecting %s", pool, getattr(fn, "__qualname__", fn))
+        raise HTTPException(status_code=503, detail=f"server_busy:{pool}") from e
+    return await asyncio.wrap_future(future)
+
+
+async def iterate_offloaded(pool: str, iterator: Iterator[T]) -> AsyncIterator[T]:
+    """
+    Drive a blocking iterator (e.g. a ZIP stream generator) on the named pool, one item at a time.
+
+    Used as a StreamingResponse body; the iterator is closed if the client disconnects. A `next()`
+    still running on a worker when that happens is waited for first (closing a generator that is
+    executing raises `ValueError` and skips its cleanup), then `close()` runs on the same pool.
+
+    An iterator may yield a `concurrent.futures.Future` right before it would block on it (e.g. a
+    fetch running on its own threads): the wait then happens on the event loop instead of holding
+    a worker, and the future itself is not forwarded.
+    """
+    done = object()
+    executor = get_executor(pool)
+    pending: Future | None = None
+    try:
+        while True:
+            ctx = contextvars.copy_context()
+            try:
+                pending = executor.submit(ctx.run, next, iterator, done)
+            except ExecutorSaturated as e:
+                logger.warning("Executor %s saturated; rejecting stream step", pool)
+                raise HTTPException(status_code=503, detail=f"server_busy:{pool}") from e
+            item = await asyncio.wrap_future(pending)
+            pending = None
+            if item is done:
+                return
+            if isinstance(item, Future):
+                await _wait_yielded(item)
+                continue
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if callable(close):
+            # Starlette cancels the whole task group on disconnect; shield the cleanup awaits.
+            with anyio.CancelScope(shield=True):
+                await _close_offloaded(pool, close, pending)
+
+
+async def prime_offloaded(pool: str, iterator: Iterator[T]) -> AsyncIterator[T]:
+    """
+    Run the iterator's first step now and return the stream of all its items.
+
+    Setup errors raised before the first item (missing client, bad input) propagate from this call,
+    so a route can still answer with an error status instead of a truncated 200 body.
+    """
+    done = object()
+    close = getattr(iterator, "close", None)
+    try:
+        first = await offload(pool, next, iterator, done)
+        while isinstance(first, Future):
+            await _wait_yielded(first)
+            first = await offload(pool, next, iterator, done)
+    except BaseException:
+        if callable(close):
+            with anyio.CancelScope(shield=True):
+                await _close_offloaded(pool, close, None)
+        raise
+
+    async def stream() -> AsyncIterator[T]:
+        if first is done:
+            return
+        try:
+            yield first
+        except BaseException:
+            if callable(close):
+                with anyio.CancelScope(shield=True):
+                    await _close_offloaded(pool, close, None)
+            raise
+        async for item in iterate_offloaded(pool, iterator):
+            yield item
+
+    return stream()
+
+
+async def _wait_yielded(future: Future) -> None:
+    # The iterator reads the outcome itself on its next step; shield so a disconnect does not
+    # cancel a fetch the iterator still owns (its close() cleans that up).
+    try:
+        await asyncio.shield(asyncio.wrap_future(future))
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        pass
+
+
+async def _close_offloaded(pool: str, close: Callable[[], Any], pending: Future | None) -> None:
+    if pending is not None and not pending.done():
+        try:
+            await asyncio.shield(asyncio.wrap_future(pending))
+        except BaseException:
+            pass
+    if pending is not None and not pending.done():
+        # Still cancelled out from under us: close from the worker once `next()` returns.
+        pending.add_done_callback(lambda _f: _close_quietly(close))
+        return
+    try:
+        await offload(pool, close)
+    except HTTPException:
+        await asyncio.to_thread(_close_quietly, close)
+    except Exception:
+        logger.warning("Closing offloaded iterator failed", exc_info=True)
+
+
+def _close_quietly(close: Callable[[], Any]) -> None:
+    try:
+        close()
+    except Exception:
+        logger.warning("Closing offloaded iterator failed", exc_info=True)
+
+
+def executor_stats() -> dict[str, dict[str, Any]]:
+    with _registry_lock:
+        executors = dict(_executors)
+    return {name: executor.stats() for name, executor in sorted(executors.items())}
+
+
+def shutdown_executors() -> None:
+    with _registry_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=False)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from backend.app.core.permission_resolver import PermissionSnapshot
+
+
+# Process-wide permission "generation". Every write that can change a resolved
+# PermissionSnapshot (users, permission groups, knowledge directory, datasets) bumps it,
+# which invalidates all cached snapshots at once without tracking which users are affected.
+_generation_lock = threading.Lock()
+_generation = 0
+
+
+def permission_generation() -> int:
+    return _generation
+
+
+def bump_permission_generation() -> int:
+    global _generation
+    with _generation_lock:
+        _generation += 1
+        return _generation
+
+
+def _user_signature(user: Any) -> tuple[Any, ...]:
+    group_ids = getattr(user, "group_ids", None) or []
+    return (getattr(user, "role", None), tuple(group_ids))
+
+
+class PermissionSnapshotCache:
+    """
+    Per-user cache of resolved `PermissionSnapshot`s.
+
+    An entry is served only while the permission generation is unchanged, the user's role and
+    group ids still match, and it is younger than `ttl_s`. The TTL matches the dataset index
+    cache so dataset renames done directly in RAGFlow are still picked up.
+    """
+
+    def __init__(self, *, ttl_s: float = 30.0, max_entries: int = 4096):
+        self._ttl_s = float(ttl_s)
+        self._max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple[int, tuple[Any, ...], float, PermissionSnapshot]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, user: Any) -> "PermissionSnapshot | None":
+        user_id = getattr(user, "user_id", None)
+        if not user_id:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                generation, signature, cached_at_s, snapshot = entry
+                if (
+                    generation == _generation
+                    and signature == _user_signature(user)
+                    and (time.monotonic() - cached_at_s) <= self._ttl_s
+                ):
+                    self._hits += 1
+                    self._entries.move_to_end(user_id)
+                    return snapshot
+                del self._entries[user_id]
+            self._misses += 1
+            return None
+
+    def put(self, user: Any, snapshot: "PermissionSnapshot", *, generation: int) -> None:
+        user_id = getattr(user, "user_id", None)
+        if not user_id:
+            return
+        with self._lock:
+            # A write that landed while the snapshot was being resolved makes it stale already.
+            if generation != _generation:
+                return
+            self._entries[user_id] = (generation, _user_signature(user), time.monotonic(), snapshot)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / total, 4) if total else 0.0,
+                "generation": _generation,
+                "ttl_s": self._ttl_s,
+            }
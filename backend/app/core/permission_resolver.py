@@ -6,6 +6,7 @@ from typing import Any, Iterable
 
 from fastapi import HTTPException
 
+from backend.app.core.permission_cache import permission_generation
 from backend.app.dependencies import AppDependencies
 
 
@@ -168,6 +169,22 @@ def resolve_permissions(deps: AppDependencies, user: Any) -> PermissionSnapshot:
     )
 
 
+def resolve_permissions_cached(deps: AppDependencies, user: Any) -> PermissionSnapshot:
+    """
+    `resolve_permissions` behind the per-user snapshot cache on `deps` (when present).
+    """
+    cache = getattr(deps, "permission_snapshot_cache", None)
+    if cache is None:
+        return resolve_permissions(deps, user)
+    snapshot = cache.get(user)
+    if snapshot is not None:
+        return snapshot
+    generation = permission_generation()
+    snapshot = resolve_permissions(deps, user)
+    cache.put(user, snapshot, generation=generation)
+    return snapshot
+
+
 def filter_datasets_by_name(snapshot: PermissionSnapshot, datasets: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
     if snapshot.kb_scope == ResourceScope.ALL:
         return list(datasets)
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from backend.app.core.executors import CONVERSION, RAGFLOW_IO, SQLITE, offload
+from backend.services.documents.document_manager import DocumentManager
+from backend.services.documents.models import DocumentRef
+from backend.services.unified_preview import needs_office_conversion
+
+
+async def offloaded_preview_payload(
+    mgr: DocumentManager,
+    ref: DocumentRef,
+    *,
+    render: str = "default",
+    delivery: str = "inline",
+) -> dict:
+    """
+    `DocumentManager.preview_payload` split across the pools: the fetch (and any payload that
+    needs no office conversion) runs on the source's pool, RAGFLOW_IO for RAGFlow downloads and
+    SQLITE for local uploads; only soffice conversions take one of the CONVERSION workers.
+    """
+    pool = RAGFLOW_IO if ref.source == "ragflow" else SQLITE
+    source = await offload(pool, mgr.fetch_preview_source, ref, delivery=delivery)
+    if isinstance(source, dict):
+        return source
+    if needs_office_conversion(source.filename, render):
+        pool = CONVERSION
+    return await offload(pool, mgr.build_preview, ref, source, render=render, delivery=delivery)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Any
+
+STREAM_PROTOCOL_FULL = "full"
+STREAM_PROTOCOL_DELTA = "delta"
+
+# `v` field on delta-protocol events, so clients can tell the framing apart from RAGFlow's own.
+DELTA_FRAMING_VERSION = 2
+
+
+def sse_data(obj: Any) -> str:
+    return f"data: {json.dumps(obj, ensure_ascii=False)}\n\n"
+
+
+def sse_frame(payload: bytes) -> bytes:
+    """Re-frame a raw upstream `data:` payload without decoding it."""
+    return b"data: " + payload + b"\n\n"
+
+
+_SESSION_ID_RE = re.compile(rb'"session_id"\s*:\s*"([^"\\]+)"')
+
+
+def scan_session_id(payload: bytes) -> str | None:
+    """`session_id` from a raw completion frame, found without parsing the JSON."""
+    m = _SESSION_ID_RE.search(payload)
+    if m is None:
+        return None
+    return m.group(1).decode("utf-8", "replace").strip() or None
+
+
+def frame_has_answer(payload: bytes) -> bool:
+    return b'"answer"' in payload
+
+
+def frame_answer(payload: bytes) -> str:
+    """Decode the `answer` of a raw completion frame ("" when it has none)."""
+    try:
+        data = json.loads(payload).get("data")
+    except Exception:
+        return ""
+    answer = data.get("answer") if isinstance(data, dict) else None
+    return answer if isinstance(answer, str) else ""
+
+
+def wants_delta(stream_protocol: str | None) -> bool:
+    return str(stream_protocol or "").strip().lower() == STREAM_PROTOCOL_DELTA
+
+
+class AnswerDeltaEncoder:
+    """
+    Re-frame RAGFlow's cumulative `answer` messages as append-only deltas.
+
+    - `{"code": 0, "v": 2, "data": {"delta": "..."}}` for each message that extends the answer;
+      the first one also carries the message metadata (session_id, id, ...). When the upstream
+      text is rewritten rather than extended, the event sets `"reset": true` and `delta` holds the
+      whole answer.
+    - `{"code": 0, "v": 2, "data": {..., "answer": <full>, "final": true}}` once at the end: the
+      last upstream message unchanged (reference included), flagged as final.
+    - Anything else (sources, errors, the `data: true` terminator) passes through untouched.
+    """
+
+    def __init__(self):
+        self._sent = ""
+        self._last: dict | None = None
+        self._started = False
+        self._finished = False
+
+    def encode(self, chunk: Any) -> list[Any]:
+        data = chunk.get("data") if isinstance(chunk, dict) else None
+        if not isinstance(data, dict) or not isinstance(data.get("answer"), str) or chunk.get("code") not in (0, None):
+            # RAGFlow closes a completion stream with `data: true`; the full answer goes out first.
+            if isinstance(chunk, dict) and data is True:
+                return [*self.finish(), chunk]
+            return [chunk]
+
+        answer = data["answer"]
+        self._last = chunk
+        if answer.startswith(self._sent):
+            delta, reset = answer[len(self._sent) :], False
+        elif self._sent.startswith(answer):
+            # An older/shorter snapshot: nothing new to send.
+            return []
+        else:
+            delta, reset = answer, True
+        self._sent = answer
+
+        if not delta and not reset and self._started:
+            return []
+        out: dict[str, Any] = {}
+        if not self._started:
+            out.update({k: v for k, v in data.items() if k not in ("answer", "reference")})
+            self._started = True
+        out["delta"] = delta
+        if reset:
+            out["reset"] = True
+        return [{"code": chunk.get("code", 0), "v": DELTA_FRAMING_VERSION, "data": out}]
+
+    def finish(self) -> list[dict]:
+        if self._finished or self._last is None:
+            return []
+        self._finished = True
+        final = dict(self._last["data"])
+        final["final"] = True
+        return [{"code": self._last.get("code", 0), "v": DELTA_FRAMING_VERSION, "data": final}]
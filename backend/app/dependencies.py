@@ -1,13 +1,17 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
+from backend.app.core.config import settings
+from backend.app.core.permission_cache import PermissionSnapshotCache
 from backend.database.paths import resolve_auth_db_path
 from backend.database.schema_migrations import ensure_schema
+from backend.database.write_behind import WriteBehindLog
 from backend.services.chat_session_store import ChatSessionStore
 from backend.services.auth_session_store import AuthSessionStore
 from backend.services.data_security import DataSecurityStore
 from backend.services.audit_log_store import AuditLogStore
 from backend.services.chat_message_sources_store import ChatMessageSourcesStore
 from backend.services.deletion_log_store import DeletionLogStore
+from backend.services.document_name_resolver import DocumentNameResolver
 from backend.services.download_log_store import DownloadLogStore
 from backend.services.kb_store import KbStore
 from backend.services.knowledge_directory_store import KnowledgeDirectoryStore
@@ -15,9 +19,11 @@ from backend.services.permission_group_store import PermissionGroupStore
 from backend.services.permission_group_folder_store import PermissionGroupFolderManager, PermissionGroupFolderStore
 from backend.services.patent_download.store import PatentDownloadStore
 from backend.services.paper_download.store import PaperDownloadStore
+from backend.services.ragflow_config_watcher import RagflowConfigWatcher
 from backend.services.ragflow_connection import create_ragflow_connection
 from backend.services.ragflow_chat_service import RagflowChatService
 from backend.services.ragflow_service import RagflowService
+from backend.services.ragflow.document_catalog import RagflowDocumentCatalog
 from backend.services.org_directory_store import OrgDirectoryStore
 from backend.services.user_store import UserStore
 from backend.services.search_config_store import SearchConfigStore
@@ -55,6 +61,12 @@ class AppDependencies:
     knowledge_ingestion_manager: KnowledgeIngestionManager | None
     permission_group_folder_store: PermissionGroupFolderStore
     permission_group_folder_manager: PermissionGroupFolderManager
+    permission_snapshot_cache: PermissionSnapshotCache = field(default_factory=PermissionSnapshotCache)
+    document_name_resolver: DocumentNameResolver | None = None
+    # Started/stopped by the app lifespan; until then the log stores write synchronously.
+    log_write_behind: WriteBehindLog | None = None
+    # Shared ragflow_config.json watcher; started/stopped by the app lifespan.
+    ragflow_config_watcher: RagflowConfigWatcher | None = None
 
 
 def create_dependencies(db_path: str | None = None) -> AppDependencies:
@@ -65,7 +77,10 @@ def create_dependencies(db_path: str | None = None) -> AppDependencies:
     chat_session_store = ChatSessionStore(db_path=str(db_path))
     auth_session_store = AuthSessionStore(db_path=str(db_path))
     auth_session_manager = AuthSessionManager(port=auth_session_store)
-    ragflow_conn = create_ragflow_connection()
+    ragflow_conn = create_ragflow_connection(
+        poll_interval_s=settings.RAGFLOW_CONFIG_POLL_INTERVAL_S,
+        force_polling=settings.RAGFLOW_CONFIG_FORCE_POLLING,
+    )
     data_security_store = DataSecurityStore(db_path=str(db_path))
     chat_message_sources_store = ChatMessageSourcesStore(db_path=str(db_path))
     search_config_store = SearchConfigStore(db_path=str(db_path))
@@ -75,15 +90,27 @@ def create_dependencies(db_path: str | None = None) -> AppDependencies:
     permission_group_folder_store = PermissionGroupFolderStore(db_path=str(db_path))
     permission_group_folder_manager = PermissionGroupFolderManager(store=permission_group_folder_store)
 
-    audit_log_store = AuditLogStore(db_path=str(db_path))
+    log_write_behind = None
+    if settings.LOG_WRITE_BEHIND_ENABLED:
+        log_write_behind = WriteBehindLog(
+            db_path,
+            max_queue=settings.LOG_WRITE_BEHIND_MAX_QUEUE,
+            batch_size=settings.LOG_WRITE_BEHIND_BATCH_SIZE,
+            flush_interval_s=settings.LOG_WRITE_BEHIND_FLUSH_INTERVAL_S,
+        )
+
+    audit_log_store = AuditLogStore(db_path=str(db_path), write_behind=log_write_behind)
     audit_log_manager = AuditLogManager(store=audit_log_store)
 
     deps = AppDependencies(
         user_store=UserStore(db_path=str(db_path)),
         kb_store=KbStore(db_path=str(db_path)),
-        ragflow_service=RagflowService(connection=ragflow_conn),
-        deletion_log_store=DeletionLogStore(db_path=str(db_path)),
-        download_log_store=DownloadLogStore(db_path=str(db_path)),
+        ragflow_service=RagflowService(
+            connection=ragflow_conn,
+            document_catalog=RagflowDocumentCatalog(db_path=str(db_path)),
+        ),
+        deletion_log_store=DeletionLogStore(db_path=str(db_path), write_behind=log_write_behind),
+        download_log_store=DownloadLogStore(db_path=str(db_path), write_behind=log_write_behind),
         audit_log_store=audit_log_store,
         audit_log_manager=audit_log_manager,
         ragflow_chat_service=RagflowChatService(session_store=chat_session_store, connection=ragflow_conn),
@@ -104,6 +131,9 @@ def create_dependencies(db_path: str | None = None) -> AppDependencies:
         knowledge_ingestion_manager=None,
         permission_group_folder_store=permission_group_folder_store,
         permission_group_folder_manager=permission_group_folder_manager,
+        log_write_behind=log_write_behind,
+        ragflow_config_watcher=ragflow_conn.watcher,
     )
     deps.knowledge_ingestion_manager = KnowledgeIngestionManager(deps=deps)
+    deps.document_name_resolver = DocumentNameResolver(kb_store=deps.kb_store, ragflow_service=deps.ragflow_service)
     return deps
@@ -53,13 +53,89 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to start improved backup scheduler V2: {e}", exc_info=True)
         raise
 
+    try:
+        if app.state.deps.log_write_behind is not None:
+            app.state.deps.log_write_behind.start()
+    except Exception as e:
+        logger.warning(f"Failed to start log write-behind (logging synchronously): {e}")
+
+    try:
+        if settings.RAGFLOW_CONFIG_WATCH_ENABLED and app.state.deps.ragflow_config_watcher is not None:
+            app.state.deps.ragflow_config_watcher.start()
+    except Exception as e:
+        logger.warning(f"Failed to start RAGFlow config watcher (falling back to throttled checks): {e}")
+
+    try:
+        from backend.services.ragflow.document_catalog import start_document_catalog_reconciler
+
+        start_document_catalog_reconciler(
+            app.state.deps.ragflow_service, interval_s=settings.RAGFLOW_CATALOG_SYNC_INTERVAL_S
+        )
+    except Exception as e:
+        logger.warning(f"Failed to start RAGFlow document catalog reconciler: {e}")
+
+    try:
+        from backend.services.kb.content_hash_backfill import start_content_hash_backfill
+
+        start_content_hash_backfill(app.state.deps.kb_store)
+    except Exception as e:
+        logger.warning(f"Failed to start kb_documents content hash backfill: {e}")
+
     yield
+    try:
+        from backend.services.kb.content_hash_backfill import stop_content_hash_backfill
+
+        stop_content_hash_backfill()
+    except Exception as e:
+        logger.warning(f"Error stopping kb_documents content hash backfill: {e}")
+    try:
+        from backend.services.ragflow.document_catalog import stop_document_catalog_reconciler
+
+        stop_document_catalog_reconciler()
+    except Exception as e:
+        logger.warning(f"Error stopping RAGFlow document catalog reconciler: {e}")
+    try:
+        if app.state.deps.ragflow_config_watcher is not None:
+            app.state.deps.ragflow_config_watcher.stop()
+    except Exception as e:
+        logger.warning(f"Error stopping RAGFlow config watcher: {e}")
+    try:
+        await app.state.deps.ragflow_chat_service.aclose()
+    except Exception as e:
+        logger.warning(f"Error closing RAGFlow async client: {e}")
     try:
         stop_scheduler_v2()
         logger.info("Backup scheduler V2 stopped")
     except Exception as e:
         logger.error(f"Error stopping scheduler V2: {e}", exc_info=True)
 
+    try:
+        from backend.app.core.executors import shutdown_executors
+
+        shutdown_executors()
+    except Exception as e:
+        logger.warning(f"Error shutting down worker pools: {e}")
+
+    try:
+        from backend.services.office_worker_pool import shutdown_office_pool
+
+        shutdown_office_pool()
+    except Exception as e:
+        logger.warning(f"Error stopping LibreOffice workers: {e}")
+
+    try:
+        if app.state.deps.log_write_behind is not None:
+            app.state.deps.log_write_behind.stop()
+    except Exception as e:
+        logger.warning(f"Error flushing log write-behind: {e}")
+
+    try:
+        from backend.database.sqlite import close_sqlite_pools
+
+        close_sqlite_pools()
+    except Exception as e:
+        logger.warning(f"Error closing sqlite pools: {e}")
+
     logger.info("Shutting down...")
 
 
@@ -1,12 +1,23 @@
 from fastapi import APIRouter, HTTPException, Body
+from fastapi.responses import StreamingResponse
 from typing import Any, Optional
+import json
 import logging
 from pydantic import BaseModel
 
 from backend.app.core.authz import AuthContextDep
+from backend.app.core.config import settings
 from backend.app.core.datasets import list_accessible_datasets
+from backend.app.core.executors import RAGFLOW_IO, offload
 from backend.app.core.permdbg import permdbg
-from backend.app.core.permission_resolver import ResourceScope, allowed_dataset_ids, filter_datasets_by_name, assert_kb_allowed
+from backend.app.core.permission_resolver import (
+    ResourceScope,
+    allowed_dataset_ids,
+    filter_datasets_by_name,
+    assert_kb_allowed,
+    normalize_accessible_chat_ids,
+)
+from backend.app.core.sse import AnswerDeltaEncoder, sse_data, sse_frame, wants_delta
 from backend.services.audit_helpers import actor_fields_from_ctx
 
 
@@ -26,6 +37,89 @@ class SearchRequest(BaseModel):
     highlight: bool = False
 
 
+class AgentCompletionRequest(BaseModel):
+    """Agent completion request model"""
+    question: str
+    stream: bool = True
+    session_id: Optional[str] = None
+    inputs: Optional[dict[str, Any]] = None
+    # "delta": relay only the appended answer text per event (see backend.app.core.sse).
+    stream_protocol: Optional[str] = None
+
+
+@router.post("/agents/{agent_id}/completions")
+async def agent_completion(
+    agent_id: str,
+    body: AgentCompletionRequest,
+    ctx: AuthContextDep,
+):
+    """
+    与搜索体对话（流式）
+
+    权限规则：
+    - 用户必须有该搜索体的权限（权限组 accessible_chats 中的 agent_<id>）
+    """
+    deps = ctx.deps
+    user = ctx.user
+    snapshot = ctx.snapshot
+    if not snapshot.is_admin:
+        if snapshot.chat_scope == ResourceScope.NONE or agent_id not in normalize_accessible_chat_ids(snapshot.chat_ids):
+            raise HTTPException(status_code=403, detail="无权访问该搜索体")
+
+    if not body.question:
+        raise HTTPException(status_code=400, detail="问题不能为空")
+
+    async def generate():
+        delta_encoder = AnswerDeltaEncoder() if wants_delta(body.stream_protocol) else None
+        chat_service = deps.ragflow_chat_service
+        try:
+            # Nothing is rewritten on this route, so frames go out as the upstream bytes unless delta framing is wanted.
+            if (
+                settings.CHAT_SSE_PASSTHROUGH
+                and body.stream
+                and delta_encoder is None
+                and callable(getattr(chat_service, "agent_chat_frames", None))
+            ):
+                async for payload in chat_service.agent_chat_frames(
+                    agent_id=agent_id,
+                    question=body.question,
+                    session_id=body.session_id,
+                    inputs=body.inputs,
+                    user_id=user.user_id,
+                ):
+                    yield sse_frame(payload)
+                return
+            async for chunk in chat_service.agent_chat(
+                agent_id=agent_id,
+                question=body.question,
+                stream=body.stream,
+                session_id=body.session_id,
+                inputs=body.inputs,
+                user_id=user.user_id,
+            ):
+                if delta_encoder is None:
+                    yield sse_data(chunk)
+                else:
+                    for event in delta_encoder.encode(chunk):
+                        yield sse_data(event)
+            if delta_encoder is not None:
+                for event in delta_encoder.finish():
+                    yield sse_data(event)
+        except Exception as e:
+            logger.error(f"[AGENT] Error during agent chat: {e}", exc_info=True)
+            yield f"data: {json.dumps({'code': -1, 'message': str(e)}, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
 @router.post("/search")
 async def search_chunks(
     request_data: SearchRequest,
@@ -41,7 +135,7 @@ async def search_chunks(
     deps = ctx.deps
     snapshot = ctx.snapshot
 
-    all_datasets = deps.ragflow_service.list_datasets()
+    all_datasets = await offload(RAGFLOW_IO, deps.ragflow_service.list_datasets)
     available_dataset_ids = allowed_dataset_ids(snapshot, all_datasets)
 
     try:
@@ -59,7 +153,11 @@ async def search_chunks(
     # 如果指定了dataset_ids，验证用户是否有权限
     if request_data.dataset_ids:
         normalize = getattr(deps.ragflow_service, "normalize_dataset_ids", None)
-        requested_ids = normalize(request_data.dataset_ids) if callable(normalize) else request_data.dataset_ids
+        requested_ids = (
+            await offload(RAGFLOW_IO, normalize, request_data.dataset_ids)
+            if callable(normalize)
+            else request_data.dataset_ids
+        )
         valid_dataset_ids = [ds_id for ds_id in requested_ids if ds_id in available_dataset_ids]
         if not valid_dataset_ids:
             raise HTTPException(status_code=403, detail="您没有权限访问指定的知识库")
@@ -72,7 +170,9 @@ async def search_chunks(
 
     # 调用检索服务
     try:
-        result = deps.ragflow_chat_service.retrieve_chunks(
+        result = await offload(
+            RAGFLOW_IO,
+            deps.ragflow_chat_service.retrieve_chunks,
             question=request_data.question,
             dataset_ids=dataset_ids,
             page=request_data.page,
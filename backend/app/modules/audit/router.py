@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 
 from backend.app.core.authz import AdminOnly, AuthContextDep
 
@@ -22,6 +22,8 @@ async def list_audit_events(
     to_ms: int | None = None,
     offset: int = 0,
     limit: int = 200,
+    cursor: str | None = None,
+    total_mode: str = "exact",
 ):
     """
     Unified audit events list (admin only).
@@ -29,12 +31,13 @@ async def list_audit_events(
     Covers:
     - auth_login/auth_logout
     - document_preview/document_upload/document_download/document_delete
+
+    Page with `cursor` (the previous response's `next_cursor`) rather than `offset` on large logs;
+    `total_mode=cached|none` avoids recounting the whole filter on every page.
     """
-    manager = getattr(ctx.deps, "audit_log_manager", None)
-    if manager is None:
-        manager = ctx.deps.audit_log_store
-    if hasattr(manager, "list_events") and manager is not ctx.deps.audit_log_store:
-        return manager.list_events(
+    try:
+        return _list_audit_events(
+            ctx,
             action=action,
             actor=actor,
             actor_username=username,
@@ -46,22 +49,23 @@ async def list_audit_events(
             to_ms=to_ms,
             offset=offset,
             limit=limit,
+            cursor=cursor,
+            total_mode=total_mode,
         )
-    total, rows = ctx.deps.audit_log_store.list_events(
-        action=action,
-        actor=actor,
-        actor_username=username,
-        company_id=company_id,
-        department_id=department_id,
-        source=source,
-        kb_ref=kb_ref,
-        from_ms=from_ms,
-        to_ms=to_ms,
-        offset=offset,
-        limit=limit,
-    )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+def _list_audit_events(ctx, **query) -> dict:
+    manager = getattr(ctx.deps, "audit_log_manager", None)
+    if manager is None:
+        manager = ctx.deps.audit_log_store
+    if hasattr(manager, "list_events") and manager is not ctx.deps.audit_log_store:
+        return manager.list_events(**query)
+    page = ctx.deps.audit_log_store.list_events_page(**query)
     return {
-        "total": total,
+        "total": page.total,
+        "next_cursor": page.next_cursor,
         "items": [
             {
                 "id": r.id,
@@ -81,6 +85,6 @@ async def list_audit_events(
                 "kb_name": r.kb_name,
                 "meta_json": r.meta_json,
             }
-            for r in rows
+            for r in page.items
         ],
     }
@@ -7,9 +7,20 @@ import asyncio
 from pydantic import BaseModel
 
 from backend.app.core.authz import AuthContextDep
-from backend.app.core.kb_refs import resolve_kb_ref
+from backend.app.core.config import settings
+from backend.app.core.executors import RAGFLOW_IO, SQLITE, offload
 from backend.app.core.permission_resolver import ResourceScope, allowed_dataset_ids, normalize_accessible_chat_ids
+from backend.app.core.sse import (
+    AnswerDeltaEncoder,
+    frame_answer,
+    frame_has_answer,
+    scan_session_id,
+    sse_data,
+    sse_frame,
+    wants_delta,
+)
 from backend.services.chat_message_sources_store import content_hash_hex
+from backend.services.document_name_resolver import DocumentNameResolver
 
 
 router = APIRouter()
@@ -28,11 +39,113 @@ def _assert_chat_access(snapshot, chat_id: Optional[str] = None) -> set[str]:
     return allowed_raw_ids
 
 
+def _source_fields(ch: dict) -> tuple[str, str, str, str] | None:
+    """`(doc_id, dataset_ref, filename, chunk_text)` from a RAGFlow chunk (retrieval result or completion reference)."""
+    doc_id = ch.get("document_id") or ch.get("docId") or ch.get("documentId") or ch.get("doc_id") or ch.get("id")
+    dataset_ref = (
+        ch.get("dataset_id")
+        or ch.get("dataset")
+        or ch.get("kb_id")
+        or ch.get("kb")
+        or ch.get("kb_name")
+        or ch.get("dataset_name")
+    )
+    filename = ch.get("filename") or ch.get("doc_name") or ch.get("document_name") or ch.get("title") or ch.get("name")
+    chunk_text = (
+        ch.get("content") or ch.get("chunk") or ch.get("text") or ch.get("snippet") or ch.get("content_with_weight")
+    )
+    if not isinstance(doc_id, str) or not doc_id:
+        return None
+    dataset_ref = dataset_ref if isinstance(dataset_ref, str) else ""
+    filename = filename if isinstance(filename, str) else ""
+    if not isinstance(chunk_text, str):
+        chunk_text = ""
+    chunk_text = chunk_text.strip()
+    if len(chunk_text) > 2000:
+        chunk_text = chunk_text[:2000] + "…"
+    return doc_id, dataset_ref, filename, chunk_text
+
+
+def _looks_like_placeholder(name: str, doc_id: str) -> bool:
+    if not name:
+        return True
+    n = name.strip()
+    if not n:
+        return True
+    if n == doc_id:
+        return True
+    if n.startswith("document_") and doc_id in n:
+        return True
+    return False
+
+
+# Citation markers in answers index into the reference chunk list, so a chunk the user may not
+# see is blanked in place rather than dropped.
+_REDACTED_SOURCE = {"doc_id": "", "dataset": "", "filename": "", "chunk": ""}
+
+
+def _build_sources(deps, ragflow_service, parsed: list, dataset_candidates: list[str]) -> list[dict]:
+    """Source entries for parsed chunks (None entries stay redacted), with names resolved in one bulk call."""
+    # One bulk lookup (LRU -> local uploads -> RAGFlow catalog) for every document in the answer.
+    resolver = getattr(deps, "document_name_resolver", None) or DocumentNameResolver(
+        kb_store=getattr(deps, "kb_store", None), ragflow_service=ragflow_service
+    )
+    try:
+        resolved = resolver.resolve([(item[0], item[1]) for item in parsed if item is not None])
+    except Exception as e:
+        logger.warning("[CHAT] Failed to resolve source names: %s", e)
+        resolved = {}
+
+    sources: list[dict] = []
+    for item in parsed:
+        if item is None:
+            sources.append(dict(_REDACTED_SOURCE))
+            continue
+        doc_id, dataset_ref, filename, chunk_text = item
+        if dataset_ref:
+            try:
+                ds_name = ragflow_service.resolve_dataset_name(dataset_ref)
+            except Exception:
+                ds_name = None
+            fallback_dataset = ds_name or dataset_ref
+        else:
+            fallback_dataset = dataset_candidates[0] if dataset_candidates else dataset_ref
+
+        resolved_name, resolved_dataset = resolved.get(doc_id, ("", ""))
+        sources.append(
+            {
+                "doc_id": doc_id,
+                "dataset": resolved_dataset or fallback_dataset,
+                "filename": resolved_name or ("" if _looks_like_placeholder(filename, doc_id) else filename) or doc_id,
+                "chunk": chunk_text,
+            }
+        )
+    return sources
+
+
+def _reference_chunks(chunk: object) -> list | None:
+    """Reference chunks RAGFlow attaches to a completion message, if this message carries any."""
+    if not isinstance(chunk, dict):
+        return None
+    data = chunk.get("data")
+    if not isinstance(data, dict):
+        return None
+    reference = data.get("reference")
+    if not isinstance(reference, dict):
+        return None
+    chunks = reference.get("chunks")
+    if isinstance(chunks, list) and chunks:
+        return chunks
+    return None
+
+
 class ChatCompletionRequest(BaseModel):
     """Chat completion request model"""
     question: str
     stream: bool = True
     session_id: Optional[str] = None
+    # "delta": relay only the appended answer text per event (see backend.app.core.sse).
+    stream_protocol: Optional[str] = None
 
 
 class DeleteSessionsRequest(BaseModel):
@@ -473,29 +586,33 @@ async def chat_completion(
             effective_session_id = str(body.session_id or "").strip() or None
             sources_sent = False
             assistant_text_for_hash = ""
+            ragflow_service = getattr(deps, "ragflow_service", None)
+            delta_encoder = AnswerDeltaEncoder() if wants_delta(body.stream_protocol) else None
+            # "reference": sources come from the chunks RAGFlow returns with the completion itself;
+            # the separate retrieval below only runs when the stream carried no references.
+            use_references = str(settings.CHAT_SOURCES_MODE or "").strip().lower() != "retrieval"
+
+            def _allowed_datasets() -> tuple[list[str], list[str]]:
+                all_datasets = ragflow_service.list_datasets() or []
+                dataset_ids = allowed_dataset_ids(snapshot, all_datasets)
+                dataset_candidates: list[str] = []
+                for ds_id in dataset_ids:
+                    try:
+                        name = ragflow_service.resolve_dataset_name(ds_id)
+                    except Exception:
+                        name = None
+                    dataset_candidates.append(name or ds_id)
+                return dataset_ids, dataset_candidates
 
             # Build retrieval sources in the background so we never block streaming answers.
             def _build_sources_sync() -> list[dict]:
                 try:
-                    ragflow_service = getattr(deps, "ragflow_service", None)
                     if ragflow_service is None:
                         return []
-                    all_datasets = ragflow_service.list_datasets() or []
-                    dataset_ids = allowed_dataset_ids(snapshot, all_datasets)
+                    dataset_ids, dataset_candidates = _allowed_datasets()
                     if not dataset_ids:
                         return []
 
-                    dataset_candidates: list[str] = []
-                    try:
-                        for ds_id in dataset_ids:
-                            try:
-                                name = ragflow_service.resolve_dataset_name(ds_id)
-                            except Exception:
-                                name = None
-                            dataset_candidates.append(name or ds_id)
-                    except Exception:
-                        dataset_candidates = []
-
                     retrieval = deps.ragflow_chat_service.retrieve_chunks(
                         question=body.question,
                         dataset_ids=dataset_ids,
@@ -507,165 +624,96 @@ async def chat_completion(
                         highlight=False,
                     )
                     chunks = retrieval.get("chunks") if isinstance(retrieval, dict) else None
-                    sources: list[dict] = []
-                    name_cache: dict[tuple[str, str], str] = {}
-                    doc_dataset_cache: dict[str, str] = {}
-                    if isinstance(chunks, list):
-                        for ch in chunks:
-                            if not isinstance(ch, dict):
-                                continue
-                            doc_id = (
-                                ch.get("document_id")
-                                or ch.get("docId")
-                                or ch.get("documentId")
-                                or ch.get("doc_id")
-                                or ch.get("id")
-                            )
-                            dataset_ref = (
-                                ch.get("dataset_id")
-                                or ch.get("dataset")
-                                or ch.get("kb_id")
-                                or ch.get("kb")
-                                or ch.get("kb_name")
-                                or ch.get("dataset_name")
-                            )
-                            filename = (
-                                ch.get("filename")
-                                or ch.get("doc_name")
-                                or ch.get("document_name")
-                                or ch.get("title")
-                                or ch.get("name")
-                            )
-                            chunk_text = (
-                                ch.get("content")
-                                or ch.get("chunk")
-                                or ch.get("text")
-                                or ch.get("snippet")
-                                or ch.get("content_with_weight")
-                            )
-                            if not isinstance(doc_id, str) or not doc_id:
-                                continue
-                            dataset_ref = dataset_ref if isinstance(dataset_ref, str) else ""
-                            filename = filename if isinstance(filename, str) else ""
-                            if not isinstance(chunk_text, str):
-                                chunk_text = ""
-                            chunk_text = chunk_text.strip()
-                            if len(chunk_text) > 2000:
-                                chunk_text = chunk_text[:2000] + "…"
-
-                            def _looks_like_placeholder(name: str) -> bool:
-                                if not name:
-                                    return True
-                                n = name.strip()
-                                if not n:
-                                    return True
-                                if n == doc_id:
-                                    return True
-                                if n.startswith("document_") and doc_id in n:
-                                    return True
-                                return False
-
-                            resolved_name = ""
-                            resolved_dataset = ""
-
-                            if doc_id in doc_dataset_cache:
-                                resolved_dataset = doc_dataset_cache[doc_id]
-
-                            # Prefer dataset from chunk; otherwise try all accessible datasets (best-effort).
-                            candidates = []
-                            if dataset_ref:
-                                try:
-                                    ds_name = ragflow_service.resolve_dataset_name(dataset_ref)
-                                except Exception:
-                                    ds_name = None
-                                candidates = [ds_name or dataset_ref]
-                            else:
-                                candidates = dataset_candidates[:6]
-
-                            # Resolve dataset + name if filename is missing or looks like placeholder.
-                            if _looks_like_placeholder(filename) or not resolved_dataset:
-                                for dataset_name in candidates:
-                                    if not dataset_name:
-                                        continue
-                                    cache_key = (dataset_name, doc_id)
-                                    if cache_key in name_cache:
-                                        resolved_name = name_cache[cache_key]
-                                        resolved_dataset = dataset_name
-                                        break
-
-                                    # Prefer local DB mapping (original uploaded filename) when available.
-                                    try:
-                                        kb_store = getattr(deps, "kb_store", None)
-                                    except Exception:
-                                        kb_store = None
-                                    if kb_store is not None:
-                                        try:
-                                            kb_info = resolve_kb_ref(deps, dataset_name)
-                                            local_doc = kb_store.get_document_by_ragflow_id(
-                                                doc_id,
-                                                kb_id=(kb_info.name or kb_info.ref),
-                                                kb_refs=list(kb_info.variants),
-                                            )
-                                        except Exception:
-                                            local_doc = None
-                                            kb_info = None
-
-                                        local_name = ""
-                                        if local_doc is not None:
-                                            try:
-                                                local_name = str(getattr(local_doc, "filename", "") or "").strip()
-                                            except Exception:
-                                                local_name = ""
-
-                                        if local_name:
-                                            resolved_name = local_name
-                                            resolved_dataset = (kb_info.name if kb_info is not None else None) or dataset_name
-                                            name_cache[cache_key] = local_name
-                                            break
-
-                                    try:
-                                        detail = ragflow_service.get_document_detail(doc_id, dataset_name=dataset_name)
-                                    except Exception:
-                                        detail = None
-                                    if isinstance(detail, dict):
-                                        n = str(detail.get("name") or "").strip()
-                                        if n:
-                                            resolved_name = n
-                                            resolved_dataset = dataset_name
-                                            name_cache[cache_key] = n
-                                            break
-
-                            if resolved_dataset:
-                                doc_dataset_cache[doc_id] = resolved_dataset
-
-                            final_dataset = resolved_dataset or (candidates[0] if candidates else dataset_ref)
-                            final_name = resolved_name or ("" if _looks_like_placeholder(filename) else filename) or doc_id
-
-                            sources.append(
-                                {
-                                    "doc_id": doc_id,
-                                    "dataset": final_dataset,
-                                    "filename": final_name,
-                                    "chunk": chunk_text,
-                                }
-                            )
-                    return sources
+                    parsed = [_source_fields(ch) for ch in (chunks or []) if isinstance(ch, dict)]
+                    parsed = [item for item in parsed if item is not None]
+                    return _build_sources(deps, ragflow_service, parsed, dataset_candidates)
                 except Exception as e:
                     logger.warning("[CHAT] Failed to build sources: %s", e)
                     return []
 
-            try:
-                sources_task = asyncio.create_task(asyncio.to_thread(_build_sources_sync))
-            except Exception:
-                sources_task = None
+            def _screen_references_sync(chunks: list) -> tuple[list, list[str]]:
+                """Parsed reference chunks, with None for chunks outside the user's datasets."""
+                if ragflow_service is None:
+                    return [None] * len(chunks), []
+                dataset_ids, dataset_candidates = _allowed_datasets()
+                allowed = set(dataset_ids)
+                parsed: list = []
+                for ch in chunks:
+                    item = _source_fields(ch) if isinstance(ch, dict) else None
+                    if item is not None:
+                        try:
+                            ds_id = ragflow_service.normalize_dataset_id(item[1]) if item[1] else None
+                        except Exception:
+                            ds_id = None
+                        if (ds_id or item[1]) not in allowed:
+                            item = None
+                    parsed.append(item)
+                return parsed, dataset_candidates
+
+            if not use_references:
+                try:
+                    sources_task = asyncio.create_task(offload(RAGFLOW_IO, _build_sources_sync))
+                except Exception:
+                    sources_task = None
+
+            chat_service = deps.ragflow_chat_service
+            passthrough = (
+                bool(settings.CHAT_SSE_PASSTHROUGH)
+                and body.stream
+                and delta_encoder is None
+                and callable(getattr(chat_service, "chat_frames", None))
+            )
+            last_answer_frame: bytes | None = None
+
+            async def _upstream():
+                """(message, None) for messages that need handling here; (None, payload) for raw relay frames."""
+                if not passthrough:
+                    async for message in chat_service.chat(
+                        chat_id=chat_id,
+                        question=body.question,
+                        stream=body.stream,
+                        session_id=body.session_id,
+                        user_id=user.user_id
+                    ):
+                        yield message, None
+                    return
+                async for payload in chat_service.chat_frames(
+                    chat_id=chat_id,
+                    question=body.question,
+                    session_id=body.session_id,
+                    user_id=user.user_id,
+                ):
+                    # Reference chunks must be screened, so only those frames are decoded.
+                    if use_references and b'"chunks"' in payload:
+                        try:
+                            message = json.loads(payload)
+                        except Exception:
+                            continue
+                        if isinstance(message, dict):
+                            yield message, None
+                        continue
+                    yield None, payload
+
+            async for chunk, frame in _upstream():
+                # If sources are ready, send them as a dedicated SSE event (do not block the answer stream).
+                try:
+                    if sources_task and (not sources_sent) and sources_task.done():
+                        sources_sent = True
+                        built_sources = sources_task.result() or []
+                        if built_sources:
+                            yield f"data: {json.dumps({'code': 0, 'data': {'sources': built_sources}}, ensure_ascii=False)}\n\n"
+                except Exception as e:
+                    sources_sent = True
+                    logger.warning("[CHAT] Failed to send sources: %s", e)
+
+                if frame is not None:
+                    if not effective_session_id:
+                        effective_session_id = scan_session_id(frame)
+                    if frame_has_answer(frame):
+                        last_answer_frame = frame
+                    yield sse_frame(frame)
+                    continue
 
-            async for chunk in deps.ragflow_chat_service.chat(
-                chat_id=chat_id,
-                question=body.question,
-                stream=body.stream,
-                session_id=body.session_id,
-                user_id=user.user_id
-            ):
                 # SSE格式
                 try:
                     if isinstance(chunk, dict):
@@ -678,21 +726,55 @@ async def chat_completion(
                             ans = data.get("answer")
                             if isinstance(ans, str) and ans:
                                 assistant_text_for_hash = ans
+                                last_answer_frame = None
                 except Exception:
                     pass
 
-                # If sources are ready, send them as a dedicated SSE event (do not block the answer stream).
-                try:
-                    if sources_task and (not sources_sent) and sources_task.done():
+                # Completion references: screened on every message that carries them (never relay chunks
+                # from datasets the user cannot access), turned into sources on the first one.
+                reference_chunks = _reference_chunks(chunk) if use_references else None
+                if reference_chunks is not None:
+                    try:
+                        parsed, dataset_candidates = await offload(RAGFLOW_IO, _screen_references_sync, reference_chunks)
+                    except Exception as e:
+                        logger.warning("[CHAT] Failed to screen references: %s", e)
+                        parsed, dataset_candidates = [None] * len(reference_chunks), []
+                    reference = chunk["data"]["reference"]
+                    reference["chunks"] = [ch if item is not None else {} for ch, item in zip(reference_chunks, parsed)]
+                    visible_doc_ids = {item[0] for item in parsed if item is not None}
+                    if isinstance(reference.get("doc_aggs"), list):
+                        reference["doc_aggs"] = [
+                            agg
+                            for agg in reference["doc_aggs"]
+                            if isinstance(agg, dict) and agg.get("doc_id") in visible_doc_ids
+                        ]
+                    if not sources_sent and visible_doc_ids:
                         sources_sent = True
-                        built_sources = sources_task.result() or []
+                        built_sources = await offload(
+                            RAGFLOW_IO, _build_sources, deps, ragflow_service, parsed, dataset_candidates
+                        )
                         if built_sources:
                             yield f"data: {json.dumps({'code': 0, 'data': {'sources': built_sources}}, ensure_ascii=False)}\n\n"
-                except Exception as e:
-                    sources_sent = True
-                    logger.warning("[CHAT] Failed to send sources: %s", e)
 
-                yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                if delta_encoder is None:
+                    yield sse_data(chunk)
+                else:
+                    for event in delta_encoder.encode(chunk):
+                        yield sse_data(event)
+
+            if delta_encoder is not None:
+                for event in delta_encoder.finish():
+                    yield sse_data(event)
+
+            if last_answer_frame is not None:
+                assistant_text_for_hash = frame_answer(last_answer_frame) or assistant_text_for_hash
+
+            # No references in the stream (older RAGFlow, or a chat without datasets): fall back to retrieval.
+            if use_references and not sources_sent:
+                sources_sent = True
+                built_sources = await offload(RAGFLOW_IO, _build_sources_sync)
+                if built_sources:
+                    yield f"data: {json.dumps({'code': 0, 'data': {'sources': built_sources}}, ensure_ascii=False)}\n\n"
 
             # Persist assistant sources in sqlite so chat history survives backup/restore.
             try:
@@ -703,7 +785,9 @@ async def chat_completion(
                 if built_sources and effective_session_id and assistant_text_for_hash:
                     src_store = getattr(deps, "chat_message_sources_store", None)
                     if src_store:
-                        src_store.upsert_sources(
+                        await offload(
+                            SQLITE,
+                            src_store.upsert_sources,
                             chat_id=chat_id,
                             session_id=effective_session_id,
                             assistant_text=assistant_text_for_hash,
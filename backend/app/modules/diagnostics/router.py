@@ -6,7 +6,13 @@ import sys
 from pathlib import Path
 
 from backend.app.core.authz import AdminOnly, AuthContextDep
+from backend.app.core.executors import executor_stats
 from backend.app.core.permission_resolver import ResourceScope
+from backend.database.sqlite import sqlite_pool_stats
+from backend.services.office_worker_pool import office_pool_stats
+from backend.services.preview_blobs import get_preview_blob_store
+from backend.services.preview_cache import get_preview_cache
+from backend.services.ragflow.refresh import get_refresh_scheduler
 from backend.services.ragflow_config import is_placeholder_api_key
 
 
@@ -112,6 +118,13 @@ async def ragflow_diagnostics(ctx: AuthContextDep, _: AdminOnly):
     except Exception:
         chats = []
 
+    http_pool = {}
+    try:
+        pool_stats = getattr(getattr(ragflow, "_http", None), "pool_stats", None)
+        http_pool = pool_stats() if callable(pool_stats) else {}
+    except Exception:
+        http_pool = {}
+
     return {
         "ragflow": {
             "config_path": str(getattr(ragflow, "config_path", "")),
@@ -130,6 +143,31 @@ async def ragflow_diagnostics(ctx: AuthContextDep, _: AdminOnly):
             "chat_refs_count": len(chats or []),
             "chat_refs_sample": (chats or [])[:20],
         },
+        "http_pool": http_pool,
+    }
+
+
+@router.get("/diagnostics/runtime")
+async def runtime_diagnostics(ctx: AuthContextDep, _: AdminOnly):
+    """
+    In-process resource pools and caches (connection reuse, queue depths, hit ratios).
+    """
+    return {
+        "sqlite_pools": sqlite_pool_stats(),
+        "executors": executor_stats(),
+        "preview_cache": get_preview_cache().stats(),
+        "preview_blobs": get_preview_blob_store().stats(),
+        "office_pool": office_pool_stats(),
+        "ragflow_datasets": ctx.deps.ragflow_service.dataset_registry_stats(),
+        "ragflow_chat_refs": ctx.deps.ragflow_chat_service.chat_ref_index_stats(),
+        "ragflow_index_refresh": get_refresh_scheduler().stats(),
+        "ragflow_config": ctx.deps.ragflow_config_watcher.stats() if ctx.deps.ragflow_config_watcher else None,
+        "ragflow_document_catalog": ctx.deps.ragflow_service.document_catalog_stats(),
+        "document_names": ctx.deps.document_name_resolver.stats() if ctx.deps.document_name_resolver else None,
+        "permission_snapshots": ctx.deps.permission_snapshot_cache.stats(),
+        "auth_session_touches": ctx.deps.auth_session_store.touch_stats(),
+        "org_directory": ctx.deps.org_directory_store.cache_stats(),
+        "log_write_behind": ctx.deps.log_write_behind.stats() if ctx.deps.log_write_behind else None,
     }
 
 
@@ -6,9 +6,11 @@ import time
 import zipfile
 
 from fastapi import APIRouter, HTTPException, Request, UploadFile, File
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 
 from backend.app.core.authz import AuthContextDep
+from backend.app.core.config import settings
+from backend.app.core.executors import ARCHIVE, SQLITE, offload, prime_offloaded
 from backend.app.core.kb_refs import resolve_kb_ref
 from backend.app.core.permission_resolver import assert_can_download, assert_kb_allowed
 from backend.services.documents.document_manager import DocumentManager
@@ -113,48 +115,53 @@ async def batch_download_documents_unified(
 
     if src == "knowledge":
         doc_ids = data.get("doc_ids", [])
-        valid_docs = []
-        for doc_id in doc_ids:
-            doc = deps.kb_store.get_document(doc_id)
-            if not doc:
-                continue
-            assert_kb_allowed(snapshot, doc.kb_id)
-            if not os.path.exists(doc.file_path):
-                continue
-            valid_docs.append(doc)
 
-        if not valid_docs:
-            raise HTTPException(status_code=404, detail="娌℃湁鎵惧埌鍙笅杞界殑鏂囨。")
-
-        zip_buffer = io.BytesIO()
-        created_at_ms = int(time.time() * 1000)
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-            used_names: set[str] = set()
+        def _build_zip() -> tuple[bytes, str]:
+            valid_docs = []
+            for doc_id in doc_ids:
+                doc = deps.kb_store.get_document(doc_id)
+                if not doc:
+                    continue
+                assert_kb_allowed(snapshot, doc.kb_id)
+                if not os.path.exists(doc.file_path):
+                    continue
+                valid_docs.append(doc)
+
+            if not valid_docs:
+                raise HTTPException(status_code=404, detail="娌℃湁鎵惧埌鍙笅杞界殑鏂囨。")
+
+            zip_buffer = io.BytesIO()
+            created_at_ms = int(time.time() * 1000)
+            with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+                used_names: set[str] = set()
+                for doc in valid_docs:
+                    zip_name = doc.filename
+                    counter = 1
+                    base, ext = os.path.splitext(zip_name)
+                    while zip_name in used_names:
+                        zip_name = f"{base}_{counter}{ext}"
+                        counter += 1
+                    used_names.add(zip_name)
+                    zip_file.write(doc.file_path, zip_name)
+
+            zip_buffer.seek(0)
+            zip_filename = f"documents_{created_at_ms}.zip"
             for doc in valid_docs:
-                zip_name = doc.filename
-                counter = 1
-                base, ext = os.path.splitext(zip_name)
-                while zip_name in used_names:
-                    zip_name = f"{base}_{counter}{ext}"
-                    counter += 1
-                used_names.add(zip_name)
-                zip_file.write(doc.file_path, zip_name)
-
-        zip_buffer.seek(0)
-        zip_filename = f"documents_{created_at_ms}.zip"
-        for doc in valid_docs:
-            deps.download_log_store.log_download(
-                doc_id=doc.doc_id,
-                filename=doc.filename,
-                kb_id=(doc.kb_name or doc.kb_id),
-                downloaded_by=ctx.payload.sub,
-                is_batch=True,
-                kb_dataset_id=doc.kb_dataset_id,
-                kb_name=doc.kb_name,
-            )
-
+                deps.download_log_store.log_download(
+                    doc_id=doc.doc_id,
+                    filename=doc.filename,
+                    kb_id=(doc.kb_name or doc.kb_id),
+                    downloaded_by=ctx.payload.sub,
+                    is_batch=True,
+                    kb_dataset_id=doc.kb_dataset_id,
+                    kb_name=doc.kb_name,
+                )
+
+            return zip_buffer.getvalue(), zip_filename
+
+        zip_content, zip_filename = await offload(ARCHIVE, _build_zip)
         return Response(
-            content=zip_buffer.getvalue(),
+            content=zip_content,
             media_type="application/zip",
             headers={"Content-Disposition": f'attachment; filename="{zip_filename}"'},
         )
@@ -164,32 +171,54 @@ async def batch_download_documents_unified(
         if not documents_info:
             raise HTTPException(status_code=400, detail="no_documents_selected")
 
-        for doc_info in documents_info:
-            dataset = doc_info.get("dataset", "灞曞巺")
-            assert_kb_allowed(snapshot, dataset)
-
-        zip_content, filename = deps.ragflow_service.batch_download_documents(documents_info)
-        if zip_content is None:
-            raise HTTPException(status_code=500, detail="鎵归噺涓嬭浇澶辫触")
-
+        # One dataset key per item: the one authorized here is the only one the download uses.
+        items = []
         for doc_info in documents_info:
             doc_id = doc_info.get("doc_id") or doc_info.get("id")
-            doc_name = doc_info.get("name", "unknown")
-            dataset = doc_info.get("dataset", "灞曞巺")
-            kb_info = resolve_kb_ref(deps, dataset)
-            deps.download_log_store.log_download(
-                doc_id=doc_id,
-                filename=doc_name,
-                kb_id=(kb_info.dataset_id or dataset),
-                downloaded_by=ctx.payload.sub,
-                ragflow_doc_id=doc_id,
-                is_batch=True,
-                kb_dataset_id=kb_info.dataset_id,
-                kb_name=(kb_info.name or dataset),
-            )
+            if not doc_id:
+                continue
+            dataset = doc_info.get("dataset") or doc_info.get("dataset_name") or "灞曞巺"
+            assert_kb_allowed(snapshot, dataset)
+            items.append({"doc_id": doc_id, "dataset": dataset, "name": doc_info.get("name")})
+        if not items:
+            raise HTTPException(status_code=400, detail="no_documents_selected")
 
-        return Response(
-            content=zip_content,
+        filename = f"documents_{int(time.time())}.zip"
+        chunks = deps.ragflow_service.iter_batch_download(
+            items,
+            max_workers=settings.BATCH_DOWNLOAD_CONCURRENCY,
+            spool_max_bytes=settings.BATCH_DOWNLOAD_SPOOL_BYTES,
+            yield_waits=True,
+        )
+        # Client/dataset setup errors surface here (as 500) rather than as a truncated ZIP after the 200.
+        body = await prime_offloaded(ARCHIVE, chunks)
+
+        def _log_downloads() -> None:
+            for item in items:
+                doc_id = item["doc_id"]
+                doc_name = item["name"] or "unknown"
+                dataset = item["dataset"]
+                kb_info = resolve_kb_ref(deps, dataset)
+                deps.download_log_store.log_download(
+                    doc_id=doc_id,
+                    filename=doc_name,
+                    kb_id=(kb_info.dataset_id or dataset),
+                    downloaded_by=ctx.payload.sub,
+                    ragflow_doc_id=doc_id,
+                    is_batch=True,
+                    kb_dataset_id=kb_info.dataset_id,
+                    kb_name=(kb_info.name or dataset),
+                )
+
+        try:
+            await offload(SQLITE, _log_downloads)
+        except BaseException:
+            # The primed generator is suspended at its first yield; release its pool and spools.
+            await offload(ARCHIVE, chunks.close)
+            raise
+
+        return StreamingResponse(
+            body,
             media_type="application/zip",
             headers={"Content-Disposition": f'attachment; filename="{filename}"'},
         )
@@ -6,6 +6,7 @@ import zipfile
 import io
 
 from backend.app.core.authz import AuthContextDep
+from backend.app.core.executors import ARCHIVE, CONVERSION, offload
 from backend.app.core.permission_resolver import (
     assert_can_download,
     assert_can_review,
@@ -82,7 +83,7 @@ async def preview_document(
                 except Exception:
                     pass
 
-            html_bytes = convert_office_path_to_html_bytes(doc.file_path)
+            html_bytes = await offload(CONVERSION, convert_office_path_to_html_bytes, doc.file_path)
             cached_html.write_bytes(html_bytes)
 
             quoted = quote(f"{Path(doc.filename).stem}.html")
@@ -126,67 +127,71 @@ async def batch_download_documents(
     snapshot = ctx.snapshot
     assert_can_download(snapshot)
 
-    valid_docs = []
-    for doc_id in doc_ids:
-        doc = deps.kb_store.get_document(doc_id)
-        if not doc:
-            logger.warning(f"[BATCH DOWNLOAD] Document not found: {doc_id}")
-            continue
-        try:
-            assert_kb_allowed(snapshot, doc.kb_id)
-        except HTTPException:
-            logger.warning(f"[BATCH DOWNLOAD] No access to doc {doc_id} kb_id={doc.kb_id}")
-            continue
+    def _build_zip() -> tuple[bytes, str]:
+        valid_docs = []
+        for doc_id in doc_ids:
+            doc = deps.kb_store.get_document(doc_id)
+            if not doc:
+                logger.warning(f"[BATCH DOWNLOAD] Document not found: {doc_id}")
+                continue
+            try:
+                assert_kb_allowed(snapshot, doc.kb_id)
+            except HTTPException:
+                logger.warning(f"[BATCH DOWNLOAD] No access to doc {doc_id} kb_id={doc.kb_id}")
+                continue
 
-        if not os.path.exists(doc.file_path):
-            logger.warning(f"[BATCH DOWNLOAD] File not found: {doc.file_path}")
-            continue
+            if not os.path.exists(doc.file_path):
+                logger.warning(f"[BATCH DOWNLOAD] File not found: {doc.file_path}")
+                continue
 
-        valid_docs.append(doc)
+            valid_docs.append(doc)
 
-    if len(valid_docs) == 0:
-        raise HTTPException(status_code=404, detail="没有找到可下载的文档")
+        if len(valid_docs) == 0:
+            raise HTTPException(status_code=404, detail="没有找到可下载的文档")
 
-    logger.info(f"[BATCH DOWNLOAD] Found {len(valid_docs)} valid documents for download")
+        logger.info(f"[BATCH DOWNLOAD] Found {len(valid_docs)} valid documents for download")
 
-    zip_buffer = io.BytesIO()
-    created_at_ms = int(time.time() * 1000)
+        zip_buffer = io.BytesIO()
+        created_at_ms = int(time.time() * 1000)
 
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        for doc in valid_docs:
-            zip_name = doc.filename
-            counter = 1
-            while zip_name in [f.filename for f in valid_docs if f.filename != doc.filename]:
-                name, ext = os.path.splitext(doc.filename)
-                zip_name = f"{name}_{counter}{ext}"
-                counter += 1
+        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            for doc in valid_docs:
+                zip_name = doc.filename
+                counter = 1
+                while zip_name in [f.filename for f in valid_docs if f.filename != doc.filename]:
+                    name, ext = os.path.splitext(doc.filename)
+                    zip_name = f"{name}_{counter}{ext}"
+                    counter += 1
 
-            try:
-                zip_file.write(doc.file_path, zip_name)
-                logger.info(f"[BATCH DOWNLOAD] Added to ZIP: {zip_name}")
-            except Exception as e:
-                logger.error(f"[BATCH DOWNLOAD] Failed to add {doc.filename} to ZIP: {e}")
-                continue
+                try:
+                    zip_file.write(doc.file_path, zip_name)
+                    logger.info(f"[BATCH DOWNLOAD] Added to ZIP: {zip_name}")
+                except Exception as e:
+                    logger.error(f"[BATCH DOWNLOAD] Failed to add {doc.filename} to ZIP: {e}")
+                    continue
 
-    zip_buffer.seek(0)
+        zip_buffer.seek(0)
 
-    zip_filename = f"documents_{created_at_ms}.zip"
+        zip_filename = f"documents_{created_at_ms}.zip"
+
+        for doc in valid_docs:
+            deps.download_log_store.log_download(
+                doc_id=doc.doc_id,
+                filename=doc.filename,
+                kb_id=doc.kb_id,
+                downloaded_by=ctx.payload.sub,
+                is_batch=True,
+                kb_dataset_id=doc.kb_dataset_id,
+                kb_name=doc.kb_name,
+            )
 
-    for doc in valid_docs:
-        deps.download_log_store.log_download(
-            doc_id=doc.doc_id,
-            filename=doc.filename,
-            kb_id=doc.kb_id,
-            downloaded_by=ctx.payload.sub,
-            is_batch=True,
-            kb_dataset_id=doc.kb_dataset_id,
-            kb_name=doc.kb_name,
-        )
+        logger.info(f"[BATCH DOWNLOAD] ZIP file created: {zip_filename} with {len(valid_docs)} files")
+        return zip_buffer.getvalue(), zip_filename
 
-    logger.info(f"[BATCH DOWNLOAD] ZIP file created: {zip_filename} with {len(valid_docs)} files")
+    zip_content, zip_filename = await offload(ARCHIVE, _build_zip)
 
     return Response(
-        content=zip_buffer.getvalue(),
+        content=zip_content,
         media_type="application/zip",
         headers={
             "Content-Disposition": f'attachment; filename="{zip_filename}"'
@@ -1,19 +1,38 @@
 from __future__ import annotations
 
 import logging
+import urllib.parse
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 
 from backend.app.core.authz import AuthContextDep
+from backend.app.core.executors import RAGFLOW_IO, SQLITE, offload
 from backend.app.core.kb_refs import resolve_kb_ref
 from backend.app.core.permission_resolver import assert_kb_allowed
+from backend.app.core.previews import offloaded_preview_payload
 from backend.services.documents.document_manager import DocumentManager
 from backend.services.documents.models import DocumentRef
 from backend.services.audit_helpers import actor_fields_from_ctx
+from backend.services.preview_blobs import PreviewBlobError, get_preview_blob_store, parse_byte_range
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+_STREAM_CHUNK = 256 * 1024
+
+
+def _log_preview(audit, deps, ctx, **fields) -> None:
+    try:
+        audit.log_event(
+            action="document_preview",
+            actor=ctx.payload.sub,
+            **fields,
+            **actor_fields_from_ctx(deps, ctx),
+        )
+    except Exception:
+        pass
+
 
 @router.get("/preview/documents/{source}/{doc_id}/preview")
 async def preview_gateway(
@@ -22,6 +41,7 @@ async def preview_gateway(
     ctx: AuthContextDep,
     dataset: str = "展厅",
     render: str = "default",
+    delivery: str = "inline",
 ):
     """
     Unified preview gateway for both "ragflow" and "knowledge" document sources.
@@ -34,57 +54,127 @@ async def preview_gateway(
       - render: "default" | "html"
         - For Excel: default returns `{type:'excel', sheets:{...}}` (fast, no download permission needed)
         - render=html returns `{type:'html', content: base64_html}` for "original preview"
+      - delivery: "inline" | "url"
+        - url: pdf/image/html omit `content` and return a short-lived signed `url` (plus size/etag)
+          that streams the raw bytes from `/api/preview/blobs/{token}` with Range support
     """
     deps = ctx.deps
     snapshot = ctx.snapshot
 
     src = (source or "").strip().lower()
     if src == "ragflow":
-        assert_kb_allowed(snapshot, resolve_kb_ref(deps, dataset).variants)
+        kb_info = await offload(RAGFLOW_IO, resolve_kb_ref, deps, dataset)
+        assert_kb_allowed(snapshot, kb_info.variants)
         mgr = DocumentManager(deps)
-        payload = mgr.preview_payload(DocumentRef(source="ragflow", doc_id=doc_id, dataset_name=dataset), render=render)
+        payload = await offloaded_preview_payload(
+            mgr,
+            DocumentRef(source="ragflow", doc_id=doc_id, dataset_name=dataset),
+            render=render,
+            delivery=delivery,
+        )
         audit = getattr(deps, "audit_log_store", None)
         if audit:
-            try:
-                audit.log_event(
-                    action="document_preview",
-                    actor=ctx.payload.sub,
-                    source="ragflow",
-                    doc_id=doc_id,
-                    filename=str(payload.get("filename") or ""),
-                    kb_id=dataset,
-                    kb_name=dataset,
-                    meta={"render": render, "type": payload.get("type")},
-                    **actor_fields_from_ctx(deps, ctx),
-                )
-            except Exception:
-                pass
+            await offload(
+                SQLITE,
+                _log_preview,
+                audit,
+                deps,
+                ctx,
+                source="ragflow",
+                doc_id=doc_id,
+                filename=str(payload.get("filename") or ""),
+                kb_id=dataset,
+                kb_name=dataset,
+                meta={"render": render, "type": payload.get("type")},
+            )
         return payload
 
     if src == "knowledge":
         mgr = DocumentManager(deps)
-        doc = deps.kb_store.get_document(doc_id)
+        doc = await offload(SQLITE, deps.kb_store.get_document, doc_id)
         if not doc:
             raise HTTPException(status_code=404, detail="文档不存在")
         assert_kb_allowed(snapshot, doc.kb_id)
-        payload = mgr.preview_payload(DocumentRef(source="knowledge", doc_id=doc_id), render=render)
+        payload = await offloaded_preview_payload(
+            mgr,
+            DocumentRef(source="knowledge", doc_id=doc_id),
+            render=render,
+            delivery=delivery,
+        )
         audit = getattr(deps, "audit_log_store", None)
         if audit:
-            try:
-                audit.log_event(
-                    action="document_preview",
-                    actor=ctx.payload.sub,
-                    source="knowledge",
-                    doc_id=doc_id,
-                    filename=str(payload.get("filename") or getattr(doc, "filename", "") or ""),
-                    kb_id=(getattr(doc, "kb_name", None) or getattr(doc, "kb_id", None) or ""),
-                    kb_dataset_id=getattr(doc, "kb_dataset_id", None),
-                    kb_name=getattr(doc, "kb_name", None) or getattr(doc, "kb_id", None),
-                    meta={"render": render, "type": payload.get("type")},
-                    **actor_fields_from_ctx(deps, ctx),
-                )
-            except Exception:
-                pass
+            await offload(
+                SQLITE,
+                _log_preview,
+                audit,
+                deps,
+                ctx,
+                source="knowledge",
+                doc_id=doc_id,
+                filename=str(payload.get("filename") or getattr(doc, "filename", "") or ""),
+                kb_id=(getattr(doc, "kb_name", None) or getattr(doc, "kb_id", None) or ""),
+                kb_dataset_id=getattr(doc, "kb_dataset_id", None),
+                kb_name=getattr(doc, "kb_name", None) or getattr(doc, "kb_id", None),
+                meta={"render": render, "type": payload.get("type")},
+            )
         return payload
 
     raise HTTPException(status_code=400, detail="invalid_source")
+
+
+def _iter_file_range(path, start: int, length: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(_STREAM_CHUNK, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+@router.get("/preview/blobs/{token}")
+async def preview_blob(token: str, request: Request):
+    """
+    Stream a preview body published by `delivery=url`.
+
+    The token is signed and short-lived, so no session is required (works for <iframe>/<img>).
+    Supports single `Range` requests (206) and `If-None-Match` revalidation (304).
+    """
+    store = get_preview_blob_store()
+    try:
+        blob = store.resolve(token)
+    except PreviewBlobError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.code)
+
+    ascii_name = blob.filename.encode("ascii", "replace").decode("ascii").replace('"', "_")
+    disposition = f"inline; filename=\"{ascii_name}\"; filename*=UTF-8''{urllib.parse.quote(blob.filename)}"
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": blob.etag,
+        "Cache-Control": "private, max-age=300",
+        "Content-Disposition": disposition,
+    }
+    if_none_match = request.headers.get("if-none-match") or ""
+    if blob.etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    try:
+        byte_range = parse_byte_range(request.headers.get("range"), blob.size)
+    except PreviewBlobError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{blob.size}"})
+
+    if byte_range is None:
+        start, end, status = 0, blob.size - 1, 200
+    else:
+        (start, end), status = byte_range, 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{blob.size}"
+    length = max(0, end - start + 1)
+    headers["Content-Length"] = str(length)
+    return StreamingResponse(
+        _iter_file_range(blob.path, start, length),
+        status_code=status,
+        media_type=blob.media_type,
+        headers=headers,
+    )
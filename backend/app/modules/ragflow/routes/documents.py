@@ -1,16 +1,20 @@
 import logging
+import time
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 
 from backend.app.core.authz import AuthContextDep
+from backend.app.core.config import settings
+from backend.app.core.executors import ARCHIVE, SQLITE, offload, prime_offloaded
 from backend.app.core.kb_refs import resolve_kb_ref
 from backend.app.core.permission_resolver import (
     assert_can_delete,
     assert_can_download,
     assert_kb_allowed,
 )
+from backend.app.core.previews import offloaded_preview_payload
 from backend.services.documents.document_manager import DocumentManager
 from backend.services.documents.models import DocumentRef
 
@@ -83,7 +87,7 @@ async def preview_document(
     snapshot = ctx.snapshot
     assert_kb_allowed(snapshot, dataset)
     mgr = DocumentManager(ctx.deps)
-    return mgr.preview_payload(DocumentRef(source="ragflow", doc_id=doc_id, dataset_name=dataset))
+    return await offloaded_preview_payload(mgr, DocumentRef(source="ragflow", doc_id=doc_id, dataset_name=dataset))
 
 
 @router.delete("/documents/{doc_id}")
@@ -114,34 +118,55 @@ async def batch_download_documents(
     if not documents_info:
         raise HTTPException(status_code=400, detail="no_documents_selected")
 
+    # One dataset key per item: the one authorized here is the only one the download uses.
+    items = []
     for doc_info in documents_info:
-        dataset = doc_info.get("dataset", "展厅")
+        doc_id = doc_info.get("doc_id") or doc_info.get("id")
+        if not doc_id:
+            continue
+        dataset = doc_info.get("dataset") or doc_info.get("dataset_name") or "展厅"
         assert_kb_allowed(snapshot, dataset)
+        items.append({"doc_id": doc_id, "dataset": dataset, "name": doc_info.get("name")})
+    if not items:
+        raise HTTPException(status_code=400, detail="no_documents_selected")
 
-    zip_content, filename = deps.ragflow_service.batch_download_documents(documents_info)
-    if zip_content is None:
-        logger.error("[BATCH DOWNLOAD] Failed to create zip - service returned None")
-        raise HTTPException(status_code=500, detail="批量下载失败")
-
-    for doc_info in documents_info:
-        doc_id = doc_info.get("doc_id") or doc_info.get("id")
-        doc_name = doc_info.get("name", "unknown")
-        dataset = doc_info.get("dataset", "展厅")
-        kb_info = resolve_kb_ref(deps, dataset)
-
-        deps.download_log_store.log_download(
-            doc_id=doc_id,
-            filename=doc_name,
-            kb_id=(kb_info.dataset_id or dataset),
-            downloaded_by=ctx.payload.sub,
-            ragflow_doc_id=doc_id,
-            is_batch=True,
-            kb_dataset_id=kb_info.dataset_id,
-            kb_name=(kb_info.name or dataset),
-        )
-
-    return Response(
-        content=zip_content,
+    filename = f"documents_{int(time.time())}.zip"
+    chunks = deps.ragflow_service.iter_batch_download(
+        items,
+        max_workers=settings.BATCH_DOWNLOAD_CONCURRENCY,
+        spool_max_bytes=settings.BATCH_DOWNLOAD_SPOOL_BYTES,
+        yield_waits=True,
+    )
+    # Client/dataset setup errors surface here (as 500) rather than as a truncated ZIP after the 200.
+    body = await prime_offloaded(ARCHIVE, chunks)
+
+    def _log_downloads() -> None:
+        for item in items:
+            doc_id = item["doc_id"]
+            doc_name = item["name"] or "unknown"
+            dataset = item["dataset"]
+            kb_info = resolve_kb_ref(deps, dataset)
+
+            deps.download_log_store.log_download(
+                doc_id=doc_id,
+                filename=doc_name,
+                kb_id=(kb_info.dataset_id or dataset),
+                downloaded_by=ctx.payload.sub,
+                ragflow_doc_id=doc_id,
+                is_batch=True,
+                kb_dataset_id=kb_info.dataset_id,
+                kb_name=(kb_info.name or dataset),
+            )
+
+    try:
+        await offload(SQLITE, _log_downloads)
+    except BaseException:
+        # The primed generator is suspended at its first yield; release its pool and spools.
+        await offload(ARCHIVE, chunks.close)
+        raise
+
+    return StreamingResponse(
+        body,
         media_type="application/zip",
         headers={"Content-Disposition": f'attachment; filename=\"{filename}\"'},
     )
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from fastapi import HTTPException
+
+from backend.app.core.config import settings
+from backend.app.core.executors import RAGFLOW_IO, SQLITE, offload
+from backend.app.core.permission_resolver import assert_can_review, assert_kb_allowed
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------- single-document steps --------------------
+
+
+async def load_approvable_document(doc_id: str, ctx: Any):
+    """The pending kb_documents row for `doc_id`; HTTPException when it cannot be approved."""
+    deps = ctx.deps
+    snapshot = ctx.snapshot
+    assert_can_review(snapshot)
+
+    doc = await offload(SQLITE, deps.kb_store.get_document, doc_id)
+    if not doc:
+        logger.error('[APPROVE] Document not found: %s', doc_id)
+        raise HTTPException(status_code=404, detail='文档不存在')
+
+    assert_kb_allowed(snapshot, doc.kb_id)
+
+    if doc.status != 'pending':
+        logger.error('[APPROVE] Document status is not pending: %s', doc.status)
+        raise HTTPException(status_code=400, detail='文档不是待审核状态')
+
+    if not Path(doc.file_path).exists():
+        logger.error('[APPROVE] Local file not found: %s', doc.file_path)
+        raise HTTPException(status_code=404, detail='本地文件不存在')
+    return doc
+
+
+async def upload_approved_file(deps: Any, doc) -> str:
+    # Streamed from disk: memory use stays flat regardless of the file size.
+    ragflow_doc_id = await offload(
+        RAGFLOW_IO,
+        deps.ragflow_service.upload_document_file,
+        file_path=doc.file_path,
+        file_filename=doc.filename,
+        kb_id=doc.kb_id,
+    )
+    if not ragflow_doc_id:
+        raise HTTPException(status_code=500, detail='上传到RAGFlow失败')
+    return ragflow_doc_id
+
+
+def dataset_ref_of(doc) -> str:
+    return doc.kb_dataset_id or doc.kb_id or (doc.kb_name or '')
+
+
+async def trigger_parse(deps: Any, *, dataset_ref: str, ragflow_doc_ids: list[str]) -> bool:
+    """Best-effort parse (chunking) trigger for documents just uploaded to one dataset."""
+    doc_ids = [x for x in ragflow_doc_ids if x and x != 'uploaded']
+    if not doc_ids:
+        logger.warning('[APPROVE] Skip parse trigger: ragflow_doc_id is not available (%s)', ragflow_doc_ids)
+        return False
+    try:
+        ok = await offload(
+            RAGFLOW_IO,
+            deps.ragflow_service.parse_documents,
+            dataset_ref=dataset_ref,
+            document_ids=doc_ids,
+        )
+    except Exception as e:
+        logger.warning(
+            '[APPROVE] Parse trigger exception: ragflow_doc_ids=%s dataset_ref=%s err=%s', doc_ids, dataset_ref, e
+        )
+        return False
+    if not ok:
+        logger.warning('[APPROVE] Parse trigger failed: ragflow_doc_ids=%s dataset_ref=%s', doc_ids, dataset_ref)
+    return bool(ok)
+
+
+async def mark_approved(ctx: Any, doc_id: str, ragflow_doc_id: str, review_notes: str | None):
+    return await offload(
+        SQLITE,
+        ctx.deps.kb_store.update_document_status,
+        doc_id=doc_id,
+        status='approved',
+        reviewed_by=ctx.payload.sub,
+        review_notes=review_notes,
+        ragflow_doc_id=ragflow_doc_id,
+    )
+
+
+# -------------------- batch approval jobs --------------------
+
+
+@dataclass
+class BatchApprovalJob:
+    job_id: str
+    created_by: str
+    doc_ids: list[str]
+    status: str = 'queued'
+    succeeded_doc_ids: list[str] = field(default_factory=list)
+    failed_items: list[dict] = field(default_factory=list)
+    parse_failed_datasets: list[str] = field(default_factory=list)
+    created_at_ms: int = field(default_factory=lambda: int(time.time() * 1000))
+    finished_at_ms: int | None = None
+
+    @property
+    def processed(self) -> int:
+        return len(self.succeeded_doc_ids) + len(self.failed_items)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'total': len(self.doc_ids),
+            'processed': self.processed,
+            'success_count': len(self.succeeded_doc_ids),
+            'failed_count': len(self.failed_items),
+            'succeeded_doc_ids': list(self.succeeded_doc_ids),
+            'failed_items': list(self.failed_items),
+            'parse_failed_datasets': list(self.parse_failed_datasets),
+            'created_at_ms': self.created_at_ms,
+            'finished_at_ms': self.finished_at_ms,
+        }
+
+
+class BatchApprovalJobs:
+    """
+    In-process registry of batch approval jobs (polled by the review page).
+
+    Finished jobs are kept for `retention_s` so late polls still see the result; the task handle is
+    held here so a running job is not garbage-collected once the starting request returns.
+    """
+
+    def __init__(self, *, retention_s: float = 3600.0, max_jobs: int = 200):
+        self._retention_s = float(retention_s)
+        self._max_jobs = max(1, int(max_jobs))
+        self._lock = threading.Lock()
+        self._jobs: dict[str, BatchApprovalJob] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def _prune(self) -> None:
+        cutoff_ms = int((time.time() - self._retention_s) * 1000)
+        finished = sorted(
+            (job for job in self._jobs.values() if job.finished_at_ms is not None),
+            key=lambda job: job.finished_at_ms,
+        )
+        excess = len(self._jobs) - self._max_jobs
+        for job in finished:
+            if job.finished_at_ms < cutoff_ms or excess > 0:
+                self._jobs.pop(job.job_id, None)
+                excess -= 1
+
+    def start(self, *, doc_ids: list[str], ctx: Any, review_notes: str | None) -> BatchApprovalJob:
+        job = BatchApprovalJob(job_id=uuid.uuid4().hex, created_by=str(ctx.payload.sub), doc_ids=list(doc_ids))
+        with self._lock:
+            self._prune()
+            self._jobs[job.job_id] = job
+        task = asyncio.get_running_loop().create_task(run_batch_approval(job, ctx, review_notes))
+        with self._lock:
+            self._tasks[job.job_id] = task
+        task.add_done_callback(lambda _t: self._forget_task(job.job_id))
+        return job
+
+    def _forget_task(self, job_id: str) -> None:
+        with self._lock:
+            self._tasks.pop(job_id, None)
+
+    def get(self, job_id: str) -> BatchApprovalJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+
+batch_approval_jobs = BatchApprovalJobs()
+
+
+def _failure(doc_id: str, exc: BaseException) -> dict:
+    if isinstance(exc, HTTPException):
+        return {'doc_id': doc_id, 'detail': exc.detail, 'status_code': exc.status_code}
+    return {'doc_id': doc_id, 'detail': str(exc), 'status_code': 500}
+
+
+async def run_batch_approval(job: BatchApprovalJob, ctx: Any, review_notes: str | None) -> BatchApprovalJob:
+    """
+    Approve `job.doc_ids`: uploads run concurrently (at most `REVIEW_BATCH_UPLOAD_CONCURRENCY` per
+    dataset), each document is marked approved as soon as its upload lands, and every dataset gets a
+    single `parse_documents` call for all of its new RAGFlow documents.
+    """
+    deps = ctx.deps
+    job.status = 'running'
+    try:
+        by_dataset: dict[str, list] = {}
+        for doc_id in dict.fromkeys(job.doc_ids):
+            try:
+                doc = await load_approvable_document(doc_id, ctx)
+            except Exception as e:
+                job.failed_items.append(_failure(doc_id, e))
+                continue
+            by_dataset.setdefault(dataset_ref_of(doc), []).append(doc)
+
+        limit = max(1, int(settings.REVIEW_BATCH_UPLOAD_CONCURRENCY))
+
+        async def approve_dataset(dataset_ref: str, docs: list) -> None:
+            gate = asyncio.Semaphore(limit)
+            uploaded: list[str] = []
+
+            async def approve_one(doc) -> None:
+                async with gate:
+                    try:
+                        ragflow_doc_id = await upload_approved_file(deps, doc)
+                        await mark_approved(ctx, doc.doc_id, ragflow_doc_id, review_notes)
+                    except Exception as e:
+                        logger.warning('[APPROVE-BATCH] doc_id=%s failed: %s', doc.doc_id, e)
+                        job.failed_items.append(_failure(doc.doc_id, e))
+                        return
+                    uploaded.append(ragflow_doc_id)
+                    job.succeeded_doc_ids.append(doc.doc_id)
+
+            await asyncio.gather(*(approve_one(doc) for doc in docs))
+            if uploaded and not await trigger_parse(deps, dataset_ref=dataset_ref, ragflow_doc_ids=uploaded):
+                job.parse_failed_datasets.append(dataset_ref)
+
+        await asyncio.gather(*(approve_dataset(ref, docs) for ref, docs in by_dataset.items()))
+        job.status = 'completed'
+    except Exception:
+        logger.exception('[APPROVE-BATCH] job %s failed', job.job_id)
+        job.status = 'failed'
+    finally:
+        job.finished_at_ms = int(time.time() * 1000)
+    return job
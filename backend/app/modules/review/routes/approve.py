@@ -1,10 +1,21 @@
-﻿from pathlib import Path
+﻿import logging
 
 from fastapi import APIRouter, HTTPException
 
 from backend.app.core.authz import AuthContextDep
-from backend.app.core.permission_resolver import assert_can_review, assert_kb_allowed
+from backend.app.core.permission_resolver import assert_can_review
+from backend.app.modules.review.approval import (
+    BatchApprovalJob,
+    batch_approval_jobs,
+    dataset_ref_of,
+    load_approvable_document,
+    mark_approved,
+    run_batch_approval,
+    trigger_parse,
+    upload_approved_file,
+)
 from backend.models.document import (
+    BatchApprovalJobResponse,
     BatchDocumentReviewRequest,
     BatchDocumentReviewResponse,
     DocumentResponse,
@@ -13,6 +24,7 @@ from backend.models.document import (
 
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 
 def _to_document_response(updated_doc) -> DocumentResponse:
@@ -33,72 +45,13 @@ def _to_document_response(updated_doc) -> DocumentResponse:
 
 
 async def _approve_document_impl(doc_id: str, ctx: AuthContextDep, review_data: DocumentReviewRequest | None = None) -> DocumentResponse:
-    import logging
-
-    logger = logging.getLogger(__name__)
-    deps = ctx.deps
-    user = ctx.user
-    snapshot = ctx.snapshot
-    assert_can_review(snapshot)
-
-    logger.info('[APPROVE] User %s approving doc %s', user.username, doc_id)
-
-    doc = deps.kb_store.get_document(doc_id)
-    if not doc:
-        logger.error('[APPROVE] Document not found: %s', doc_id)
-        raise HTTPException(status_code=404, detail='文档不存在')
-
-    assert_kb_allowed(snapshot, doc.kb_id)
-
-    if doc.status != 'pending':
-        logger.error('[APPROVE] Document status is not pending: %s', doc.status)
-        raise HTTPException(status_code=400, detail='文档不是待审核状态')
+    logger.info('[APPROVE] User %s approving doc %s', ctx.user.username, doc_id)
 
+    doc = await load_approvable_document(doc_id, ctx)
     try:
-        if not Path(doc.file_path).exists():
-            logger.error('[APPROVE] Local file not found: %s', doc.file_path)
-            raise HTTPException(status_code=404, detail='本地文件不存在')
-
-        with open(doc.file_path, 'rb') as f:
-            file_content = f.read()
-
-        ragflow_doc_id = deps.ragflow_service.upload_document_blob(
-            file_filename=doc.filename,
-            file_content=file_content,
-            kb_id=doc.kb_id,
-        )
-        if not ragflow_doc_id:
-            raise HTTPException(status_code=500, detail='上传到RAGFlow失败')
-
-        dataset_ref = doc.kb_dataset_id or doc.kb_id or (doc.kb_name or '')
-        if ragflow_doc_id and ragflow_doc_id != 'uploaded':
-            try:
-                ok = deps.ragflow_service.parse_document(dataset_ref=dataset_ref, document_id=ragflow_doc_id)
-                if not ok:
-                    logger.warning(
-                        '[APPROVE] Parse trigger failed: doc_id=%s ragflow_doc_id=%s dataset_ref=%s',
-                        doc_id,
-                        ragflow_doc_id,
-                        dataset_ref,
-                    )
-            except Exception as e:
-                logger.warning(
-                    '[APPROVE] Parse trigger exception: doc_id=%s ragflow_doc_id=%s dataset_ref=%s err=%s',
-                    doc_id,
-                    ragflow_doc_id,
-                    dataset_ref,
-                    e,
-                )
-        else:
-            logger.warning('[APPROVE] Skip parse trigger: ragflow_doc_id is not available (%s)', ragflow_doc_id)
-
-        updated_doc = deps.kb_store.update_document_status(
-            doc_id=doc_id,
-            status='approved',
-            reviewed_by=ctx.payload.sub,
-            review_notes=review_data.review_notes if review_data else None,
-            ragflow_doc_id=ragflow_doc_id,
-        )
+        ragflow_doc_id = await upload_approved_file(ctx.deps, doc)
+        await trigger_parse(ctx.deps, dataset_ref=dataset_ref_of(doc), ragflow_doc_ids=[ragflow_doc_id])
+        updated_doc = await mark_approved(ctx, doc_id, ragflow_doc_id, review_data.review_notes if review_data else None)
         return _to_document_response(updated_doc)
     except HTTPException:
         raise
@@ -107,30 +60,42 @@ async def _approve_document_impl(doc_id: str, ctx: AuthContextDep, review_data:
         raise HTTPException(status_code=500, detail=f'审核失败: {str(e)}')
 
 
+def _job_response(job) -> BatchApprovalJobResponse:
+    return BatchApprovalJobResponse(**job.as_dict())
+
+
 @router.post('/documents/batch/approve', response_model=BatchDocumentReviewResponse)
 async def approve_documents_batch(body: BatchDocumentReviewRequest, ctx: AuthContextDep):
-    review_data = DocumentReviewRequest(review_notes=body.review_notes)
-    succeeded_doc_ids = []
-    failed_items = []
-
-    for doc_id in body.doc_ids:
-        try:
-            await _approve_document_impl(doc_id, ctx, review_data)
-            succeeded_doc_ids.append(doc_id)
-        except HTTPException as exc:
-            failed_items.append({'doc_id': doc_id, 'detail': exc.detail, 'status_code': exc.status_code})
-        except Exception as exc:  # pragma: no cover
-            failed_items.append({'doc_id': doc_id, 'detail': str(exc), 'status_code': 500})
+    assert_can_review(ctx.snapshot)
+    job = BatchApprovalJob(job_id='inline', created_by=str(ctx.payload.sub), doc_ids=list(body.doc_ids))
+    await run_batch_approval(job, ctx, body.review_notes)
 
     return BatchDocumentReviewResponse(
         total=len(body.doc_ids),
-        success_count=len(succeeded_doc_ids),
-        failed_count=len(failed_items),
-        succeeded_doc_ids=succeeded_doc_ids,
-        failed_items=failed_items,
+        success_count=len(job.succeeded_doc_ids),
+        failed_count=len(job.failed_items),
+        succeeded_doc_ids=job.succeeded_doc_ids,
+        failed_items=job.failed_items,
     )
 
 
+@router.post('/documents/batch/approve/jobs', response_model=BatchApprovalJobResponse)
+async def start_approve_documents_batch_job(body: BatchDocumentReviewRequest, ctx: AuthContextDep):
+    """Start batch approval in the background; poll `GET /documents/batch/approve/jobs/{job_id}` for progress."""
+    assert_can_review(ctx.snapshot)
+    job = batch_approval_jobs.start(doc_ids=body.doc_ids, ctx=ctx, review_notes=body.review_notes)
+    return _job_response(job)
+
+
+@router.get('/documents/batch/approve/jobs/{job_id}', response_model=BatchApprovalJobResponse)
+async def get_approve_documents_batch_job(job_id: str, ctx: AuthContextDep):
+    assert_can_review(ctx.snapshot)
+    job = batch_approval_jobs.get(job_id)
+    if job is None or (job.created_by != str(ctx.payload.sub) and not ctx.snapshot.is_admin):
+        raise HTTPException(status_code=404, detail='job_not_found')
+    return _job_response(job)
+
+
 @router.post('/documents/{doc_id}/approve', response_model=DocumentResponse)
 async def approve_document(doc_id: str, ctx: AuthContextDep, review_data: DocumentReviewRequest | None = None):
     return await _approve_document_impl(doc_id, ctx, review_data)
@@ -1,20 +1,54 @@
 from fastapi import APIRouter, HTTPException
 
 from backend.app.core.authz import AuthContextDep
-from backend.app.core.filename_normalize import normalize_filename_for_conflict
-from backend.app.core.permission_resolver import assert_can_review, assert_kb_allowed
+from backend.app.core.executors import SQLITE, offload
+from backend.app.core.permission_resolver import ResourceScope, assert_can_review, assert_kb_allowed
+from backend.models.document import BatchConflictCheckRequest
 
 
 router = APIRouter()
 
 
+def _conflict_payload(existing, match: str, usernames: dict) -> dict:
+    return {
+        "conflict": True,
+        "match": match,
+        "normalized_name": existing.normalized_filename,
+        "existing": {
+            "doc_id": existing.doc_id,
+            "filename": existing.filename,
+            "uploaded_by": existing.uploaded_by,
+            "uploaded_by_name": usernames.get(existing.uploaded_by) if existing.uploaded_by else None,
+            "uploaded_at_ms": existing.uploaded_at_ms,
+            "reviewed_by": existing.reviewed_by,
+            "reviewed_by_name": usernames.get(existing.reviewed_by) if existing.reviewed_by else None,
+            "reviewed_at_ms": existing.reviewed_at_ms,
+            "ragflow_doc_id": existing.ragflow_doc_id,
+            "kb_id": existing.kb_name or existing.kb_id,
+        },
+    }
+
+
+def _usernames_for(deps, existing_docs) -> dict:
+    user_ids = set()
+    for existing in existing_docs:
+        user_ids |= {existing.uploaded_by, existing.reviewed_by}
+    user_ids -= {None, ""}
+    if not user_ids:
+        return {}
+    try:
+        return deps.user_store.get_usernames_by_ids(user_ids)
+    except Exception:
+        return {}
+
+
 @router.get("/documents/{doc_id}/conflict")
 async def get_document_conflict(doc_id: str, ctx: AuthContextDep) -> dict:
     deps = ctx.deps
     snapshot = ctx.snapshot
     assert_can_review(snapshot)
 
-    doc = deps.kb_store.get_document(doc_id)
+    doc = await offload(SQLITE, deps.kb_store.get_document, doc_id)
     if not doc:
         raise HTTPException(status_code=404, detail="文档不存在")
 
@@ -23,41 +57,36 @@ async def get_document_conflict(doc_id: str, ctx: AuthContextDep) -> dict:
     if doc.status != "pending":
         return {"conflict": False}
 
-    normalized = normalize_filename_for_conflict(doc.filename)
-    kb_refs = [r for r in {doc.kb_id, doc.kb_dataset_id, doc.kb_name} if r]
+    found = (await offload(SQLITE, deps.kb_store.find_approved_conflicts, [doc.doc_id])).get(doc.doc_id)
+    if not found:
+        return {"conflict": False}
+
+    existing, match = found
+    usernames = await offload(SQLITE, _usernames_for, deps, [existing])
+    return _conflict_payload(existing, match, usernames)
 
-    approved = deps.kb_store.list_documents(status="approved", kb_refs=kb_refs, limit=2000)
-    existing = None
-    for d in approved:
-        if d.doc_id == doc.doc_id:
-            continue
-        if normalize_filename_for_conflict(d.filename) == normalized:
-            existing = d
-            break
 
-    if not existing:
-        return {"conflict": False}
+@router.post("/documents/batch/conflicts")
+async def get_batch_document_conflicts(ctx: AuthContextDep, body: BatchConflictCheckRequest | None = None) -> dict:
+    """
+    Conflicts for many pending documents in one query.
 
-    usernames = {}
-    try:
-        usernames = deps.user_store.get_usernames_by_ids({existing.uploaded_by, existing.reviewed_by} - {None, ""})
-    except Exception:
-        usernames = {}
+    Without `doc_ids` the whole review queue visible to the caller is checked. Only conflicting
+    documents appear under `conflicts`; documents outside the caller's knowledge bases are skipped.
+    """
+    deps = ctx.deps
+    snapshot = ctx.snapshot
+    assert_can_review(snapshot)
+
+    if snapshot.kb_scope == ResourceScope.NONE:
+        return {"conflicts": {}}
+    kb_refs = None if snapshot.kb_scope == ResourceScope.ALL else sorted(snapshot.kb_names)
+    doc_ids = body.doc_ids if body else None
 
+    found = await offload(SQLITE, deps.kb_store.find_approved_conflicts, doc_ids, kb_refs)
+    usernames = await offload(SQLITE, _usernames_for, deps, [existing for existing, _ in found.values()])
     return {
-        "conflict": True,
-        "normalized_name": normalized,
-        "existing": {
-            "doc_id": existing.doc_id,
-            "filename": existing.filename,
-            "uploaded_by": existing.uploaded_by,
-            "uploaded_by_name": usernames.get(existing.uploaded_by) if existing.uploaded_by else None,
-            "uploaded_at_ms": existing.uploaded_at_ms,
-            "reviewed_by": existing.reviewed_by,
-            "reviewed_by_name": usernames.get(existing.reviewed_by) if existing.reviewed_by else None,
-            "reviewed_at_ms": existing.reviewed_at_ms,
-            "ragflow_doc_id": existing.ragflow_doc_id,
-            "kb_id": existing.kb_name or existing.kb_id,
-        },
+        "conflicts": {
+            doc_id: _conflict_payload(existing, match, usernames) for doc_id, (existing, match) in found.items()
+        }
     }
-
@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException
 from pathlib import Path
 
 from backend.app.core.authz import AuthContextDep
+from backend.app.core.executors import RAGFLOW_IO, SQLITE, offload
 from backend.app.core.filename_normalize import normalize_filename_for_conflict
 from backend.app.core.permission_resolver import assert_can_review, assert_kb_allowed
 from backend.models.document import DocumentResponse
@@ -24,14 +25,14 @@ async def approve_document_overwrite(doc_id: str, ctx: AuthContextDep, body: dic
     if not replace_doc_id:
         raise HTTPException(status_code=400, detail="缺少 replace_doc_id")
 
-    new_doc = deps.kb_store.get_document(doc_id)
+    new_doc = await offload(SQLITE, deps.kb_store.get_document, doc_id)
     if not new_doc:
         raise HTTPException(status_code=404, detail="文档不存在")
     if new_doc.status != "pending":
         raise HTTPException(status_code=400, detail="文档不是待审核状态")
     assert_kb_allowed(snapshot, new_doc.kb_id)
 
-    old_doc = deps.kb_store.get_document(str(replace_doc_id))
+    old_doc = await offload(SQLITE, deps.kb_store.get_document, str(replace_doc_id))
     if not old_doc:
         raise HTTPException(status_code=404, detail="旧文档不存在")
     if old_doc.status != "approved":
@@ -40,7 +41,9 @@ async def approve_document_overwrite(doc_id: str, ctx: AuthContextDep, body: dic
     new_norm = normalize_filename_for_conflict(new_doc.filename)
     old_norm = normalize_filename_for_conflict(old_doc.filename)
     kb_refs = {new_doc.kb_id, new_doc.kb_dataset_id, new_doc.kb_name}
-    if old_norm != new_norm or not ({old_doc.kb_id, old_doc.kb_dataset_id, old_doc.kb_name} & kb_refs):
+    same_content = bool(new_doc.content_sha256) and new_doc.content_sha256 == old_doc.content_sha256
+    same_kb = bool({old_doc.kb_id, old_doc.kb_dataset_id, old_doc.kb_name} & kb_refs)
+    if (old_norm != new_norm and not same_content) or not same_kb:
         raise HTTPException(status_code=400, detail="旧文档与新文档不匹配，无法覆盖")
 
     if not Path(new_doc.file_path).exists():
@@ -48,7 +51,9 @@ async def approve_document_overwrite(doc_id: str, ctx: AuthContextDep, body: dic
 
     # 1) Delete old from RAGFlow first (must succeed)
     if not old_doc.ragflow_doc_id:
-        deps.deletion_log_store.log_deletion(
+        await offload(
+            SQLITE,
+            deps.deletion_log_store.log_deletion,
             doc_id=old_doc.doc_id,
             filename=old_doc.filename,
             kb_id=(old_doc.kb_name or old_doc.kb_id),
@@ -68,14 +73,20 @@ async def approve_document_overwrite(doc_id: str, ctx: AuthContextDep, body: dic
     rag_ok = False
     rag_err = None
     try:
-        rag_ok = bool(deps.ragflow_service.delete_document(old_doc.ragflow_doc_id, dataset_name=dataset_ref))
+        rag_ok = bool(
+            await offload(
+                RAGFLOW_IO, deps.ragflow_service.delete_document, old_doc.ragflow_doc_id, dataset_name=dataset_ref
+            )
+        )
         if not rag_ok:
             rag_err = "RAGFlow 删除失败"
     except Exception as e:
         rag_ok = False
         rag_err = str(e)
 
-    deps.deletion_log_store.log_deletion(
+    await offload(
+        SQLITE,
+        deps.deletion_log_store.log_deletion,
         doc_id=old_doc.doc_id,
         filename=old_doc.filename,
         kb_id=(old_doc.kb_name or old_doc.kb_id),
@@ -98,15 +109,14 @@ async def approve_document_overwrite(doc_id: str, ctx: AuthContextDep, body: dic
             Path(old_doc.file_path).unlink()
     except Exception:
         logger.warning("Failed to delete old local file: %s", old_doc.file_path)
-    deps.kb_store.delete_document(old_doc.doc_id)
+    await offload(SQLITE, deps.kb_store.delete_document, old_doc.doc_id)
 
     # 3) Upload new to RAGFlow and approve
-    with open(new_doc.file_path, "rb") as f:
-        file_content = f.read()
-
-    ragflow_doc_id = deps.ragflow_service.upload_document_blob(
+    ragflow_doc_id = await offload(
+        RAGFLOW_IO,
+        deps.ragflow_service.upload_document_file,
+        file_path=new_doc.file_path,
         file_filename=new_doc.filename,
-        file_content=file_content,
         kb_id=new_doc.kb_id,
     )
     if not ragflow_doc_id:
@@ -116,7 +126,9 @@ async def approve_document_overwrite(doc_id: str, ctx: AuthContextDep, body: dic
     dataset_ref = new_doc.kb_dataset_id or new_doc.kb_id or (new_doc.kb_name or "")
     if ragflow_doc_id and ragflow_doc_id != "uploaded":
         try:
-            ok = deps.ragflow_service.parse_document(dataset_ref=dataset_ref, document_id=ragflow_doc_id)
+            ok = await offload(
+                RAGFLOW_IO, deps.ragflow_service.parse_document, dataset_ref=dataset_ref, document_id=ragflow_doc_id
+            )
             if not ok:
                 logger.warning(
                     "[APPROVE-OVERWRITE] Parse trigger failed: doc_id=%s ragflow_doc_id=%s dataset_ref=%s",
@@ -135,7 +147,9 @@ async def approve_document_overwrite(doc_id: str, ctx: AuthContextDep, body: dic
     else:
         logger.warning("[APPROVE-OVERWRITE] Skip parse trigger: ragflow_doc_id is not available (%s)", ragflow_doc_id)
 
-    updated_doc = deps.kb_store.update_document_status(
+    updated_doc = await offload(
+        SQLITE,
+        deps.kb_store.update_document_status,
         doc_id=new_doc.doc_id,
         status="approved",
         reviewed_by=ctx.payload.sub,
@@ -77,6 +77,7 @@ def ensure_deletion_log_extended_columns(conn: sqlite3.Connection) -> None:
 def ensure_kb_ref_indexes(conn: sqlite3.Connection) -> None:
     if table_exists(conn, "kb_documents"):
         conn.execute("CREATE INDEX IF NOT EXISTS idx_docs_kb_dataset_id ON kb_documents(kb_dataset_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_docs_ragflow_doc_id ON kb_documents(ragflow_doc_id)")
     if table_exists(conn, "deletion_logs"):
         conn.execute("CREATE INDEX IF NOT EXISTS idx_deletion_logs_kb_dataset_id ON deletion_logs(kb_dataset_id)")
     if table_exists(conn, "download_logs"):
@@ -114,14 +115,7 @@ def ensure_audit_events_table(conn: sqlite3.Connection) -> None:
     add_column_if_missing(conn, "audit_events", "department_id INTEGER")
     add_column_if_missing(conn, "audit_events", "department_name TEXT")
 
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_events_time ON audit_events(created_at_ms)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_events_action ON audit_events(action)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_events_actor ON audit_events(actor)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_events_actor_username ON audit_events(actor_username)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_events_company_id ON audit_events(company_id)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_events_department_id ON audit_events(department_id)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_events_kb ON audit_events(kb_id)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_events_kb_dataset_id ON audit_events(kb_dataset_id)")
+    ensure_audit_events_indexes(conn)
 
     # Best-effort backfill from directory tables for existing rows (helps filtering immediately).
     try:
@@ -181,3 +175,39 @@ def ensure_audit_events_table(conn: sqlite3.Connection) -> None:
         conn.commit()
     except Exception:
         pass
+
+
+# Filter columns of the audit log API. Each gets a (column, created_at_ms) index; with the implicit
+# rowid (`id`) suffix that is exactly the (created_at_ms, id) keyset order the list query pages by.
+_AUDIT_EVENT_FILTER_COLUMNS = (
+    "action",
+    "actor",
+    "actor_username",
+    "company_id",
+    "department_id",
+    "source",
+    "kb_id",
+    "kb_dataset_id",
+    "kb_name",
+)
+
+# Single-column indexes superseded by the composite ones above.
+_AUDIT_EVENT_LEGACY_INDEXES = (
+    "idx_audit_events_action",
+    "idx_audit_events_actor",
+    "idx_audit_events_actor_username",
+    "idx_audit_events_company_id",
+    "idx_audit_events_department_id",
+    "idx_audit_events_kb",
+    "idx_audit_events_kb_dataset_id",
+)
+
+
+def ensure_audit_events_indexes(conn: sqlite3.Connection) -> None:
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_events_time ON audit_events(created_at_ms)")
+    for column in _AUDIT_EVENT_FILTER_COLUMNS:
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_audit_events_{column}_time ON audit_events({column}, created_at_ms)"
+        )
+    for name in _AUDIT_EVENT_LEGACY_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
@@ -29,7 +29,8 @@ from .data_security import (
     ensure_backup_locks_table,
     ensure_data_security_settings_table,
 )
-from .kb_documents import ensure_kb_documents_table
+from .kb_documents import ensure_kb_documents_content_columns, ensure_kb_documents_table
+from .ragflow_document_catalog import ensure_ragflow_document_catalog_tables
 from .patent_downloads import ensure_patent_download_tables
 from .paper_downloads import ensure_paper_download_tables
 from .org_directory import (
@@ -74,6 +75,8 @@ def ensure_schema(db_path: str | Path) -> None:
         ensure_user_login_policy_columns(conn)
         ensure_auth_login_sessions_table(conn)
         ensure_kb_documents_table(conn)
+        ensure_kb_documents_content_columns(conn)
+        ensure_ragflow_document_catalog_tables(conn)
         ensure_chat_sessions_table(conn)
         ensure_chat_message_sources_table(conn)
         ensure_search_configs_table(conn)
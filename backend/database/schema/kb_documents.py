@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import sqlite3
 
-from .helpers import table_exists
+from backend.app.core.filename_normalize import normalize_filename_for_conflict
+
+from .helpers import add_column_if_missing, table_exists
 
 
 def ensure_kb_documents_table(conn: sqlite3.Connection) -> None:
@@ -33,3 +35,30 @@ def ensure_kb_documents_table(conn: sqlite3.Connection) -> None:
     conn.execute("CREATE INDEX IF NOT EXISTS idx_docs_kb ON kb_documents(kb_id)")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_docs_kb_dataset_id ON kb_documents(kb_dataset_id)")
 
+
+def ensure_kb_documents_content_columns(conn: sqlite3.Connection) -> None:
+    # SHA-256 of the staged upload, computed while streaming it to disk.
+    add_column_if_missing(conn, "kb_documents", "content_sha256 TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_docs_content_sha256 ON kb_documents(content_sha256)")
+    # `normalize_filename_for_conflict(filename)`, so review conflict checks are index lookups.
+    add_column_if_missing(conn, "kb_documents", "normalized_filename TEXT")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_docs_normalized_filename ON kb_documents(normalized_filename, status)"
+    )
+    backfill_kb_documents_normalized_filename(conn)
+
+
+def backfill_kb_documents_normalized_filename(conn: sqlite3.Connection) -> None:
+    """
+    Fill `normalized_filename` for rows staged before the column existed.
+
+    Only rows still NULL are touched, so after the first run this is an indexed no-op scan.
+    `content_sha256` for those rows needs the files read and is filled after startup by
+    `backend.services.kb.content_hash_backfill`.
+    """
+    rows = conn.execute("SELECT doc_id, filename FROM kb_documents WHERE normalized_filename IS NULL").fetchall()
+    if rows:
+        conn.executemany(
+            "UPDATE kb_documents SET normalized_filename = ? WHERE doc_id = ?",
+            [(normalize_filename_for_conflict(filename or ""), doc_id) for doc_id, filename in rows],
+        )
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import sqlite3
+
+from .helpers import table_exists
+
+
+def ensure_ragflow_document_catalog_tables(conn: sqlite3.Connection) -> None:
+    if not table_exists(conn, "ragflow_document_catalog"):
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ragflow_document_catalog (
+                document_id TEXT PRIMARY KEY,
+                dataset_id TEXT NOT NULL,
+                dataset_name TEXT,
+                name TEXT,
+                status TEXT,
+                run TEXT,
+                size INTEGER,
+                chunk_method TEXT,
+                created_at_ms INTEGER,
+                updated_at_ms INTEGER,
+                synced_at_ms INTEGER NOT NULL
+            )
+            """
+        )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ragflow_doc_catalog_dataset ON ragflow_document_catalog(dataset_id)")
+
+    if not table_exists(conn, "ragflow_document_catalog_sync"):
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ragflow_document_catalog_sync (
+                dataset_id TEXT PRIMARY KEY,
+                full_synced_at_ms INTEGER,
+                watermark_ms INTEGER,
+                document_count INTEGER
+            )
+            """
+        )
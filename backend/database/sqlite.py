@@ -1,32 +1,28 @@
 from __future__ import annotations
 
 import sqlite3
+import threading
 import time
 from pathlib import Path
 from typing import Any, Iterable
 
 
-def connect_sqlite(
-    db_path: str | Path,
-    *,
-    timeout_s: float = 30.0,
-    row_factory: Any = sqlite3.Row,
-    pragmas: Iterable[str] | None = None,
-) -> sqlite3.Connection:
-    """
-    Create a sqlite3 connection with consistent defaults across the project.
+_DEFAULT_PRAGMAS: tuple[str, ...] = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+)
 
-    - row_factory defaults to sqlite3.Row (supports both index and name access).
-    - pragmas are applied best-effort (ignored on unsupported/read-only setups).
-    """
+
+def _connect_with_retry(db_path: str | Path, **kwargs: Any) -> sqlite3.Connection:
     # On some deployments (especially with bind mounts) sqlite may transiently fail to open the DB file
     # (e.g. during backup/restore operations or brief IO hiccups). Add a small retry window to avoid
     # leaking sporadic 500s to callers.
     last_err: Exception | None = None
     for attempt in range(5):
         try:
-            conn = sqlite3.connect(str(db_path), timeout=timeout_s)
-            break
+            return sqlite3.connect(str(db_path), **kwargs)
         except sqlite3.OperationalError as e:
             last_err = e
             msg = str(e).lower()
@@ -34,18 +30,28 @@ def connect_sqlite(
                 raise
             # 0.1s, 0.2s, 0.4s, 0.8s, 1.6s (max ~3.1s total)
             time.sleep(0.1 * (2**attempt))
-    else:
-        assert last_err is not None
-        raise last_err
+    assert last_err is not None
+    raise last_err
+
+
+def connect_sqlite(
+    db_path: str | Path,
+    *,
+    timeout_s: float = 30.0,
+    row_factory: Any = sqlite3.Row,
+    pragmas: Iterable[str] | None = None,
+) -> sqlite3.Connection:
+    """
+    Create a sqlite3 connection with consistent defaults across the project.
+
+    - row_factory defaults to sqlite3.Row (supports both index and name access).
+    - pragmas are applied best-effort (ignored on unsupported/read-only setups).
+    """
+    conn = _connect_with_retry(db_path, timeout=timeout_s)
     conn.row_factory = row_factory
 
     if pragmas is None:
-        pragmas = (
-            "PRAGMA foreign_keys = ON",
-            "PRAGMA busy_timeout = 5000",
-            "PRAGMA journal_mode = WAL",
-            "PRAGMA synchronous = NORMAL",
-        )
+        pragmas = _DEFAULT_PRAGMAS
 
     for stmt in pragmas:
         try:
@@ -54,3 +60,241 @@ def connect_sqlite(
             continue
 
     return conn
+
+
+class PooledConnection:
+    """
+    Connection handle checked out from a `SqliteConnectionPool`.
+
+    Behaves like `sqlite3.Connection` for the APIs stores use (execute/cursor/commit/...).
+    Differences:
+    - `close()` returns the underlying connection to the pool (uncommitted work is rolled back).
+    - `with conn:` commits/rolls back like sqlite3 *and* releases the connection afterwards,
+      so the `with self._conn() as conn:` store pattern no longer leaks connections.
+    """
+
+    __slots__ = ("_pool", "_raw")
+
+    def __init__(self, pool: "SqliteConnectionPool", raw: sqlite3.Connection):
+        object.__setattr__(self, "_pool", pool)
+        object.__setattr__(self, "_raw", raw)
+
+    def _conn(self) -> sqlite3.Connection:
+        raw = self._raw
+        if raw is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return raw
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._conn(), name, value)
+
+    def __enter__(self) -> "PooledConnection":
+        self._conn()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        try:
+            raw = self._conn()
+            if exc_type is None:
+                raw.commit()
+            else:
+                raw.rollback()
+        finally:
+            self.close()
+        return False
+
+    def close(self) -> None:
+        raw = self._raw
+        if raw is None:
+            return
+        object.__setattr__(self, "_raw", None)
+        self._pool.release(raw)
+
+    def __del__(self) -> None:
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class SqliteConnectionPool:
+    """
+    Shared connection provider for one sqlite database file.
+
+    - Per-thread reuse: each thread keeps the last connection it released and gets it back on the
+      next checkout (no reopen, no PRAGMA round-trips). Nested checkouts in the same thread get a
+      separate connection so transactions never interleave.
+    - Bounded: at most `max_idle` connections are kept in the shared idle list; extra ones are
+      closed on release.
+    - PRAGMAs run once per physical connection; sqlite3's statement cache is enlarged so hot
+      queries stay prepared for the life of the connection.
+    - Health check: connections idle longer than `health_check_after_s` are probed with
+      `SELECT 1` and replaced if the probe fails.
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        *,
+        max_idle: int = 8,
+        timeout_s: float = 30.0,
+        cached_statements: int = 256,
+        health_check_after_s: float = 30.0,
+    ):
+        self.db_path = str(db_path)
+        self.max_idle = max(0, int(max_idle))
+        self.timeout_s = timeout_s
+        self.cached_statements = cached_statements
+        self.health_check_after_s = health_check_after_s
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._idle: list[tuple[sqlite3.Connection, float]] = []
+        self._closed = False
+        self._stats = {
+            "checkouts": 0,
+            "thread_hits": 0,
+            "idle_hits": 0,
+            "opened": 0,
+            "closed": 0,
+            "health_failures": 0,
+        }
+
+    def _open(self) -> sqlite3.Connection:
+        conn = _connect_with_retry(
+            self.db_path,
+            timeout=self.timeout_s,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        conn.row_factory = sqlite3.Row
+        for stmt in _DEFAULT_PRAGMAS:
+            try:
+                conn.execute(stmt)
+            except sqlite3.OperationalError:
+                continue
+        with self._lock:
+            self._stats["opened"] += 1
+        return conn
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._stats["closed"] += 1
+
+    def _healthy(self, conn: sqlite3.Connection, idle_since: float) -> bool:
+        if (time.monotonic() - idle_since) < self.health_check_after_s:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except Exception:
+            with self._lock:
+                self._stats["health_failures"] += 1
+            return False
+
+    def acquire(self) -> PooledConnection:
+        candidate: tuple[sqlite3.Connection, float] | None = getattr(self._local, "idle", None)
+        self._local.idle = None
+        source = "thread_hits"
+        with self._lock:
+            self._stats["checkouts"] += 1
+            if candidate is None and self._idle:
+                candidate = self._idle.pop()
+                source = "idle_hits"
+        if candidate is not None:
+            conn, idle_since = candidate
+            if self._healthy(conn, idle_since):
+                with self._lock:
+                    self._stats[source] += 1
+                return PooledConnection(self, conn)
+            self._discard(conn)
+        return PooledConnection(self, self._open())
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            if conn.row_factory is not sqlite3.Row:
+                conn.row_factory = sqlite3.Row
+        except Exception:
+            self._discard(conn)
+            return
+
+        entry = (conn, time.monotonic())
+        if self._closed:
+            self._discard(conn)
+            return
+        if getattr(self._local, "idle", None) is None:
+            self._local.idle = entry
+            return
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(entry)
+                return
+        self._discard(conn)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            out["idle"] = len(self._idle)
+        out["open"] = out["opened"] - out["closed"]
+        out["db_path"] = self.db_path
+        return out
+
+    def close(self) -> None:
+        """Close shared idle connections; per-thread ones close when their thread exits."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._discard(conn)
+        cached = getattr(self._local, "idle", None)
+        self._local.idle = None
+        if cached is not None:
+            self._discard(cached[0])
+
+
+_POOLS: dict[str, SqliteConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _pool_key(db_path: str | Path) -> str:
+    try:
+        return str(Path(db_path).resolve())
+    except Exception:
+        return str(db_path)
+
+
+def get_sqlite_pool(db_path: str | Path) -> SqliteConnectionPool:
+    key = _pool_key(db_path)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = SqliteConnectionPool(db_path)
+            _POOLS[key] = pool
+        return pool
+
+
+def pooled_connection(db_path: str | Path) -> PooledConnection:
+    """Checkout a connection from the shared pool for `db_path` (use `close()` or `with`)."""
+    return get_sqlite_pool(db_path).acquire()
+
+
+def sqlite_pool_stats() -> list[dict[str, Any]]:
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+    return [pool.stats() for pool in pools]
+
+
+def close_sqlite_pools() -> None:
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from backend.database.sqlite import pooled_connection
+
+logger = logging.getLogger(__name__)
+
+
+def require_columns(table: str, row: dict[str, Any], *columns: str) -> None:
+    """Raise `ValueError` when a NOT NULL column of `row` is missing, before it is queued or inserted."""
+    missing = [c for c in columns if row.get(c) is None]
+    if missing:
+        raise ValueError(f"{table}_missing_fields:{','.join(missing)}")
+
+
+class WriteBehindLog:
+    """
+    Write-behind queue for append-only log rows (audit_events, download_logs, deletion_logs).
+
+    - `submit(table, row)` queues the row and appends it to a spool file; a background thread
+      inserts queued rows in one transaction per flush (every `flush_interval_s`, or as soon as
+      `batch_size` rows are waiting).
+    - The queue is bounded: `submit` returns False when it is full or the writer is not running,
+      and the caller writes the row synchronously instead.
+    - Crash safety: each flush rotates the spool to a segment that is deleted only after its rows
+      are committed; segments left behind by a crash are replayed by `start()`. Delivery is
+      at-least-once (a crash between commit and unlink replays that segment).
+    - A row the database rejects (constraint violation) is set aside in `<spool>.rejected` instead
+      of being retried, so it cannot hold back the rows queued after it.
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        *,
+        spool_path: str | Path | None = None,
+        max_queue: int = 10000,
+        batch_size: int = 200,
+        flush_interval_s: float = 0.5,
+    ):
+        self.db_path = Path(db_path)
+        self.spool_path = Path(spool_path) if spool_path else self.db_path.parent / "log_write_behind.spool"
+        self.rejected_path = self.spool_path.with_name(f"{self.spool_path.name}.rejected")
+        self._max_queue = max(1, int(max_queue))
+        self._batch_size = max(1, int(batch_size))
+        self._flush_interval_s = max(0.01, float(flush_interval_s))
+
+        self._cond = threading.Condition()
+        self._queue: list[tuple[str, dict[str, Any]]] = []
+        self._spool = None
+        self._segment_seq = 0
+        # Segments whose rows were re-queued after a failed flush; deleted with the next good one.
+        self._retry_segments: list[Path] = []
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+        self._flush_lock = threading.Lock()
+
+        self._enqueued = 0
+        self._sync_fallbacks = 0
+        self._rows_written = 0
+        self._flushes = 0
+        self._flush_errors = 0
+        self._replayed = 0
+        self._rejected = 0
+        self._last_flush_rows = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+
+    # -------------------- lifecycle --------------------
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self.spool_path.parent.mkdir(parents=True, exist_ok=True)
+        self._replay_spool()
+        self._stop_event.clear()
+        with self._cond:
+            self._spool = self.spool_path.open("a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._loop, name="log_write_behind", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout_s: float = 10.0) -> None:
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
+        thread.join(timeout=timeout_s)
+        self._thread = None
+        self.flush()
+        with self._cond:
+            if self._spool is not None:
+                self._spool.close()
+                self._spool = None
+            drained = not self._queue
+        if drained:
+            self.spool_path.unlink(missing_ok=True)
+
+    # -------------------- producer side --------------------
+
+    def submit(self, table: str, row: dict[str, Any]) -> bool:
+        line = json.dumps({"t": table, "r": row}, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._cond:
+            if self._spool is None or self._stop_event.is_set() or len(self._queue) >= self._max_queue:
+                self._sync_fallbacks += 1
+                return False
+            try:
+                self._spool.write(line)
+                self._spool.flush()
+            except OSError:
+                logger.warning("[WriteBehind] spool append failed; writing synchronously", exc_info=True)
+                self._sync_fallbacks += 1
+                return False
+            self._queue.append((table, row))
+            self._enqueued += 1
+            if len(self._queue) >= self._batch_size:
+                self._cond.notify()
+        return True
+
+    # -------------------- writer side --------------------
+
+    def _loop(self) -> None:
+        while not self._stop_event.is_set():
+            with self._cond:
+                if len(self._queue) < self._batch_size and not self._stop_event.is_set():
+                    self._cond.wait(self._flush_interval_s)
+            if self._stop_event.is_set():
+                # `stop()` does the final flush once the thread is gone.
+                break
+            self.flush()
+
+    def _rotate_spool_locked(self) -> Path | None:
+        if self._spool is None:
+            return None
+        self._spool.close()
+        self._segment_seq += 1
+        segment = self.spool_path.with_name(f"{self.spool_path.name}.{int(time.time() * 1000)}.{self._segment_seq}.flushing")
+        self.spool_path.replace(segment)
+        self._spool = self.spool_path.open("a", encoding="utf-8")
+        return segment
+
+    def flush(self) -> int:
+        """Write everything queued so far in one transaction; returns the number of rows written."""
+        with self._flush_lock:
+            with self._cond:
+                if not self._queue:
+                    return 0
+                items, self._queue = self._queue, []
+                segments = [*self._retry_segments]
+                self._retry_segments = []
+                segment = self._rotate_spool_locked()
+                if segment is not None:
+                    segments.append(segment)
+
+            started = time.perf_counter()
+            try:
+                rejected = self._insert_rows(items)
+            except Exception:
+                logger.exception("[WriteBehind] flush of %s rows failed; will retry", len(items))
+                with self._cond:
+                    self._flush_errors += 1
+                    self._queue[:0] = items
+                    self._retry_segments = segments
+                return 0
+
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            self._dead_letter(rejected)
+            for seg in segments:
+                seg.unlink(missing_ok=True)
+            written = len(items) - len(rejected)
+            with self._cond:
+                self._rows_written += written
+                self._flushes += 1
+                self._last_flush_rows = written
+                self._last_flush_ms = elapsed_ms
+                self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+            return written
+
+    @staticmethod
+    def _insert_sql(table: str, cols: tuple[str, ...]) -> str:
+        placeholders = ", ".join("?" for _ in cols)
+        return f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({placeholders})"
+
+    def _insert_rows(self, items: list[tuple[str, dict[str, Any]]]) -> list[tuple[str, dict[str, Any]]]:
+        """
+        Insert `items` in one transaction and return the rows the database rejected.
+
+        Grouped `executemany` first; if that hits a constraint violation the batch is re-inserted
+        row by row (a failed INSERT only aborts its own statement) so the good rows still commit.
+        Other errors (locked/unavailable database) propagate and the whole batch is retried.
+        """
+        grouped: dict[tuple[str, tuple[str, ...]], list[tuple]] = {}
+        for table, row in items:
+            cols = tuple(row)
+            grouped.setdefault((table, cols), []).append(tuple(row[c] for c in cols))
+
+        conn = pooled_connection(self.db_path)
+        try:
+            try:
+                for (table, cols), values in grouped.items():
+                    conn.executemany(self._insert_sql(table, cols), values)
+                conn.commit()
+                return []
+            except sqlite3.IntegrityError:
+                conn.rollback()
+
+            rejected: list[tuple[str, dict[str, Any]]] = []
+            for table, row in items:
+                cols = tuple(row)
+                try:
+                    conn.execute(self._insert_sql(table, cols), tuple(row[c] for c in cols))
+                except sqlite3.IntegrityError:
+                    rejected.append((table, row))
+            conn.commit()
+            return rejected
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _dead_letter(self, rejected: list[tuple[str, dict[str, Any]]]) -> None:
+        if not rejected:
+            return
+        with self._cond:
+            self._rejected += len(rejected)
+        logger.error(
+            "[WriteBehind] %s log rows violate table constraints; moved to %s", len(rejected), self.rejected_path
+        )
+        try:
+            with self.rejected_path.open("a", encoding="utf-8") as f:
+                for table, row in rejected:
+                    f.write(json.dumps({"t": table, "r": row}, ensure_ascii=False, separators=(",", ":")) + "\n")
+        except OSError:
+            logger.warning("[WriteBehind] could not record rejected rows", exc_info=True)
+
+    def _replay_spool(self) -> None:
+        paths = sorted(self.spool_path.parent.glob(f"{self.spool_path.name}.*.flushing"))
+        if self.spool_path.exists():
+            paths.append(self.spool_path)
+        if not paths:
+            return
+
+        items: list[tuple[str, dict[str, Any]]] = []
+        for path in paths:
+            for line in path.read_text(encoding="utf-8", errors="replace").splitlines():
+                try:
+                    entry = json.loads(line)
+                    items.append((str(entry["t"]), dict(entry["r"])))
+                except Exception:
+                    # A torn last line from a crash mid-append.
+                    continue
+        if items:
+            rejected = self._insert_rows(items)
+            self._dead_letter(rejected)
+            self._replayed += len(items) - len(rejected)
+            logger.info("[WriteBehind] replayed %s spooled log rows", len(items) - len(rejected))
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                "running": self.running,
+                "queued": len(self._queue),
+                "max_queue": self._max_queue,
+                "batch_size": self._batch_size,
+                "flush_interval_s": self._flush_interval_s,
+                "enqueued": self._enqueued,
+                "sync_fallbacks": self._sync_fallbacks,
+                "rows_written": self._rows_written,
+                "flushes": self._flushes,
+                "flush_errors": self._flush_errors,
+                "replayed": self._replayed,
+                "rejected": self._rejected,
+                "last_flush_rows": self._last_flush_rows,
+                "last_flush_ms": round(self._last_flush_ms, 3),
+                "max_flush_ms": round(self._max_flush_ms, 3),
+            }
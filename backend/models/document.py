@@ -29,6 +29,11 @@ class BatchDocumentReviewRequest(BaseModel):
     review_notes: Optional[str] = None
 
 
+class BatchConflictCheckRequest(BaseModel):
+    """Batch conflict check request model (no doc_ids: the whole pending queue)"""
+    doc_ids: Optional[List[str]] = None
+
+
 class BatchDocumentReviewResponse(BaseModel):
     """Batch document review response model"""
     total: int
@@ -38,6 +43,21 @@ class BatchDocumentReviewResponse(BaseModel):
     failed_items: List[dict]
 
 
+class BatchApprovalJobResponse(BaseModel):
+    """Background batch approval job status"""
+    job_id: str
+    status: str
+    total: int
+    processed: int
+    success_count: int
+    failed_count: int
+    succeeded_doc_ids: List[str]
+    failed_items: List[dict]
+    parse_failed_datasets: List[str]
+    created_at_ms: int
+    finished_at_ms: Optional[int] = None
+
+
 class StatsResponse(BaseModel):
     """Statistics response model"""
     total_documents: int
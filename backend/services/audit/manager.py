@@ -52,10 +52,11 @@ class AuditLogManager:
 
     def list_events(self, **kwargs) -> dict[str, Any]:
         if self._store is None:
-            return {"total": 0, "items": []}
-        total, rows = self._store.list_events(**kwargs)
+            return {"total": 0, "items": [], "next_cursor": None}
+        page = self._store.list_events_page(**kwargs)
         return {
-            "total": total,
+            "total": page.total,
+            "next_cursor": page.next_cursor,
             "items": [
                 {
                     "id": r.id,
@@ -75,6 +76,6 @@ class AuditLogManager:
                     "kb_name": r.kb_name,
                     "meta_json": r.meta_json,
                 }
-                for r in rows
+                for r in page.items
             ],
         }
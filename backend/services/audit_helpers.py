@@ -40,6 +40,10 @@ def actor_fields_from_user(deps: Any, user: Any) -> dict[str, Any]:
 
 
 def actor_fields_from_ctx(deps: Any, ctx: Any) -> dict[str, Any]:
+    # AuthContext memoizes the fields for the request; other ctx objects resolve them here.
+    cached = getattr(ctx, "actor_fields", None)
+    if isinstance(cached, dict):
+        return dict(cached)
     user = getattr(ctx, "user", None)
     if not user:
         return {
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 import json
+import threading
 import time
 from dataclasses import dataclass
 from typing import Any, Optional
 
 from backend.database.paths import resolve_auth_db_path
-from backend.database.sqlite import connect_sqlite
+from backend.database.sqlite import pooled_connection
+from backend.database.write_behind import WriteBehindLog
 
 
 @dataclass(frozen=True)
@@ -30,6 +32,30 @@ class AuditEvent:
     meta_json: Optional[str] = None
 
 
+@dataclass(frozen=True)
+class AuditEventPage:
+    total: Optional[int]
+    items: list[AuditEvent]
+    next_cursor: Optional[str] = None
+
+
+TOTAL_MODE_EXACT = "exact"
+TOTAL_MODE_CACHED = "cached"
+TOTAL_MODE_NONE = "none"
+
+
+def encode_audit_cursor(event: AuditEvent) -> str:
+    return f"{int(event.created_at_ms)}:{int(event.id)}"
+
+
+def decode_audit_cursor(cursor: str) -> tuple[int, int]:
+    try:
+        created_at_ms, event_id = str(cursor).split(":", 1)
+        return int(created_at_ms), int(event_id)
+    except (TypeError, ValueError):
+        raise ValueError("invalid_cursor") from None
+
+
 class AuditLogStore:
     """
     Unified audit/event log store.
@@ -41,14 +67,25 @@ class AuditLogStore:
     Notes:
     - This is additive; existing specialized logs (download_logs/deletion_logs) are kept for compatibility.
     - Avoid putting secrets into meta_json.
+    - With a `write_behind` queue, `log_event` only enqueues the row (see database/write_behind.py).
     """
 
-    def __init__(self, db_path: str | None = None):
+    def __init__(
+        self,
+        db_path: str | None = None,
+        *,
+        count_cache_ttl_s: float = 30.0,
+        write_behind: WriteBehindLog | None = None,
+    ):
         self.db_path = resolve_auth_db_path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._write_behind = write_behind
+        self._count_cache_ttl_s = float(count_cache_ttl_s)
+        self._count_lock = threading.Lock()
+        self._count_cache: dict[tuple, tuple[float, int]] = {}
 
     def _get_connection(self):
-        return connect_sqlite(self.db_path)
+        return pooled_connection(self.db_path)
 
     def log_event(
         self,
@@ -76,6 +113,30 @@ class AuditLogStore:
             except Exception:
                 meta_json = None
 
+        row = {
+            "action": (action or "").strip(),
+            "actor": (actor or "").strip(),
+            "created_at_ms": now_ms,
+            "actor_username": (actor_username or None),
+            "company_id": (int(company_id) if company_id is not None else None),
+            "company_name": (company_name or None),
+            "department_id": (int(department_id) if department_id is not None else None),
+            "department_name": (department_name or None),
+            "source": (source or None),
+            "doc_id": (doc_id or None),
+            "filename": (filename or None),
+            "kb_id": (kb_id or None),
+            "kb_dataset_id": (kb_dataset_id or None),
+            "kb_name": (kb_name or kb_id or None),
+            "meta_json": meta_json,
+        }
+        # Queued rows have no id yet (0); they are committed by the write-behind flusher.
+        event_id = 0
+        if self._write_behind is None or not self._write_behind.submit("audit_events", row):
+            event_id = self._insert(row)
+        return AuditEvent(id=event_id, **row)
+
+    def _insert(self, row: dict[str, Any]) -> int:
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
@@ -87,51 +148,45 @@ class AuditLogStore:
                     source, doc_id, filename,
                     kb_id, kb_dataset_id, kb_name,
                     meta_json
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ) VALUES (
+                    :action, :actor, :created_at_ms,
+                    :actor_username, :company_id, :company_name, :department_id, :department_name,
+                    :source, :doc_id, :filename,
+                    :kb_id, :kb_dataset_id, :kb_name,
+                    :meta_json
+                )
                 """,
-                (
-                    (action or "").strip(),
-                    (actor or "").strip(),
-                    now_ms,
-                    (actor_username or None),
-                    (int(company_id) if company_id is not None else None),
-                    (company_name or None),
-                    (int(department_id) if department_id is not None else None),
-                    (department_name or None),
-                    (source or None),
-                    (doc_id or None),
-                    (filename or None),
-                    (kb_id or None),
-                    (kb_dataset_id or None),
-                    (kb_name or kb_id or None),
-                    meta_json,
-                ),
+                row,
             )
             conn.commit()
-            cursor.execute("SELECT last_insert_rowid()")
-            event_id = int(cursor.fetchone()[0])
-            return AuditEvent(
-                id=event_id,
-                action=(action or "").strip(),
-                actor=(actor or "").strip(),
-                actor_username=(actor_username or None),
-                company_id=(int(company_id) if company_id is not None else None),
-                company_name=(company_name or None),
-                department_id=(int(department_id) if department_id is not None else None),
-                department_name=(department_name or None),
-                created_at_ms=now_ms,
-                source=(source or None),
-                doc_id=(doc_id or None),
-                filename=(filename or None),
-                kb_id=(kb_id or None),
-                kb_dataset_id=(kb_dataset_id or None),
-                kb_name=(kb_name or kb_id or None),
-                meta_json=meta_json,
-            )
+            return int(cursor.lastrowid)
         finally:
             conn.close()
 
-    def list_events(
+    def list_events(self, **kwargs) -> tuple[int, list[AuditEvent]]:
+        page = self.list_events_page(**kwargs)
+        return int(page.total or 0), page.items
+
+    def _count(self, cursor, where: str, params: list[Any], total_mode: str) -> int | None:
+        if total_mode == TOTAL_MODE_NONE:
+            return None
+        key = (where, tuple(params))
+        now = time.monotonic()
+        if total_mode == TOTAL_MODE_CACHED:
+            with self._count_lock:
+                hit = self._count_cache.get(key)
+            if hit is not None and now - hit[0] < self._count_cache_ttl_s:
+                return hit[1]
+
+        cursor.execute(f"SELECT COUNT(*) FROM audit_events{where}", params)
+        total = int(cursor.fetchone()[0])
+        with self._count_lock:
+            if len(self._count_cache) >= 256:
+                self._count_cache.clear()
+            self._count_cache[key] = (now, total)
+        return total
+
+    def list_events_page(
         self,
         *,
         action: str | None = None,
@@ -145,13 +200,28 @@ class AuditLogStore:
         to_ms: int | None = None,
         offset: int = 0,
         limit: int = 200,
-    ) -> tuple[int, list[AuditEvent]]:
+        cursor: str | None = None,
+        total_mode: str = TOTAL_MODE_EXACT,
+    ) -> AuditEventPage:
+        """
+        Newest-first page of audit events.
+
+        Pass the previous page's `next_cursor` as `cursor` to continue after it: the (created_at_ms, id)
+        keyset seeks straight into the matching `(filter, created_at_ms)` index instead of skipping
+        `offset` rows. `offset` is still honoured when no cursor is given.
+
+        `total_mode`: "exact" counts every call, "cached" reuses a count of the same filter for
+        `count_cache_ttl_s`, "none" skips counting (`total` is None).
+        """
         lim = int(limit) if int(limit) > 0 else 200
         lim = min(lim, 2000)
         off = int(offset) if int(offset) > 0 else 0
+        after = decode_audit_cursor(cursor) if cursor else None
+        if total_mode not in (TOTAL_MODE_EXACT, TOTAL_MODE_CACHED, TOTAL_MODE_NONE):
+            raise ValueError("invalid_total_mode")
 
         conn = self._get_connection()
-        cursor = conn.cursor()
+        cur = conn.cursor()
         try:
             where = " WHERE 1=1"
             params: list[Any] = []
@@ -184,10 +254,15 @@ class AuditLogStore:
                 where += " AND created_at_ms <= ?"
                 params.append(int(to_ms))
 
-            cursor.execute(f"SELECT COUNT(*) FROM audit_events{where}", params)
-            total = int(cursor.fetchone()[0])
+            total = self._count(cur, where, params, total_mode)
 
-            cursor.execute(
+            page_where, page_params = where, list(params)
+            if after is not None:
+                page_where += " AND (created_at_ms, id) < (?, ?)"
+                page_params.extend(after)
+                off = 0
+
+            cur.execute(
                 f"""
                 SELECT
                     id, action, actor,
@@ -197,14 +272,15 @@ class AuditLogStore:
                     kb_id, kb_dataset_id, kb_name,
                     meta_json
                 FROM audit_events
-                {where}
-                ORDER BY created_at_ms DESC
+                {page_where}
+                ORDER BY created_at_ms DESC, id DESC
                 LIMIT ? OFFSET ?
                 """,
-                [*params, lim, off],
+                [*page_params, lim, off],
             )
 
-            rows = cursor.fetchall()
-            return total, [AuditEvent(*row) for row in rows]
+            items = [AuditEvent(*row) for row in cur.fetchall()]
+            next_cursor = encode_audit_cursor(items[-1]) if len(items) == lim else None
+            return AuditEventPage(total=total, items=items, next_cursor=next_cursor)
         finally:
             conn.close()
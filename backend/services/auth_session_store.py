@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import threading
 import time
 from dataclasses import dataclass
 from datetime import datetime
@@ -7,7 +8,7 @@ from pathlib import Path
 from typing import Optional
 
 from backend.database.paths import resolve_auth_db_path
-from backend.database.sqlite import connect_sqlite
+from backend.database.sqlite import pooled_connection
 
 
 @dataclass
@@ -28,12 +29,34 @@ class AuthLoginSession:
 
 
 class AuthSessionStore:
-    def __init__(self, db_path: str | None = None):
+    def __init__(self, db_path: str | None = None, *, touch_interval_s: float = 60.0):
         self.db_path = resolve_auth_db_path(db_path)
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        # Plain access-token touches are coalesced: `last_activity_at_ms` is only rewritten once it
+        # is older than this interval, so read-heavy traffic does not turn into one UPDATE per
+        # request. Idle timeouts are therefore measured with up to this much slack.
+        self._touch_interval_ms = max(0, int(float(touch_interval_s) * 1000))
+        self._stats_lock = threading.Lock()
+        self._touches_written = 0
+        self._touches_coalesced = 0
+
+    def touch_stats(self) -> dict[str, int]:
+        with self._stats_lock:
+            return {
+                "touch_interval_ms": self._touch_interval_ms,
+                "touches_written": self._touches_written,
+                "touches_coalesced": self._touches_coalesced,
+            }
+
+    def _count_touch(self, *, written: bool) -> None:
+        with self._stats_lock:
+            if written:
+                self._touches_written += 1
+            else:
+                self._touches_coalesced += 1
 
     def _conn(self):
-        return connect_sqlite(self.db_path)
+        return pooled_connection(self.db_path)
 
     @staticmethod
     def _now_ms() -> int:
@@ -375,7 +398,10 @@ class AuthSessionStore:
                 conn.commit()
                 return False, "idle_timeout"
 
-            if touch:
+            if touch and not mark_refresh and 0 <= (now - last_activity) < self._touch_interval_ms:
+                self._count_touch(written=False)
+            elif touch:
+                self._count_touch(written=True)
                 if mark_refresh:
                     conn.execute(
                         """
@@ -6,7 +6,7 @@ from dataclasses import dataclass
 from typing import Any
 
 from backend.database.paths import resolve_auth_db_path
-from backend.database.sqlite import connect_sqlite
+from backend.database.sqlite import pooled_connection
 
 
 def _strip_think_tags(value: str) -> str:
@@ -73,7 +73,7 @@ class ChatMessageSourcesStore:
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
     def _conn(self):
-        return connect_sqlite(self.db_path)
+        return pooled_connection(self.db_path)
 
     def upsert_sources(self, *, chat_id: str, session_id: str, assistant_text: str, sources: list[dict[str, Any]]) -> None:
         chat_id = str(chat_id or "").strip()
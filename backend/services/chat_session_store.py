@@ -5,7 +5,7 @@ from typing import List, Optional, Dict
 from pathlib import Path
 
 from backend.database.paths import resolve_auth_db_path
-from backend.database.sqlite import connect_sqlite
+from backend.database.sqlite import PooledConnection, pooled_connection
 
 
 class ChatSessionStore:
@@ -20,9 +20,9 @@ class ChatSessionStore:
         if not self.db_path.exists():
             raise FileNotFoundError(f"Database not found: {self.db_path}")
 
-    def _get_connection(self) -> sqlite3.Connection:
+    def _get_connection(self) -> PooledConnection:
         """Get database connection."""
-        return connect_sqlite(self.db_path)
+        return pooled_connection(self.db_path)
 
     def create_session(
         self,
@@ -6,7 +6,7 @@ from typing import Any
 from uuid import uuid4
 
 from backend.database.paths import resolve_auth_db_path
-from backend.database.sqlite import connect_sqlite
+from backend.database.sqlite import pooled_connection
 
 from .models import BackupJob, DataSecuritySettings
 
@@ -18,7 +18,7 @@ class DataSecurityStore:
         self._lock_owner = uuid4().hex
 
     def _conn(self):
-        return connect_sqlite(self.db_path)
+        return pooled_connection(self.db_path)
 
     def _acquire_lock(self, *, name: str, job_id: int | None, ttl_ms: int) -> bool:
         """
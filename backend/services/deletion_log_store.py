@@ -6,7 +6,8 @@ from dataclasses import dataclass
 from pathlib import Path
 
 from backend.database.paths import resolve_auth_db_path
-from backend.database.sqlite import connect_sqlite
+from backend.database.sqlite import pooled_connection
+from backend.database.write_behind import WriteBehindLog, require_columns
 
 
 @dataclass
@@ -28,13 +29,14 @@ class DeletionLog:
 
 
 class DeletionLogStore:
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, write_behind: Optional[WriteBehindLog] = None):
         self.db_path = resolve_auth_db_path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._write_behind = write_behind
         self._logger = logging.getLogger(__name__)
 
     def _get_connection(self):
-        return connect_sqlite(self.db_path)
+        return pooled_connection(self.db_path)
 
     def log_deletion(
         self,
@@ -54,7 +56,40 @@ class DeletionLogStore:
     ) -> DeletionLog:
         """记录文件删除操作"""
         now_ms = int(time.time() * 1000)
-
+        row = {
+            "doc_id": doc_id,
+            "filename": filename,
+            "kb_id": kb_id,
+            "deleted_by": deleted_by,
+            "deleted_at_ms": now_ms,
+            "original_uploader": original_uploader,
+            "original_reviewer": original_reviewer,
+            "ragflow_doc_id": ragflow_doc_id,
+            "kb_dataset_id": kb_dataset_id,
+            "kb_name": (kb_name or kb_id),
+            "action": action,
+            "ragflow_deleted": ragflow_deleted,
+            "ragflow_delete_error": ragflow_delete_error,
+        }
+
+        require_columns("deletion_logs", row, "doc_id", "filename", "kb_id", "deleted_by")
+
+        # 写入队列时 id 为 0，由后台批量写入
+        log_id = 0
+        if self._write_behind is None or not self._write_behind.submit("deletion_logs", row):
+            log_id = self._insert(row)
+
+        self._logger.info(
+            "[DELETE] deletion logged doc_id=%s filename=%s kb_id=%s deleted_by=%s",
+            doc_id,
+            filename,
+            kb_id,
+            deleted_by,
+        )
+
+        return DeletionLog(id=log_id, **row)
+
+    def _insert(self, row: dict) -> int:
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
@@ -63,40 +98,14 @@ class DeletionLogStore:
                     doc_id, filename, kb_id, deleted_by, deleted_at_ms,
                     original_uploader, original_reviewer, ragflow_doc_id,
                     kb_dataset_id, kb_name, action, ragflow_deleted, ragflow_delete_error
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (doc_id, filename, kb_id, deleted_by, now_ms,
-                  original_uploader, original_reviewer, ragflow_doc_id,
-                  kb_dataset_id, (kb_name or kb_id), action, ragflow_deleted, ragflow_delete_error))
+                ) VALUES (
+                    :doc_id, :filename, :kb_id, :deleted_by, :deleted_at_ms,
+                    :original_uploader, :original_reviewer, :ragflow_doc_id,
+                    :kb_dataset_id, :kb_name, :action, :ragflow_deleted, :ragflow_delete_error
+                )
+            """, row)
             conn.commit()
-
-            # 获取插入的记录
-            cursor.execute("SELECT last_insert_rowid()")
-            log_id = cursor.fetchone()[0]
-
-            self._logger.info(
-                "[DELETE] deletion logged doc_id=%s filename=%s kb_id=%s deleted_by=%s",
-                doc_id,
-                filename,
-                kb_id,
-                deleted_by,
-            )
-
-            return DeletionLog(
-                id=log_id,
-                doc_id=doc_id,
-                filename=filename,
-                kb_id=kb_id,
-                deleted_by=deleted_by,
-                deleted_at_ms=now_ms,
-                original_uploader=original_uploader,
-                original_reviewer=original_reviewer,
-                ragflow_doc_id=ragflow_doc_id,
-                kb_dataset_id=kb_dataset_id,
-                kb_name=(kb_name or kb_id),
-                action=action,
-                ragflow_deleted=ragflow_deleted,
-                ragflow_delete_error=ragflow_delete_error,
-            )
+            return cursor.lastrowid
         finally:
             conn.close()
 
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentNameResolver:
+    """
+    Bulk `doc_id -> (filename, dataset name)` resolution for chat retrieval sources.
+
+    Per batch: one LRU pass, one `kb_documents ... IN (...)` query for original upload names,
+    then the RAGFlow document catalog for the rest (grouped by dataset). Results are shared
+    across requests for `ttl_s`, so repeated questions over the same documents cost nothing.
+    """
+
+    def __init__(self, *, kb_store: Any, ragflow_service: Any, ttl_s: float = 600.0, max_entries: int = 4096):
+        self.kb_store = kb_store
+        self.ragflow_service = ragflow_service
+        self._ttl_s = float(ttl_s)
+        self._max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple[float, str, str]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def _cached(self, doc_ids: list[str]) -> dict[str, tuple[str, str]]:
+        out: dict[str, tuple[str, str]] = {}
+        now = time.monotonic()
+        with self._lock:
+            for doc_id in doc_ids:
+                entry = self._entries.get(doc_id)
+                if entry is None:
+                    continue
+                cached_at_s, name, dataset = entry
+                if now - cached_at_s > self._ttl_s:
+                    del self._entries[doc_id]
+                    continue
+                self._entries.move_to_end(doc_id)
+                out[doc_id] = (name, dataset)
+            self._hits += len(out)
+            self._misses += len(doc_ids) - len(out)
+        return out
+
+    def _remember(self, resolved: dict[str, tuple[str, str]]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for doc_id, (name, dataset) in resolved.items():
+                self._entries[doc_id] = (now, name, dataset)
+                self._entries.move_to_end(doc_id)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def _dataset_variants(self, dataset_ref: str | None) -> tuple[set[str], str | None]:
+        """All refs (as given, id, name) that denote `dataset_ref`, plus its display name."""
+        if not dataset_ref:
+            return set(), None
+        variants = {dataset_ref}
+        try:
+            dataset_id = self.ragflow_service.normalize_dataset_id(dataset_ref)
+        except Exception:
+            dataset_id = None
+        try:
+            name = self.ragflow_service.resolve_dataset_name(dataset_ref)
+        except Exception:
+            name = None
+        variants.update(x for x in (dataset_id, name) if x)
+        return variants, name
+
+    def _from_local_uploads(self, wanted: dict[str, str | None]) -> dict[str, tuple[str, str]]:
+        if self.kb_store is None or not wanted:
+            return {}
+        try:
+            records = self.kb_store.get_documents_by_ragflow_ids(list(wanted))
+        except Exception as e:
+            logger.warning("Local document name lookup failed: %s", e)
+            return {}
+        out: dict[str, tuple[str, str]] = {}
+        for doc_id, docs in records.items():
+            variants, dataset_name = self._dataset_variants(wanted.get(doc_id))
+            for doc in docs:
+                refs = {doc.kb_id, doc.kb_dataset_id, doc.kb_name}
+                if variants and not (refs & variants):
+                    continue
+                filename = str(doc.filename or "").strip()
+                if filename:
+                    out[doc_id] = (filename, dataset_name or doc.kb_name or doc.kb_id or "")
+                    break
+        return out
+
+    def _from_catalog(self, wanted: dict[str, str | None]) -> dict[str, tuple[str, str]]:
+        resolve = getattr(self.ragflow_service, "resolve_document_names", None)
+        if not callable(resolve) or not wanted:
+            return {}
+        try:
+            found = resolve(list(wanted.items()))
+        except Exception as e:
+            logger.warning("RAGFlow document name lookup failed: %s", e)
+            return {}
+        return {
+            doc_id: (str(info["name"]), str(info.get("dataset") or info.get("dataset_id") or ""))
+            for doc_id, info in found.items()
+            if info.get("name")
+        }
+
+    def resolve(self, refs: list[tuple[str, str | None]]) -> dict[str, tuple[str, str]]:
+        """Map each doc id in `(doc_id, dataset_ref)` pairs to `(filename, dataset name)`; unknown ids are omitted."""
+        wanted: dict[str, str | None] = {}
+        for doc_id, dataset_ref in refs or []:
+            if isinstance(doc_id, str) and doc_id and doc_id not in wanted:
+                wanted[doc_id] = dataset_ref if isinstance(dataset_ref, str) and dataset_ref else None
+
+        out = self._cached(list(wanted))
+        pending = {k: v for k, v in wanted.items() if k not in out}
+
+        fresh = self._from_local_uploads(pending)
+        pending = {k: v for k, v in pending.items() if k not in fresh}
+        fresh.update(self._from_catalog(pending))
+
+        self._remember(fresh)
+        out.update(fresh)
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / total, 4) if total else 0.0,
+                "ttl_s": self._ttl_s,
+            }
@@ -15,7 +15,7 @@ from backend.app.core.permission_resolver import (
     assert_kb_allowed,
 )
 from backend.services.documents.errors import DocumentNotFound, DocumentSourceError
-from backend.services.documents.models import DeleteResult, DocumentRef
+from backend.services.documents.models import DeleteResult, DocumentBytes, DocumentRef
 from backend.services.documents.sources.knowledge_source import KnowledgeDocumentSource
 from backend.services.documents.sources.ragflow_source import RagflowDocumentSource
 from backend.services.audit_helpers import actor_fields_from_ctx
@@ -40,16 +40,60 @@ class DocumentManager:
 
     # -------------------- Preview (JSON contract) --------------------
 
-    def preview_payload(self, ref: DocumentRef, *, preview_filename: str | None = None, render: str = "default"):
+    def preview_payload(
+        self,
+        ref: DocumentRef,
+        *,
+        preview_filename: str | None = None,
+        render: str = "default",
+        delivery: str = "inline",
+    ):
         """
         Return a unified preview JSON payload.
         This is used by the unified preview gateway and can be reused by other modules.
         """
-        if ref.source == "ragflow":
-            doc_bytes = self._ragflow.get_bytes(ref)
-        else:
-            doc_bytes = self._knowledge.get_bytes(ref)
+        source = self.fetch_preview_source(ref, preview_filename=preview_filename, delivery=delivery)
+        if isinstance(source, dict):
+            return source
+        return self.build_preview(ref, source, preview_filename=preview_filename, render=render, delivery=delivery)
+
+    def fetch_preview_source(
+        self,
+        ref: DocumentRef,
+        *,
+        preview_filename: str | None = None,
+        delivery: str = "inline",
+    ) -> DocumentBytes | dict:
+        """
+        First half of `preview_payload`: the document bytes, or the finished payload when a
+        staged upload can be served by URL straight from disk.
+        """
+        from backend.services.unified_preview import file_preview_payload
 
+        if ref.source == "ragflow":
+            return self._ragflow.get_bytes(ref)
+        local = self._knowledge.get_file(ref)
+        # Staged uploads carry their digest: publish PDFs/images for URL delivery from disk.
+        payload = file_preview_payload(
+            local.path,
+            preview_filename or local.filename or f"document_{ref.doc_id}",
+            delivery=delivery,
+            content_sha256=local.content_sha256,
+        )
+        if payload is not None:
+            return payload
+        return self._knowledge.read(local)
+
+    def build_preview(
+        self,
+        ref: DocumentRef,
+        doc_bytes: DocumentBytes,
+        *,
+        preview_filename: str | None = None,
+        render: str = "default",
+        delivery: str = "inline",
+    ) -> dict:
+        """Second half of `preview_payload`: convert/encode fetched bytes into the preview contract."""
         from backend.services.unified_preview import build_preview_payload
 
         return build_preview_payload(
@@ -57,6 +101,8 @@ class DocumentManager:
             preview_filename or doc_bytes.filename,
             doc_id=ref.doc_id,
             render=render,
+            delivery=delivery,
+            content_sha256=doc_bytes.content_sha256,
         )
 
     # -------------------- Download --------------------
@@ -19,6 +19,15 @@ class DocumentBytes:
     filename: str
     content: bytes
     mime_type: str | None = None
+    content_sha256: str | None = None
+
+
+@dataclass(frozen=True)
+class DocumentFile:
+    filename: str
+    path: str
+    mime_type: str | None = None
+    content_sha256: str | None = None
 
 
 @dataclass(frozen=True)
@@ -3,25 +3,41 @@ from __future__ import annotations
 import os
 
 from backend.services.documents.errors import DocumentNotFound, DocumentSourceError
-from backend.services.documents.models import DocumentBytes, DocumentRef
+from backend.services.documents.models import DocumentBytes, DocumentFile, DocumentRef
 
 
 class KnowledgeDocumentSource:
     def __init__(self, deps):
         self._deps = deps
 
-    def get_bytes(self, ref: DocumentRef) -> DocumentBytes:
+    def get_file(self, ref: DocumentRef) -> DocumentFile:
         doc = self._deps.kb_store.get_document(ref.doc_id)
         if not doc:
             raise DocumentNotFound("文档不存在")
         if not os.path.exists(doc.file_path):
             raise DocumentNotFound("文件不存在")
+        return DocumentFile(
+            filename=doc.filename,
+            path=doc.file_path,
+            mime_type=getattr(doc, "mime_type", None),
+            content_sha256=getattr(doc, "content_sha256", None),
+        )
+
+    def read(self, local: DocumentFile) -> DocumentBytes:
         try:
-            with open(doc.file_path, "rb") as f:
+            with open(local.path, "rb") as f:
                 content = f.read()
         except Exception as e:
             raise DocumentSourceError(str(e)) from e
-        return DocumentBytes(filename=doc.filename, content=content, mime_type=getattr(doc, "mime_type", None))
+        return DocumentBytes(
+            filename=local.filename,
+            content=content,
+            mime_type=local.mime_type,
+            content_sha256=local.content_sha256,
+        )
+
+    def get_bytes(self, ref: DocumentRef) -> DocumentBytes:
+        return self.read(self.get_file(ref))
 
     def delete(self, ref: DocumentRef) -> bool:
         # Local delete is managed by DocumentManager because it needs logging and DB cleanup.
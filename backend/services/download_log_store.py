@@ -5,7 +5,8 @@ from dataclasses import dataclass
 from pathlib import Path
 
 from backend.database.paths import resolve_auth_db_path
-from backend.database.sqlite import connect_sqlite
+from backend.database.sqlite import pooled_connection
+from backend.database.write_behind import WriteBehindLog, require_columns
 
 
 
@@ -24,12 +25,13 @@ class DownloadLog:
 
 
 class DownloadLogStore:
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, write_behind: Optional[WriteBehindLog] = None):
         self.db_path = resolve_auth_db_path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._write_behind = write_behind
 
     def _get_connection(self):
-        return connect_sqlite(self.db_path)
+        return pooled_connection(self.db_path)
 
     def log_download(
         self,
@@ -44,7 +46,39 @@ class DownloadLogStore:
     ) -> DownloadLog:
         """记录文件下载操作"""
         now_ms = int(time.time() * 1000)
-
+        row = {
+            "doc_id": doc_id,
+            "filename": filename,
+            "kb_id": kb_id,
+            "downloaded_by": downloaded_by,
+            "downloaded_at_ms": now_ms,
+            "ragflow_doc_id": ragflow_doc_id,
+            "is_batch": 1 if is_batch else 0,
+            "kb_dataset_id": kb_dataset_id,
+            "kb_name": (kb_name or kb_id),
+        }
+
+        require_columns("download_logs", row, "doc_id", "filename", "kb_id", "downloaded_by")
+
+        # 写入队列时 id 为 0，由后台批量写入
+        log_id = 0
+        if self._write_behind is None or not self._write_behind.submit("download_logs", row):
+            log_id = self._insert(row)
+
+        return DownloadLog(
+            id=log_id,
+            doc_id=doc_id,
+            filename=filename,
+            kb_id=kb_id,
+            downloaded_by=downloaded_by,
+            downloaded_at_ms=now_ms,
+            ragflow_doc_id=ragflow_doc_id,
+            is_batch=is_batch,
+            kb_dataset_id=kb_dataset_id,
+            kb_name=(kb_name or kb_id),
+        )
+
+    def _insert(self, row: dict) -> int:
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
@@ -52,27 +86,13 @@ class DownloadLogStore:
                 INSERT INTO download_logs (
                     doc_id, filename, kb_id, downloaded_by, downloaded_at_ms,
                     ragflow_doc_id, is_batch, kb_dataset_id, kb_name
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (doc_id, filename, kb_id, downloaded_by, now_ms,
-                  ragflow_doc_id, 1 if is_batch else 0, kb_dataset_id, (kb_name or kb_id)))
+                ) VALUES (
+                    :doc_id, :filename, :kb_id, :downloaded_by, :downloaded_at_ms,
+                    :ragflow_doc_id, :is_batch, :kb_dataset_id, :kb_name
+                )
+            """, row)
             conn.commit()
-
-            # 获取插入的记录
-            cursor.execute("SELECT last_insert_rowid()")
-            log_id = cursor.fetchone()[0]
-
-            return DownloadLog(
-                id=log_id,
-                doc_id=doc_id,
-                filename=filename,
-                kb_id=kb_id,
-                downloaded_by=downloaded_by,
-                downloaded_at_ms=now_ms,
-                ragflow_doc_id=ragflow_doc_id,
-                is_batch=is_batch,
-                kb_dataset_id=kb_dataset_id,
-                kb_name=(kb_name or kb_id),
-            )
+            return cursor.lastrowid
         finally:
             conn.close()
 
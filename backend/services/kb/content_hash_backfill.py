@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from pathlib import Path
+
+
+def file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    try:
+        with Path(file_path).open("rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    except OSError:
+        # '' marks "not computable" so the row is not picked up again.
+        return ""
+    return digest.hexdigest()
+
+
+class KbContentHashBackfill:
+    """
+    Background thread that fills `content_sha256` for documents staged before the column existed.
+
+    Rows are hashed `batch_size` at a time with no connection held while files are read, and the
+    thread exits once nothing is left, so startup never waits on legacy uploads. Until a row is
+    hashed it simply does not take part in content-conflict checks.
+    """
+
+    def __init__(self, kb_store, *, batch_size: int = 50, pause_s: float = 0.05, logger: logging.Logger | None = None):
+        self.kb_store = kb_store
+        self.batch_size = max(1, int(batch_size))
+        self.pause_s = max(0.0, float(pause_s))
+        self.logger = logger or logging.getLogger(__name__)
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+        self.hashed = 0
+
+    def run_once(self) -> int:
+        rows = self.kb_store.list_unhashed_documents(limit=self.batch_size)
+        hashes: list[tuple[str, str]] = []
+        for doc_id, file_path in rows:
+            if self._stop_event.is_set():
+                break
+            hashes.append((doc_id, file_sha256(file_path)))
+        self.kb_store.set_content_hashes(hashes)
+        self.hashed += len(hashes)
+        return len(hashes)
+
+    def run(self) -> int:
+        while not self._stop_event.is_set():
+            if self.run_once() < self.batch_size:
+                break
+            # Leave room for request-path writers between batches.
+            self._stop_event.wait(self.pause_s)
+        return self.hashed
+
+    def _loop(self) -> None:
+        try:
+            hashed = self.run()
+        except Exception as e:
+            self.logger.warning("kb_documents content hash backfill failed: %s", e)
+            return
+        if hashed:
+            self.logger.info("kb_documents content hash backfill filled %s rows", hashed)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name="kb_content_hash_backfill", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+_backfill: KbContentHashBackfill | None = None
+
+
+def start_content_hash_backfill(kb_store) -> KbContentHashBackfill:
+    global _backfill
+    if _backfill is None:
+        _backfill = KbContentHashBackfill(kb_store)
+    _backfill.start()
+    return _backfill
+
+
+def stop_content_hash_backfill() -> None:
+    global _backfill
+    if _backfill is not None:
+        _backfill.stop()
+        _backfill = None
@@ -21,4 +21,6 @@ class KbDocument:
     kb_id: str = "灞曞巺"
     kb_dataset_id: Optional[str] = None
     kb_name: Optional[str] = None
+    content_sha256: Optional[str] = None
+    normalized_filename: Optional[str] = None
 
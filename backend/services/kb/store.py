@@ -5,8 +5,9 @@ import time
 import uuid
 from typing import List, Optional
 
+from backend.app.core.filename_normalize import normalize_filename_for_conflict
 from backend.database.paths import resolve_auth_db_path
-from backend.database.sqlite import connect_sqlite
+from backend.database.sqlite import pooled_connection
 
 from .models import KbDocument
 
@@ -19,7 +20,7 @@ class KbStore:
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
     def _get_connection(self):
-        return connect_sqlite(self.db_path)
+        return pooled_connection(self.db_path)
 
     def create_document(
         self,
@@ -32,9 +33,11 @@ class KbStore:
         kb_dataset_id: Optional[str] = None,
         kb_name: Optional[str] = None,
         status: str = "pending",
+        content_sha256: Optional[str] = None,
     ) -> KbDocument:
         doc_id = str(uuid.uuid4())
         now_ms = int(time.time() * 1000)
+        normalized_filename = normalize_filename_for_conflict(filename)
 
         logger.debug(
             "[KbStore] create_document filename=%s uploaded_by=%s kb_id=%s status=%s",
@@ -51,8 +54,8 @@ class KbStore:
                 """
                 INSERT INTO kb_documents (
                     doc_id, filename, file_path, file_size, mime_type,
-                    uploaded_by, status, uploaded_at_ms, kb_id, kb_dataset_id, kb_name
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    uploaded_by, status, uploaded_at_ms, kb_id, kb_dataset_id, kb_name, content_sha256, normalized_filename
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                 (
                     doc_id,
@@ -66,6 +69,8 @@ class KbStore:
                     kb_id,
                     kb_dataset_id,
                     (kb_name or kb_id),
+                    content_sha256,
+                    normalized_filename,
                 ),
             )
             conn.commit()
@@ -82,6 +87,8 @@ class KbStore:
                 kb_id=kb_id,
                 kb_dataset_id=kb_dataset_id,
                 kb_name=(kb_name or kb_id),
+                content_sha256=content_sha256,
+                normalized_filename=normalized_filename,
             )
         finally:
             conn.close()
@@ -94,7 +101,7 @@ class KbStore:
                 """
                 SELECT doc_id, filename, file_path, file_size, mime_type,
                        uploaded_by, status, uploaded_at_ms, reviewed_by,
-                       reviewed_at_ms, review_notes, ragflow_doc_id, kb_id, kb_dataset_id, kb_name
+                       reviewed_at_ms, review_notes, ragflow_doc_id, kb_id, kb_dataset_id, kb_name, content_sha256, normalized_filename
                 FROM kb_documents WHERE doc_id = ?
                 """,
                 (doc_id,),
@@ -123,7 +130,7 @@ class KbStore:
                     f"""
                     SELECT doc_id, filename, file_path, file_size, mime_type,
                            uploaded_by, status, uploaded_at_ms, reviewed_by,
-                           reviewed_at_ms, review_notes, ragflow_doc_id, kb_id, kb_dataset_id, kb_name
+                           reviewed_at_ms, review_notes, ragflow_doc_id, kb_id, kb_dataset_id, kb_name, content_sha256, normalized_filename
                     FROM kb_documents
                     WHERE ragflow_doc_id = ?
                       AND (kb_id IN ({placeholders}) OR kb_dataset_id IN ({placeholders}) OR kb_name IN ({placeholders}))
@@ -135,7 +142,7 @@ class KbStore:
                     """
                     SELECT doc_id, filename, file_path, file_size, mime_type,
                            uploaded_by, status, uploaded_at_ms, reviewed_by,
-                           reviewed_at_ms, review_notes, ragflow_doc_id, kb_id, kb_dataset_id, kb_name
+                           reviewed_at_ms, review_notes, ragflow_doc_id, kb_id, kb_dataset_id, kb_name, content_sha256, normalized_filename
                     FROM kb_documents
                     WHERE ragflow_doc_id = ?
                     """,
@@ -148,6 +155,35 @@ class KbStore:
         finally:
             conn.close()
 
+    def get_documents_by_ragflow_ids(self, ragflow_doc_ids: List[str]) -> dict[str, List[KbDocument]]:
+        """Local records for many RAGFlow doc ids in one query, grouped by ragflow_doc_id."""
+        ids = list(dict.fromkeys(x for x in (ragflow_doc_ids or []) if isinstance(x, str) and x))
+        out: dict[str, List[KbDocument]] = {}
+        if not ids:
+            return out
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start : start + 500]
+                placeholders = ",".join("?" for _ in chunk)
+                cursor.execute(
+                    f"""
+                    SELECT doc_id, filename, file_path, file_size, mime_type,
+                           uploaded_by, status, uploaded_at_ms, reviewed_by,
+                           reviewed_at_ms, review_notes, ragflow_doc_id, kb_id, kb_dataset_id, kb_name, content_sha256, normalized_filename
+                    FROM kb_documents
+                    WHERE ragflow_doc_id IN ({placeholders})
+                    """,
+                    chunk,
+                )
+                for row in cursor.fetchall():
+                    doc = KbDocument(*row)
+                    out.setdefault(doc.ragflow_doc_id, []).append(doc)
+            return out
+        finally:
+            conn.close()
+
     def list_documents(
         self,
         status: Optional[str] = None,
@@ -162,7 +198,7 @@ class KbStore:
             query = """
                 SELECT doc_id, filename, file_path, file_size, mime_type,
                        uploaded_by, status, uploaded_at_ms, reviewed_by,
-                       reviewed_at_ms, review_notes, ragflow_doc_id, kb_id, kb_dataset_id, kb_name
+                       reviewed_at_ms, review_notes, ragflow_doc_id, kb_id, kb_dataset_id, kb_name, content_sha256, normalized_filename
                 FROM kb_documents
                 WHERE 1=1
             """
@@ -193,6 +229,78 @@ class KbStore:
         finally:
             conn.close()
 
+    def find_approved_conflicts(
+        self,
+        doc_ids: Optional[List[str]] = None,
+        kb_refs: Optional[List[str]] = None,
+    ) -> dict[str, tuple[KbDocument, str]]:
+        """
+        Approved documents that clash with pending ones, keyed by the pending doc_id.
+
+        A clash is an approved document in the same knowledge base with the same `normalized_filename`
+        ("filename") or, failing that, the same `content_sha256` ("content"); the most recently uploaded
+        one wins. `doc_ids=None` covers the whole pending queue (optionally limited to `kb_refs`).
+        Both sides are index lookups, so the cost follows the queue size, not the approved catalog.
+        """
+        cols = """
+            a.doc_id, a.filename, a.file_path, a.file_size, a.mime_type,
+            a.uploaded_by, a.status, a.uploaded_at_ms, a.reviewed_by,
+            a.reviewed_at_ms, a.review_notes, a.ragflow_doc_id, a.kb_id, a.kb_dataset_id, a.kb_name,
+            a.content_sha256, a.normalized_filename
+        """
+        same_kb = (
+            "(a.kb_id IN (p.kb_id, p.kb_dataset_id, p.kb_name)"
+            " OR a.kb_dataset_id IN (p.kb_id, p.kb_dataset_id, p.kb_name)"
+            " OR a.kb_name IN (p.kb_id, p.kb_dataset_id, p.kb_name))"
+        )
+        pending_where = "p.status = 'pending' AND a.status = 'approved' AND a.doc_id != p.doc_id"
+        pending_params: list = []
+        refs = [r for r in (kb_refs or []) if r]
+        if refs:
+            placeholders = ",".join("?" for _ in refs)
+            pending_where += (
+                f" AND (p.kb_id IN ({placeholders}) OR p.kb_dataset_id IN ({placeholders}) OR p.kb_name IN ({placeholders}))"
+            )
+            pending_params.extend([*refs, *refs, *refs])
+
+        if doc_ids is None:
+            batches: list[Optional[list[str]]] = [None]
+        else:
+            ids = list(dict.fromkeys(x for x in doc_ids if isinstance(x, str) and x))
+            batches = [ids[start : start + 200] for start in range(0, len(ids), 200)]
+
+        out: dict[str, tuple[KbDocument, str]] = {}
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            for chunk in batches:
+                where, params = pending_where, list(pending_params)
+                if chunk is not None:
+                    where += f" AND p.doc_id IN ({','.join('?' for _ in chunk)})"
+                    params.extend(chunk)
+                cursor.execute(
+                    f"""
+                    SELECT p.doc_id, 0 AS match_rank, a.uploaded_at_ms AS recency, {cols}
+                    FROM kb_documents p
+                    JOIN kb_documents a ON a.normalized_filename = p.normalized_filename
+                    WHERE {where} AND p.normalized_filename != '' AND {same_kb}
+                    UNION ALL
+                    SELECT p.doc_id, 1 AS match_rank, a.uploaded_at_ms AS recency, {cols}
+                    FROM kb_documents p
+                    JOIN kb_documents a ON a.content_sha256 = p.content_sha256
+                    WHERE {where} AND p.content_sha256 != '' AND {same_kb}
+                    ORDER BY match_rank, recency DESC
+                    """,
+                    [*params, *params],
+                )
+                for row in cursor.fetchall():
+                    pending_id, match_rank = row[0], row[1]
+                    if pending_id not in out:
+                        out[pending_id] = (KbDocument(*row[3:]), "filename" if match_rank == 0 else "content")
+            return out
+        finally:
+            conn.close()
+
     def update_document_status(
         self,
         doc_id: str,
@@ -227,6 +335,32 @@ class KbStore:
         finally:
             conn.close()
 
+    def list_unhashed_documents(self, limit: int = 50) -> list[tuple[str, str]]:
+        """(doc_id, file_path) of legacy rows whose `content_sha256` has not been computed yet."""
+        conn = self._get_connection()
+        try:
+            rows = conn.execute(
+                "SELECT doc_id, file_path FROM kb_documents WHERE content_sha256 IS NULL LIMIT ?",
+                (int(limit),),
+            ).fetchall()
+            return [(str(doc_id), str(file_path or "")) for doc_id, file_path in rows]
+        finally:
+            conn.close()
+
+    def set_content_hashes(self, hashes: list[tuple[str, str]]) -> None:
+        """Record `(doc_id, content_sha256)` pairs; rows hashed meanwhile (re-upload) are left alone."""
+        if not hashes:
+            return
+        conn = self._get_connection()
+        try:
+            conn.executemany(
+                "UPDATE kb_documents SET content_sha256 = ? WHERE doc_id = ? AND content_sha256 IS NULL",
+                [(sha, doc_id) for doc_id, sha in hashes],
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
     def delete_document(self, doc_id: str) -> bool:
         conn = self._get_connection()
         cursor = conn.cursor()
@@ -5,7 +5,8 @@ import time
 import uuid
 from typing import Any
 
-from backend.database.sqlite import connect_sqlite
+from backend.app.core.permission_cache import bump_permission_generation
+from backend.database.sqlite import PooledConnection, pooled_connection
 
 
 _UNSET = object()
@@ -15,8 +16,8 @@ class KnowledgeDirectoryStore:
     def __init__(self, db_path: str):
         self._db_path = db_path
 
-    def _conn(self) -> sqlite3.Connection:
-        return connect_sqlite(self._db_path)
+    def _conn(self) -> PooledConnection:
+        return pooled_connection(self._db_path)
 
     def list_nodes(self) -> list[dict[str, Any]]:
         with self._conn() as conn:
@@ -128,6 +129,7 @@ class KnowledgeDirectoryStore:
                     (next_name, next_parent, now_ms, node_id),
                 )
                 conn.commit()
+                bump_permission_generation()
             except sqlite3.IntegrityError as exc:
                 raise ValueError("duplicate_name") from exc
         updated = self.get_node(node_id)
@@ -156,6 +158,7 @@ class KnowledgeDirectoryStore:
                 (node_id,),
             )
             conn.commit()
+            bump_permission_generation()
             return bool(cur.rowcount)
 
     def list_bindings(self) -> dict[str, str]:
@@ -193,18 +196,22 @@ class KnowledgeDirectoryStore:
                     (clean_dataset, clean_node, now_ms),
                 )
                 conn.commit()
+                bump_permission_generation()
                 return
             conn.execute(
                 "DELETE FROM kb_directory_dataset_bindings WHERE dataset_id = ?",
                 (clean_dataset,),
             )
             conn.commit()
+            bump_permission_generation()
 
     def remove_bindings_for_unknown_datasets(self, known_dataset_ids: set[str]) -> int:
         if not known_dataset_ids:
             with self._conn() as conn:
                 cur = conn.execute("DELETE FROM kb_directory_dataset_bindings")
                 conn.commit()
+                if cur.rowcount:
+                    bump_permission_generation()
                 return int(cur.rowcount or 0)
 
         placeholders = ",".join("?" for _ in known_dataset_ids)
@@ -214,6 +221,8 @@ class KnowledgeDirectoryStore:
                 list(known_dataset_ids),
             )
             conn.commit()
+            if cur.rowcount:
+                bump_permission_generation()
             return int(cur.rowcount or 0)
 
     def expand_node_ids(self, node_ids: list[str] | set[str] | tuple[str, ...]) -> set[str]:
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import hashlib
 import mimetypes
+import shutil
 import uuid
 from dataclasses import dataclass
 from pathlib import Path, PurePosixPath
-from typing import Protocol
+from typing import BinaryIO, Protocol
+
+import anyio
 
 from backend.app.core.config import settings
 from backend.app.core.kb_refs import resolve_kb_ref
@@ -24,9 +28,33 @@ class KnowledgeIngestionKbPort(Protocol):
         kb_dataset_id: str | None,
         kb_name: str | None,
         status: str = "pending",
+        content_sha256: str | None = None,
     ): ...
 
 
+# Read size for streaming uploads to the staging directory.
+_UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+def _open_staged_file(file_path: Path) -> BinaryIO:
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    return open(file_path, "wb")
+
+
+def _write_chunk(out: BinaryIO, digest, chunk: bytes) -> None:
+    digest.update(chunk)
+    out.write(chunk)
+
+
+def _remove_staged(out: BinaryIO | None, staged_root: Path) -> None:
+    if out is not None:
+        try:
+            out.close()
+        except OSError:
+            pass
+    shutil.rmtree(staged_root, ignore_errors=True)
+
+
 @dataclass
 class KnowledgeIngestionError(Exception):
     code: str
@@ -88,6 +116,42 @@ class KnowledgeIngestionManager:
 
         return "/".join(parts), Path(*parts)
 
+    @staticmethod
+    async def _stream_to_file(upload_file, file_path: Path, *, staged_root: Path) -> tuple[int, str]:
+        """
+        Copy the upload to `file_path` chunk by chunk, hashing as it goes.
+
+        Returns `(size, sha256 hex)`. Stops reading as soon as `MAX_FILE_SIZE` is exceeded; a
+        rejected or failed upload removes `staged_root`.
+        """
+        declared_size = getattr(upload_file, "size", None)
+        if isinstance(declared_size, int) and declared_size > settings.MAX_FILE_SIZE:
+            raise KnowledgeIngestionError("file_too_large", status_code=400)
+
+        digest = hashlib.sha256()
+        size = 0
+        out: BinaryIO | None = None
+        try:
+            # open/write/close and the hashing run in anyio's worker threads, never on the event
+            # loop, and not on the bounded executor pools that long ZIP streams occupy.
+            out = await anyio.to_thread.run_sync(_open_staged_file, file_path)
+            while True:
+                chunk = await upload_file.read(_UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > settings.MAX_FILE_SIZE:
+                    raise KnowledgeIngestionError("file_too_large", status_code=400)
+                await anyio.to_thread.run_sync(_write_chunk, out, digest, chunk)
+            await anyio.to_thread.run_sync(out.close)
+        except KnowledgeIngestionError:
+            await anyio.to_thread.run_sync(_remove_staged, out, staged_root)
+            raise
+        except Exception as e:
+            await anyio.to_thread.run_sync(_remove_staged, out, staged_root)
+            raise KnowledgeIngestionError(f"write_file_failed:{e}", status_code=500) from e
+        return size, digest.hexdigest()
+
     async def stage_upload_knowledge(self, *, kb_ref: str, upload_file, ctx):
         from backend.app.core.permission_resolver import assert_can_upload, assert_kb_allowed
 
@@ -97,10 +161,6 @@ class KnowledgeIngestionManager:
         assert_can_upload(snapshot)
         assert_kb_allowed(snapshot, kb_ref)
 
-        content = await upload_file.read()
-        if len(content) > settings.MAX_FILE_SIZE:
-            raise KnowledgeIngestionError("file_too_large", status_code=400)
-
         display_name, relative_path = self._normalize_relative_upload_path(upload_file.filename)
         file_ext = Path(display_name).suffix.lower()
         upload_settings_store = getattr(deps, "upload_settings_store", None)
@@ -119,24 +179,21 @@ class KnowledgeIngestionManager:
 
         staged_root = uploads_dir / str(uuid.uuid4())
         file_path = staged_root / relative_path
-        try:
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            file_path.write_bytes(content)
-        except Exception as e:
-            raise KnowledgeIngestionError(f"write_file_failed:{e}", status_code=500) from e
+        file_size, content_sha256 = await self._stream_to_file(upload_file, file_path, staged_root=staged_root)
 
         mime_type = self._detect_mime(display_name, getattr(upload_file, "content_type", None))
 
         doc = deps.kb_store.create_document(
             filename=display_name,
             file_path=str(file_path),
-            file_size=len(content),
+            file_size=file_size,
             mime_type=mime_type,
             uploaded_by=ctx.payload.sub,
             kb_id=(kb_info.dataset_id or kb_ref),
             kb_dataset_id=kb_info.dataset_id,
             kb_name=(kb_info.name or kb_ref),
             status="pending",
+            content_sha256=content_sha256,
         )
 
         audit = getattr(deps, "audit_log_store", None)
@@ -6,30 +6,13 @@ import tempfile
 from pathlib import Path
 
 from backend.services.office_to_pdf import ensure_soffice_available
-import subprocess
 
 
 def _run_soffice_convert_to_html(input_path: Path, outdir: Path) -> Path:
-    exe = ensure_soffice_available()
-    cmd = [
-        exe,
-        "--headless",
-        "--nologo",
-        "--nofirststartwizard",
-        "--convert-to",
-        "html",
-        "--outdir",
-        str(outdir),
-        str(input_path),
-    ]
-    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    if proc.returncode != 0:
-        raise RuntimeError(f"soffice convert failed: {proc.stderr.strip() or proc.stdout.strip()}")
-
-    html_candidates = list(outdir.glob("*.html")) + list(outdir.glob("*.htm"))
-    if not html_candidates:
-        raise RuntimeError("soffice did not produce an HTML output")
-    return html_candidates[0]
+    ensure_soffice_available()
+    from backend.services.office_worker_pool import get_office_pool
+
+    return get_office_pool().convert(input_path, outdir, "html")
 
 
 _SRC_RE = re.compile(r"""(?P<prefix>\bsrc=)(?P<q>["'])(?P<val>[^"']+)(?P=q)""", re.IGNORECASE)
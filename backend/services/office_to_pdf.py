@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import shutil
-import subprocess
 import tempfile
 from pathlib import Path
 
@@ -18,26 +17,11 @@ def ensure_soffice_available() -> str:
 
 
 def _run_soffice_convert(input_path: Path, outdir: Path) -> Path:
-    exe = ensure_soffice_available()
-    cmd = [
-        exe,
-        "--headless",
-        "--nologo",
-        "--nofirststartwizard",
-        "--convert-to",
-        "pdf",
-        "--outdir",
-        str(outdir),
-        str(input_path),
-    ]
-    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    if proc.returncode != 0:
-        raise RuntimeError(f"soffice convert failed: {proc.stderr.strip() or proc.stdout.strip()}")
+    # Checked up front so "soffice not found" surfaces without queueing behind other conversions.
+    ensure_soffice_available()
+    from backend.services.office_worker_pool import get_office_pool
 
-    pdf_candidates = list(outdir.glob("*.pdf"))
-    if not pdf_candidates:
-        raise RuntimeError("soffice did not produce a PDF output")
-    return pdf_candidates[0]
+    return get_office_pool().convert(input_path, outdir, "pdf")
 
 
 def convert_office_path_to_pdf_bytes(path: str | Path) -> bytes:
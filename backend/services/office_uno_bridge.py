@@ -0,0 +1,134 @@
+"""
+LibreOffice UNO conversion helpers.
+
+Used two ways by `office_worker_pool.SofficeWorker`:
+- imported in-process when the application interpreter can `import uno`;
+- run as a standalone helper under a UNO-capable interpreter (Debian's `/usr/bin/python3` with
+  `python3-uno`, or the `python` bundled in LibreOffice's `program/` directory). The helper
+  connects to a running `soffice --accept=...` listener and serves one JSON request per line on
+  stdin: `{"input": path, "output": path, "fmt": "pdf"|"html"}` -> `{"ok": true}` or
+  `{"ok": false, "error": "..."}`. Closing stdin terminates the office instance and exits.
+
+This module must not import anything from `backend`: the helper interpreter does not have the
+application's packages.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+
+def connect(conn: str, *, timeout_s: float, alive: Callable[[], bool] | None = None) -> Any:
+    """Resolve the listener's `com.sun.star.frame.Desktop`, retrying until `timeout_s`."""
+    import uno
+
+    local = uno.getComponentContext()
+    resolver = local.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", local)
+    deadline = time.monotonic() + timeout_s
+    while True:
+        try:
+            ctx = resolver.resolve(f"uno:{conn}")
+            break
+        except Exception:
+            if (alive is not None and not alive()) or time.monotonic() > deadline:
+                raise RuntimeError("soffice listener failed to start")
+            time.sleep(0.25)
+    return ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+
+
+def _props(**kwargs: Any) -> tuple:
+    from com.sun.star.beans import PropertyValue
+
+    out = []
+    for name, value in kwargs.items():
+        p = PropertyValue()
+        p.Name = name
+        p.Value = value
+        out.append(p)
+    return tuple(out)
+
+
+def export_filter(doc: Any, fmt: str) -> str:
+    if doc.supportsService("com.sun.star.sheet.SpreadsheetDocument"):
+        family = "calc"
+    elif doc.supportsService("com.sun.star.presentation.PresentationDocument"):
+        family = "impress"
+    elif doc.supportsService("com.sun.star.drawing.DrawingDocument"):
+        family = "draw"
+    else:
+        family = "writer"
+    if fmt == "pdf":
+        return f"{family}_pdf_Export"
+    html_filters = {
+        "writer": "HTML (StarWriter)",
+        "calc": "HTML (StarCalc)",
+        "impress": "impress_html_Export",
+        "draw": "draw_html_Export",
+    }
+    return html_filters[family]
+
+
+def convert(desktop: Any, input_path: str | Path, output_path: str | Path, fmt: str) -> None:
+    import uno
+
+    in_url = uno.systemPathToFileUrl(str(Path(input_path).resolve()))
+    out_url = uno.systemPathToFileUrl(str(Path(output_path).resolve()))
+    doc = desktop.loadComponentFromURL(in_url, "_blank", 0, _props(Hidden=True, ReadOnly=True))
+    if doc is None:
+        raise RuntimeError("soffice convert failed: document could not be loaded")
+    try:
+        doc.storeToURL(out_url, _props(FilterName=export_filter(doc, fmt), Overwrite=True))
+    finally:
+        try:
+            doc.close(True)
+        except Exception:
+            pass
+
+
+def _reply(stdout, payload: dict) -> None:
+    stdout.write(json.dumps(payload) + "\n")
+    stdout.flush()
+
+
+def serve(conn: str, *, timeout_s: float, stdin=None, stdout=None) -> int:
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    try:
+        desktop = connect(conn, timeout_s=timeout_s)
+    except Exception as e:
+        _reply(stdout, {"ready": False, "error": str(e)})
+        return 1
+    _reply(stdout, {"ready": True})
+    try:
+        for line in stdin:
+            if not line.strip():
+                continue
+            try:
+                req = json.loads(line)
+                convert(desktop, req["input"], req["output"], req["fmt"])
+                _reply(stdout, {"ok": True})
+            except Exception as e:
+                _reply(stdout, {"ok": False, "error": str(e)})
+    finally:
+        try:
+            desktop.terminate()
+        except Exception:
+            pass
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="LibreOffice UNO conversion helper")
+    parser.add_argument("--connect", required=True, help="UNO connection string of the soffice listener")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for the listener")
+    args = parser.parse_args(argv)
+    return serve(args.connect, timeout_s=args.timeout)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,540 @@
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import socket
+import subprocess
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+_START_TIMEOUT_S = 30.0
+
+
+class OfficePoolBusy(RuntimeError):
+    def __init__(self):
+        super().__init__("office_conversion_busy")
+
+
+class OfficeConversionTimeout(RuntimeError):
+    def __init__(self, timeout_s: float):
+        super().__init__(f"soffice convert timed out after {timeout_s:g}s")
+        self.timeout_s = timeout_s
+
+
+def _uno_available() -> bool:
+    try:
+        import uno  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+_BRIDGE_SCRIPT = Path(__file__).with_name("office_uno_bridge.py")
+_uno_python_cache: dict[tuple[str, str], str | None] = {}
+_uno_python_lock = threading.Lock()
+
+
+def _probe_uno_python(python: str) -> bool:
+    try:
+        proc = subprocess.run(
+            [python, "-c", "import uno"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=20,
+        )
+    except Exception:
+        return False
+    return proc.returncode == 0
+
+
+def find_uno_python(exe: str, configured: str | None = None) -> str | None:
+    """
+    Interpreter that can `import uno` for the bridge helper: `configured` if set, else the `python`
+    bundled next to `soffice` (Windows/macOS builds), else the system `/usr/bin/python3`
+    (Debian's `python3-uno`). Probed once per process.
+    """
+    key = (str(exe), str(configured or ""))
+    with _uno_python_lock:
+        if key in _uno_python_cache:
+            return _uno_python_cache[key]
+    candidates: list[Path] = []
+    if configured:
+        candidates.append(Path(configured))
+    else:
+        try:
+            program_dir = Path(exe).resolve().parent
+            candidates += [program_dir / "python", program_dir / "python.exe"]
+        except Exception:
+            pass
+        candidates.append(Path("/usr/bin/python3"))
+    found = None
+    for candidate in candidates:
+        if candidate.is_file() and _probe_uno_python(str(candidate)):
+            found = str(candidate)
+            break
+    if found is None and configured:
+        logger.warning("OFFICE_UNO_PYTHON=%s cannot import uno; falling back", configured)
+    with _uno_python_lock:
+        _uno_python_cache[key] = found
+    return found
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return int(s.getsockname()[1])
+
+
+def _pick_output(outdir: Path, fmt: str) -> Path:
+    patterns = ["*.html", "*.htm"] if fmt == "html" else [f"*.{fmt}"]
+    for pattern in patterns:
+        candidates = sorted(outdir.glob(pattern))
+        if candidates:
+            return candidates[0]
+    if fmt == "html":
+        raise RuntimeError("soffice did not produce an HTML output")
+    raise RuntimeError(f"soffice did not produce a {fmt.upper()} output")
+
+
+class SofficeWorker:
+    """
+    One LibreOffice instance with its own user profile.
+
+    In "listener" mode the worker keeps a headless `soffice --accept=...` running and converts
+    through the UNO bridge, so the multi-second startup is paid once per worker lifetime. The bridge
+    runs in-process when the app interpreter has `uno`; otherwise through a long-lived
+    `office_uno_bridge.py` helper started under a UNO-capable interpreter (`find_uno_python`),
+    which is how the Docker image (python:slim + Debian's python3-uno) runs.
+    Only when neither is available ("cli" mode) does each job run `soffice --convert-to` against
+    the worker's (already initialised) profile.
+    """
+
+    def __init__(
+        self,
+        index: int,
+        *,
+        exe: str,
+        profile_dir: Path,
+        use_uno: bool | None = None,
+        uno_python: str | None = None,
+    ):
+        self.index = index
+        self._exe = exe
+        self._profile_dir = Path(profile_dir)
+        self._use_uno = _uno_available() if use_uno is None else bool(use_uno)
+        # Bridge helper interpreter; only consulted when `uno` is not importable in-process.
+        self._uno_python = None if self._use_uno or use_uno is False else find_uno_python(exe, uno_python)
+        self._proc: subprocess.Popen | None = None
+        self._bridge: subprocess.Popen | None = None
+        self._desktop: Any = None
+
+    @property
+    def mode(self) -> str:
+        return "listener" if (self._use_uno or self._uno_python) else "cli"
+
+    @property
+    def bridge(self) -> str | None:
+        if self._use_uno:
+            return "in_process"
+        return "helper" if self._uno_python else None
+
+    def _profile_arg(self) -> str:
+        return f"-env:UserInstallation={self._profile_dir.resolve().as_uri()}"
+
+    def alive(self) -> bool:
+        if self.mode == "cli":
+            return True
+        if self._proc is None or self._proc.poll() is not None:
+            return False
+        if self._use_uno:
+            return self._desktop is not None
+        return self._bridge is not None and self._bridge.poll() is None
+
+    def start(self) -> None:
+        self._profile_dir.mkdir(parents=True, exist_ok=True)
+        if self.mode == "cli":
+            return
+        port = _free_port()
+        conn = f"socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext"
+        cmd = [
+            self._exe,
+            "--headless",
+            "--invisible",
+            "--nologo",
+            "--nodefault",
+            "--norestore",
+            "--nofirststartwizard",
+            self._profile_arg(),
+            f"--accept={conn}",
+        ]
+        self._proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            if self._use_uno:
+                from backend.services import office_uno_bridge
+
+                proc = self._proc
+                self._desktop = office_uno_bridge.connect(
+                    conn, timeout_s=_START_TIMEOUT_S, alive=lambda: proc.poll() is None
+                )
+            else:
+                self._start_bridge(conn)
+        except BaseException:
+            self.stop()
+            raise
+
+    def _start_bridge(self, conn: str) -> None:
+        self._bridge = subprocess.Popen(
+            [self._uno_python, str(_BRIDGE_SCRIPT), "--connect", conn, "--timeout", str(_START_TIMEOUT_S)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+        )
+        ready = self._read_bridge()
+        if not ready.get("ready"):
+            raise RuntimeError(ready.get("error") or "soffice listener failed to start")
+
+    def _read_bridge(self) -> dict:
+        line = self._bridge.stdout.readline() if self._bridge is not None else ""
+        if not line:
+            raise RuntimeError("soffice bridge helper exited")
+        try:
+            return json.loads(line)
+        except ValueError:
+            raise RuntimeError(f"soffice bridge helper sent garbage: {line.strip()[:200]}") from None
+
+    def stop(self) -> None:
+        desktop, self._desktop = self._desktop, None
+        bridge, self._bridge = self._bridge, None
+        proc, self._proc = self._proc, None
+        if desktop is not None:
+            try:
+                desktop.terminate()
+            except Exception:
+                pass
+        if bridge is not None:
+            # EOF on stdin makes the helper terminate the office instance and exit.
+            try:
+                bridge.stdin.close()
+            except Exception:
+                pass
+            try:
+                bridge.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                bridge.kill()
+                bridge.wait()
+            if bridge.stdout is not None:
+                bridge.stdout.close()
+        if proc is not None and proc.poll() is None:
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+
+    def kill(self) -> None:
+        for proc in (self._proc, self._bridge):
+            if proc is not None and proc.poll() is None:
+                proc.kill()
+
+    def convert(self, input_path: Path, outdir: Path, fmt: str, *, timeout_s: float) -> Path:
+        if self.mode == "cli":
+            self._convert_cli(input_path, outdir, fmt, timeout_s=timeout_s)
+        else:
+            self._convert_listener(input_path, outdir, fmt, timeout_s=timeout_s)
+        return _pick_output(outdir, fmt)
+
+    def _convert_cli(self, input_path: Path, outdir: Path, fmt: str, *, timeout_s: float) -> None:
+        cmd = [
+            self._exe,
+            "--headless",
+            "--nologo",
+            "--nofirststartwizard",
+            self._profile_arg(),
+            "--convert-to",
+            fmt,
+            "--outdir",
+            str(outdir),
+            str(input_path),
+        ]
+        try:
+            proc = subprocess.run(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=timeout_s if timeout_s > 0 else None,
+            )
+        except subprocess.TimeoutExpired as e:
+            raise OfficeConversionTimeout(timeout_s) from e
+        if proc.returncode != 0:
+            raise RuntimeError(f"soffice convert failed: {proc.stderr.strip() or proc.stdout.strip()}")
+
+    def _convert_listener(self, input_path: Path, outdir: Path, fmt: str, *, timeout_s: float) -> None:
+        # The UNO call itself cannot be interrupted; killing the listener (and helper) makes it fail promptly.
+        timed_out = threading.Event()
+
+        def on_timeout() -> None:
+            timed_out.set()
+            self.kill()
+
+        watchdog = threading.Timer(timeout_s, on_timeout) if timeout_s > 0 else None
+        if watchdog is not None:
+            watchdog.daemon = True
+            watchdog.start()
+        output_path = outdir / f"{input_path.stem}.{fmt}"
+        try:
+            if self._use_uno:
+                from backend.services import office_uno_bridge
+
+                office_uno_bridge.convert(self._desktop, input_path, output_path, fmt)
+            else:
+                request = {"input": str(input_path.resolve()), "output": str(output_path.resolve()), "fmt": fmt}
+                self._bridge.stdin.write(json.dumps(request) + "\n")
+                self._bridge.stdin.flush()
+                reply = self._read_bridge()
+                if not reply.get("ok"):
+                    error = str(reply.get("error") or "")
+                    raise RuntimeError(error if error.startswith("soffice convert failed") else f"soffice convert failed: {error}")
+        except Exception as e:
+            if timed_out.is_set():
+                raise OfficeConversionTimeout(timeout_s) from e
+            if isinstance(e, RuntimeError):
+                raise
+            raise RuntimeError(f"soffice convert failed: {e}") from e
+        finally:
+            if watchdog is not None:
+                watchdog.cancel()
+
+
+class _Job:
+    __slots__ = ("input_path", "outdir", "fmt", "future", "enqueued_at")
+
+    def __init__(self, input_path: Path, outdir: Path, fmt: str):
+        self.input_path = input_path
+        self.outdir = outdir
+        self.fmt = fmt
+        self.future: Future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class OfficeConversionPool:
+    """
+    Fixed set of long-lived LibreOffice workers fed from a bounded job queue.
+
+    Each worker owns an isolated profile directory. Jobs that exceed `job_timeout_s` kill their
+    worker; a worker whose process died is restarted before its next job, and every worker is
+    recycled after `max_jobs_per_worker` conversions to cap LibreOffice memory growth. When the
+    queue is full `convert` raises `OfficePoolBusy` instead of piling up more work.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int = 2,
+        max_queue: int = 32,
+        job_timeout_s: float = 120.0,
+        max_jobs_per_worker: int = 200,
+        profile_root: str | Path,
+        worker_factory: Callable[[int, Path], Any] | None = None,
+    ):
+        self._workers = max(1, int(workers))
+        self._max_queue = max(1, int(max_queue))
+        self._job_timeout_s = float(job_timeout_s)
+        self._max_jobs_per_worker = max(0, int(max_jobs_per_worker))
+        self._profile_root = Path(profile_root)
+        self._worker_factory = worker_factory or self._default_worker
+        self._queue: queue.Queue[_Job | None] = queue.Queue(maxsize=self._max_queue)
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        self._closed = False
+        self._mode: str | None = None
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._restarts = 0
+        self._recycles = 0
+        self._wait_total_s = 0.0
+        self._run_total_s = 0.0
+
+    @staticmethod
+    def _default_worker(index: int, profile_dir: Path) -> SofficeWorker:
+        from backend.services.office_to_pdf import ensure_soffice_available
+
+        from backend.app.core.config import settings
+
+        return SofficeWorker(
+            index,
+            exe=ensure_soffice_available(),
+            profile_dir=profile_dir,
+            uno_python=settings.OFFICE_UNO_PYTHON or None,
+        )
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("office conversion pool is shut down")
+            if self._threads:
+                return
+            for index in range(self._workers):
+                t = threading.Thread(target=self._worker_loop, args=(index,), name=f"soffice_worker_{index}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def convert(self, input_path: str | Path, outdir: str | Path, fmt: str) -> Path:
+        """Convert `input_path` to `fmt` ("pdf" / "html") inside `outdir`; blocks until done."""
+        self._ensure_started()
+        job = _Job(Path(input_path), Path(outdir), fmt)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            raise OfficePoolBusy() from None
+        with self._lock:
+            self._submitted += 1
+        return job.future.result()
+
+    def _worker_loop(self, index: int) -> None:
+        profile_dir = self._profile_root / f"worker_{index}"
+        worker = None
+        jobs_done = 0
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            started_at = time.monotonic()
+            with self._lock:
+                self._wait_total_s += started_at - job.enqueued_at
+            try:
+                if worker is None or not worker.alive():
+                    if worker is not None:
+                        worker.stop()
+                        with self._lock:
+                            self._restarts += 1
+                    worker = self._worker_factory(index, profile_dir)
+                    worker.start()
+                    jobs_done = 0
+                    mode = getattr(worker, "mode", None)
+                    with self._lock:
+                        changed, self._mode = mode != self._mode, mode
+                    if changed:
+                        logger.info("soffice workers running in %s mode", mode)
+                result = worker.convert(job.input_path, job.outdir, job.fmt, timeout_s=self._job_timeout_s)
+            except BaseException as e:
+                with self._lock:
+                    self._failed += 1
+                    self._run_total_s += time.monotonic() - started_at
+                    if isinstance(e, OfficeConversionTimeout):
+                        self._timeouts += 1
+                if isinstance(e, OfficeConversionTimeout) and worker is not None:
+                    logger.warning("soffice worker %s timed out; restarting", index)
+                    worker.stop()
+                    worker = None
+                    with self._lock:
+                        self._restarts += 1
+                job.future.set_exception(e)
+                continue
+            jobs_done += 1
+            with self._lock:
+                self._completed += 1
+                self._run_total_s += time.monotonic() - started_at
+            job.future.set_result(result)
+            if self._max_jobs_per_worker and jobs_done >= self._max_jobs_per_worker:
+                worker.stop()
+                worker = None
+                with self._lock:
+                    self._recycles += 1
+        if worker is not None:
+            worker.stop()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            finished = self._completed + self._failed
+            return {
+                "workers": self._workers,
+                "mode": self._mode,
+                "started": bool(self._threads),
+                "max_queue": self._max_queue,
+                "queued": self._queue.qsize(),
+                "job_timeout_s": self._job_timeout_s,
+                "max_jobs_per_worker": self._max_jobs_per_worker,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "timeouts": self._timeouts,
+                "restarts": self._restarts,
+                "recycles": self._recycles,
+                "wait_avg_ms": round(self._wait_total_s * 1000 / finished, 2) if finished else 0.0,
+                "run_avg_ms": round(self._run_total_s * 1000 / finished, 2) if finished else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            threads = list(self._threads)
+        # Fail anything still queued, then wake every worker with a sentinel.
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                job.future.set_exception(RuntimeError("office conversion pool is shut down"))
+        for _ in threads:
+            self._queue.put(None)
+        for t in threads:
+            t.join(timeout=10)
+
+
+_pool_lock = threading.Lock()
+_pool: OfficeConversionPool | None = None
+
+
+def get_office_pool() -> OfficeConversionPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from backend.app.core.config import settings
+            from backend.app.core.paths import resolve_repo_path
+
+            _pool = OfficeConversionPool(
+                workers=settings.OFFICE_POOL_WORKERS,
+                max_queue=settings.OFFICE_POOL_MAX_QUEUE,
+                job_timeout_s=settings.OFFICE_CONVERT_TIMEOUT_S,
+                max_jobs_per_worker=settings.OFFICE_WORKER_MAX_JOBS,
+                profile_root=resolve_repo_path(settings.OFFICE_PROFILE_DIR),
+            )
+        return _pool
+
+
+def set_office_pool(pool: OfficeConversionPool | None) -> None:
+    global _pool
+    with _pool_lock:
+        _pool = pool
+
+
+def office_pool_stats() -> dict[str, Any] | None:
+    with _pool_lock:
+        pool = _pool
+    return pool.stats() if pool is not None else None
+
+
+def shutdown_office_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
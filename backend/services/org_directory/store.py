@@ -1,20 +1,78 @@
 from __future__ import annotations
 
+import threading
 import time
 
 from backend.database.paths import resolve_auth_db_path
-from backend.database.sqlite import connect_sqlite
+from backend.database.sqlite import pooled_connection
 
 from .models import Company, Department, OrgDirectoryAuditLog
 
 
 class OrgDirectoryStore:
-    def __init__(self, db_path: str | None = None):
+    def __init__(self, db_path: str | None = None, *, cache_ttl_s: float = 60.0):
         self.db_path = resolve_auth_db_path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Companies/departments by id, for the per-event lookups of audit logging. Writes through this
+        # store drop it at once; the TTL bounds staleness for writes made by other processes.
+        self._cache_ttl_s = max(0.0, float(cache_ttl_s))
+        self._cache_lock = threading.Lock()
+        self._cache: tuple[dict[int, Company], dict[int, Department]] | None = None
+        self._cache_loaded_at = 0.0
+        # Bumped by every invalidation; a load that started before one must not be stored.
+        self._cache_epoch = 0
+        self._cache_hits = 0
+        self._cache_loads = 0
 
     def _get_connection(self):
-        return connect_sqlite(self.db_path)
+        return pooled_connection(self.db_path)
+
+    # -------- Cache --------
+    def _invalidate_cache(self) -> None:
+        with self._cache_lock:
+            self._cache = None
+            self._cache_epoch += 1
+
+    def _cached_directory(self, *, miss: bool = False) -> tuple[dict[int, Company], dict[int, Department]]:
+        # `miss`: an id was not found; reload unless the snapshot is under a second old (an id created
+        # by another process shows up at once, an id that really is gone costs one reload per second).
+        max_age_s = min(self._cache_ttl_s, 1.0) if miss else self._cache_ttl_s
+        with self._cache_lock:
+            if self._cache is not None and time.monotonic() - self._cache_loaded_at < max_age_s:
+                self._cache_hits += 1
+                return self._cache
+            epoch = self._cache_epoch
+
+        conn = self._get_connection()
+        try:
+            companies = conn.execute("SELECT company_id, name, created_at_ms, updated_at_ms FROM companies").fetchall()
+            departments = conn.execute(
+                "SELECT department_id, name, created_at_ms, updated_at_ms FROM departments"
+            ).fetchall()
+        finally:
+            conn.close()
+
+        cache = (
+            {int(row[0]): Company(*row) for row in companies},
+            {int(row[0]): Department(*row) for row in departments},
+        )
+        with self._cache_lock:
+            self._cache_loads += 1
+            if self._cache_epoch == epoch:
+                self._cache = cache
+                self._cache_loaded_at = time.monotonic()
+        return cache
+
+    def cache_stats(self) -> dict[str, object]:
+        with self._cache_lock:
+            return {
+                "loaded": self._cache is not None,
+                "companies": len(self._cache[0]) if self._cache else 0,
+                "departments": len(self._cache[1]) if self._cache else 0,
+                "hits": self._cache_hits,
+                "loads": self._cache_loads,
+                "ttl_s": self._cache_ttl_s,
+            }
 
     # -------- Companies --------
     def list_companies(self) -> list[Company]:
@@ -28,15 +86,10 @@ class OrgDirectoryStore:
             conn.close()
 
     def get_company(self, company_id: int) -> Company | None:
-        conn = self._get_connection()
-        try:
-            row = conn.execute(
-                "SELECT company_id, name, created_at_ms, updated_at_ms FROM companies WHERE company_id = ?",
-                (company_id,),
-            ).fetchone()
-            return Company(*row) if row else None
-        finally:
-            conn.close()
+        company = self._cached_directory()[0].get(int(company_id))
+        if company is None:
+            company = self._cached_directory(miss=True)[0].get(int(company_id))
+        return company
 
     def create_company(self, *, name: str, actor_user_id: str) -> Company:
         name = (name or "").strip()
@@ -62,6 +115,7 @@ class OrgDirectoryStore:
                 actor_user_id=actor_user_id,
             )
             conn.commit()
+            self._invalidate_cache()
             return Company(company_id=company_id, name=name, created_at_ms=now_ms, updated_at_ms=now_ms)
         finally:
             conn.close()
@@ -97,6 +151,7 @@ class OrgDirectoryStore:
                 actor_user_id=actor_user_id,
             )
             conn.commit()
+            self._invalidate_cache()
             return Company(company_id=company_id, name=name, created_at_ms=before.created_at_ms, updated_at_ms=now_ms)
         finally:
             conn.close()
@@ -128,6 +183,7 @@ class OrgDirectoryStore:
                 actor_user_id=actor_user_id,
             )
             conn.commit()
+            self._invalidate_cache()
         finally:
             conn.close()
 
@@ -143,15 +199,10 @@ class OrgDirectoryStore:
             conn.close()
 
     def get_department(self, department_id: int) -> Department | None:
-        conn = self._get_connection()
-        try:
-            row = conn.execute(
-                "SELECT department_id, name, created_at_ms, updated_at_ms FROM departments WHERE department_id = ?",
-                (department_id,),
-            ).fetchone()
-            return Department(*row) if row else None
-        finally:
-            conn.close()
+        department = self._cached_directory()[1].get(int(department_id))
+        if department is None:
+            department = self._cached_directory(miss=True)[1].get(int(department_id))
+        return department
 
     def create_department(self, *, name: str, actor_user_id: str) -> Department:
         name = (name or "").strip()
@@ -177,6 +228,7 @@ class OrgDirectoryStore:
                 actor_user_id=actor_user_id,
             )
             conn.commit()
+            self._invalidate_cache()
             return Department(department_id=department_id, name=name, created_at_ms=now_ms, updated_at_ms=now_ms)
         finally:
             conn.close()
@@ -212,6 +264,7 @@ class OrgDirectoryStore:
                 actor_user_id=actor_user_id,
             )
             conn.commit()
+            self._invalidate_cache()
             return Department(
                 department_id=department_id, name=name, created_at_ms=before.created_at_ms, updated_at_ms=now_ms
             )
@@ -245,6 +298,7 @@ class OrgDirectoryStore:
                 actor_user_id=actor_user_id,
             )
             conn.commit()
+            self._invalidate_cache()
         finally:
             conn.close()
 
@@ -9,6 +9,7 @@ import time
 import urllib.parse
 import urllib.request
 import uuid
+import hashlib
 import html
 from pathlib import Path
 from typing import Any
@@ -801,6 +802,7 @@ class PaperDownloadManager:
                 kb_dataset_id=kb_info.dataset_id,
                 kb_name=(kb_info.name or kb_ref),
                 status="pending",
+                content_sha256=hashlib.sha256(content).hexdigest(),
             )
 
             kb_targets = self._kb_target_candidates(kb_ref, kb_info)
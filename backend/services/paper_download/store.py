@@ -6,7 +6,7 @@ from dataclasses import asdict
 from typing import Any, Iterable, Optional
 
 from backend.database.paths import resolve_auth_db_path
-from backend.database.sqlite import connect_sqlite
+from backend.database.sqlite import pooled_connection
 
 from .models import PaperDownloadItem, PaperDownloadSession
 
@@ -17,7 +17,7 @@ class PaperDownloadStore:
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
     def _get_connection(self):
-        return connect_sqlite(self.db_path)
+        return pooled_connection(self.db_path)
 
     @staticmethod
     def _json_text(value: Any) -> str:
@@ -5,7 +5,7 @@ import time
 import uuid
 from typing import Any
 
-from backend.database.sqlite import connect_sqlite
+from backend.database.sqlite import PooledConnection, pooled_connection
 
 _UNSET = object()
 
@@ -14,8 +14,8 @@ class PermissionGroupFolderStore:
     def __init__(self, db_path: str):
         self._db_path = db_path
 
-    def _conn(self) -> sqlite3.Connection:
-        return connect_sqlite(self._db_path)
+    def _conn(self) -> PooledConnection:
+        return pooled_connection(self._db_path)
 
     def list_folders(self) -> list[dict[str, Any]]:
         with self._conn() as conn:
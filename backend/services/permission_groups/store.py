@@ -9,7 +9,8 @@ import sqlite3
 from datetime import datetime
 from typing import Dict, List, Optional
 
-from backend.database.sqlite import connect_sqlite
+from backend.app.core.permission_cache import bump_permission_generation
+from backend.database.sqlite import PooledConnection, pooled_connection
 
 _UNSET = object()
 
@@ -31,8 +32,8 @@ class PermissionGroupStore:
             # Older DB missing user_permission_groups: treat as 0 (we no longer read users.group_id).
             return 0
 
-    def _get_connection(self) -> sqlite3.Connection:
-        return connect_sqlite(self._database_path)
+    def _get_connection(self) -> PooledConnection:
+        return pooled_connection(self._database_path)
 
     def create_group(
         self,
@@ -270,6 +271,7 @@ class PermissionGroupStore:
                     params,
                 )
                 conn.commit()
+                bump_permission_generation()
                 return True
         except Exception as e:
             self._logger.error(f"更新权限组失败: {e}")
@@ -295,6 +297,7 @@ class PermissionGroupStore:
 
                 cursor.execute("DELETE FROM permission_groups WHERE group_id = ?", (group_id,))
                 conn.commit()
+                bump_permission_generation()
                 return cursor.rowcount > 0
         except Exception as e:
             self._logger.error(f"删除权限组失败: {e}")
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from backend.services.preview_cache import PreviewCache
+
+BLOB_URL_PREFIX = "/api/preview/blobs"
+
+
+class PreviewBlobError(Exception):
+    def __init__(self, status_code: int, code: str):
+        super().__init__(code)
+        self.status_code = status_code
+        self.code = code
+
+
+@dataclass(frozen=True)
+class PreviewBlob:
+    path: Path
+    size: int
+    etag: str
+    media_type: str
+    filename: str
+
+
+def _b64e(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _b64d(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def parse_byte_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """
+    Parse a single-range `Range: bytes=...` header into an inclusive (start, end) pair.
+
+    Returns None when the whole body should be sent (no header, multi-range or non-byte units);
+    raises `PreviewBlobError(416)` for ranges outside the body.
+    """
+    text = (header or "").strip()
+    if not text.lower().startswith("bytes=") or "," in text:
+        return None
+    spec = text[6:].strip()
+    start_s, sep, end_s = spec.partition("-")
+    if not sep:
+        return None
+    try:
+        if start_s == "":
+            suffix = int(end_s)
+            if suffix <= 0:
+                raise PreviewBlobError(416, "range_not_satisfiable")
+            return max(0, size - suffix), size - 1
+        start = int(start_s)
+        end = int(end_s) if end_s else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        raise PreviewBlobError(416, "range_not_satisfiable")
+    return start, min(end, size - 1)
+
+
+class PreviewBlobStore:
+    """
+    Short-lived signed URLs for preview bodies (PDFs, images, converted HTML).
+
+    Bodies are stored content-addressed in a `PreviewCache`; the URL token carries the content key,
+    media type, filename and expiry, signed with HMAC-SHA256, so the streaming endpoint needs no
+    session and can serve `<iframe>`/`<img>` requests and Range reads directly from disk.
+    """
+
+    def __init__(self, cache: PreviewCache, *, secret: str, ttl_s: int = 600, url_prefix: str = BLOB_URL_PREFIX):
+        self._cache = cache
+        self._secret = str(secret or "").encode("utf-8")
+        self._ttl_s = max(1, int(ttl_s))
+        self._url_prefix = url_prefix.rstrip("/")
+
+    @property
+    def enabled(self) -> bool:
+        return self._cache.enabled and bool(self._secret)
+
+    def _sign(self, body: str) -> str:
+        return _b64e(hmac.new(self._secret, body.encode("ascii"), hashlib.sha256).digest())
+
+    def publish(self, data: bytes, *, media_type: str, filename: str) -> dict[str, Any] | None:
+        """Store `data` and return the URL-delivery payload fields, or None to fall back to inline."""
+        if not self.enabled:
+            return None
+        key = PreviewCache.make_key(data, "blob")
+        if self._cache.put(key, data) is None:
+            return None
+        return self._ref(key, size=len(data), media_type=media_type, filename=filename)
+
+    def publish_file(
+        self, path: str | Path, *, content_sha256: str, media_type: str, filename: str
+    ) -> dict[str, Any] | None:
+        """
+        `publish` for a file already on disk whose SHA-256 is known (staged knowledge uploads):
+        the blob is keyed by that digest and linked/copied from `path` without reading it here.
+        """
+        if not self.enabled or not content_sha256:
+            return None
+        key = PreviewCache.make_key_for_digest(content_sha256, "blob")
+        stored = self._cache.put_file(key, path)
+        if stored is None:
+            return None
+        try:
+            size = stored.stat().st_size
+        except OSError:
+            return None
+        return self._ref(key, size=int(size), media_type=media_type, filename=filename)
+
+    def _ref(self, key: str, *, size: int, media_type: str, filename: str) -> dict[str, Any]:
+        expires = int(time.time()) + self._ttl_s
+        body = _b64e(json.dumps({"k": key, "m": media_type, "n": filename, "e": expires}, separators=(",", ":")).encode("utf-8"))
+        return {
+            "delivery": "url",
+            "url": f"{self._url_prefix}/{body}.{self._sign(body)}",
+            "size": size,
+            "etag": f'"{key}"',
+            "media_type": media_type,
+            "expires_at": expires,
+        }
+
+    def resolve(self, token: str) -> PreviewBlob:
+        body, _, sig = (token or "").partition(".")
+        if not body or not sig or not hmac.compare_digest(sig, self._sign(body)):
+            raise PreviewBlobError(403, "invalid_preview_token")
+        try:
+            claims = json.loads(_b64d(body).decode("utf-8"))
+            key = str(claims["k"])
+            expires = int(claims["e"])
+        except Exception:
+            raise PreviewBlobError(403, "invalid_preview_token")
+        if expires < time.time():
+            raise PreviewBlobError(410, "preview_token_expired")
+        path = self._cache.locate(key)
+        if path is None:
+            raise PreviewBlobError(410, "preview_blob_evicted")
+        try:
+            size = path.stat().st_size
+        except OSError:
+            raise PreviewBlobError(410, "preview_blob_evicted")
+        return PreviewBlob(
+            path=path,
+            size=int(size),
+            etag=f'"{key}"',
+            media_type=str(claims.get("m") or "application/octet-stream"),
+            filename=str(claims.get("n") or "document"),
+        )
+
+    def stats(self) -> dict[str, Any]:
+        return {"enabled": self.enabled, "ttl_s": self._ttl_s, **self._cache.stats()}
+
+
+_store_lock = threading.Lock()
+_store: PreviewBlobStore | None = None
+
+
+def get_preview_blob_store() -> PreviewBlobStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            from backend.app.core.config import settings
+            from backend.app.core.paths import resolve_repo_path
+
+            cache = PreviewCache(
+                resolve_repo_path(settings.PREVIEW_BLOB_DIR),
+                max_bytes=settings.PREVIEW_BLOB_MAX_BYTES,
+                max_age_s=max(settings.PREVIEW_URL_TTL_S * 2, 3600),
+            )
+            _store = PreviewBlobStore(
+                cache,
+                secret=settings.PREVIEW_URL_SECRET or settings.JWT_SECRET_KEY,
+                ttl_s=settings.PREVIEW_URL_TTL_S,
+            )
+        return _store
+
+
+def set_preview_blob_store(store: PreviewBlobStore | None) -> None:
+    global _store
+    with _store_lock:
+        _store = store
@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable
+
+
+class PreviewCache:
+    """
+    Disk-backed, content-addressed cache for converted preview artifacts.
+
+    Entries live at `<root>/<key[:2]>/<key>.bin`; the file mtime doubles as the LRU clock (bumped
+    on every hit). Eviction drops entries older than `max_age_s` and then the least recently used
+    ones until the cache fits in `max_bytes`. Concurrent requests for the same key are collapsed
+    into a single conversion (single-flight); only successful conversions are stored.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        *,
+        max_bytes: int = 512 * 1024 * 1024,
+        max_age_s: float = 7 * 24 * 3600,
+        logger: logging.Logger | None = None,
+    ):
+        self._root = Path(root)
+        self._max_bytes = max(0, int(max_bytes))
+        self._max_age_s = float(max_age_s)
+        self._logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._inflight: dict[str, Future] = {}
+        self._total_bytes: int | None = None
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._stores = 0
+        self._evictions = 0
+        self._errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_bytes > 0
+
+    @staticmethod
+    def make_key(content: bytes, *parts: str) -> str:
+        return PreviewCache.make_key_for_digest(hashlib.sha256(content).hexdigest(), *parts)
+
+    @staticmethod
+    def make_key_for_digest(content_sha256: str, *parts: str) -> str:
+        """Same key as `make_key` when the content's SHA-256 (hex) is already known."""
+        digest = hashlib.sha256(str(content_sha256).encode("ascii"))
+        for part in parts:
+            digest.update(b"\0")
+            digest.update(str(part).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self._root / key[:2] / f"{key}.bin"
+
+    def _read(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        if self._max_age_s > 0 and (time.time() - st.st_mtime) > self._max_age_s:
+            self._remove(path, st.st_size)
+            return None
+        try:
+            data = path.read_bytes()
+            os.utime(path, None)
+            return data
+        except OSError:
+            return None
+
+    def _write(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            with self._lock:
+                self._errors += 1
+            self._logger.warning("Preview cache write failed: %s", e)
+            return
+        self._stored(len(data))
+
+    def _write_file(self, key: str, source: str | Path) -> None:
+        path = self._path(key)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(source, tmp)
+            except OSError:
+                # Different filesystem (or no hardlink support): stream it across in chunks.
+                with open(source, "rb") as src, open(tmp, "wb") as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+            size = tmp.stat().st_size
+            os.replace(tmp, path)
+        except OSError as e:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            with self._lock:
+                self._errors += 1
+            self._logger.warning("Preview cache write failed: %s", e)
+            return
+        self._stored(size)
+
+    def _stored(self, size: int) -> None:
+        with self._lock:
+            self._stores += 1
+            if self._total_bytes is not None:
+                self._total_bytes += int(size)
+        self._evict_if_needed()
+
+    def _remove(self, path: Path, size: int) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            return
+        with self._lock:
+            self._evictions += 1
+            if self._total_bytes is not None:
+                self._total_bytes = max(0, self._total_bytes - int(size))
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries: list[tuple[float, int, Path]] = []
+        if not self._root.exists():
+            return entries
+        for path in self._root.glob("*/*.bin"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _evict_if_needed(self) -> None:
+        with self._lock:
+            total = self._total_bytes
+        if total is not None and total <= self._max_bytes:
+            return
+
+        entries = self._entries()
+        now = time.time()
+        kept: list[tuple[float, int, Path]] = []
+        for mtime, size, path in entries:
+            if self._max_age_s > 0 and (now - mtime) > self._max_age_s:
+                self._remove(path, size)
+            else:
+                kept.append((mtime, size, path))
+        total = sum(size for _, size, _ in kept)
+        kept.sort(key=lambda item: item[0])
+        for _, size, path in kept:
+            if total <= self._max_bytes:
+                break
+            self._remove(path, size)
+            total -= size
+        with self._lock:
+            self._total_bytes = total
+
+    def get_or_create(self, key: str, producer: Callable[[], bytes]) -> bytes:
+        if not self.enabled:
+            return producer()
+
+        data = self._read(key)
+        if data is not None:
+            with self._lock:
+                self._hits += 1
+            return data
+
+        with self._lock:
+            pending = self._inflight.get(key)
+            if pending is None:
+                leader = True
+                pending = Future()
+                self._inflight[key] = pending
+                self._misses += 1
+            else:
+                leader = False
+                self._coalesced += 1
+        if not leader:
+            return pending.result()
+
+        try:
+            # A previous leader may have stored the entry between our read and taking the slot.
+            data = self._read(key)
+            if data is None:
+                data = producer()
+                self._write(key, data)
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        pending.set_result(data)
+        return data
+
+    def put(self, key: str, data: bytes) -> Path | None:
+        """
+        Store `data` under `key` (an existing entry is only touched) and return the entry path.
+
+        Returns None when the cache is disabled or the entry could not be kept (write error, or
+        larger than the whole cache).
+        """
+        return self._put(key, lambda: self._write(key, data))
+
+    def put_file(self, key: str, source: str | Path) -> Path | None:
+        """
+        `put` for content that is already on disk: `source` is hardlinked into the cache (chunked
+        copy across filesystems) instead of being read into memory.
+        """
+        return self._put(key, lambda: self._write_file(key, source))
+
+    def _put(self, key: str, write: Callable[[], None]) -> Path | None:
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            os.utime(path, None)
+            with self._lock:
+                self._hits += 1
+            return path
+        except OSError:
+            pass
+        with self._lock:
+            self._misses += 1
+        write()
+        return path if path.exists() else None
+
+    def locate(self, key: str) -> Path | None:
+        """Path of a live entry without reading it (for streaming responses)."""
+        path = self._path(key)
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        if self._max_age_s > 0 and (time.time() - st.st_mtime) > self._max_age_s:
+            self._remove(path, st.st_size)
+            return None
+        return path
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses + self._coalesced
+            return {
+                "root": str(self._root),
+                "enabled": self.enabled,
+                "max_bytes": self._max_bytes,
+                "max_age_s": self._max_age_s,
+                "bytes": self._total_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "coalesced": self._coalesced,
+                "stores": self._stores,
+                "evictions": self._evictions,
+                "errors": self._errors,
+                "in_flight": len(self._inflight),
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_cache_lock = threading.Lock()
+_cache: PreviewCache | None = None
+
+
+def get_preview_cache() -> PreviewCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            from backend.app.core.config import settings
+            from backend.app.core.paths import resolve_repo_path
+
+            _cache = PreviewCache(
+                resolve_repo_path(settings.PREVIEW_CACHE_DIR),
+                max_bytes=settings.PREVIEW_CACHE_MAX_BYTES,
+                max_age_s=settings.PREVIEW_CACHE_MAX_AGE_S,
+            )
+        return _cache
+
+
+def set_preview_cache(cache: PreviewCache | None) -> None:
+    global _cache
+    with _cache_lock:
+        _cache = cache
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from .refresh import RefreshScheduler, StaleWhileRevalidate
+
+
+@dataclass(frozen=True)
+class DatasetSnapshot:
+    datasets: tuple[dict, ...] = ()
+    by_id: dict[str, dict] = field(default_factory=dict)
+    by_name: dict[str, dict] = field(default_factory=dict)
+    # Legacy `get_dataset_index()` shape: {"by_id": {id: name}, "by_name": {name: id}}.
+    index: dict[str, dict[str, str]] = field(default_factory=lambda: {"by_id": {}, "by_name": {}})
+    loaded_at_s: float = 0.0
+
+    @classmethod
+    def build(cls, datasets: list[dict], *, loaded_at_s: float) -> "DatasetSnapshot":
+        kept: list[dict] = []
+        by_id: dict[str, dict] = {}
+        by_name: dict[str, dict] = {}
+        for ds in datasets:
+            if not isinstance(ds, dict):
+                continue
+            dataset_id = ds.get("id")
+            if not isinstance(dataset_id, str) or not dataset_id or dataset_id in by_id:
+                continue
+            kept.append(ds)
+            by_id[dataset_id] = ds
+            name = ds.get("name")
+            if isinstance(name, str) and name and name not in by_name:
+                by_name[name] = ds
+        index = {
+            "by_id": {dataset_id: ds["name"] for dataset_id, ds in by_id.items() if isinstance(ds.get("name"), str) and ds["name"]},
+            "by_name": {name: ds["id"] for name, ds in by_name.items()},
+        }
+        return cls(datasets=tuple(kept), by_id=by_id, by_name=by_name, index=index, loaded_at_s=loaded_at_s)
+
+    def get(self, ref: str) -> dict | None:
+        if not isinstance(ref, str) or not ref:
+            return None
+        return self.by_id.get(ref) or self.by_name.get(ref)
+
+
+class DatasetRegistry:
+    """
+    Process-wide view of the RAGFlow dataset list with O(1) lookup by id and by name.
+
+    Freshness is handled by a `StaleWhileRevalidate` cache: a snapshot younger than `ttl_s` is
+    served as-is, a stale one (up to `max_stale_s`) is served while the shared refresh scheduler
+    reloads it, and listings are single-flight. `invalidate()` (after local mutations) drops the
+    snapshot and queues an immediate refresh. `on_change` fires when a reload changes the
+    id -> name mapping.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], list[dict] | None],
+        *,
+        ttl_s: float = 30.0,
+        max_stale_s: float = 300.0,
+        on_change: Callable[[], Any] | None = None,
+        logger: logging.Logger | None = None,
+        scheduler: RefreshScheduler | None = None,
+    ):
+        self._fetch = fetch
+        self._on_change = on_change
+        self._cache: StaleWhileRevalidate[DatasetSnapshot] = StaleWhileRevalidate(
+            "datasets",
+            self._load_snapshot,
+            ttl_s=ttl_s,
+            max_stale_s=max_stale_s,
+            on_loaded=self._snapshot_loaded,
+            scheduler=scheduler,
+            logger=logger,
+        )
+
+    def _load_snapshot(self) -> DatasetSnapshot | None:
+        datasets = self._fetch()
+        if datasets is None:
+            return None
+        return DatasetSnapshot.build(list(datasets), loaded_at_s=time.monotonic())
+
+    def _snapshot_loaded(self, previous: DatasetSnapshot | None, current: DatasetSnapshot) -> None:
+        if previous is not None and self._on_change is not None and previous.index["by_id"] != current.index["by_id"]:
+            self._on_change()
+
+    def snapshot(self, *, max_age_s: float | None = None) -> DatasetSnapshot:
+        return self._cache.get(max_age_s=max_age_s) or DatasetSnapshot()
+
+    def get(self, ref: str, *, max_age_s: float | None = None) -> dict | None:
+        return self.snapshot(max_age_s=max_age_s).get(ref)
+
+    def invalidate(self, *, refresh: bool = True) -> None:
+        self._cache.invalidate(refresh=refresh)
+
+    def stats(self) -> dict[str, Any]:
+        current = self._cache.peek()
+        stats = self._cache.stats()
+        return {"datasets": len(current.datasets) if current is not None else None, **stats}
@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from backend.database.paths import resolve_auth_db_path
+from backend.database.sqlite import pooled_connection
+
+_COLUMNS = (
+    "document_id",
+    "dataset_id",
+    "dataset_name",
+    "name",
+    "status",
+    "run",
+    "size",
+    "chunk_method",
+    "created_at_ms",
+    "updated_at_ms",
+    "synced_at_ms",
+)
+
+
+def _as_int(value: Any) -> int | None:
+    try:
+        return int(value) if value is not None and value != "" else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_text(value: Any) -> str | None:
+    if value is None:
+        return None
+    text = str(value)
+    return text if text else None
+
+
+def catalog_row_from_document(doc: Any, *, dataset_id: str, dataset_name: str | None) -> dict | None:
+    """Map an upstream document (HTTP dict or SDK object) to a catalog row; None if it has no id."""
+
+    def field(name: str) -> Any:
+        if isinstance(doc, dict):
+            return doc.get(name)
+        return getattr(doc, name, None)
+
+    document_id = field("id")
+    if not isinstance(document_id, str) or not document_id:
+        return None
+    return {
+        "document_id": document_id,
+        "dataset_id": dataset_id,
+        "dataset_name": dataset_name,
+        "name": _as_text(field("name")),
+        "status": _as_text(field("status")),
+        "run": _as_text(field("run")),
+        "size": _as_int(field("size")),
+        "chunk_method": _as_text(field("chunk_method") or field("parser_id")),
+        "created_at_ms": _as_int(field("create_time")),
+        "updated_at_ms": _as_int(field("update_time")),
+    }
+
+
+@dataclass(frozen=True)
+class CatalogSyncState:
+    dataset_id: str
+    full_synced_at_ms: int | None
+    watermark_ms: int | None
+    document_count: int | None
+
+
+class RagflowDocumentCatalog:
+    """
+    Local mirror of RAGFlow document metadata (id, name, status, size, chunk method, dataset).
+
+    Rows are keyed by document id so single-document lookups never page through a dataset.
+    Each dataset records when it was last fully listed and the newest `update_time` seen, which
+    lets the reconciler fetch only recently changed documents between full passes.
+    """
+
+    def __init__(self, db_path: str | None = None) -> None:
+        self.db_path = resolve_auth_db_path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _conn(self):
+        return pooled_connection(self.db_path)
+
+    def get(self, document_id: str) -> dict | None:
+        found = self.get_many([document_id])
+        return found.get(document_id)
+
+    def get_many(self, document_ids: Iterable[str]) -> dict[str, dict]:
+        ids = list(dict.fromkeys(str(x) for x in (document_ids or []) if isinstance(x, str) and x))
+        if not ids:
+            return {}
+        out: dict[str, dict] = {}
+        conn = self._conn()
+        try:
+            # Stay well below SQLite's bound-parameter limit.
+            for start in range(0, len(ids), 500):
+                chunk = ids[start : start + 500]
+                placeholders = ",".join(["?"] * len(chunk))
+                rows = conn.execute(
+                    f"SELECT {', '.join(_COLUMNS)} FROM ragflow_document_catalog WHERE document_id IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for r in rows:
+                    out[str(r["document_id"])] = {k: r[k] for k in _COLUMNS}
+        finally:
+            conn.close()
+        with self._lock:
+            self._hits += len(out)
+            self._misses += len(ids) - len(out)
+        return out
+
+    def upsert_many(self, rows: Iterable[dict]) -> int:
+        now_ms = int(time.time() * 1000)
+        values = [tuple(row.get(k) for k in _COLUMNS[:-1]) + (now_ms,) for row in rows if row]
+        if not values:
+            return 0
+        conn = self._conn()
+        try:
+            conn.executemany(
+                f"""
+                INSERT INTO ragflow_document_catalog ({', '.join(_COLUMNS)})
+                VALUES ({', '.join(['?'] * len(_COLUMNS))})
+                ON CONFLICT(document_id) DO UPDATE SET
+                    {', '.join(f'{k} = excluded.{k}' for k in _COLUMNS[1:])}
+                """,
+                values,
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        return len(values)
+
+    def replace_dataset(self, dataset_id: str, rows: list[dict]) -> int:
+        """Make the catalog's view of one dataset exactly `rows` (result of a full listing)."""
+        now_ms = int(time.time() * 1000)
+        keep = {row["document_id"] for row in rows if row}
+        watermark = max((row.get("updated_at_ms") or 0 for row in rows if row), default=0) or None
+        written = self.upsert_many(rows)
+        conn = self._conn()
+        try:
+            existing = conn.execute(
+                "SELECT document_id FROM ragflow_document_catalog WHERE dataset_id = ?",
+                (dataset_id,),
+            ).fetchall()
+            stale = [(str(r["document_id"]),) for r in existing if str(r["document_id"]) not in keep]
+            if stale:
+                conn.executemany("DELETE FROM ragflow_document_catalog WHERE document_id = ?", stale)
+            conn.execute(
+                """
+                INSERT INTO ragflow_document_catalog_sync (dataset_id, full_synced_at_ms, watermark_ms, document_count)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(dataset_id) DO UPDATE SET
+                    full_synced_at_ms = excluded.full_synced_at_ms,
+                    watermark_ms = excluded.watermark_ms,
+                    document_count = excluded.document_count
+                """,
+                (dataset_id, now_ms, watermark, len(keep)),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        return written
+
+    def apply_changes(self, dataset_id: str, rows: list[dict]) -> int:
+        """Upsert documents changed since the last pass and advance the dataset's watermark."""
+        written = self.upsert_many(rows)
+        watermark = max((row.get("updated_at_ms") or 0 for row in rows if row), default=0)
+        if watermark:
+            conn = self._conn()
+            try:
+                conn.execute(
+                    """
+                    UPDATE ragflow_document_catalog_sync
+                    SET watermark_ms = MAX(COALESCE(watermark_ms, 0), ?)
+                    WHERE dataset_id = ?
+                    """,
+                    (watermark, dataset_id),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        return written
+
+    def sync_state(self, dataset_id: str) -> CatalogSyncState | None:
+        conn = self._conn()
+        try:
+            r = conn.execute(
+                """
+                SELECT dataset_id, full_synced_at_ms, watermark_ms, document_count
+                FROM ragflow_document_catalog_sync WHERE dataset_id = ?
+                """,
+                (dataset_id,),
+            ).fetchone()
+        finally:
+            conn.close()
+        if not r:
+            return None
+        return CatalogSyncState(
+            dataset_id=str(r["dataset_id"]),
+            full_synced_at_ms=r["full_synced_at_ms"],
+            watermark_ms=r["watermark_ms"],
+            document_count=r["document_count"],
+        )
+
+    def remove(self, document_ids: Iterable[str]) -> None:
+        """Forget documents (deleted upstream, or changed in a way the next lookup must re-read)."""
+        ids = [(x,) for x in dict.fromkeys(document_ids or []) if isinstance(x, str) and x]
+        if not ids:
+            return
+        conn = self._conn()
+        try:
+            conn.executemany("DELETE FROM ragflow_document_catalog WHERE document_id = ?", ids)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def mark_dataset_dirty(self, dataset_id: str) -> None:
+        """Force the next reconcile pass over `dataset_id` to be a full listing."""
+        conn = self._conn()
+        try:
+            conn.execute(
+                "UPDATE ragflow_document_catalog_sync SET full_synced_at_ms = NULL WHERE dataset_id = ?",
+                (dataset_id,),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def retain_datasets(self, dataset_ids: Iterable[str]) -> int:
+        """Drop rows of datasets that no longer exist upstream; returns the number of datasets dropped."""
+        keep = set(x for x in dataset_ids if isinstance(x, str) and x)
+        conn = self._conn()
+        try:
+            known = {
+                str(r["dataset_id"])
+                for r in conn.execute(
+                    "SELECT DISTINCT dataset_id FROM ragflow_document_catalog "
+                    "UNION SELECT dataset_id FROM ragflow_document_catalog_sync"
+                ).fetchall()
+            }
+            gone = [(x,) for x in known - keep]
+            if gone:
+                conn.executemany("DELETE FROM ragflow_document_catalog WHERE dataset_id = ?", gone)
+                conn.executemany("DELETE FROM ragflow_document_catalog_sync WHERE dataset_id = ?", gone)
+                conn.commit()
+        finally:
+            conn.close()
+        return len(gone)
+
+    def stats(self) -> dict[str, Any]:
+        conn = self._conn()
+        try:
+            documents = conn.execute("SELECT COUNT(*) FROM ragflow_document_catalog").fetchone()[0]
+            datasets = conn.execute("SELECT COUNT(*) FROM ragflow_document_catalog_sync").fetchone()[0]
+        finally:
+            conn.close()
+        with self._lock:
+            return {"documents": int(documents), "datasets": int(datasets), "hits": self._hits, "misses": self._misses}
+
+
+class DocumentCatalogReconciler:
+    """Background thread that keeps the catalog in step with RAGFlow, one dataset at a time."""
+
+    def __init__(self, ragflow_service, *, interval_s: float = 300.0, logger: logging.Logger | None = None):
+        self.ragflow_service = ragflow_service
+        self.interval_s = max(5.0, float(interval_s))
+        self.logger = logger or logging.getLogger(__name__)
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+
+    def run_once(self) -> int:
+        datasets = self.ragflow_service.list_datasets()
+        catalog = self.ragflow_service.document_catalog
+        if catalog is None:
+            return 0
+        dataset_ids = [ds.get("id") for ds in datasets if isinstance(ds.get("id"), str) and ds.get("id")]
+        synced = 0
+        for dataset_id in dataset_ids:
+            if self._stop_event.is_set():
+                break
+            try:
+                self.ragflow_service.sync_document_catalog(dataset_id)
+                synced += 1
+            except Exception as e:
+                self.logger.warning("Document catalog sync failed for dataset %s: %s", dataset_id, e)
+        # An empty listing usually means RAGFlow is unreachable; never wipe the catalog on that.
+        if dataset_ids:
+            catalog.retain_datasets(dataset_ids)
+        return synced
+
+    def _loop(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                self.logger.warning("Document catalog reconcile pass failed: %s", e)
+            self._stop_event.wait(self.interval_s)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name="ragflow_document_catalog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+_reconciler: DocumentCatalogReconciler | None = None
+
+
+def start_document_catalog_reconciler(ragflow_service, *, interval_s: float) -> DocumentCatalogReconciler | None:
+    global _reconciler
+    if getattr(ragflow_service, "document_catalog", None) is None or interval_s <= 0:
+        return None
+    if _reconciler is None:
+        _reconciler = DocumentCatalogReconciler(ragflow_service, interval_s=interval_s)
+    _reconciler.start()
+    return _reconciler
+
+
+def stop_document_catalog_reconciler() -> None:
+    global _reconciler
+    if _reconciler is not None:
+        _reconciler.stop()
+        _reconciler = None
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-from time import time
 from typing import List
 
+from backend.app.core.permission_cache import bump_permission_generation
+
 from ...ragflow_config import is_placeholder_api_key
+from ..dataset_registry import DatasetRegistry, DatasetSnapshot
 
 
 class RagflowDatasetsMixin:
@@ -111,23 +113,68 @@ class RagflowDatasetsMixin:
             result.append({"id": dataset_id, "name": name})
         return result
 
-    def get_dataset_index(self, *, ttl_s: float = 30.0) -> dict[str, dict[str, str]]:
-        now_s = time()
-        if self._dataset_index_cache and (now_s - self._dataset_index_cache_at_s) <= ttl_s:
-            return self._dataset_index_cache
+    # Upstream list endpoint is paginated (RAGFlow defaults to 30 per page).
+    _DATASET_LIST_PAGE_SIZE = 100
+
+    def _fetch_all_datasets(self) -> list[dict]:
+        api_key = self.config.get("api_key", "")
+        if is_placeholder_api_key(api_key):
+            return []
+        datasets: list[dict] = []
+        page = 1
+        while True:
+            batch = self._http.get_list(
+                "/api/v1/datasets",
+                params={"page": page, "page_size": self._DATASET_LIST_PAGE_SIZE},
+                context="list_datasets",
+            )
+            datasets.extend(d for d in batch if isinstance(d, dict))
+            if len(batch) < self._DATASET_LIST_PAGE_SIZE:
+                break
+            page += 1
+        return datasets
+
+    def _dataset_registry(self) -> DatasetRegistry:
+        registry = getattr(self, "_datasets_registry", None)
+        if registry is None:
+            registry = DatasetRegistry(
+                self._fetch_all_datasets,
+                on_change=bump_permission_generation,
+                logger=getattr(self, "logger", None),
+            )
+            self._datasets_registry = registry
+        return registry
+
+    def _dataset_snapshot(self, *, fresh: bool = False) -> DatasetSnapshot:
+        return self._dataset_registry().snapshot(max_age_s=0 if fresh else None)
+
+    def _lookup_dataset(self, *refs: str) -> dict | None:
+        """Full dataset object for the first ref (id or name) found; one fresh listing on a miss."""
+        refs = tuple(r for r in refs if isinstance(r, str) and r)
+        if not refs:
+            return None
+        for fresh in (False, True):
+            snapshot = self._dataset_snapshot(fresh=fresh)
+            for ref in refs:
+                ds = snapshot.get(ref)
+                if ds is not None:
+                    return ds
+        return None
+
+    def dataset_registry_stats(self) -> dict:
+        return self._dataset_registry().stats()
 
-        by_id: dict[str, str] = {}
-        by_name: dict[str, str] = {}
-        for ds in self.list_all_datasets():
-            dataset_id = ds["id"]
-            name = ds["name"]
-            by_id[dataset_id] = name
-            by_name[name] = dataset_id
+    def get_dataset_index(self) -> dict[str, dict[str, str]]:
+        return self._dataset_snapshot().index
 
-        cache = {"by_id": by_id, "by_name": by_name}
-        self._dataset_index_cache = cache
-        self._dataset_index_cache_at_s = now_s
-        return cache
+    def _invalidate_dataset_index(self) -> None:
+        # Drop the dataset registry after mutation so subsequent normalize/resolve doesn't miss;
+        # cached permission snapshots expand dataset names through the same index.
+        try:
+            self._dataset_registry().invalidate()
+        except Exception:
+            pass
+        bump_permission_generation()
 
     def normalize_dataset_id(self, ref: str) -> str | None:
         if not isinstance(ref, str) or not ref:
@@ -180,36 +227,9 @@ class RagflowDatasetsMixin:
         if callable(reload_cfg):
             reload_cfg()
 
-        api_key = self.config.get("api_key", "")
-        if not self.client:
-            # Fallback to HTTP API list endpoint when SDK client isn't available.
-            if is_placeholder_api_key(api_key):
-                return []
-            datasets = self._http.get_list("/api/v1/datasets", context="list_datasets")
-            # Keep the full dataset objects from the upstream list endpoint. This enables UI features
-            # like "delete only when empty" based on document_count/chunk_count.
-            return [d for d in datasets if isinstance(d, dict)]
-
-        try:
-            datasets = self.client.list_datasets()
-            result = []
-            for dataset in datasets:
-                if hasattr(dataset, "name"):
-                    result.append(
-                        {
-                            "id": getattr(dataset, "id", ""),
-                            "name": dataset.name,
-                            "document_count": getattr(dataset, "document_count", None),
-                            "chunk_count": getattr(dataset, "chunk_count", None),
-                            "description": getattr(dataset, "description", None),
-                        }
-                    )
-                elif isinstance(dataset, dict):
-                    result.append(dict(dataset))
-            return result
-        except Exception as e:
-            self.logger.error(f"Failed to list datasets: {e}")
-            return []
+        # Full dataset objects from the upstream list endpoint (document_count/chunk_count etc.
+        # drive UI features like "delete only when empty"). Copies, so callers can't mutate the registry.
+        return [dict(ds) for ds in self._dataset_snapshot().datasets]
 
     def get_dataset_detail(self, dataset_ref: str) -> dict | None:
         reload_cfg = getattr(self, "_reload_config_if_changed", None)
@@ -234,18 +254,8 @@ class RagflowDatasetsMixin:
             dataset_id = dataset_ref
 
         # RAGFlow currently does not support GET /api/v1/datasets/{id} (returns 200 with code=100 MethodNotAllowed).
-        # Use the list endpoint and pick the matching dataset object.
-        datasets = self._http.get_list("/api/v1/datasets", context="list_datasets_for_detail")
-        for ds in datasets:
-            if not isinstance(ds, dict):
-                continue
-            ds_id = ds.get("id")
-            ds_name = ds.get("name")
-            if ds_id == dataset_id or ds_id == dataset_ref:
-                return ds
-            if ds_name == dataset_ref or ds_name == dataset_id:
-                return ds
-        return None
+        # Pick the matching object from the dataset registry (backed by the list endpoint).
+        return self._lookup_dataset(dataset_id, dataset_ref)
 
     def update_dataset(self, dataset_ref: str, updates: dict) -> dict | None:
         reload_cfg = getattr(self, "_reload_config_if_changed", None)
@@ -270,21 +280,11 @@ class RagflowDatasetsMixin:
         except Exception:
             dataset_id = dataset_ref
 
-        # If the ref is a name and normalization misses (stale index), resolve id via list endpoint.
+        # If the ref is a name and normalization misses (stale index), resolve id via a fresh listing.
         if dataset_id == dataset_ref:
-            try:
-                datasets = self._http.get_list("/api/v1/datasets", context="list_datasets_for_update_resolve")
-                for ds in datasets:
-                    if not isinstance(ds, dict):
-                        continue
-                    if ds.get("id") == dataset_ref:
-                        dataset_id = dataset_ref
-                        break
-                    if ds.get("name") == dataset_ref and isinstance(ds.get("id"), str) and ds.get("id"):
-                        dataset_id = ds.get("id")
-                        break
-            except Exception:
-                pass
+            ds = self._lookup_dataset(dataset_ref)
+            if ds is not None and isinstance(ds.get("id"), str) and ds.get("id"):
+                dataset_id = ds.get("id")
 
         cleaned = self._sanitize_dataset_update_body(updates)
         payload = self._http.put_json(f"/api/v1/datasets/{dataset_id}", body=cleaned, params=None)
@@ -292,12 +292,7 @@ class RagflowDatasetsMixin:
         if out is None and payload and isinstance(payload, dict):
             msg = self._payload_error_message(payload) or "unknown_error"
             raise RuntimeError(f"RAGFlow update dataset failed: {msg}")
-        # Invalidate dataset index cache after mutation so subsequent normalize/resolve doesn't miss.
-        try:
-            setattr(self, "_dataset_index_cache", None)
-            setattr(self, "_dataset_index_cache_at_s", 0.0)
-        except Exception:
-            pass
+        self._invalidate_dataset_index()
         return out
 
     def create_dataset(self, create_body: dict) -> dict | None:
@@ -318,12 +313,7 @@ class RagflowDatasetsMixin:
         if out is None and payload and isinstance(payload, dict):
             msg = self._payload_error_message(payload) or "unknown_error"
             raise RuntimeError(f"RAGFlow create dataset failed: {msg}")
-        # Invalidate dataset index cache after mutation so subsequent normalize/resolve doesn't miss.
-        try:
-            setattr(self, "_dataset_index_cache", None)
-            setattr(self, "_dataset_index_cache_at_s", 0.0)
-        except Exception:
-            pass
+        self._invalidate_dataset_index()
         return out
 
     def delete_dataset_if_empty(self, dataset_ref: str) -> bool:
@@ -346,22 +336,12 @@ class RagflowDatasetsMixin:
         except Exception:
             dataset_id = dataset_ref
 
-        # Use list endpoint for counts and for resolving dataset id from name.
-        datasets = self._http.get_list("/api/v1/datasets", context="list_datasets_for_delete")
-        target = None
-        for ds in datasets:
-            if not isinstance(ds, dict):
-                continue
-            if ds.get("id") == dataset_id or ds.get("id") == dataset_ref:
-                target = ds
-                dataset_id = ds.get("id") or dataset_id
-                break
-            if ds.get("name") == dataset_ref and isinstance(ds.get("id"), str) and ds.get("id"):
-                target = ds
-                dataset_id = ds.get("id")
-                break
+        # Counts must be current before deleting: always take a fresh listing here.
+        snapshot = self._dataset_snapshot(fresh=True)
+        target = snapshot.get(dataset_id) or snapshot.get(dataset_ref)
         if not target:
             raise ValueError("dataset_not_found")
+        dataset_id = target.get("id") or dataset_id
 
         doc_count = target.get("document_count")
         chunk_count = target.get("chunk_count")
@@ -382,10 +362,5 @@ class RagflowDatasetsMixin:
         if not self._payload_ok(payload):
             msg = self._payload_error_message(payload) or "unknown_error"
             raise RuntimeError(f"RAGFlow delete dataset failed: {msg}")
-        # Invalidate dataset index cache after mutation so subsequent normalize/resolve doesn't miss.
-        try:
-            setattr(self, "_dataset_index_cache", None)
-            setattr(self, "_dataset_index_cache_at_s", 0.0)
-        except Exception:
-            pass
+        self._invalidate_dataset_index()
         return True
@@ -1,12 +1,25 @@
 from __future__ import annotations
 
 import inspect
+import itertools
 import json
-from typing import Optional, List
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterator, List, Optional
 
-import requests
+from ...zip_stream import ZipStream
 
-from ...ragflow_config import DEFAULT_RAGFLOW_BASE_URL
+
+def _close_fetched_spool(future) -> None:
+    if future.cancelled() or future.exception() is not None:
+        return
+    item = future.result()
+    if item is not None:
+        item[1].close()
 
 
 class RagflowDocumentsMixin:
@@ -31,7 +44,7 @@ class RagflowDocumentsMixin:
             }
         return None
 
-    def _extract_document_batch_from_payload(self, payload: dict | None) -> list[dict]:
+    def _document_candidates_from_payload(self, payload: dict | None) -> list:
         if not isinstance(payload, dict):
             return []
         if payload.get("code") not in (0, None):
@@ -39,18 +52,18 @@ class RagflowDocumentsMixin:
             return []
 
         data = payload.get("data")
-        candidates = []
         if isinstance(data, list):
-            candidates = data
-        elif isinstance(data, dict):
+            return data
+        if isinstance(data, dict):
             for key in ("docs", "documents", "items", "list"):
                 value = data.get(key)
                 if isinstance(value, list):
-                    candidates = value
-                    break
+                    return value
+        return []
 
+    def _extract_document_batch_from_payload(self, payload: dict | None) -> list[dict]:
         result: list[dict] = []
-        for item in candidates:
+        for item in self._document_candidates_from_payload(payload):
             row = self._coerce_document_item(item)
             if row is not None:
                 result.append(row)
@@ -111,10 +124,175 @@ class RagflowDocumentsMixin:
         batch = self._extract_document_batch_from_payload(payload)
         return batch[0] if batch else None
 
+    # --- local document catalog (services/ragflow/document_catalog.py) ---
+
+    # Full listings also catch deletions made outside this app; in between, only changes are paged.
+    _CATALOG_FULL_SYNC_S = 3600
+    # Parse status moves quickly while RAGFlow is chunking; older catalog rows are re-read for status.
+    _CATALOG_STATUS_MAX_AGE_S = 15
+    _CATALOG_PAGE_SIZE = 200
+
+    def _list_catalog_rows_via_http(self, dataset_id: str, dataset_name: str | None, *, since_ms: int | None = None) -> list[dict]:
+        from ..document_catalog import catalog_row_from_document
+
+        rows: list[dict] = []
+        page = 1
+        while True:
+            params = {"page": page, "page_size": self._CATALOG_PAGE_SIZE}
+            if since_ms is not None:
+                params.update({"orderby": "update_time", "desc": "true"})
+            payload = self._http.get_json(f"/api/v1/datasets/{dataset_id}/documents", params=params)
+            batch = self._document_candidates_from_payload(payload)
+            reached_watermark = False
+            for item in batch:
+                row = catalog_row_from_document(item, dataset_id=dataset_id, dataset_name=dataset_name)
+                if row is None:
+                    continue
+                if since_ms is not None and (row.get("updated_at_ms") or 0) < since_ms:
+                    reached_watermark = True
+                    break
+                rows.append(row)
+            if reached_watermark or len(batch) < self._CATALOG_PAGE_SIZE:
+                break
+            page += 1
+        return rows
+
+    def sync_document_catalog(self, dataset_ref: str, *, full: bool = False) -> int:
+        """Bring the local catalog for one dataset up to date; returns the number of rows written."""
+        catalog = getattr(self, "document_catalog", None)
+        if catalog is None:
+            return 0
+        ds = self._lookup_dataset(dataset_ref)
+        if ds is None:
+            return 0
+        dataset_id = ds["id"]
+        dataset_name = ds.get("name")
+
+        state = catalog.sync_state(dataset_id)
+        now_ms = int(time.time() * 1000)
+        needs_full = (
+            full
+            or state is None
+            or state.full_synced_at_ms is None
+            or state.watermark_ms is None
+            or now_ms - state.full_synced_at_ms >= self._CATALOG_FULL_SYNC_S * 1000
+        )
+        if needs_full:
+            rows = self._list_catalog_rows_via_http(dataset_id, dataset_name)
+            return catalog.replace_dataset(dataset_id, rows)
+        rows = self._list_catalog_rows_via_http(dataset_id, dataset_name, since_ms=state.watermark_ms)
+        return catalog.apply_changes(dataset_id, rows)
+
+    def _catalog_document(self, document_id: str, dataset_name: str, *, max_age_s: float | None = None) -> dict | None:
+        """Catalog row for one document; a miss (or a row older than `max_age_s`) costs one HTTP lookup."""
+        from ..document_catalog import catalog_row_from_document
+
+        catalog = getattr(self, "document_catalog", None)
+        ds = self._lookup_dataset(dataset_name)
+        dataset_id = ds["id"] if ds is not None else None
+
+        row = catalog.get(document_id) if catalog is not None else None
+        if row is not None and dataset_id is not None and row.get("dataset_id") != dataset_id:
+            row = None
+        if row is not None and max_age_s is not None:
+            if time.time() * 1000 - (row.get("synced_at_ms") or 0) > max_age_s * 1000:
+                row = None
+        if row is not None:
+            return row
+        if dataset_id is None:
+            return None
+
+        payload = self._http.get_json(
+            f"/api/v1/datasets/{dataset_id}/documents",
+            params={"id": document_id, "page": 1, "page_size": 1},
+        )
+        for item in self._document_candidates_from_payload(payload):
+            fresh = catalog_row_from_document(item, dataset_id=dataset_id, dataset_name=ds.get("name"))
+            if fresh is None or fresh["document_id"] != document_id:
+                continue
+            if catalog is not None:
+                catalog.upsert_many([fresh])
+            return fresh
+        return None
+
+    # Below this many misses in a dataset that was never listed, per-id lookups beat a full listing.
+    _CATALOG_MAX_POINT_LOOKUPS = 5
+
+    def resolve_document_names(self, refs: list[tuple[str, str | None]]) -> dict[str, dict]:
+        """
+        Bulk `{doc_id: {"name", "dataset_id", "dataset"}}` for `(doc_id, dataset_ref)` pairs.
+
+        All ids are read from the catalog in one query; ids still missing are fetched per dataset
+        (one incremental catalog sync, or a few `?id=` lookups for a dataset never listed before).
+        """
+        catalog = getattr(self, "document_catalog", None)
+        if catalog is None:
+            return {}
+        wanted: dict[str, str | None] = {}
+        for doc_id, dataset_ref in refs or []:
+            if isinstance(doc_id, str) and doc_id and doc_id not in wanted:
+                wanted[doc_id] = dataset_ref if isinstance(dataset_ref, str) and dataset_ref else None
+
+        rows = catalog.get_many(list(wanted))
+        missing_by_dataset: dict[str, list[str]] = {}
+        dataset_names: dict[str, str] = {}
+        for doc_id, dataset_ref in wanted.items():
+            if doc_id in rows or dataset_ref is None:
+                continue
+            ds = self._lookup_dataset(dataset_ref)
+            if ds is None:
+                continue
+            missing_by_dataset.setdefault(ds["id"], []).append(doc_id)
+            dataset_names[ds["id"]] = ds.get("name") or ds["id"]
+
+        for dataset_id, doc_ids in missing_by_dataset.items():
+            try:
+                if catalog.sync_state(dataset_id) is not None or len(doc_ids) > self._CATALOG_MAX_POINT_LOOKUPS:
+                    self.sync_document_catalog(dataset_id)
+                    rows.update(catalog.get_many(doc_ids))
+                else:
+                    for doc_id in doc_ids:
+                        row = self._catalog_document(doc_id, dataset_names[dataset_id])
+                        if row is not None:
+                            rows[doc_id] = row
+            except Exception as e:
+                self.logger.warning("Document name lookup failed for dataset %s: %s", dataset_id, e)
+
+        return {
+            doc_id: {"name": row.get("name"), "dataset_id": row.get("dataset_id"), "dataset": row.get("dataset_name")}
+            for doc_id, row in rows.items()
+            if row.get("name")
+        }
+
+    def _remember_catalog_document(self, dataset, document) -> None:
+        catalog = getattr(self, "document_catalog", None)
+        dataset_id = self._dataset_id_from_obj(dataset)
+        if catalog is None or not dataset_id:
+            return
+        from ..document_catalog import catalog_row_from_document
+
+        dataset_name = getattr(dataset, "name", None) or (dataset.get("name") if isinstance(dataset, dict) else None)
+        try:
+            catalog.upsert_many([catalog_row_from_document(document, dataset_id=dataset_id, dataset_name=dataset_name)])
+        except Exception as e:
+            self.logger.warning("Document catalog update failed: %s", e)
+
+    def document_catalog_stats(self) -> dict | None:
+        catalog = getattr(self, "document_catalog", None)
+        return catalog.stats() if catalog is not None else None
+
+    def _forget_catalog_documents(self, document_ids: list[str]) -> None:
+        catalog = getattr(self, "document_catalog", None)
+        if catalog is None:
+            return
+        try:
+            catalog.remove(document_ids)
+        except Exception as e:
+            self.logger.warning("Document catalog invalidation failed: %s", e)
+
     def _download_document_via_http(self, dataset_id: str, document_id: str) -> bytes | None:
-        url = f"{self._http.config.base_url.rstrip('/')}/api/v1/datasets/{dataset_id}/documents/{document_id}"
         try:
-            resp = requests.get(url, headers=self._http.headers(), timeout=float(self.config.get("timeout", 10) or 10))
+            resp = self._http.request("GET", f"/api/v1/datasets/{dataset_id}/documents/{document_id}")
         except Exception as exc:
             self.logger.error("RAGFlow download document failed: %s", exc)
             return None
@@ -183,8 +361,10 @@ class RagflowDocumentsMixin:
         if not dataset:
             self.logger.info(f"Creating dataset '{kb_id}'")
             dataset = self.client.create_dataset(name=kb_id)
+            self._invalidate_dataset_index()
 
         document = dataset.upload_file(file_path)
+        self._remember_catalog_document(dataset, document)
 
         doc_id = getattr(document, "id", None)
         if not doc_id and isinstance(document, dict):
@@ -192,92 +372,130 @@ class RagflowDocumentsMixin:
 
         return doc_id
 
-    def upload_document_blob(self, file_filename: str, file_content: bytes, kb_id: str = "展厅") -> str:
+    # Upload read timeout: a floor plus the time to move the file at a pessimistic throughput.
+    _UPLOAD_TIMEOUT_BASE_S = 60.0
+    _UPLOAD_MIN_BYTES_PER_S = 512 * 1024
+
+    def _upload_timeout_s(self, size: int) -> float:
+        return self._UPLOAD_TIMEOUT_BASE_S + max(0, int(size)) / self._UPLOAD_MIN_BYTES_PER_S
+
+    def _upload_target_dataset(self, kb_id: str):
+        """Dataset to upload into (from the dataset registry), created when it does not exist yet."""
         reload_cfg = getattr(self, "_reload_config_if_changed", None)
         if callable(reload_cfg):
             reload_cfg()
 
-        """
-        Upload document to RAGFlow using official HTTP API
-        Reference: https://ragflow.io/docs/http_api
-
-        HTTP API: POST /api/v1/datasets/{dataset_id}/documents
-        Form: file=@{FILE_PATH}
-        """
-        import requests
-        import io
-
         if not self.client:
             raise ValueError("RAGFlow client not initialized")
 
-        kb_id = self._normalize_dataset_name_for_ops(kb_id)
-        dataset = self._find_dataset_by_name(kb_id)
-
+        name = self._normalize_dataset_name_for_ops(kb_id)
+        dataset = self._lookup_dataset(name, kb_id)
         if not dataset:
-            self.logger.info(f"Creating dataset '{kb_id}'")
-            dataset = self.client.create_dataset(name=kb_id)
+            self.logger.info(f"Creating dataset '{name}'")
+            dataset = self.client.create_dataset(name=name)
+            self._invalidate_dataset_index()
+        return dataset
+
+    def _document_id_from_upload_response(self, response, dataset, file_filename: str) -> str | None:
+        """
+        HTTP API: POST /api/v1/datasets/{dataset_id}/documents (reference: https://ragflow.io/docs/http_api)
 
+        Returns the new document id, "uploaded" when RAGFlow accepted the file without reporting one,
+        or None on failure.
+        """
+        if response.status_code not in [200, 201]:
+            self.logger.error(f"Upload failed with status {response.status_code}: {response.text}")
+            return None
+
+        self.logger.info(f"Successfully uploaded {file_filename}")
         try:
-            dataset_id = getattr(dataset, "id", None)
-            if not dataset_id and isinstance(dataset, dict):
-                dataset_id = dataset.get("id")
+            result = response.json()
+            self.logger.info(f"RAGFlow response: {str(result)[:200]}...")
+
+            if isinstance(result, dict):
+                if "code" in result and result["code"] == 0:
+                    if "data" in result and isinstance(result["data"], list):
+                        docs = result["data"]
+                        if docs and len(docs) > 0:
+                            self._remember_catalog_document(dataset, docs[0])
+                            doc_id = docs[0].get("id")
+                            self.logger.info(f"Document ID: {doc_id}")
+                            return doc_id
+                elif "data" in result and isinstance(result["data"], list):
+                    doc_ids = result["data"]
+                    if doc_ids and len(doc_ids) > 0:
+                        doc_id = doc_ids[0].get("id") if isinstance(doc_ids[0], dict) else doc_ids[0]
+                        self.logger.info(f"Document ID: {doc_id}")
+                        return doc_id
+                elif "id" in result:
+                    return result["id"]
+
+            self.logger.warning("Could not extract document ID from response")
+            return "uploaded"
+        except Exception as e:
+            self.logger.warning(f"Could not parse response JSON: {e}")
+            return "uploaded"
+
+    def upload_document_file(
+        self,
+        file_path: str,
+        file_filename: str | None = None,
+        kb_id: str = "展厅",
+        progress: Callable[[int, int], None] | None = None,
+    ) -> str | None:
+        """
+        Upload a file from disk as a streamed multipart body over the pooled connection.
+
+        Memory use does not depend on the file size; the read timeout grows with it.
+        `progress(sent_bytes, total_bytes)` is called while the body is sent.
+        """
+        from ...ragflow_http_client import MultipartFileBody
 
+        file_filename = file_filename or os.path.basename(file_path)
+        try:
+            dataset = self._upload_target_dataset(kb_id)
+            dataset_id = self._dataset_id_from_obj(dataset)
             if not dataset_id:
                 self.logger.error(f"Cannot find dataset ID for '{kb_id}'")
                 return None
 
-            base_url = self.config.get("base_url", DEFAULT_RAGFLOW_BASE_URL)
-            api_key = self.config.get("api_key", "")
-
-            upload_url = f"{base_url}/api/v1/datasets/{dataset_id}/documents"
-
-            files = {"file": (file_filename, io.BytesIO(file_content))}
-            headers = {"Authorization": f"Bearer {api_key}"}
-
+            body = MultipartFileBody(file_path, filename=file_filename, progress=progress)
             self.logger.info(
-                f"Uploading {file_filename} ({len(file_content)} bytes) to dataset '{kb_id}' (id={dataset_id})"
+                f"Uploading {file_filename} ({body.file_size} bytes) from disk to dataset '{kb_id}' (id={dataset_id})"
+            )
+            response = self._http.post_multipart_file(
+                f"/api/v1/datasets/{dataset_id}/documents",
+                body,
+                timeout_s=self._upload_timeout_s(body.file_size),
             )
-            self.logger.info(f"POST {upload_url}")
+            return self._document_id_from_upload_response(response, dataset, file_filename)
+        except Exception as e:
+            self.logger.error(f"Failed to upload document: {e}", exc_info=True)
+            return None
 
-            response = requests.post(upload_url, files=files, headers=headers, timeout=60)
+    def upload_document_blob(self, file_filename: str, file_content: bytes, kb_id: str = "展厅") -> str:
+        """In-memory variant of `upload_document_file`, for content that never touched the disk."""
+        import io
 
-            if response.status_code in [200, 201]:
-                self.logger.info(f"Successfully uploaded {file_filename}")
-                try:
-                    result = response.json()
-                    self.logger.info(f"RAGFlow response: {str(result)[:200]}...")
-
-                    if isinstance(result, dict):
-                        if "code" in result and result["code"] == 0:
-                            if "data" in result and isinstance(result["data"], list):
-                                docs = result["data"]
-                                if docs and len(docs) > 0:
-                                    doc_id = docs[0].get("id")
-                                    self.logger.info(f"Document ID: {doc_id}")
-                                    return doc_id
-                        elif "data" in result and isinstance(result["data"], list):
-                            doc_ids = result["data"]
-                            if doc_ids and len(doc_ids) > 0:
-                                doc_id = doc_ids[0].get("id") if isinstance(doc_ids[0], dict) else doc_ids[0]
-                                self.logger.info(f"Document ID: {doc_id}")
-                                return doc_id
-                        elif "id" in result:
-                            return result["id"]
-
-                    self.logger.warning("Could not extract document ID from response")
-                    return "uploaded"
-                except Exception as e:
-                    self.logger.warning(f"Could not parse response JSON: {e}")
-                    return "uploaded"
-            else:
-                self.logger.error(f"Upload failed with status {response.status_code}: {response.text}")
+        try:
+            dataset = self._upload_target_dataset(kb_id)
+            dataset_id = self._dataset_id_from_obj(dataset)
+            if not dataset_id:
+                self.logger.error(f"Cannot find dataset ID for '{kb_id}'")
                 return None
 
+            self.logger.info(
+                f"Uploading {file_filename} ({len(file_content)} bytes) to dataset '{kb_id}' (id={dataset_id})"
+            )
+            response = self._http.request(
+                "POST",
+                f"/api/v1/datasets/{dataset_id}/documents",
+                files={"file": (file_filename, io.BytesIO(file_content))},
+                timeout_s=self._upload_timeout_s(len(file_content)),
+            )
+            return self._document_id_from_upload_response(response, dataset, file_filename)
         except Exception as e:
-            self.logger.error(f"Failed to upload document: {e}")
-            import traceback
-
-            self.logger.error(traceback.format_exc())
+            self.logger.error(f"Failed to upload document: {e}", exc_info=True)
             return None
 
     def _looks_like_uuid(self, value: str) -> bool:
@@ -351,6 +569,8 @@ class RagflowDocumentsMixin:
             )
             return False
 
+        # Parse status is about to change: make the next status lookup re-read these documents.
+        self._forget_catalog_documents(doc_ids)
         return True
 
     def parse_document(self, *, dataset_ref: str, document_id: str) -> bool:
@@ -385,11 +605,28 @@ class RagflowDocumentsMixin:
             self.logger.info(f"delete_documents returned: {result}")
 
             self.logger.info("Verifying deletion...")
-            verify_docs = self.list_documents(dataset_name)
-            still_exists = any(
-                (getattr(d, "id", None) or (d.get("id") if isinstance(d, dict) else None)) == document_id
-                for d in verify_docs
-            )
+            self._forget_catalog_documents([document_id])
+            dataset_id = self._dataset_id_from_obj(dataset)
+            if dataset_id:
+                # Ask for this one id instead of listing the whole dataset.
+                payload = self._http.get_json(
+                    f"/api/v1/datasets/{dataset_id}/documents",
+                    params={"id": document_id, "page": 1, "page_size": 1},
+                )
+                still_exists = bool(
+                    isinstance(payload, dict)
+                    and payload.get("code") in (0, None)
+                    and any(
+                        isinstance(d, dict) and d.get("id") == document_id
+                        for d in self._document_candidates_from_payload(payload)
+                    )
+                )
+            else:
+                verify_docs = self.list_documents(dataset_name)
+                still_exists = any(
+                    (getattr(d, "id", None) or (d.get("id") if isinstance(d, dict) else None)) == document_id
+                    for d in verify_docs
+                )
 
             if still_exists:
                 self.logger.error(f"Document {document_id} still exists after deletion attempt")
@@ -415,12 +652,8 @@ class RagflowDocumentsMixin:
 
         try:
             dataset_name = self._normalize_dataset_name_for_ops(dataset_name)
-            documents = self.list_documents(dataset_name)
-            for doc in documents:
-                doc_id = getattr(doc, "id", None) or (doc.get("id") if isinstance(doc, dict) else None)
-                if doc_id == document_id:
-                    return getattr(doc, "status", None) or (doc.get("status") if isinstance(doc, dict) else None)
-            return None
+            row = self._catalog_document(document_id, dataset_name, max_age_s=self._CATALOG_STATUS_MAX_AGE_S)
+            return row.get("status") if row else None
         except Exception as e:
             self.logger.error(f"Failed to get document status: {e}")
             return None
@@ -435,24 +668,23 @@ class RagflowDocumentsMixin:
 
         try:
             dataset_name = self._normalize_dataset_name_for_ops(dataset_name)
-            documents = self.list_documents(dataset_name)
-            for doc in documents:
-                doc_id = getattr(doc, "id", None) or (doc.get("id") if isinstance(doc, dict) else None)
-                if doc_id == document_id:
-                    detail = {
-                        "id": document_id,
-                        "name": getattr(doc, "name", None) or (doc.get("name") if isinstance(doc, dict) else None),
-                        "status": getattr(doc, "status", None) or (doc.get("status") if isinstance(doc, dict) else None),
-                        "dataset": dataset_name,
-                    }
-
-                    for attr in ["chunk_method", "parser_id", "size", "created_at"]:
-                        value = getattr(doc, attr, None) or (doc.get(attr) if isinstance(doc, dict) else None)
-                        if value:
-                            detail[attr] = value
-
-                    return detail
-            return None
+            row = self._catalog_document(document_id, dataset_name)
+            if not row:
+                return None
+            detail = {
+                "id": document_id,
+                "name": row.get("name"),
+                "status": row.get("status"),
+                "dataset": dataset_name,
+            }
+            for key, value in (
+                ("chunk_method", row.get("chunk_method")),
+                ("size", row.get("size")),
+                ("created_at", row.get("created_at_ms")),
+            ):
+                if value:
+                    detail[key] = value
+            return detail
         except Exception as e:
             self.logger.error(f"Failed to get document detail: {e}")
             return None
@@ -500,38 +732,107 @@ class RagflowDocumentsMixin:
             self.logger.error(traceback.format_exc())
             return None, None
 
-    def batch_download_documents(self, documents_info: list) -> tuple:
+    def iter_batch_download(
+        self,
+        documents_info: list,
+        *,
+        max_workers: int = 4,
+        spool_max_bytes: int = 8 * 1024 * 1024,
+        yield_waits: bool = False,
+    ) -> Iterator[bytes | Future]:
+        """
+        Yield a ZIP archive of the given documents as it is built.
+
+        Items are `{doc_id|id, dataset, name?}` (`dataset_name` is read only when `dataset` is
+        absent); routes pass the dataset they authorized as `dataset`. Bodies are fetched concurrently (at
+        most `max_workers` in flight, each spooled to disk past `spool_max_bytes`) and written to the
+        archive in request order, so memory stays bounded whatever the batch size. Each dataset is
+        resolved once per batch, and the metadata lookup is skipped when the caller supplies a name.
+        Documents that cannot be downloaded are skipped.
+
+        With `yield_waits=True` the generator yields the fetch `Future` it is about to wait on, so
+        `iterate_offloaded` can wait on the event loop instead of holding an executor worker.
+        """
         reload_cfg = getattr(self, "_reload_config_if_changed", None)
         if callable(reload_cfg):
             reload_cfg()
 
-        import io
-        import zipfile
-        import time
-
         if not self.client:
             raise ValueError("RAGFlow client not initialized")
 
-        zip_buffer = io.BytesIO()
-        timestamp = int(time.time())
-        zip_filename = f"documents_{timestamp}.zip"
+        jobs = []
+        for doc_info in documents_info:
+            doc_id = doc_info.get("doc_id") or doc_info.get("id")
+            dataset_name = doc_info.get("dataset") or doc_info.get("dataset_name")
+            if not doc_id or not dataset_name:
+                continue
+            jobs.append((doc_id, dataset_name, doc_info.get("name")))
+
+        dataset_ids: dict[str, str | None] = {}
+        dataset_lock = threading.Lock()
+
+        def dataset_id_for(dataset_name: str) -> str | None:
+            with dataset_lock:
+                if dataset_name in dataset_ids:
+                    return dataset_ids[dataset_name]
+            normalized = self._normalize_dataset_name_for_ops(dataset_name)
+            dataset = self._find_dataset_by_name(normalized)
+            dataset_id = self._dataset_id_from_obj(dataset) if dataset else None
+            with dataset_lock:
+                dataset_ids[dataset_name] = dataset_id
+            return dataset_id
 
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-            for doc_info in documents_info:
-                doc_id = doc_info.get("doc_id")
-                dataset_name = doc_info.get("dataset_name")
-                name = doc_info.get("name")
+        def fetch(job):
+            doc_id, dataset_name, name = job
+            dataset_id = dataset_id_for(dataset_name)
+            if not dataset_id:
+                self.logger.warning(f"Skipping document {doc_id} - dataset '{dataset_name}' not found")
+                return None
+            if not name:
+                doc_meta = self._find_document_metadata_via_http(dataset_id, doc_id)
+                if not doc_meta:
+                    self.logger.warning(f"Skipping document {doc_id} - not found in dataset '{dataset_name}'")
+                    return None
+                name = doc_meta.get("name")
+            spool = tempfile.SpooledTemporaryFile(max_size=spool_max_bytes)
+            written = self._http.download_to(f"/api/v1/datasets/{dataset_id}/documents/{doc_id}", spool)
+            if not written:
+                spool.close()
+                self.logger.warning(f"Skipping document {doc_id} - could not download")
+                return None
+            spool.seek(0)
+            return (name or f"{doc_id}.bin", spool)
 
-                if not doc_id or not dataset_name:
+        archive = ZipStream()
+        pool = ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="ragflow_zip")
+        pending: deque = deque()
+        remaining = iter(jobs)
+        try:
+            for job in itertools.islice(remaining, max(1, int(max_workers))):
+                pending.append(pool.submit(fetch, job))
+            while pending:
+                if yield_waits and not pending[0].done():
+                    yield pending[0]
+                try:
+                    item = pending.popleft().result()
+                except Exception as e:
+                    self.logger.warning(f"Skipping document - download failed: {e}")
+                    item = None
+                for job in itertools.islice(remaining, 1):
+                    pending.append(pool.submit(fetch, job))
+                if item is None:
                     continue
+                name, spool = item
+                with spool:
+                    yield from archive.add(name, spool)
+            yield archive.close()
+        finally:
+            # Client went away (or an error): drop queued fetches and release finished spools.
+            pool.shutdown(wait=False, cancel_futures=True)
+            for future in pending:
+                # Fetches still running hand back their spool when they finish.
+                future.add_done_callback(_close_fetched_spool)
 
-                file_content, filename = self.download_document(doc_id, dataset_name)
-
-                if file_content:
-                    zip_name = name or filename or f"{doc_id}.bin"
-                    zip_file.writestr(zip_name, file_content)
-                else:
-                    self.logger.warning(f"Skipping document {doc_id} - could not download")
-
-        zip_buffer.seek(0)
-        return zip_buffer.getvalue(), zip_filename
+    def batch_download_documents(self, documents_info: list) -> tuple:
+        zip_filename = f"documents_{int(time.time())}.zip"
+        return b"".join(self.iter_batch_download(documents_info)), zip_filename
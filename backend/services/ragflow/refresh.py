@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshScheduler:
+    """
+    One daemon worker that runs background index refreshes for every `StaleWhileRevalidate`
+    cache in the process.
+
+    Jobs are keyed: scheduling a key that is already pending is a no-op, so a burst of stale
+    reads (or mutations) turns into a single upstream listing per index.
+    """
+
+    def __init__(self, name: str = "ragflow_index_refresh"):
+        self._name = name
+        self._cond = threading.Condition()
+        self._pending: deque[tuple[str, Callable[[], Any]]] = deque()
+        self._pending_keys: set[str] = set()
+        self._thread: threading.Thread | None = None
+        self._scheduled = 0
+        self._deduped = 0
+        self._completed = 0
+        self._failed = 0
+
+    def schedule(self, key: str, job: Callable[[], Any]) -> bool:
+        with self._cond:
+            if key in self._pending_keys:
+                self._deduped += 1
+                return False
+            self._pending_keys.add(key)
+            self._pending.append((key, job))
+            self._scheduled += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name=self._name, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return True
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                key, job = self._pending.popleft()
+            # The key stays "pending" while the job runs so concurrent triggers collapse into it.
+            try:
+                job()
+                failed = False
+            except Exception:
+                logger.exception("[RefreshScheduler] refresh %s failed", key)
+                failed = True
+            with self._cond:
+                self._pending_keys.discard(key)
+                if failed:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                "pending": len(self._pending_keys),
+                "scheduled": self._scheduled,
+                "deduped": self._deduped,
+                "completed": self._completed,
+                "failed": self._failed,
+            }
+
+
+_scheduler = RefreshScheduler()
+
+
+def get_refresh_scheduler() -> RefreshScheduler:
+    return _scheduler
+
+
+class StaleWhileRevalidate(Generic[T]):
+    """
+    Single cached value loaded by `fetch()`, refreshed stale-while-revalidate.
+
+    - Younger than `ttl_s`: served as-is.
+    - Between `ttl_s` and `max_stale_s`: the stale value is served and a background refresh is
+      queued on the shared `RefreshScheduler`.
+    - Older than `max_stale_s`, never loaded, invalidated, or read with `max_age_s`: the caller
+      loads synchronously. Loads are single-flight; callers that waited on an in-flight load reuse
+      its result.
+
+    `invalidate(refresh=True)` (used after local mutations) drops the value and immediately queues a
+    refresh, so the next reader usually finds a fresh value or joins the in-flight load.
+    A failed load keeps the previous value. `on_loaded(previous, current)` runs after each load.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[], T | None],
+        *,
+        ttl_s: float = 30.0,
+        max_stale_s: float = 300.0,
+        on_loaded: Callable[[T | None, T], Any] | None = None,
+        scheduler: RefreshScheduler | None = None,
+        logger: logging.Logger | None = None,
+    ):
+        self.name = name
+        self._fetch = fetch
+        self._ttl_s = float(ttl_s)
+        self._max_stale_s = max(float(max_stale_s), self._ttl_s)
+        self._on_loaded = on_loaded
+        self._scheduler = scheduler or get_refresh_scheduler()
+        self._logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._value: T | None = None
+        self._loaded_at_s = 0.0
+        self._epoch = 0
+        self._loads = 0
+        self._background_loads = 0
+        self._forced_refreshes = 0
+        self._hits = 0
+        self._stale_hits = 0
+        self._errors = 0
+        self._last_refresh_ms = 0.0
+        self._max_refresh_ms = 0.0
+
+    @property
+    def ttl_s(self) -> float:
+        return self._ttl_s
+
+    @property
+    def max_stale_s(self) -> float:
+        return self._max_stale_s
+
+    def peek(self) -> T | None:
+        with self._lock:
+            return self._value
+
+    def _load(self, *, background: bool) -> T | None:
+        with self._lock:
+            epoch = self._epoch
+        started = time.perf_counter()
+        try:
+            value = self._fetch()
+        except Exception as e:
+            with self._lock:
+                self._errors += 1
+            self._logger.error("RAGFlow %s refresh failed: %s", self.name, e)
+            return None
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        if value is None:
+            with self._lock:
+                self._errors += 1
+            return None
+        with self._lock:
+            previous = self._value
+            self._loads += 1
+            if background:
+                self._background_loads += 1
+            self._last_refresh_ms = elapsed_ms
+            self._max_refresh_ms = max(self._max_refresh_ms, elapsed_ms)
+            # An invalidation that raced with this fetch wins: keep the slot empty.
+            if epoch == self._epoch:
+                self._value = value
+                self._loaded_at_s = time.monotonic()
+        if self._on_loaded is not None:
+            try:
+                self._on_loaded(previous, value)
+            except Exception:
+                pass
+        return value
+
+    def _schedule_refresh(self) -> None:
+        scheduled_at = time.monotonic()
+
+        def job() -> None:
+            with self._load_lock:
+                with self._lock:
+                    # A foreground load already beat the queued refresh.
+                    if self._value is not None and self._loaded_at_s >= scheduled_at:
+                        return
+                self._load(background=True)
+
+        self._scheduler.schedule(f"{self.name}:{id(self)}", job)
+
+    def get(self, *, max_age_s: float | None = None) -> T | None:
+        ttl_s = self._ttl_s if max_age_s is None else float(max_age_s)
+        now = time.monotonic()
+        with self._lock:
+            current = self._value
+            age = (now - self._loaded_at_s) if current is not None else None
+            if current is not None and age <= ttl_s:
+                self._hits += 1
+                return current
+            serve_stale = current is not None and age <= self._max_stale_s and max_age_s is None
+            if serve_stale:
+                self._stale_hits += 1
+        if serve_stale:
+            self._schedule_refresh()
+            return current
+
+        with self._load_lock:
+            # Another caller (or the scheduler) may have reloaded while we waited for the load lock.
+            with self._lock:
+                if self._value is not None and self._loaded_at_s >= now:
+                    self._hits += 1
+                    return self._value
+            loaded = self._load(background=False)
+        if loaded is not None:
+            return loaded
+        with self._lock:
+            return self._value
+
+    def invalidate(self, *, refresh: bool = True) -> None:
+        with self._lock:
+            had_value = self._value is not None
+            self._epoch += 1
+            self._value = None
+            if refresh and had_value:
+                self._forced_refreshes += 1
+        # Only indexes that are actually in use are re-warmed eagerly.
+        if refresh and had_value:
+            self._schedule_refresh()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "loaded": self._value is not None,
+                "age_s": round(time.monotonic() - self._loaded_at_s, 1) if self._value is not None else None,
+                "ttl_s": self._ttl_s,
+                "max_stale_s": self._max_stale_s,
+                "loads": self._loads,
+                "background_loads": self._background_loads,
+                "forced_refreshes": self._forced_refreshes,
+                "hits": self._hits,
+                "stale_hits": self._stale_hits,
+                "errors": self._errors,
+                "last_refresh_ms": round(self._last_refresh_ms, 3),
+                "max_refresh_ms": round(self._max_refresh_ms, 3),
+            }
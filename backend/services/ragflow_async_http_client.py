@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import weakref
+from typing import Any, AsyncIterator
+
+import httpx
+
+from .ragflow_http_client import RagflowHttpClientConfig, sse_data_payload, sse_error_frame
+
+
+class AsyncRagflowHttpClient:
+    """
+    asyncio counterpart of `RagflowHttpClient` for JSON and SSE calls.
+
+    Used by async routes (chat/agent completions) so upstream I/O never blocks the event loop.
+    Connections are pooled per event loop (`httpx.AsyncClient` is loop-bound); in a uvicorn
+    worker that means one shared keep-alive pool. Transport errors are retried `max_retries`
+    times when the connection cannot be established; requests are never replayed after they
+    reached upstream.
+    """
+
+    def __init__(self, config: RagflowHttpClientConfig, *, logger: logging.Logger | None = None):
+        self._config = config
+        self._logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._in_flight = 0
+        self._requests_total = 0
+        self._errors_total = 0
+        self._pool_rebuilds = 0
+
+    @property
+    def config(self) -> RagflowHttpClientConfig:
+        return self._config
+
+    def set_config(self, config: RagflowHttpClientConfig) -> None:
+        with self._lock:
+            if config == self._config:
+                return
+            self._config = config
+            retired = list(self._clients.items())
+            self._clients = weakref.WeakKeyDictionary()
+            self._pool_rebuilds += 1
+        for loop, client in retired:
+            self._close_on_loop(loop, client)
+
+    async def aclose(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            retired = list(self._clients.items())
+            self._clients = weakref.WeakKeyDictionary()
+        for client_loop, client in retired:
+            if client_loop is loop:
+                await client.aclose()
+            else:
+                self._close_on_loop(client_loop, client)
+
+    @staticmethod
+    def _close_on_loop(loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient) -> None:
+        # Streams already running keep their connection until they finish.
+        try:
+            if loop.is_closed():
+                return
+            loop.call_soon_threadsafe(lambda: loop.create_task(client.aclose()))
+        except Exception:
+            pass
+
+    @staticmethod
+    def _build_client(config: RagflowHttpClientConfig) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=config.pool_maxsize,
+            max_keepalive_connections=config.pool_maxsize,
+        )
+        transport = httpx.AsyncHTTPTransport(limits=limits, retries=config.max_retries)
+        return httpx.AsyncClient(transport=transport, timeout=_timeout(config, None))
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None or client.is_closed:
+                client = self._build_client(self._config)
+                self._clients[loop] = client
+            return client
+
+    def pool_stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight": self._in_flight,
+                "requests_total": self._requests_total,
+                "errors_total": self._errors_total,
+                "pool_rebuilds": self._pool_rebuilds,
+                "event_loops": len(self._clients),
+                "pool_maxsize": self._config.pool_maxsize,
+            }
+
+    def _headers(self) -> dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self._config.api_key}",
+            "Content-Type": "application/json",
+        }
+
+    def _url(self, path: str) -> str:
+        return f"{self._config.base_url.rstrip('/')}{path}"
+
+    def _enter(self) -> None:
+        with self._lock:
+            self._in_flight += 1
+            self._requests_total += 1
+
+    def _leave(self, *, failed: bool = False) -> None:
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            if failed:
+                self._errors_total += 1
+
+    async def _request_json(
+        self,
+        method: str,
+        path: str,
+        *,
+        body: dict[str, Any] | None,
+        params: dict[str, Any] | None,
+        timeout_s: float | None,
+    ) -> dict[str, Any] | None:
+        url = self._url(path)
+        kwargs: dict[str, Any] = {
+            "headers": self._headers(),
+            "params": params,
+            "timeout": _timeout(self._config, timeout_s),
+        }
+        if body is not None:
+            kwargs["json"] = body
+        self._enter()
+        try:
+            resp = await self._client().request(method, url, **kwargs)
+        except Exception as exc:
+            self._leave(failed=True)
+            self._logger.error("RAGFlow %s %s failed: %s", method, url, exc)
+            return None
+        self._leave()
+
+        if resp.status_code != 200:
+            preview = ""
+            try:
+                preview = (resp.text or "")[:500]
+            except Exception:
+                preview = ""
+            if preview:
+                self._logger.error("RAGFlow %s %s failed: HTTP %s body=%s", method, url, resp.status_code, preview)
+            else:
+                self._logger.error("RAGFlow %s %s failed: HTTP %s", method, url, resp.status_code)
+            return None
+
+        try:
+            data = resp.json()
+        except Exception as exc:
+            self._logger.error("RAGFlow %s %s invalid JSON: %s", method, url, exc)
+            return None
+        return data if isinstance(data, dict) else None
+
+    async def get_json(
+        self, path: str, *, params: dict[str, Any] | None = None, timeout_s: float | None = None
+    ) -> dict[str, Any] | None:
+        return await self._request_json("GET", path, body=None, params=params, timeout_s=timeout_s)
+
+    async def post_json(
+        self,
+        path: str,
+        *,
+        body: dict[str, Any] | None = None,
+        params: dict[str, Any] | None = None,
+        timeout_s: float | None = None,
+    ) -> dict[str, Any] | None:
+        return await self._request_json("POST", path, body=body or {}, params=params, timeout_s=timeout_s)
+
+    async def put_json(
+        self,
+        path: str,
+        *,
+        body: dict[str, Any] | None = None,
+        params: dict[str, Any] | None = None,
+        timeout_s: float | None = None,
+    ) -> dict[str, Any] | None:
+        return await self._request_json("PUT", path, body=body or {}, params=params, timeout_s=timeout_s)
+
+    async def delete_json(
+        self,
+        path: str,
+        *,
+        body: dict[str, Any] | None = None,
+        params: dict[str, Any] | None = None,
+        timeout_s: float | None = None,
+    ) -> dict[str, Any] | None:
+        # Same contract as the sync client: `body=None` omits the DELETE body entirely.
+        return await self._request_json("DELETE", path, body=body, params=params, timeout_s=timeout_s)
+
+    async def get_list(
+        self,
+        path: str,
+        *,
+        params: dict[str, Any] | None = None,
+        context: str,
+        data_field: str = "data",
+        ok_code: int = 0,
+    ) -> list[dict[str, Any]]:
+        payload = await self.get_json(path, params=params)
+        if not payload:
+            return []
+        if payload.get("code") != ok_code:
+            self._logger.error("RAGFlow %s failed: %s", context, payload.get("message"))
+            return []
+        value = payload.get(data_field, [])
+        if isinstance(value, list):
+            return [item for item in value if isinstance(item, dict)]
+        if value is not None:
+            self._logger.error("Unexpected %s response type: %s", context, type(value).__name__)
+        return []
+
+    async def post_sse_frames(
+        self,
+        path: str,
+        *,
+        body: dict[str, Any] | None = None,
+        params: dict[str, Any] | None = None,
+        timeout_s: float | None = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        POST an SSE endpoint and yield the raw payload of each `data:` line.
+
+        Mirrors `RagflowHttpClient.post_sse_frames`, including the encoded `{code, message}` error frames.
+        """
+        url = self._url(path)
+        client = self._client()
+        self._enter()
+        try:
+            request = client.build_request(
+                "POST",
+                url,
+                headers=self._headers(),
+                params=params,
+                json=body or {},
+                timeout=_timeout(self._config, timeout_s),
+            )
+            resp = await client.send(request, stream=True)
+        except Exception as exc:
+            self._leave(failed=True)
+            self._logger.error("RAGFlow SSE POST %s failed: %s", url, exc)
+            yield sse_error_frame(-1, str(exc))
+            return
+
+        try:
+            if resp.status_code != 200:
+                self._logger.error("RAGFlow SSE POST %s failed: HTTP %s", url, resp.status_code)
+                yield sse_error_frame(resp.status_code, f"HTTP {resp.status_code}")
+                return
+
+            # Split lines on the raw bytes: no per-line text decoding on the relay path.
+            pending = b""
+            async for data in resp.aiter_bytes():
+                pending += data
+                *lines, pending = pending.split(b"\n")
+                for line in lines:
+                    payload = sse_data_payload(line)
+                    if payload is None:
+                        continue
+                    if payload == b"[DONE]":
+                        return
+                    yield payload
+            payload = sse_data_payload(pending)
+            if payload is not None and payload != b"[DONE]":
+                yield payload
+        finally:
+            try:
+                await resp.aclose()
+            except Exception:
+                pass
+            self._leave()
+
+    async def post_sse(
+        self,
+        path: str,
+        *,
+        body: dict[str, Any] | None = None,
+        params: dict[str, Any] | None = None,
+        timeout_s: float | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        POST an SSE endpoint and yield decoded JSON objects from `data:` lines.
+
+        Mirrors `RagflowHttpClient.post_sse`, including the `{code, message}` error objects.
+        """
+        async for payload in self.post_sse_frames(path, body=body, params=params, timeout_s=timeout_s):
+            try:
+                obj = json.loads(payload)
+            except Exception:
+                self._logger.warning("Failed to parse SSE data: %s", payload[:200])
+                continue
+            if isinstance(obj, dict):
+                yield obj
+
+def _timeout(config: RagflowHttpClientConfig, timeout_s: float | None) -> httpx.Timeout:
+    read_timeout = float(timeout_s if timeout_s is not None else config.timeout_s)
+    return httpx.Timeout(read_timeout, connect=min(float(config.connect_timeout_s), read_timeout))
@@ -1,15 +1,12 @@
+import asyncio
 import logging
-from typing import Optional, List, AsyncIterator, Dict, Any
+from typing import Optional, List, AsyncIterator, Dict, Any, Iterator
 import re
 
+from .ragflow.refresh import StaleWhileRevalidate
 from .ragflow_connection import RagflowConnection, create_ragflow_connection
-from .ragflow_config import (
-    DEFAULT_RAGFLOW_BASE_URL,
-    effective_api_key,
-    format_api_key_for_log,
-    load_ragflow_config,
-)
-from .ragflow_http_client import RagflowHttpClientConfig
+from .ragflow_config import format_api_key_for_log
+from .ragflow_config_watcher import RagflowConfigSnapshot
 
 
 class RagflowChatService:
@@ -27,71 +24,72 @@ class RagflowChatService:
         self.config = conn.config
         self.session_store = session_store
         self._client = conn.http
-        self._chat_ref_cache: dict[str, str] | None = None
-        self._chat_ref_cache_at_s: float = 0.0
-        self._config_mtime_ns: int | None = None
-        self._config_sig: tuple[str, str, float] | None = None
-        self._capture_config_state()
-
-    def _capture_config_state(self) -> None:
-        try:
-            st = self.config_path.stat()
-            self._config_mtime_ns = getattr(st, "st_mtime_ns", None) or int(st.st_mtime * 1_000_000_000)
-        except Exception:
-            self._config_mtime_ns = None
-        try:
-            base_url = str(self.config.get("base_url", DEFAULT_RAGFLOW_BASE_URL) or "")
-            api_key = str(self.config.get("api_key", "") or "")
-            timeout_s = float(self.config.get("timeout", 10) or 10)
-            self._config_sig = (base_url, api_key, timeout_s)
-        except Exception:
-            self._config_sig = None
+        # Async transport for streaming completions; None only for hand-built connections (tests).
+        self._async_client = getattr(conn, "async_http", None)
+        # Raw chat/agent id -> permission-group ref, refreshed stale-while-revalidate in the background.
+        self._chat_ref_index: StaleWhileRevalidate[dict[str, str]] = StaleWhileRevalidate(
+            "chat_refs",
+            self._fetch_chat_ref_index,
+            ttl_s=30.0,
+            max_stale_s=300.0,
+            logger=self.logger,
+        )
+        self._config_watcher = conn.watcher
+        if self._config_watcher is not None:
+            self._config_watcher.subscribe(self._apply_config_snapshot)
 
     def _reload_config_if_changed(self) -> None:
+        # New snapshots are pushed by the shared config watcher; without a running watcher
+        # (scripts) this re-checks the file at most once per poll interval.
+        if self._config_watcher is not None:
+            self._config_watcher.poll()
+
+    def _apply_config_snapshot(self, snapshot: RagflowConfigSnapshot) -> None:
+        self.config = dict(snapshot.config)
+        self._invalidate_chat_ref_index()
         try:
-            st = self.config_path.stat()
-            mtime_ns = getattr(st, "st_mtime_ns", None) or int(st.st_mtime * 1_000_000_000)
+            logging.getLogger("uvicorn.error").warning(
+                "RAGFlow chat config reloaded: base_url=%s api_key=%s",
+                snapshot.base_url,
+                format_api_key_for_log(snapshot.api_key),
+            )
         except Exception:
-            mtime_ns = None
-
-        if mtime_ns is not None and self._config_mtime_ns is not None and mtime_ns == self._config_mtime_ns:
-            return
+            pass
 
-        new_config = load_ragflow_config(self.config_path, logger=self.logger)
-        if not isinstance(new_config, dict):
-            return
+    async def aclose(self) -> None:
+        if self._async_client is not None:
+            await self._async_client.aclose()
 
-        try:
-            new_base_url = str(new_config.get("base_url", DEFAULT_RAGFLOW_BASE_URL) or "")
-            new_api_key = effective_api_key(
-                base_url=new_base_url,
-                configured_api_key=str(new_config.get("api_key", "") or ""),
-            )
-            new_timeout_s = float(new_config.get("timeout", 10) or 10)
-            new_sig = (new_base_url, new_api_key, new_timeout_s)
-        except Exception:
+    @staticmethod
+    async def _iterate_in_thread(iterator: Iterator[dict]) -> AsyncIterator[dict]:
+        """Drain a blocking iterator from worker threads so the event loop stays free."""
+        sentinel = object()
+        while True:
+            item = await asyncio.to_thread(next, iterator, sentinel)
+            if item is sentinel:
+                return
+            yield item
+
+    async def _stream_completion(self, path: str, body: dict[str, Any]) -> AsyncIterator[dict]:
+        if self._async_client is not None:
+            async for obj in self._async_client.post_sse(path, body=body, timeout_s=30):
+                yield obj
             return
+        async for obj in self._iterate_in_thread(self._client.post_sse(path, body=body, timeout_s=30)):
+            yield obj
 
-        if self._config_sig is not None and new_sig == self._config_sig:
-            self._config_mtime_ns = mtime_ns
+    async def _stream_completion_frames(self, path: str, body: dict[str, Any]) -> AsyncIterator[bytes]:
+        if self._async_client is not None:
+            async for frame in self._async_client.post_sse_frames(path, body=body, timeout_s=30):
+                yield frame
             return
+        async for frame in self._iterate_in_thread(self._client.post_sse_frames(path, body=body, timeout_s=30)):
+            yield frame
 
-        new_config["base_url"] = new_base_url
-        new_config["api_key"] = new_api_key
-        self.config = new_config
-        self._client.set_config(RagflowHttpClientConfig(base_url=new_base_url, api_key=new_api_key, timeout_s=new_timeout_s))
-        self._chat_ref_cache = None
-        self._chat_ref_cache_at_s = 0.0
-        self._config_mtime_ns = mtime_ns
-        self._config_sig = new_sig
-        try:
-            logging.getLogger("uvicorn.error").warning(
-                "RAGFlow chat config reloaded: base_url=%s api_key=%s",
-                new_base_url,
-                format_api_key_for_log(new_api_key),
-            )
-        except Exception:
-            pass
+    async def _post_completion(self, path: str, body: dict[str, Any]) -> Optional[dict]:
+        if self._async_client is not None:
+            return await self._async_client.post_json(path, body=body)
+        return await asyncio.to_thread(self._client.post_json, path, body=body)
 
     def list_chats(
         self,
@@ -235,8 +233,7 @@ class RagflowChatService:
             self.logger.error("RAGFlow create_chat failed: %s", resp.get("message"))
             raise ValueError(str(resp.get("message") or "chat_create_failed"))
         data = resp.get("data")
-        self._chat_ref_cache = None
-        self._chat_ref_cache_at_s = 0.0
+        self._invalidate_chat_ref_index()
         return data if isinstance(data, dict) else None
 
     def update_chat(self, chat_id: str, payload: dict[str, Any]) -> Optional[dict]:
@@ -321,8 +318,7 @@ class RagflowChatService:
             # Best-effort: if update was applied but response was missing/invalid, avoid false failure.
             verified = _verify_update_applied(body)
             if verified:
-                self._chat_ref_cache = None
-                self._chat_ref_cache_at_s = 0.0
+                self._invalidate_chat_ref_index()
                 return verified
             return None
         if resp.get("code") != 0:
@@ -347,8 +343,7 @@ class RagflowChatService:
                 resp2 = self._client.put_json(f"/api/v1/chats/{chat_id}", body=minimal)
                 if resp2 and resp2.get("code") == 0:
                     data2 = _coerce_updated_chat(resp2, minimal)
-                    self._chat_ref_cache = None
-                    self._chat_ref_cache_at_s = 0.0
+                    self._invalidate_chat_ref_index()
                     return data2
                 if resp2 and resp2.get("code") != 0 and _is_dataset_ownership_error(resp2):
                     # Second-chance: some RAGFlow versions require keeping datasets that already
@@ -382,8 +377,7 @@ class RagflowChatService:
                         resp3 = self._client.put_json(f"/api/v1/chats/{chat_id}", body=minimal2)
                         if resp3 and resp3.get("code") == 0:
                             data3 = _coerce_updated_chat(resp3, minimal2)
-                            self._chat_ref_cache = None
-                            self._chat_ref_cache_at_s = 0.0
+                            self._invalidate_chat_ref_index()
                             return data3
                         if resp3 and resp3.get("code") != 0:
                             self.logger.error("RAGFlow update_chat failed (retry#2): %s", resp3.get("message"))
@@ -403,8 +397,7 @@ class RagflowChatService:
         if not data:
             # Some deployments return a wrapper without `code` (or other oddities). Try to verify.
             data = _verify_update_applied(body)
-        self._chat_ref_cache = None
-        self._chat_ref_cache_at_s = 0.0
+        self._invalidate_chat_ref_index()
         return data
 
     def delete_chat(self, chat_id: str) -> bool:
@@ -436,8 +429,7 @@ class RagflowChatService:
         # Prefer batch delete first; it's the most common contract across RAGFlow versions.
         resp = self._client.delete_json("/api/v1/chats", body={"ids": [chat_id]})
         if resp and resp.get("code") == 0:
-            self._chat_ref_cache = None
-            self._chat_ref_cache_at_s = 0.0
+            self._invalidate_chat_ref_index()
             return True
 
         if resp and _is_not_found(resp):
@@ -450,8 +442,7 @@ class RagflowChatService:
         # Fallback 1: older variants support DELETE /api/v1/chats/{id}
         resp2 = self._client.delete_json(f"/api/v1/chats/{chat_id}", body={})
         if resp2 and resp2.get("code") == 0:
-            self._chat_ref_cache = None
-            self._chat_ref_cache_at_s = 0.0
+            self._invalidate_chat_ref_index()
             return True
         if resp2 and _is_not_found(resp2):
             raise ValueError("chat_not_found")
@@ -462,8 +453,7 @@ class RagflowChatService:
         # Fallback 2: some gateways strip/deny DELETE bodies; use query params: ?ids=<id>
         resp3 = self._client.delete_json("/api/v1/chats", params={"ids": chat_id}, body=None)
         if resp3 and resp3.get("code") == 0:
-            self._chat_ref_cache = None
-            self._chat_ref_cache_at_s = 0.0
+            self._invalidate_chat_ref_index()
             return True
         if resp3 and _is_not_found(resp3):
             raise ValueError("chat_not_found")
@@ -472,8 +462,7 @@ class RagflowChatService:
             raise ValueError(str(resp3.get("message") or "chat_delete_failed"))
         return False
 
-        self._chat_ref_cache = None
-        self._chat_ref_cache_at_s = 0.0
+        self._invalidate_chat_ref_index()
         return True
 
     @staticmethod
@@ -529,15 +518,13 @@ class RagflowChatService:
         if resp and resp.get("code") == 0:
             data = resp.get("data")
             if isinstance(data, dict) and data.get("id"):
-                self._chat_ref_cache = None
-                self._chat_ref_cache_at_s = 0.0
+                self._invalidate_chat_ref_index()
                 return data
 
             # Some versions return null/non-dict even when applied; refetch.
             fresh = self.get_chat(chat_id)
             if isinstance(fresh, dict) and fresh.get("id"):
-                self._chat_ref_cache = None
-                self._chat_ref_cache_at_s = 0.0
+                self._invalidate_chat_ref_index()
                 return fresh
             return {"id": chat_id, **{k: payload.get(k) for k in payload.keys() if k != "id"}}
 
@@ -661,23 +648,43 @@ class RagflowChatService:
             聊天响应数据块
         """
         self._reload_config_if_changed()
-        body: dict[str, Any] = {"question": question, "stream": stream}
-        if session_id:
-            body["session_id"] = session_id
-        if user_id:
-            body["user_id"] = user_id
+        body = self._chat_completion_body(question, stream=stream, session_id=session_id, user_id=user_id)
 
         if stream:
-            for obj in self._client.post_sse(f"/api/v1/chats/{chat_id}/completions", body=body, timeout_s=30):
+            async for obj in self._stream_completion(f"/api/v1/chats/{chat_id}/completions", body):
                 yield obj
             return
 
-        payload = self._client.post_json(f"/api/v1/chats/{chat_id}/completions", body=body)
+        payload = await self._post_completion(f"/api/v1/chats/{chat_id}/completions", body)
         if payload is None:
             yield {"code": -1, "message": "Chat request failed"}
             return
         yield payload
 
+    async def chat_frames(
+        self,
+        chat_id: str,
+        question: str,
+        session_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> AsyncIterator[bytes]:
+        """Streaming `chat` that yields each upstream `data:` payload as raw JSON bytes (for passthrough relays)."""
+        self._reload_config_if_changed()
+        body = self._chat_completion_body(question, stream=True, session_id=session_id, user_id=user_id)
+        async for frame in self._stream_completion_frames(f"/api/v1/chats/{chat_id}/completions", body):
+            yield frame
+
+    @staticmethod
+    def _chat_completion_body(
+        question: str, *, stream: bool, session_id: Optional[str], user_id: Optional[str]
+    ) -> dict[str, Any]:
+        body: dict[str, Any] = {"question": question, "stream": stream}
+        if session_id:
+            body["session_id"] = session_id
+        if user_id:
+            body["user_id"] = user_id
+        return body
+
     def delete_sessions(
         self,
         chat_id: str,
@@ -832,8 +839,7 @@ class RagflowChatService:
         # Some versions return the created agent object directly.
         data = resp.get("data")
         if isinstance(data, dict) and data.get("id"):
-            self._chat_ref_cache = None
-            self._chat_ref_cache_at_s = 0.0
+            self._invalidate_chat_ref_index()
             return data
 
         # Best-effort: refetch newly created agent by title (newest first).
@@ -842,12 +848,10 @@ class RagflowChatService:
             if not isinstance(agent, dict):
                 continue
             if str(agent.get("title") or "").strip() == title:
-                self._chat_ref_cache = None
-                self._chat_ref_cache_at_s = 0.0
+                self._invalidate_chat_ref_index()
                 return agent
 
-        self._chat_ref_cache = None
-        self._chat_ref_cache_at_s = 0.0
+        self._invalidate_chat_ref_index()
         return None
 
     def update_agent(self, agent_id: str, payload: Dict[str, Any]) -> Optional[dict]:
@@ -878,8 +882,7 @@ class RagflowChatService:
             self.logger.error("RAGFlow update_agent failed: %s", resp.get("message"))
             raise ValueError(str(resp.get("message") or "agent_update_failed"))
 
-        self._chat_ref_cache = None
-        self._chat_ref_cache_at_s = 0.0
+        self._invalidate_chat_ref_index()
         return self.get_agent(agent_id) or {"id": agent_id, "title": body.get("title")}
 
     def delete_agent(self, agent_id: str) -> bool:
@@ -912,8 +915,7 @@ class RagflowChatService:
 
         resp = self._client.delete_json(f"/api/v1/agents/{agent_id}", body={})
         if resp and resp.get("code") == 0:
-            self._chat_ref_cache = None
-            self._chat_ref_cache_at_s = 0.0
+            self._invalidate_chat_ref_index()
             return True
         if resp and _is_not_found(resp):
             raise ValueError("agent_not_found")
@@ -924,8 +926,7 @@ class RagflowChatService:
         # Fallback: some versions accept batch delete.
         resp2 = self._client.delete_json("/api/v1/agents", body={"ids": [agent_id]})
         if resp2 and resp2.get("code") == 0:
-            self._chat_ref_cache = None
-            self._chat_ref_cache_at_s = 0.0
+            self._invalidate_chat_ref_index()
             return True
         if resp2 and _is_not_found(resp2):
             raise ValueError("agent_not_found")
@@ -952,28 +953,41 @@ class RagflowChatService:
                 result.append(f"agent_{agent['id']}")
         return result
 
-    def get_chat_ref_index(self, *, ttl_s: float = 30.0, page_size: int = 1000) -> dict[str, str]:
+    def _fetch_chat_ref_index(self, page_size: int = 1000) -> dict[str, str] | None:
+        # Unlike list_chats/list_agents, a failed listing yields None so the cache keeps the
+        # previous index instead of replacing it with an empty one.
+        self._reload_config_if_changed()
+        params: dict[str, Any] = {"page": 1, "page_size": page_size, "orderby": "create_time", "desc": "true"}
+        chats = self._client.try_get_list("/api/v1/chats", params=params, context="list_chats")
+        if chats is None:
+            return None
+        agents = self._client.try_get_list("/api/v1/agents", params=params, context="list_agents")
+        if agents is None:
+            return None
+        index: dict[str, str] = {}
+        for chat in chats:
+            if isinstance(chat, dict) and chat.get("id"):
+                index[str(chat["id"])] = f"chat_{chat['id']}"
+        for agent in agents:
+            if isinstance(agent, dict) and agent.get("id"):
+                index[str(agent["id"])] = f"agent_{agent['id']}"
+        return index
+
+    def get_chat_ref_index(self, *, max_age_s: float | None = None) -> dict[str, str]:
         """
         Map raw ids -> canonical permission-group refs (chat_<id> / agent_<id>).
+
+        Served from the background-refreshed index; pass `max_age_s` to require a fresher listing.
         """
-        from time import time as _time
+        return self._chat_ref_index.get(max_age_s=max_age_s) or {}
 
-        now_s = _time()
-        if self._chat_ref_cache and (now_s - self._chat_ref_cache_at_s) <= ttl_s:
-            return self._chat_ref_cache
+    def _invalidate_chat_ref_index(self) -> None:
+        # Drop the index after a local create/update/delete and re-list in the background.
+        self._chat_ref_index.invalidate()
 
-        index: dict[str, str] = {}
-        for ref in self.list_all_chat_ids(page_size=page_size):
-            if not isinstance(ref, str) or not ref:
-                continue
-            if ref.startswith("chat_"):
-                index[ref[5:]] = ref
-            elif ref.startswith("agent_"):
-                index[ref[6:]] = ref
-
-        self._chat_ref_cache = index
-        self._chat_ref_cache_at_s = now_s
-        return index
+    def chat_ref_index_stats(self) -> dict:
+        current = self._chat_ref_index.peek()
+        return {"refs": len(current) if current is not None else None, **self._chat_ref_index.stats()}
 
     def normalize_chat_ref(self, ref: str) -> str:
         """
@@ -1012,25 +1026,51 @@ class RagflowChatService:
             聊天响应数据块
         """
         self._reload_config_if_changed()
-        body: dict[str, Any] = {"question": question, "stream": stream}
-        if session_id:
-            body["session_id"] = session_id
-        if inputs:
-            body["inputs"] = inputs
-        if user_id:
-            body["user"] = user_id
+        body = self._agent_completion_body(question, stream=stream, session_id=session_id, inputs=inputs, user_id=user_id)
 
         if stream:
-            for obj in self._client.post_sse(f"/api/v1/agents/{agent_id}/completions", body=body, timeout_s=30):
+            async for obj in self._stream_completion(f"/api/v1/agents/{agent_id}/completions", body):
                 yield obj
             return
 
-        payload = self._client.post_json(f"/api/v1/agents/{agent_id}/completions", body=body)
+        payload = await self._post_completion(f"/api/v1/agents/{agent_id}/completions", body)
         if payload is None:
             yield {"code": -1, "message": "Agent chat request failed"}
             return
         yield payload
 
+    async def agent_chat_frames(
+        self,
+        agent_id: str,
+        question: str,
+        session_id: Optional[str] = None,
+        inputs: Optional[dict] = None,
+        user_id: Optional[str] = None,
+    ) -> AsyncIterator[bytes]:
+        """Streaming `agent_chat` that yields each upstream `data:` payload as raw JSON bytes."""
+        self._reload_config_if_changed()
+        body = self._agent_completion_body(question, stream=True, session_id=session_id, inputs=inputs, user_id=user_id)
+        async for frame in self._stream_completion_frames(f"/api/v1/agents/{agent_id}/completions", body):
+            yield frame
+
+    @staticmethod
+    def _agent_completion_body(
+        question: str,
+        *,
+        stream: bool,
+        session_id: Optional[str],
+        inputs: Optional[dict],
+        user_id: Optional[str],
+    ) -> dict[str, Any]:
+        body: dict[str, Any] = {"question": question, "stream": stream}
+        if session_id:
+            body["session_id"] = session_id
+        if inputs:
+            body["inputs"] = inputs
+        if user_id:
+            body["user"] = user_id
+        return body
+
     def retrieve_chunks(
         self,
         question: str,
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Mapping
+
+from .ragflow_config import DEFAULT_RAGFLOW_BASE_URL, effective_api_key, load_ragflow_config
+from .ragflow_http_client import TRANSPORT_CONFIG_KEYS
+
+try:
+    import watchfiles
+except ImportError:  # pragma: no cover - watchfiles ships with uvicorn[standard]
+    watchfiles = None
+
+
+def _stat_mtime_ns(path: Path) -> int | None:
+    try:
+        st = path.stat()
+        return getattr(st, "st_mtime_ns", None) or int(st.st_mtime * 1_000_000_000)
+    except Exception:
+        return None
+
+
+@dataclass(frozen=True)
+class RagflowConfigSnapshot:
+    config: Mapping[str, Any]
+    base_url: str
+    api_key: str
+    timeout_s: float
+    mtime_ns: int | None = None
+    version: int = 0
+
+    @property
+    def sig(self) -> tuple[Any, ...]:
+        # Pool / retry keys are included so the transport subscriber sees their edits too.
+        transport = tuple(self.config.get(key) for key in TRANSPORT_CONFIG_KEYS)
+        return (self.base_url, self.api_key, self.timeout_s, transport)
+
+    @classmethod
+    def build(cls, raw: dict[str, Any], *, mtime_ns: int | None = None, version: int = 0) -> "RagflowConfigSnapshot":
+        config = dict(raw or {})
+        base_url = str(config.get("base_url", DEFAULT_RAGFLOW_BASE_URL) or DEFAULT_RAGFLOW_BASE_URL)
+        api_key = effective_api_key(base_url=base_url, configured_api_key=str(config.get("api_key", "") or ""))
+        try:
+            timeout_s = float(config.get("timeout", 10) or 10)
+        except (TypeError, ValueError):
+            timeout_s = 10.0
+        config["base_url"] = base_url
+        config["api_key"] = api_key
+        return cls(
+            config=MappingProxyType(config),
+            base_url=base_url,
+            api_key=api_key,
+            timeout_s=timeout_s,
+            mtime_ns=mtime_ns,
+            version=version,
+        )
+
+
+class RagflowConfigWatcher:
+    """
+    Watches `ragflow_config.json` and publishes an immutable `RagflowConfigSnapshot` on change.
+
+    - `current` is a single attribute read; services and the HTTP clients `subscribe()` and are
+      pushed each new snapshot instead of stat()-ing the file on every call.
+    - `start()` watches the config directory with inotify (via watchfiles) plus a slow safety
+      re-check, or polls every `poll_interval_s` when watchfiles is unavailable or
+      `force_polling` is set (e.g. bind mounts that do not deliver events).
+    - Until started (scripts, tests), `poll()` re-checks the file at most once per interval.
+    A snapshot is published only when base_url / api_key or a transport key (timeouts, pool
+    sizing, retries) actually change.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        initial: RagflowConfigSnapshot | None = None,
+        poll_interval_s: float = 2.0,
+        force_polling: bool = False,
+        logger: logging.Logger | None = None,
+    ):
+        self.path = Path(path)
+        self._poll_interval_s = max(0.05, float(poll_interval_s))
+        self._force_polling = bool(force_polling)
+        self._logger = logger or logging.getLogger(__name__)
+        if initial is None:
+            initial = RagflowConfigSnapshot.build(load_ragflow_config(self.path, logger=self._logger), mtime_ns=_stat_mtime_ns(self.path))
+        self._snapshot = initial
+        self._seen_mtime_ns = initial.mtime_ns if initial.mtime_ns is not None else _stat_mtime_ns(self.path)
+        self._subscribers: list[Callable[[RagflowConfigSnapshot], Any]] = []
+        self._check_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._mode = "stopped"
+        self._last_check_s = time.monotonic()
+        self._checks = 0
+        self._reloads = 0
+        self._errors = 0
+
+    @property
+    def current(self) -> RagflowConfigSnapshot:
+        return self._snapshot
+
+    def subscribe(self, callback: Callable[[RagflowConfigSnapshot], Any]) -> None:
+        with self._check_lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[RagflowConfigSnapshot], Any]) -> None:
+        with self._check_lock:
+            try:
+                self._subscribers.remove(callback)
+            except ValueError:
+                pass
+
+    # -------------------- change detection --------------------
+
+    def check(self) -> bool:
+        """Re-read the file if its mtime moved; returns True when a new snapshot was published."""
+        with self._check_lock:
+            self._last_check_s = time.monotonic()
+            self._checks += 1
+            mtime_ns = _stat_mtime_ns(self.path)
+            if mtime_ns is not None and mtime_ns == self._seen_mtime_ns:
+                return False
+            raw = load_ragflow_config(self.path, logger=self._logger)
+            if not isinstance(raw, dict):
+                return False
+            self._seen_mtime_ns = mtime_ns
+            current = self._snapshot
+            candidate = RagflowConfigSnapshot.build(raw, mtime_ns=mtime_ns, version=current.version + 1)
+            if candidate.sig == current.sig:
+                return False
+            self._snapshot = candidate
+            self._reloads += 1
+            subscribers = list(self._subscribers)
+            # Subscribers run under the check lock so every one sees snapshots in version order.
+            for callback in subscribers:
+                try:
+                    callback(candidate)
+                except Exception:
+                    self._errors += 1
+                    self._logger.warning("RAGFlow config subscriber failed", exc_info=True)
+            return True
+
+    def poll(self) -> None:
+        """Hot-path hook: a no-op while the watcher runs, otherwise a throttled `check()`."""
+        if self._thread is not None:
+            return
+        if time.monotonic() - self._last_check_s < self._poll_interval_s:
+            return
+        self.check()
+
+    # -------------------- lifecycle --------------------
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        use_inotify = watchfiles is not None and not self._force_polling and self.path.parent.is_dir()
+        self._mode = "inotify" if use_inotify else "poll"
+        target = self._watch_loop if use_inotify else self._poll_loop
+        self._thread = threading.Thread(target=target, name="ragflow_config_watcher", daemon=True)
+        self._thread.start()
+        # Catch edits made between construction and start.
+        self.check()
+
+    def stop(self, timeout_s: float = 5.0) -> None:
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop_event.set()
+        thread.join(timeout=timeout_s)
+        self._thread = None
+        self._mode = "stopped"
+
+    def _poll_loop(self) -> None:
+        while not self._stop_event.wait(self._poll_interval_s):
+            try:
+                self.check()
+            except Exception:
+                self._errors += 1
+                self._logger.warning("RAGFlow config check failed", exc_info=True)
+
+    def _watch_loop(self) -> None:
+        name = self.path.name
+        # Editors and deploy tooling often replace the file, so watch the directory, not the inode.
+        safety_ms = int(max(self._poll_interval_s * 15, 30.0) * 1000)
+        try:
+            for _changes in watchfiles.watch(
+                self.path.parent,
+                watch_filter=lambda _change, p: Path(p).name == name,
+                stop_event=self._stop_event,
+                rust_timeout=safety_ms,
+                yield_on_timeout=True,
+                recursive=False,
+                raise_interrupt=False,
+            ):
+                try:
+                    self.check()
+                except Exception:
+                    self._errors += 1
+                    self._logger.warning("RAGFlow config check failed", exc_info=True)
+        except Exception:
+            if self._stop_event.is_set():
+                return
+            self._errors += 1
+            self._logger.warning("RAGFlow config file watch failed; falling back to polling", exc_info=True)
+            self._mode = "poll"
+            self._poll_loop()
+
+    def stats(self) -> dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "path": str(self.path),
+            "mode": self._mode,
+            "version": snapshot.version,
+            "base_url": snapshot.base_url,
+            "poll_interval_s": self._poll_interval_s,
+            "checks": self._checks,
+            "reloads": self._reloads,
+            "errors": self._errors,
+        }
@@ -13,6 +13,8 @@ from .ragflow_config import (
     load_ragflow_config,
     mask_api_key,
 )
+from .ragflow_async_http_client import AsyncRagflowHttpClient
+from .ragflow_config_watcher import RagflowConfigSnapshot, RagflowConfigWatcher
 from .ragflow_http_client import RagflowHttpClient, RagflowHttpClientConfig
 
 
@@ -21,12 +23,17 @@ class RagflowConnection:
     config_path: Path
     config: dict[str, Any]
     http: RagflowHttpClient
+    async_http: AsyncRagflowHttpClient | None = None
+    # Shared by every service built on this connection; None for hand-built connections (tests).
+    watcher: RagflowConfigWatcher | None = None
 
 
 def create_ragflow_connection(
     *,
     config_path: str | Path | None = None,
     logger: logging.Logger | None = None,
+    poll_interval_s: float = 2.0,
+    force_polling: bool = False,
 ) -> RagflowConnection:
     log = logger or logging.getLogger(__name__)
     ui_log = logging.getLogger("uvicorn.error")
@@ -50,12 +57,25 @@ def create_ragflow_connection(
         )
     except Exception:
         pass
-    http = RagflowHttpClient(
-        RagflowHttpClientConfig(
-            base_url=base_url,
-            api_key=api_key,
-            timeout_s=float(config.get("timeout", 10) or 10),
-        ),
+    http_config = RagflowHttpClientConfig.from_ragflow_config(config, base_url=base_url, api_key=api_key)
+    http = RagflowHttpClient(http_config, logger=log)
+    async_http = AsyncRagflowHttpClient(http_config, logger=log)
+
+    watcher = RagflowConfigWatcher(
+        path,
+        initial=RagflowConfigSnapshot.build(config),
+        poll_interval_s=poll_interval_s,
+        force_polling=force_polling,
         logger=log,
     )
-    return RagflowConnection(config_path=path, config=config, http=http)
+
+    def _apply_to_pool(snapshot: RagflowConfigSnapshot) -> None:
+        new_http_config = RagflowHttpClientConfig.from_ragflow_config(
+            dict(snapshot.config), base_url=snapshot.base_url, api_key=snapshot.api_key
+        )
+        http.set_config(new_http_config)
+        async_http.set_config(new_http_config)
+
+    # The transport subscribes first so services see the new pool when their callbacks run.
+    watcher.subscribe(_apply_to_pool)
+    return RagflowConnection(config_path=path, config=config, http=http, async_http=async_http, watcher=watcher)
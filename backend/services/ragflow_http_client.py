@@ -1,10 +1,133 @@
 from __future__ import annotations
 
+import json
 import logging
+import os
+import threading
+import uuid
 from dataclasses import dataclass
-from typing import Any, Iterator
+from typing import Any, BinaryIO, Callable, Iterator
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Only safe methods are retried on read errors / retryable statuses: a PUT or DELETE that
+# timed out behind a proxy may already have been applied upstream, and re-sending it turns a
+# success into a reported failure. Connection establishment failures are retried for every
+# method (the request never reached upstream).
+_RETRY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+_RETRY_STATUSES = (502, 503, 504)
+
+# `ragflow_config.json` keys read by `RagflowHttpClientConfig.from_ragflow_config`.
+TRANSPORT_CONFIG_KEYS = ("timeout", "connect_timeout", "pool_connections", "pool_maxsize", "max_retries", "retry_delay")
+
+
+def sse_data_payload(line: bytes) -> bytes | None:
+    """Payload of an SSE `data:` line, or None for blank lines, comments and other fields."""
+    if not line.startswith(b"data:"):
+        return None
+    payload = line[5:].strip()
+    return payload or None
+
+
+def sse_error_frame(code: int, message: str) -> bytes:
+    return json.dumps({"code": code, "message": message}, ensure_ascii=False).encode("utf-8")
+
+
+class MultipartFileBody:
+    """
+    `multipart/form-data` body with a single file part, read from disk on demand.
+
+    `requests` sends any object with `read()` and a length chunk by chunk under a fixed
+    Content-Length, so the file is never held in memory. `progress(sent, total)` is called as
+    the body is consumed.
+    """
+
+    def __init__(
+        self,
+        file_path: str | os.PathLike[str],
+        *,
+        filename: str,
+        field_name: str = "file",
+        content_type: str = "application/octet-stream",
+        progress: Callable[[int, int], None] | None = None,
+    ):
+        self.boundary = uuid.uuid4().hex
+        # HTML5-style escaping, as `requests`/urllib3 emit for `files=` uploads.
+        safe_name = "".join(
+            "%22" if ch == '"' else "\\\\" if ch == "\\" else f"%{ord(ch):02X}" if ord(ch) < 0x20 else ch
+            for ch in str(filename)
+        )
+        self._head = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field_name}"; filename="{safe_name}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode("utf-8")
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode("ascii")
+        self._file_path = file_path
+        self._file_size = os.path.getsize(file_path)
+        self._file: BinaryIO | None = None
+        self._parts = [self._head, None, self._tail]
+        self._part = 0
+        self._offset = 0
+        self._sent = 0
+        self._progress = progress
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    @property
+    def file_size(self) -> int:
+        return self._file_size
+
+    def __len__(self) -> int:
+        return len(self._head) + self._file_size + len(self._tail)
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self.read(256 * 1024)
+            if not chunk:
+                return
+            yield chunk
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = len(self)
+        out = bytearray()
+        while len(out) < size and self._part < len(self._parts):
+            want = size - len(out)
+            if self._part == 1:
+                if self._file is None:
+                    self._file = open(self._file_path, "rb")
+                data = self._file.read(want)
+                if not data:
+                    self.close()
+                    self._part += 1
+                    continue
+            else:
+                part = self._parts[self._part]
+                data = part[self._offset : self._offset + want]
+                self._offset += len(data)
+                if self._offset >= len(part):
+                    self._part += 1
+                    self._offset = 0
+            out += data
+        self._sent += len(out)
+        if out and self._progress is not None:
+            try:
+                self._progress(self._sent, len(self))
+            except Exception:
+                pass
+        return bytes(out)
+
+    def close(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            finally:
+                self._file = None
 
 
 @dataclass(frozen=True)
@@ -12,19 +135,171 @@ class RagflowHttpClientConfig:
     base_url: str
     api_key: str
     timeout_s: float = 10.0
+    connect_timeout_s: float = 5.0
+    pool_connections: int = 4
+    pool_maxsize: int = 32
+    max_retries: int = 2
+    retry_backoff_s: float = 0.5
+
+    @classmethod
+    def from_ragflow_config(cls, config: dict[str, Any], *, base_url: str, api_key: str) -> "RagflowHttpClientConfig":
+        """
+        Build the transport config from `ragflow_config.json`.
+
+        Optional keys (all have safe defaults):
+        - timeout / connect_timeout: read and connect timeouts in seconds
+        - pool_connections / pool_maxsize: keep-alive pool sizing (hosts / connections per host)
+        - max_retries / retry_delay: retry count and exponential backoff factor
+        """
+
+        def _num(key: str, default: float, *, minimum: float) -> float:
+            raw = config.get(key)
+            try:
+                value = float(raw) if raw not in (None, "") else default
+            except Exception:
+                value = default
+            return max(minimum, value)
+
+        return cls(
+            base_url=base_url,
+            api_key=api_key,
+            timeout_s=_num("timeout", 10.0, minimum=0.1),
+            connect_timeout_s=_num("connect_timeout", 5.0, minimum=0.1),
+            pool_connections=int(_num("pool_connections", 4, minimum=1)),
+            pool_maxsize=int(_num("pool_maxsize", 32, minimum=1)),
+            max_retries=int(_num("max_retries", 2, minimum=0)),
+            retry_backoff_s=_num("retry_delay", 0.5, minimum=0.0),
+        )
 
 
 class RagflowHttpClient:
+    """
+    Thin JSON/SSE client for the RAGFlow HTTP API.
+
+    All calls share one `requests.Session` with a keep-alive connection pool, so repeated calls
+    to the same RAGFlow host reuse TCP/TLS connections instead of reconnecting per request.
+    The session is rebuilt when `set_config()` changes the transport settings.
+    """
+
     def __init__(self, config: RagflowHttpClientConfig, *, logger: logging.Logger | None = None):
         self._config = config
         self._logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._session = self._build_session(config)
+        self._in_flight = 0
+        self._requests_total = 0
+        self._errors_total = 0
+        self._pool_rebuilds = 0
+        # Counters carried over from sessions retired by `set_config()`.
+        self._retired_connections = 0
+        self._retired_pool_requests = 0
 
     @property
     def config(self) -> RagflowHttpClientConfig:
         return self._config
 
     def set_config(self, config: RagflowHttpClientConfig) -> None:
-        self._config = config
+        with self._lock:
+            if config == self._config:
+                return
+            old_session = self._session
+            self._config = config
+            self._session = self._build_session(config)
+            connections, pool_requests = self._session_counters(old_session)
+            self._retired_connections += connections
+            self._retired_pool_requests += pool_requests
+            self._pool_rebuilds += 1
+        # Idle pooled connections are closed right away; connections still checked out by
+        # in-flight requests (e.g. SSE streams) are closed when those requests finish.
+        try:
+            old_session.close()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        with self._lock:
+            session = self._session
+        try:
+            session.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _build_session(config: RagflowHttpClientConfig) -> requests.Session:
+        retry = Retry(
+            total=config.max_retries,
+            connect=config.max_retries,
+            read=config.max_retries,
+            status=config.max_retries,
+            backoff_factor=config.retry_backoff_s,
+            status_forcelist=_RETRY_STATUSES,
+            allowed_methods=_RETRY_METHODS,
+            raise_on_status=False,
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=config.pool_connections,
+            pool_maxsize=config.pool_maxsize,
+            max_retries=retry,
+            pool_block=False,
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @staticmethod
+    def _session_counters(session: requests.Session) -> tuple[int, int]:
+        connections = 0
+        pool_requests = 0
+        for adapter in {id(a): a for a in session.adapters.values()}.values():
+            manager = getattr(adapter, "poolmanager", None)
+            pools = getattr(manager, "pools", None)
+            if pools is None:
+                continue
+            try:
+                keys = list(pools.keys())
+            except Exception:
+                continue
+            for key in keys:
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                connections += int(getattr(pool, "num_connections", 0) or 0)
+                pool_requests += int(getattr(pool, "num_requests", 0) or 0)
+        return connections, pool_requests
+
+    def pool_stats(self) -> dict[str, Any]:
+        """
+        Connection pool statistics for diagnostics.
+
+        `reuse_ratio` is the share of upstream requests served over an already-open connection.
+        """
+        with self._lock:
+            session = self._session
+            config = self._config
+            stats = {
+                "in_flight": self._in_flight,
+                "requests_total": self._requests_total,
+                "errors_total": self._errors_total,
+                "pool_rebuilds": self._pool_rebuilds,
+            }
+            retired_connections = self._retired_connections
+            retired_pool_requests = self._retired_pool_requests
+        connections, pool_requests = self._session_counters(session)
+        connections += retired_connections
+        pool_requests += retired_pool_requests
+        reused = max(0, pool_requests - connections)
+        stats.update(
+            {
+                "connections_opened": connections,
+                "pool_requests": pool_requests,
+                "reuse_ratio": round(reused / pool_requests, 4) if pool_requests else 0.0,
+                "pool_maxsize": config.pool_maxsize,
+                "max_retries": config.max_retries,
+            }
+        )
+        return stats
 
     def headers(self) -> dict[str, str]:
         return self._headers()
@@ -35,13 +310,159 @@ class RagflowHttpClient:
             "Content-Type": "application/json",
         }
 
-    def _timeout(self, timeout_s: float | None) -> float:
-        return float(timeout_s if timeout_s is not None else self._config.timeout_s)
+    def _timeout(self, timeout_s: float | None) -> tuple[float, float]:
+        read_timeout = float(timeout_s if timeout_s is not None else self._config.timeout_s)
+        return (min(float(self._config.connect_timeout_s), read_timeout), read_timeout)
+
+    def _url(self, path: str) -> str:
+        return f"{self._config.base_url.rstrip('/')}{path}"
+
+    def _send(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        with self._lock:
+            session = self._session
+            self._in_flight += 1
+            self._requests_total += 1
+        streamed = bool(kwargs.get("stream"))
+        try:
+            return session.request(method, url, **kwargs)
+        except Exception:
+            with self._lock:
+                self._errors_total += 1
+            if streamed:
+                self._release_in_flight()
+            raise
+        finally:
+            # Streamed responses stay in flight until the caller closes them.
+            if not streamed:
+                self._release_in_flight()
+
+    def _release_in_flight(self) -> None:
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        timeout_s: float | None = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """
+        Raw pooled request (binary downloads, multipart uploads). Raises on transport errors.
+
+        Only the Authorization header is added by default; `requests` sets Content-Type for
+        `json=` / `files=` payloads. Streaming (`stream=True`) is not supported here; use `post_sse`.
+        """
+        merged = {"Authorization": f"Bearer {self._config.api_key}"}
+        if headers:
+            merged.update(headers)
+        kwargs.pop("stream", None)
+        return self._send(
+            method.upper(),
+            self._url(path),
+            headers=merged,
+            params=params,
+            timeout=self._timeout(timeout_s),
+            **kwargs,
+        )
+
+    def post_multipart_file(
+        self,
+        path: str,
+        body: MultipartFileBody,
+        *,
+        timeout_s: float | None = None,
+    ) -> requests.Response:
+        """
+        POST a streamed multipart file body over the pooled session. Raises on transport errors.
+
+        The body is read once while sending, so only connection-establishment failures are retried.
+        """
+        try:
+            return self._send(
+                "POST",
+                self._url(path),
+                headers={
+                    "Authorization": f"Bearer {self._config.api_key}",
+                    "Content-Type": body.content_type,
+                    "Content-Length": str(len(body)),
+                },
+                data=body,
+                timeout=self._timeout(timeout_s),
+            )
+        finally:
+            body.close()
 
-    def get_json(self, path: str, *, params: dict[str, Any] | None = None) -> dict[str, Any] | None:
-        url = f"{self._config.base_url.rstrip('/')}{path}"
+    def download_to(
+        self,
+        path: str,
+        dest: BinaryIO,
+        *,
+        params: dict[str, Any] | None = None,
+        timeout_s: float | None = None,
+        chunk_size: int = 256 * 1024,
+    ) -> int | None:
+        """
+        GET a binary body and copy it into `dest` chunk by chunk (never fully buffered).
+
+        Returns the number of bytes written, or None on transport errors, non-200 statuses and
+        RAGFlow `{code, message}` JSON error bodies.
+        """
+        url = self._url(path)
         try:
-            resp = requests.get(url, headers=self._headers(), params=params, timeout=self._timeout(None))
+            resp = self._send(
+                "GET",
+                url,
+                headers={"Authorization": f"Bearer {self._config.api_key}"},
+                params=params,
+                stream=True,
+                timeout=self._timeout(timeout_s),
+            )
+        except Exception as exc:
+            self._logger.error("RAGFlow download %s failed: %s", url, exc)
+            return None
+
+        try:
+            if resp.status_code != 200:
+                self._logger.error("RAGFlow download %s failed: HTTP %s", url, resp.status_code)
+                return None
+            if "application/json" in (resp.headers.get("Content-Type") or "").lower():
+                # Error envelopes are tiny JSON documents; real JSON files are passed through.
+                body = resp.content
+                try:
+                    payload = json.loads(body)
+                except Exception:
+                    payload = None
+                if isinstance(payload, dict) and set(payload.keys()) == {"code", "message"}:
+                    self._logger.error("RAGFlow download %s failed: %s", url, payload.get("message"))
+                    return None
+                dest.write(body)
+                return len(body)
+            written = 0
+            for chunk in resp.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    dest.write(chunk)
+                    written += len(chunk)
+            return written
+        except Exception as exc:
+            self._logger.error("RAGFlow download %s failed: %s", url, exc)
+            return None
+        finally:
+            try:
+                resp.close()
+            except Exception:
+                pass
+            self._release_in_flight()
+
+    def get_json(
+        self, path: str, *, params: dict[str, Any] | None = None, timeout_s: float | None = None
+    ) -> dict[str, Any] | None:
+        url = self._url(path)
+        try:
+            resp = self._send("GET", url, headers=self._headers(), params=params, timeout=self._timeout(timeout_s))
         except Exception as exc:
             self._logger.error("RAGFlow GET %s failed: %s", url, exc)
             return None
@@ -59,16 +480,22 @@ class RagflowHttpClient:
         return data if isinstance(data, dict) else None
 
     def post_json(
-        self, path: str, *, body: dict[str, Any] | None = None, params: dict[str, Any] | None = None
+        self,
+        path: str,
+        *,
+        body: dict[str, Any] | None = None,
+        params: dict[str, Any] | None = None,
+        timeout_s: float | None = None,
     ) -> dict[str, Any] | None:
-        url = f"{self._config.base_url.rstrip('/')}{path}"
+        url = self._url(path)
         try:
-            resp = requests.post(
+            resp = self._send(
+                "POST",
                 url,
                 headers=self._headers(),
                 params=params,
                 json=body or {},
-                timeout=self._timeout(None),
+                timeout=self._timeout(timeout_s),
             )
         except Exception as exc:
             self._logger.error("RAGFlow POST %s failed: %s", url, exc)
@@ -95,20 +522,26 @@ class RagflowHttpClient:
         return data if isinstance(data, dict) else None
 
     def post_json_with_fallback(
-        self, path: str, *, body: dict[str, Any] | None = None, params: dict[str, Any] | None = None
+        self,
+        path: str,
+        *,
+        body: dict[str, Any] | None = None,
+        params: dict[str, Any] | None = None,
+        timeout_s: float | None = None,
     ) -> dict[str, Any]:
         """
         Prefer JSON payload; when JSON parsing fails or HTTP/request fails,
         return a structured error object containing raw response text when available.
         """
-        url = f"{self._config.base_url.rstrip('/')}{path}"
+        url = self._url(path)
         try:
-            resp = requests.post(
+            resp = self._send(
+                "POST",
                 url,
                 headers=self._headers(),
                 params=params,
                 json=body or {},
-                timeout=self._timeout(None),
+                timeout=self._timeout(timeout_s),
             )
         except Exception as exc:
             self._logger.error("RAGFlow POST %s failed: %s", url, exc)
@@ -146,16 +579,22 @@ class RagflowHttpClient:
             }
 
     def put_json(
-        self, path: str, *, body: dict[str, Any] | None = None, params: dict[str, Any] | None = None
+        self,
+        path: str,
+        *,
+        body: dict[str, Any] | None = None,
+        params: dict[str, Any] | None = None,
+        timeout_s: float | None = None,
     ) -> dict[str, Any] | None:
-        url = f"{self._config.base_url.rstrip('/')}{path}"
+        url = self._url(path)
         try:
-            resp = requests.put(
+            resp = self._send(
+                "PUT",
                 url,
                 headers=self._headers(),
                 params=params,
                 json=body or {},
-                timeout=self._timeout(None),
+                timeout=self._timeout(timeout_s),
             )
         except Exception as exc:
             self._logger.error("RAGFlow PUT %s failed: %s", url, exc)
@@ -182,20 +621,25 @@ class RagflowHttpClient:
         return data if isinstance(data, dict) else None
 
     def delete_json(
-        self, path: str, *, body: dict[str, Any] | None = None, params: dict[str, Any] | None = None
+        self,
+        path: str,
+        *,
+        body: dict[str, Any] | None = None,
+        params: dict[str, Any] | None = None,
+        timeout_s: float | None = None,
     ) -> dict[str, Any] | None:
-        url = f"{self._config.base_url.rstrip('/')}{path}"
+        url = self._url(path)
         try:
             kwargs: dict[str, Any] = {
                 "headers": self._headers(),
                 "params": params,
-                "timeout": self._timeout(None),
+                "timeout": self._timeout(timeout_s),
             }
             # Some gateways/proxies reject or strip DELETE request bodies. Allow callers to
             # omit the body by passing `body=None`.
             if body is not None:
                 kwargs["json"] = body
-            resp = requests.delete(url, **kwargs)
+            resp = self._send("DELETE", url, **kwargs)
         except Exception as exc:
             self._logger.error("RAGFlow DELETE %s failed: %s", url, exc)
             return None
@@ -212,23 +656,24 @@ class RagflowHttpClient:
 
         return data if isinstance(data, dict) else None
 
-    def post_sse(
+    def post_sse_frames(
         self,
         path: str,
         *,
         body: dict[str, Any] | None = None,
         params: dict[str, Any] | None = None,
         timeout_s: float | None = None,
-    ) -> Iterator[dict[str, Any]]:
+    ) -> Iterator[bytes]:
         """
-        POST an SSE endpoint and yield decoded JSON objects from `data:` lines.
+        POST an SSE endpoint and yield the raw payload of each `data:` line (undecoded JSON bytes).
 
-        Expected payload format per line:
-        - `data: {...json...}`
+        Transport/HTTP failures are yielded as an encoded `{code, message}` object, so callers can
+        forward every frame as-is.
         """
-        url = f"{self._config.base_url.rstrip('/')}{path}"
+        url = self._url(path)
         try:
-            resp = requests.post(
+            resp = self._send(
+                "POST",
                 url,
                 headers=self._headers(),
                 params=params,
@@ -238,38 +683,57 @@ class RagflowHttpClient:
             )
         except Exception as exc:
             self._logger.error("RAGFlow SSE POST %s failed: %s", url, exc)
-            yield {"code": -1, "message": str(exc)}
+            yield sse_error_frame(-1, str(exc))
             return
 
-        if resp.status_code != 200:
-            self._logger.error("RAGFlow SSE POST %s failed: HTTP %s", url, resp.status_code)
-            yield {"code": resp.status_code, "message": f"HTTP {resp.status_code}"}
-            return
+        try:
+            if resp.status_code != 200:
+                self._logger.error("RAGFlow SSE POST %s failed: HTTP %s", url, resp.status_code)
+                yield sse_error_frame(resp.status_code, f"HTTP {resp.status_code}")
+                return
 
-        for line in resp.iter_lines():
-            if not line:
-                continue
+            for line in resp.iter_lines():
+                payload = sse_data_payload(line)
+                if payload is None:
+                    continue
+                if payload == b"[DONE]":
+                    return
+                yield payload
+        finally:
+            # Return the connection to the pool (or drop it if the stream was abandoned mid-way).
             try:
-                text = line.decode("utf-8")
+                resp.close()
             except Exception:
-                continue
-            if not text.startswith("data:"):
-                continue
-            data_str = text[5:].strip()
-            if not data_str:
-                continue
-            if data_str == "[DONE]":
-                return
-            try:
-                import json as _json
+                pass
+            self._release_in_flight()
 
-                obj = _json.loads(data_str)
-            except Exception:
-                self._logger.warning("Failed to parse SSE data: %s", data_str)
-                continue
-            if isinstance(obj, dict):
+    def post_sse(
+        self,
+        path: str,
+        *,
+        body: dict[str, Any] | None = None,
+        params: dict[str, Any] | None = None,
+        timeout_s: float | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        POST an SSE endpoint and yield decoded JSON objects from `data:` lines.
+
+        Expected payload format per line:
+        - `data: {...json...}`
+        """
+        for payload in self.post_sse_frames(path, body=body, params=params, timeout_s=timeout_s):
+            obj = self._decode_sse_payload(payload)
+            if obj is not None:
                 yield obj
 
+    def _decode_sse_payload(self, payload: bytes) -> dict[str, Any] | None:
+        try:
+            obj = json.loads(payload)
+        except Exception:
+            self._logger.warning("Failed to parse SSE data: %s", payload[:200])
+            return None
+        return obj if isinstance(obj, dict) else None
+
     def coerce_list(self, value: Any, *, context: str) -> list[dict[str, Any]]:
         if value is None:
             return []
@@ -287,10 +751,22 @@ class RagflowHttpClient:
         data_field: str = "data",
         ok_code: int = 0,
     ) -> list[dict[str, Any]]:
+        return self.try_get_list(path, params=params, context=context, data_field=data_field, ok_code=ok_code) or []
+
+    def try_get_list(
+        self,
+        path: str,
+        *,
+        params: dict[str, Any] | None = None,
+        context: str,
+        data_field: str = "data",
+        ok_code: int = 0,
+    ) -> list[dict[str, Any]] | None:
+        """`get_list` that returns None (instead of []) when the request or the RAGFlow call failed."""
         payload = self.get_json(path, params=params)
         if not payload:
-            return []
+            return None
         if payload.get("code") != ok_code:
             self._logger.error("RAGFlow %s failed: %s", context, payload.get("message"))
-            return []
+            return None
         return self.coerce_list(payload.get(data_field, []), context=context)
@@ -2,13 +2,12 @@ import logging
 
 from .ragflow_config import (
     DEFAULT_RAGFLOW_BASE_URL,
-    effective_api_key,
     format_api_key_for_log,
     is_placeholder_api_key,
-    load_ragflow_config,
 )
+from .ragflow_config_watcher import RagflowConfigSnapshot
 from .ragflow_connection import RagflowConnection, create_ragflow_connection
-from .ragflow_http_client import RagflowHttpClientConfig
+from .ragflow.document_catalog import RagflowDocumentCatalog
 from .ragflow.mixins.datasets import RagflowDatasetsMixin
 from .ragflow.mixins.documents import RagflowDocumentsMixin
 
@@ -20,6 +19,7 @@ class RagflowService(RagflowDatasetsMixin, RagflowDocumentsMixin):
         logger: logging.Logger = None,
         *,
         connection: RagflowConnection | None = None,
+        document_catalog: RagflowDocumentCatalog | None = None,
     ):
         self.logger = logger or logging.getLogger(__name__)
         conn = connection or create_ragflow_connection(config_path=config_path, logger=self.logger)
@@ -27,31 +27,17 @@ class RagflowService(RagflowDatasetsMixin, RagflowDocumentsMixin):
         self.config = conn.config
         self.client = None
         self._http = conn.http
-        self._dataset_index_cache: dict[str, dict[str, str]] | None = None
-        self._dataset_index_cache_at_s: float = 0.0
-        self._config_mtime_ns: int | None = None
-        self._config_sig: tuple[str, str, float] | None = None
+        self._datasets_registry = None
+        self.document_catalog = document_catalog
+        self._config_watcher = conn.watcher
 
         try:
             self._init_client()
         except Exception as e:
             self.logger.warning(f"RAGFlow client initialization failed: {e}")
 
-        self._capture_config_state()
-
-    def _capture_config_state(self) -> None:
-        try:
-            st = self.config_path.stat()
-            self._config_mtime_ns = getattr(st, "st_mtime_ns", None) or int(st.st_mtime * 1_000_000_000)
-        except Exception:
-            self._config_mtime_ns = None
-        try:
-            base_url = str(self.config.get("base_url", DEFAULT_RAGFLOW_BASE_URL) or "")
-            api_key = str(self.config.get("api_key", "") or "")
-            timeout_s = float(self.config.get("timeout", 10) or 10)
-            self._config_sig = (base_url, api_key, timeout_s)
-        except Exception:
-            self._config_sig = None
+        if self._config_watcher is not None:
+            self._config_watcher.subscribe(self._apply_config_snapshot)
 
     def _reload_config_if_changed(self) -> None:
         """
@@ -59,46 +45,21 @@ class RagflowService(RagflowDatasetsMixin, RagflowDocumentsMixin):
 
         Reason: `create_dependencies()` constructs a single `RagflowService` instance at startup.
         If users/tooling update `ragflow_config.json` (e.g. base_url guardrail), the running
-        backend must pick it up without requiring a restart.
+        backend must pick it up without requiring a restart. The shared `RagflowConfigWatcher`
+        pushes new snapshots to `_apply_config_snapshot`; this hook only matters when the
+        watcher thread is not running (scripts), where it re-checks the file at most once per
+        poll interval.
         """
-        try:
-            st = self.config_path.stat()
-            mtime_ns = getattr(st, "st_mtime_ns", None) or int(st.st_mtime * 1_000_000_000)
-        except Exception:
-            mtime_ns = None
-
-        if mtime_ns is not None and self._config_mtime_ns is not None and mtime_ns == self._config_mtime_ns:
-            return
+        if self._config_watcher is not None:
+            self._config_watcher.poll()
 
-        new_config = load_ragflow_config(self.config_path, logger=self.logger)
-        if not isinstance(new_config, dict):
-            return
+    def _apply_config_snapshot(self, snapshot: RagflowConfigSnapshot) -> None:
+        old_base_url = str(self.config.get("base_url", "") or "")
+        self.config = dict(snapshot.config)
+        self._dataset_registry().invalidate()
 
         try:
-            new_base_url = str(new_config.get("base_url", DEFAULT_RAGFLOW_BASE_URL) or "")
-            new_api_key = effective_api_key(
-                base_url=new_base_url,
-                configured_api_key=str(new_config.get("api_key", "") or ""),
-            )
-            new_timeout_s = float(new_config.get("timeout", 10) or 10)
-            new_sig = (new_base_url, new_api_key, new_timeout_s)
-        except Exception:
-            return
-
-        if self._config_sig is not None and new_sig == self._config_sig:
-            self._config_mtime_ns = mtime_ns
-            return
-
-        old_base_url = (self._config_sig[0] if self._config_sig else "") or str(self.config.get("base_url", ""))
-        new_config["base_url"] = new_base_url
-        new_config["api_key"] = new_api_key
-        self.config = new_config
-        self._http.set_config(RagflowHttpClientConfig(base_url=new_base_url, api_key=new_api_key, timeout_s=new_timeout_s))
-        self._dataset_index_cache = None
-        self._dataset_index_cache_at_s = 0.0
-
-        try:
-            if is_placeholder_api_key(new_api_key):
+            if is_placeholder_api_key(snapshot.api_key):
                 self.client = None
             else:
                 self._init_client()
@@ -106,15 +67,13 @@ class RagflowService(RagflowDatasetsMixin, RagflowDocumentsMixin):
             self.client = None
             self.logger.warning(f"RAGFlow client re-init failed: {e}")
 
-        self._config_mtime_ns = mtime_ns
-        self._config_sig = new_sig
-        if old_base_url and new_base_url and old_base_url != new_base_url:
+        if old_base_url and snapshot.base_url and old_base_url != snapshot.base_url:
             try:
                 logging.getLogger("uvicorn.error").warning(
                     "RAGFlow base_url reloaded: %s -> %s api_key=%s",
                     old_base_url,
-                    new_base_url,
-                    format_api_key_for_log(new_api_key),
+                    snapshot.base_url,
+                    format_api_key_for_log(snapshot.api_key),
                 )
             except Exception:
                 pass
@@ -150,18 +109,26 @@ class RagflowService(RagflowDatasetsMixin, RagflowDocumentsMixin):
         if not self.client:
             return None
 
+        # Resolve through the shared registry and wrap the cached object for the SDK, instead of
+        # listing every dataset through `client.list_datasets()` on each call.
+        try:
+            ds = self._lookup_dataset(dataset_name)
+        except Exception as e:
+            self.logger.error(f"Failed to find dataset: {e}")
+            return None
+        if ds is None:
+            return None
+        try:
+            from ragflow_sdk.modules.dataset import DataSet
+
+            return DataSet(self.client, dict(ds))
+        except Exception as e:
+            self.logger.warning(f"Failed to wrap cached dataset, falling back to SDK listing: {e}")
+
         try:
-            datasets = self.client.list_datasets()
-            for dataset in datasets:
-                if hasattr(dataset, "name"):
-                    if dataset.name == dataset_name:
-                        return dataset
-                elif isinstance(dataset, dict):
-                    if dataset.get("name") == dataset_name:
-                        return dataset
-                else:
-                    if dataset_name in str(dataset):
-                        return dataset
+            for dataset in self.client.list_datasets(name=dataset_name):
+                if getattr(dataset, "name", None) == dataset_name:
+                    return dataset
         except Exception as e:
             self.logger.error(f"Failed to find dataset: {e}")
         return None
@@ -8,7 +8,7 @@ from dataclasses import dataclass
 from typing import Any
 
 from backend.database.paths import resolve_auth_db_path
-from backend.database.sqlite import connect_sqlite
+from backend.database.sqlite import pooled_connection
 
 
 @dataclass(frozen=True)
@@ -36,7 +36,7 @@ class SearchConfigStore:
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
     def _conn(self):
-        return connect_sqlite(self.db_path)
+        return pooled_connection(self.db_path)
 
     def list(self) -> list[SearchConfig]:
         conn = self._conn()
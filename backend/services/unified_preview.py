@@ -3,7 +3,102 @@ from __future__ import annotations
 import base64
 import html
 import io
+import json
 from pathlib import Path
+from typing import Callable
+
+# Bump when conversion output changes so cached previews from older renderers are not served.
+PREVIEW_CONVERTER_VERSION = "1"
+
+_HTML_MEDIA_TYPE = "text/html; charset=utf-8"
+
+_IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp"}
+
+
+def _cached_conversion(
+    file_content: bytes, kind: str, producer: Callable[[], bytes], content_sha256: str | None = None
+) -> bytes:
+    try:
+        from backend.services.preview_cache import get_preview_cache
+
+        cache = get_preview_cache()
+    except Exception:
+        # The cache is an optimisation only; conversion errors must surface unchanged.
+        return producer()
+    if content_sha256:
+        # Digest recorded at upload time: no need to hash the file again.
+        key = cache.make_key_for_digest(content_sha256, kind, PREVIEW_CONVERTER_VERSION)
+    else:
+        key = cache.make_key(file_content, kind, PREVIEW_CONVERTER_VERSION)
+    return cache.get_or_create(key, producer)
+
+
+def _office_html_bytes(file_content: bytes, filename: str, file_ext: str, content_sha256: str | None = None) -> bytes:
+    def convert() -> bytes:
+        from backend.services.office_to_html import convert_office_bytes_to_html_bytes
+
+        return convert_office_bytes_to_html_bytes(file_content, filename=filename)
+
+    return _cached_conversion(file_content, f"office_html{file_ext}", convert, content_sha256)
+
+
+def _body_fields(data: bytes, *, media_type: str, filename: str, delivery: str) -> dict:
+    """`content` (base64) for inline delivery; signed URL + size/etag metadata for `delivery=url`."""
+    if delivery == "url":
+        from backend.services.preview_blobs import get_preview_blob_store
+
+        ref = get_preview_blob_store().publish(data, media_type=media_type, filename=filename)
+        if ref is not None:
+            return ref
+    return {"content": base64.b64encode(data).decode("utf-8")}
+
+
+def _image_media_type(image_type: str) -> str:
+    return "image/jpeg" if image_type == "jpg" else f"image/{image_type}"
+
+
+def file_preview_payload(
+    path: str | Path,
+    filename: str,
+    *,
+    delivery: str = "inline",
+    content_sha256: str | None = None,
+) -> dict | None:
+    """
+    URL-delivery payload for an image/PDF that is already on local disk with a known digest
+    (staged knowledge uploads), published straight from `path` without reading or rehashing it.
+
+    Returns None when that shortcut does not apply (inline delivery, no digest, a type that needs
+    conversion, blob store disabled); callers then read the file and use `build_preview_payload`.
+    """
+    if (delivery or "inline").strip().lower() != "url" or not content_sha256:
+        return None
+    file_ext = Path(filename).suffix.lower()
+    if file_ext == ".pdf":
+        kind, media_type = "pdf", "application/pdf"
+    elif file_ext in _IMAGE_EXTENSIONS:
+        kind, media_type = "image", _image_media_type(file_ext[1:])
+    else:
+        return None
+
+    from backend.services.preview_blobs import get_preview_blob_store
+
+    ref = get_preview_blob_store().publish_file(path, content_sha256=content_sha256, media_type=media_type, filename=filename)
+    if ref is None:
+        return None
+    if kind == "image":
+        return {"type": "image", "filename": filename, **ref, "image_type": file_ext[1:]}
+    return {"type": "pdf", "filename": filename, **ref}
+
+
+def _xlsx_sheets_cached(file_content: bytes, content_sha256: str | None = None) -> dict[str, str]:
+    raw = _cached_conversion(
+        file_content,
+        "xlsx_sheets",
+        lambda: json.dumps(_xlsx_bytes_to_sheets_html(file_content), ensure_ascii=False).encode("utf-8"),
+        content_sha256,
+    )
+    return json.loads(raw.decode("utf-8"))
 
 
 def _xlsx_bytes_to_sheets_html(file_content: bytes, *, max_rows: int = 200, max_cols: int = 60) -> dict[str, str]:
@@ -55,7 +150,23 @@ def _sheets_html_to_single_html(sheets: dict[str, str]) -> bytes:
     return "\n".join(parts).encode("utf-8")
 
 
-def build_preview_payload(file_content: bytes, filename: str | None, doc_id: str | None = None, *, render: str = "default") -> dict:
+def needs_office_conversion(filename: str | None, render: str = "default") -> bool:
+    """Whether `build_preview_payload` runs an office (soffice) conversion for this file and render mode."""
+    file_ext = Path(filename or "").suffix.lower()
+    if file_ext in {".doc", ".docx"}:
+        return True
+    return file_ext in {".xlsx", ".xls"} and (render or "default").strip().lower() == "html"
+
+
+def build_preview_payload(
+    file_content: bytes,
+    filename: str | None,
+    doc_id: str | None = None,
+    *,
+    render: str = "default",
+    delivery: str = "inline",
+    content_sha256: str | None = None,
+) -> dict:
     """
     Return a unified preview JSON payload:
       - text:  {type:'text', filename, content}
@@ -64,12 +175,16 @@ def build_preview_payload(file_content: bytes, filename: str | None, doc_id: str
       - html:  {type:'html', filename, source_filename, content(base64)}
       - excel: {type:'excel', filename, sheets:{sheetName: html}}
       - unsupported: {type:'unsupported', filename, message}
+
+    With `delivery="url"` image/pdf/html carry `{delivery:'url', url, size, etag, media_type, expires_at}`
+    instead of `content`; the URL streams the raw bytes (see services/preview_blobs.py).
+    `content_sha256`, when known (local uploads), keys the conversion cache without rehashing.
     """
+    delivery = (delivery or "inline").strip().lower()
     filename = filename or (f"document_{doc_id}" if doc_id else "document")
     file_ext = Path(filename).suffix.lower()
 
     text_extensions = {".txt", ".md", ".csv", ".json", ".xml", ".log", ".svg", ".html", ".css", ".js"}
-    image_extensions = {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp"}
 
     if file_ext in text_extensions:
         try:
@@ -81,25 +196,26 @@ def build_preview_payload(file_content: bytes, filename: str | None, doc_id: str
                 return {"type": "unsupported", "filename": filename, "message": "无法解码文本文件"}
         return {"type": "text", "filename": filename, "content": text_content}
 
-    if file_ext in image_extensions:
-        base64_image = base64.b64encode(file_content).decode("utf-8")
+    if file_ext in _IMAGE_EXTENSIONS:
         image_type = file_ext[1:]
-        return {"type": "image", "filename": filename, "content": base64_image, "image_type": image_type}
+        body = _body_fields(file_content, media_type=_image_media_type(image_type), filename=filename, delivery=delivery)
+        return {"type": "image", "filename": filename, **body, "image_type": image_type}
 
     if file_ext == ".pdf":
-        base64_pdf = base64.b64encode(file_content).decode("utf-8")
-        return {"type": "pdf", "filename": filename, "content": base64_pdf}
+        body = _body_fields(file_content, media_type="application/pdf", filename=filename, delivery=delivery)
+        return {"type": "pdf", "filename": filename, **body}
 
     if file_ext in {".doc", ".docx"}:
         try:
-            from backend.services.office_to_html import convert_office_bytes_to_html_bytes
-
-            html_bytes = convert_office_bytes_to_html_bytes(
-                file_content, filename=filename or ("input.docx" if file_ext == ".docx" else "input.doc")
+            html_bytes = _office_html_bytes(
+                file_content,
+                filename or ("input.docx" if file_ext == ".docx" else "input.doc"),
+                file_ext,
+                content_sha256,
             )
-            base64_html = base64.b64encode(html_bytes).decode("utf-8")
             out_name = f"{Path(filename).stem}.html" if filename else f"document_{doc_id}.html"
-            return {"type": "html", "filename": out_name, "source_filename": filename, "content": base64_html}
+            body = _body_fields(html_bytes, media_type=_HTML_MEDIA_TYPE, filename=out_name, delivery=delivery)
+            return {"type": "html", "filename": out_name, "source_filename": filename, **body}
         except Exception as e:
             label = "DOCX" if file_ext == ".docx" else "DOC"
             if file_ext == ".docx" and "soffice not found" in str(e).lower():
@@ -107,9 +223,9 @@ def build_preview_payload(file_content: bytes, filename: str | None, doc_id: str
                     from backend.services.docx_to_html_fallback import convert_docx_bytes_to_html_bytes_fallback
 
                     html_bytes = convert_docx_bytes_to_html_bytes_fallback(file_content)
-                    base64_html = base64.b64encode(html_bytes).decode("utf-8")
                     out_name = f"{Path(filename).stem}.html" if filename else f"document_{doc_id}.html"
-                    return {"type": "html", "filename": out_name, "source_filename": filename, "content": base64_html}
+                    body = _body_fields(html_bytes, media_type=_HTML_MEDIA_TYPE, filename=out_name, delivery=delivery)
+                    return {"type": "html", "filename": out_name, "source_filename": filename, **body}
                 except Exception as e2:
                     return {"type": "unsupported", "filename": filename, "message": f"DOCX preview unavailable: {str(e2)}"}
             return {"type": "unsupported", "filename": filename, "message": f"{label} preview unavailable: {str(e)}"}
@@ -120,7 +236,7 @@ def build_preview_payload(file_content: bytes, filename: str | None, doc_id: str
         if mode != "html":
             if file_ext == ".xlsx":
                 try:
-                    sheets = _xlsx_bytes_to_sheets_html(file_content)
+                    sheets = _xlsx_sheets_cached(file_content, content_sha256)
                     return {"type": "excel", "filename": filename, "sheets": sheets}
                 except Exception as e:
                     return {"type": "unsupported", "filename": filename, "message": f"Excel 预览失败：{str(e)}"}
@@ -128,20 +244,18 @@ def build_preview_payload(file_content: bytes, filename: str | None, doc_id: str
 
         # render=html
         try:
-            from backend.services.office_to_html import convert_office_bytes_to_html_bytes
-
-            html_bytes = convert_office_bytes_to_html_bytes(file_content, filename=filename or "input.xlsx")
-            base64_html = base64.b64encode(html_bytes).decode("utf-8")
+            html_bytes = _office_html_bytes(file_content, filename or "input.xlsx", file_ext, content_sha256)
             out_name = f"{Path(filename).stem}.html" if filename else f"document_{doc_id}.html"
-            return {"type": "html", "filename": out_name, "source_filename": filename, "content": base64_html}
+            body = _body_fields(html_bytes, media_type=_HTML_MEDIA_TYPE, filename=out_name, delivery=delivery)
+            return {"type": "html", "filename": out_name, "source_filename": filename, **body}
         except Exception:
             if file_ext == ".xlsx":
                 try:
-                    sheets = _xlsx_bytes_to_sheets_html(file_content)
+                    sheets = _xlsx_sheets_cached(file_content, content_sha256)
                     html_bytes = _sheets_html_to_single_html(sheets)
-                    base64_html = base64.b64encode(html_bytes).decode("utf-8")
                     out_name = f"{Path(filename).stem}.html" if filename else f"document_{doc_id}.html"
-                    return {"type": "html", "filename": out_name, "source_filename": filename, "content": base64_html}
+                    body = _body_fields(html_bytes, media_type=_HTML_MEDIA_TYPE, filename=out_name, delivery=delivery)
+                    return {"type": "html", "filename": out_name, "source_filename": filename, **body}
                 except Exception as e2:
                     return {"type": "unsupported", "filename": filename, "message": f"Excel 原样预览(HTML)失败：{str(e2)}"}
             return {"type": "unsupported", "filename": filename, "message": "暂不支持 .xls 原样预览(HTML)（请下载查看）"}
@@ -5,7 +5,7 @@ import time
 from dataclasses import dataclass
 
 from backend.database.paths import resolve_auth_db_path
-from backend.database.sqlite import connect_sqlite
+from backend.database.sqlite import pooled_connection
 
 
 @dataclass(frozen=True)
@@ -20,7 +20,7 @@ class UploadSettingsStore:
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
     def _conn(self):
-        return connect_sqlite(self.db_path)
+        return pooled_connection(self.db_path)
 
     @staticmethod
     def _normalize_extensions(raw) -> list[str]:
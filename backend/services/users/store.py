@@ -5,8 +5,9 @@ import time
 import uuid
 from typing import Optional, List, Set
 
+from backend.app.core.permission_cache import bump_permission_generation
 from backend.database.paths import resolve_auth_db_path
-from backend.database.sqlite import connect_sqlite
+from backend.database.sqlite import pooled_connection
 
 from .models import User
 from .password import hash_password
@@ -18,7 +19,7 @@ class UserStore:
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
     def _get_connection(self):
-        return connect_sqlite(self.db_path)
+        return pooled_connection(self.db_path)
 
     def get_by_username(self, username: str) -> Optional[User]:
         conn = self._get_connection()
@@ -66,7 +67,9 @@ class UserStore:
                 """
                 SELECT user_id, username, password_hash, email, role, group_id, company_id, department_id, status,
                        max_login_sessions, idle_timeout_minutes,
-                       created_at_ms, last_login_at_ms, created_by
+                       created_at_ms, last_login_at_ms, created_by,
+                       (SELECT group_concat(upg.group_id) FROM user_permission_groups upg
+                        WHERE upg.user_id = users.user_id) AS group_ids_csv
                 FROM users WHERE user_id = ?
                 """,
                 (user_id,),
@@ -89,7 +92,8 @@ class UserStore:
                     last_login_at_ms=row[12],
                     created_by=row[13],
                 )
-                user.group_ids = self._get_user_group_ids(user.user_id, conn)
+                # Group ids come from the same statement: this runs on every authenticated request.
+                user.group_ids = [int(gid) for gid in str(row[14] or "").split(",") if gid]
                 user.group_id = user.group_ids[0] if user.group_ids else None
                 return user
             return None
@@ -250,6 +254,7 @@ class UserStore:
         try:
             cursor.execute(query, params)
             conn.commit()
+            bump_permission_generation()
             return self.get_by_user_id(user_id)
         finally:
             conn.close()
@@ -370,6 +375,7 @@ class UserStore:
         try:
             cursor.execute("DELETE FROM users WHERE user_id = ?", (user_id,))
             conn.commit()
+            bump_permission_generation()
             return cursor.rowcount > 0
         finally:
             conn.close()
@@ -425,6 +431,7 @@ class UserStore:
                 )
 
             conn.commit()
+            bump_permission_generation()
             return True
         finally:
             conn.close()
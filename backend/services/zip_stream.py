@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import os
+import time
+import zipfile
+from pathlib import PurePosixPath
+from typing import BinaryIO, Iterator
+
+# Formats that are already compressed: deflating them burns CPU for ~0% gain, so they are stored.
+INCOMPRESSIBLE_EXTENSIONS = frozenset(
+    {
+        ".pdf",
+        ".png",
+        ".jpg",
+        ".jpeg",
+        ".gif",
+        ".webp",
+        ".heic",
+        ".docx",
+        ".xlsx",
+        ".pptx",
+        ".zip",
+        ".gz",
+        ".tgz",
+        ".7z",
+        ".rar",
+        ".mp3",
+        ".mp4",
+        ".mov",
+        ".avi",
+    }
+)
+
+
+def is_incompressible(name: str) -> bool:
+    return PurePosixPath(str(name or "")).suffix.lower() in INCOMPRESSIBLE_EXTENSIONS
+
+
+class _Sink:
+    """Write-only, non-seekable target for ZipFile; buffered bytes are drained by the caller."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._pending = 0
+        self._pos = 0
+
+    def write(self, data) -> int:
+        n = len(data)
+        if n:
+            self._chunks.append(bytes(data))
+            self._pending += n
+            self._pos += n
+        return n
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        return None
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def drain(self) -> bytes:
+        out = b"".join(self._chunks)
+        self._chunks.clear()
+        self._pending = 0
+        return out
+
+
+class ZipStream:
+    """
+    ZIP archive produced incrementally, for streaming responses.
+
+    Entries are written with data descriptors (the output is never seeked), so memory stays at
+    roughly one `chunk_size` regardless of archive size. Duplicate entry names get a `_N` suffix.
+    """
+
+    def __init__(self, *, chunk_size: int = 1024 * 1024):
+        self._chunk_size = max(4096, int(chunk_size))
+        self._sink = _Sink()
+        self._zip = zipfile.ZipFile(self._sink, "w", allowZip64=True)
+        self._names: set[str] = set()
+
+    def _unique(self, name: str) -> str:
+        name = str(name or "file").replace("\\", "/").lstrip("/") or "file"
+        base, ext = os.path.splitext(name)
+        candidate = name
+        counter = 1
+        while candidate in self._names:
+            candidate = f"{base}_{counter}{ext}"
+            counter += 1
+        self._names.add(candidate)
+        return candidate
+
+    def add(self, name: str, fileobj: BinaryIO) -> Iterator[bytes]:
+        """Copy `fileobj` into a new entry, yielding archive bytes as they become available."""
+        info = zipfile.ZipInfo(self._unique(name), date_time=time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_STORED if is_incompressible(name) else zipfile.ZIP_DEFLATED
+        info.external_attr = 0o644 << 16
+        with self._zip.open(info, "w", force_zip64=True) as dst:
+            while True:
+                chunk = fileobj.read(self._chunk_size)
+                if not chunk:
+                    break
+                dst.write(chunk)
+                if self._sink.pending >= self._chunk_size:
+                    yield self._sink.drain()
+        tail = self._sink.drain()
+        if tail:
+            yield tail
+
+    def close(self) -> bytes:
+        """Write the central directory and return the final bytes."""
+        self._zip.close()
+        return self._sink.drain()
@@ -1,4 +1,5 @@
 import os
+import sqlite3
 import time
 import unittest
 
@@ -65,3 +66,61 @@ class TestAuditLogStoreUnit(unittest.TestCase):
         finally:
             cleanup_dir(td)
 
+    def test_cursor_pages_cover_every_event_once(self):
+        td = make_temp_dir(prefix="ragflowauth_audit_cursor")
+        try:
+            db_path = os.path.join(str(td), "auth.db")
+            ensure_schema(db_path)
+            store = AuditLogStore(db_path=db_path)
+            for i in range(7):
+                store.log_event(action="document_preview" if i % 2 else "auth_login", actor="u1", source="knowledge")
+
+            seen, cursor = [], None
+            while True:
+                page = store.list_events_page(limit=3, cursor=cursor, total_mode="cached")
+                self.assertEqual(page.total, 7)
+                seen.extend(e.id for e in page.items)
+                cursor = page.next_cursor
+                if cursor is None:
+                    break
+
+            self.assertEqual(len(seen), 7)
+            self.assertEqual(seen, sorted(seen, reverse=True))
+
+            store.log_event(action="auth_login", actor="u1")
+            self.assertEqual(store.list_events_page(total_mode="cached").total, 7)
+            self.assertEqual(store.list_events_page(total_mode="exact").total, 8)
+            self.assertIsNone(store.list_events_page(total_mode="none").total)
+            with self.assertRaises(ValueError):
+                store.list_events_page(cursor="garbage")
+        finally:
+            cleanup_dir(td)
+
+    def test_common_filters_page_on_their_indexes(self):
+        td = make_temp_dir(prefix="ragflowauth_audit_plan")
+        try:
+            db_path = os.path.join(str(td), "auth.db")
+            ensure_schema(db_path)
+            select = "SELECT id FROM audit_events WHERE {where} ORDER BY created_at_ms DESC, id DESC LIMIT 50"
+            keyset = " AND (created_at_ms, id) < (?, ?)"
+            cases = [
+                ("1=1" + keyset, (1, 1), "idx_audit_events_time"),
+                ("actor = ?" + keyset, ("u1", 1, 1), "idx_audit_events_actor_time"),
+                ("action = ?" + keyset, ("auth_login", 1, 1), "idx_audit_events_action_time"),
+                ("source = ? AND created_at_ms >= ?", ("auth", 1), "idx_audit_events_source_time"),
+                ("(kb_id = ? OR kb_dataset_id = ? OR kb_name = ?)", ("kb", "kb", "kb"), "idx_audit_events_kb_name_time"),
+            ]
+            conn = sqlite3.connect(db_path)
+            try:
+                for where, params, index in cases:
+                    plan = " | ".join(
+                        str(row[-1]) for row in conn.execute("EXPLAIN QUERY PLAN " + select.format(where=where), params)
+                    )
+                    self.assertIn(index, plan, where)
+                    self.assertNotRegex(plan, r"SCAN audit_events(?! USING)", where)
+                    if "OR" not in where:
+                        self.assertNotIn("TEMP B-TREE", plan, where)
+            finally:
+                conn.close()
+        finally:
+            cleanup_dir(td)
@@ -90,6 +90,40 @@ class TestAuthSessionStoreUnit(unittest.TestCase):
         self.assertFalse(ok)
         self.assertEqual(reason, "refresh_jti_mismatch")
 
+    def test_validate_session_coalesces_activity_touches(self):
+        store = AuthSessionStore(self.db_path, touch_interval_s=60)
+        sid = str(uuid.uuid4())
+        store.create_session(
+            session_id=sid,
+            user_id=self.user.user_id,
+            refresh_jti="r1",
+            expires_at=9_999_999_999,
+            now_ms=0,
+        )
+
+        for now_ms in (1_000, 30_000, 59_999):
+            ok, _ = store.validate_session(
+                session_id=sid, user_id=self.user.user_id, idle_timeout_minutes=60, now_ms=now_ms
+            )
+            self.assertTrue(ok)
+        self.assertEqual(store.get_session(sid).last_activity_at_ms, 0)
+
+        store.validate_session(session_id=sid, user_id=self.user.user_id, idle_timeout_minutes=60, now_ms=60_000)
+        self.assertEqual(store.get_session(sid).last_activity_at_ms, 60_000)
+        self.assertEqual(store.touch_stats()["touches_coalesced"], 3)
+        self.assertEqual(store.touch_stats()["touches_written"], 1)
+
+        # Refreshes always persist.
+        store.validate_session(
+            session_id=sid,
+            user_id=self.user.user_id,
+            idle_timeout_minutes=60,
+            refresh_jti="r1",
+            mark_refresh=True,
+            now_ms=61_000,
+        )
+        self.assertEqual(store.get_session(sid).last_refresh_at_ms, 61_000)
+
     def test_active_session_summaries_respect_idle_timeout(self):
         user2 = self.user_store.create_user(username="u2", password="Pass1234")
         s1 = str(uuid.uuid4())
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+import uuid
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.app.core.authz import AuthContextDep
+from backend.core.security import auth
+from backend.database.schema.ensure import ensure_schema
+from backend.services.auth_session_store import AuthSessionStore
+from backend.services.users.store import UserStore
+
+
+class _CountingUserStore(UserStore):
+    calls = 0
+
+    def get_by_user_id(self, user_id: str):
+        self.calls += 1
+        return super().get_by_user_id(user_id)
+
+
+class _PermissionGroupStore:
+    def get_group(self, group_id: int):  # noqa: ARG002
+        return None
+
+
+class _Deps:
+    def __init__(self, db_path: str):
+        self.user_store = _CountingUserStore(db_path)
+        self.auth_session_store = AuthSessionStore(db_path)
+        self.permission_group_store = _PermissionGroupStore()
+
+
+class TestAuthSingleLookupUnit(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory(ignore_cleanup_errors=True)
+        db_path = os.path.join(self._tmp.name, "auth.db")
+        ensure_schema(db_path)
+        self.deps = _Deps(db_path)
+        self.user = self.deps.user_store.create_user(username="u1", password="Pass1234")
+        self.deps.user_store.set_user_permission_groups(self.user.user_id, [2, 1])
+        self.sid = str(uuid.uuid4())
+        self.deps.auth_session_store.create_session(
+            session_id=self.sid,
+            user_id=self.user.user_id,
+            refresh_jti="r1",
+            expires_at=9_999_999_999,
+        )
+
+        self.app = FastAPI()
+        self.app.state.deps = self.deps
+
+        @self.app.get("/whoami")
+        def whoami(ctx: AuthContextDep):
+            return {"user_id": ctx.user.user_id, "group_ids": ctx.user.group_ids}
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_user_is_loaded_once_and_touch_is_coalesced(self):
+        token = auth.create_access_token(uid=self.user.user_id, data={"sid": self.sid})
+        with TestClient(self.app) as client:
+            for _ in range(3):
+                resp = client.get("/whoami", headers={"Authorization": f"Bearer {token}"})
+                self.assertEqual(resp.status_code, 200)
+
+        self.assertEqual(resp.json(), {"user_id": self.user.user_id, "group_ids": [1, 2]})
+        self.assertEqual(self.deps.user_store.calls, 3)
+        stats = self.deps.auth_session_store.touch_stats()
+        self.assertEqual(stats["touches_written"], 0)
+        self.assertEqual(stats["touches_coalesced"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+import json
+import unittest
+
+from authx import TokenPayload
+from fastapi import FastAPI
+from fastapi import Request
+from fastapi.testclient import TestClient
+
+from backend.app.core import auth as auth_module
+from backend.app.modules.chat.router import router as chat_router
+
+
+class _FakeUser:
+    def __init__(self):
+        self.user_id = "u1"
+        self.username = "admin"
+        self.role = "admin"
+        self.group_id = None
+
+
+class _FakeUserStore:
+    def get_by_user_id(self, user_id: str):
+        return _FakeUser()
+
+
+class _FakePermissionGroupStore:
+    def get_group(self, group_id: int):
+        return None
+
+
+class _FakeRagflowService:
+    def list_datasets(self):
+        return [{"id": "ds1", "name": "KB"}]
+
+    def normalize_dataset_id(self, ref):
+        return {"ds1": "ds1", "KB": "ds1"}.get(ref)
+
+    def resolve_dataset_name(self, ref):
+        return {"ds1": "KB", "KB": "KB"}.get(ref)
+
+    def resolve_document_names(self, refs):
+        return {doc_id: {"name": f"{doc_id}.pdf", "dataset": "KB"} for doc_id, _ in refs}
+
+
+class _FakeChatService:
+    def __init__(self, messages):
+        self.messages = messages
+        self.retrievals = 0
+
+    async def chat(self, **kwargs):
+        for m in self.messages:
+            yield m
+
+    def retrieve_chunks(self, **kwargs):
+        self.retrievals += 1
+        return {"chunks": [{"document_id": "r1", "dataset_id": "ds1", "content": "retrieved"}]}
+
+
+class _FakeFrameChatService(_FakeChatService):
+    """Chat service that also offers the raw-frame stream used by the passthrough relay."""
+
+    def __init__(self, messages):
+        super().__init__(messages)
+        self.frames_used = False
+
+    async def chat_frames(self, **kwargs):
+        self.frames_used = True
+        for m in self.messages:
+            yield json.dumps(m, ensure_ascii=False).encode("utf-8")
+
+
+class _FakeSourcesStore:
+    def __init__(self):
+        self.calls = []
+
+    def upsert_sources(self, **kwargs):
+        self.calls.append(kwargs)
+
+
+class _FakeDeps:
+    def __init__(self, messages, chat_service_cls=_FakeChatService):
+        self.user_store = _FakeUserStore()
+        self.permission_group_store = _FakePermissionGroupStore()
+        self.ragflow_service = _FakeRagflowService()
+        self.ragflow_chat_service = chat_service_cls(messages)
+        self.kb_store = None
+        self.chat_message_sources_store = None
+
+
+def _events(text: str) -> list:
+    return [json.loads(line[6:]) for line in text.splitlines() if line.startswith("data: ")]
+
+
+class TestChatCompletionSources(unittest.TestCase):
+    def _run(self, messages, chat_service_cls=_FakeChatService, sources_store=None, **extra):
+        app = FastAPI()
+        app.state.deps = _FakeDeps(messages, chat_service_cls)
+        app.state.deps.chat_message_sources_store = sources_store
+        app.include_router(chat_router, prefix="/api")
+
+        def _override_get_current_payload(request: Request) -> TokenPayload:  # noqa: ARG001
+            return TokenPayload(sub="u1")
+
+        app.dependency_overrides[auth_module.get_current_payload] = _override_get_current_payload
+        with TestClient(app) as client:
+            resp = client.post("/api/chats/c1/completions", json={"question": "q", "session_id": "s1", **extra})
+        self.assertEqual(resp.status_code, 200)
+        return app.state.deps, _events(resp.text)
+
+    def test_sources_come_from_completion_references(self):
+        reference = {
+            "chunks": [
+                {"document_id": "d1", "dataset_id": "ds1", "content": "first"},
+                {"document_id": "secret", "dataset_id": "ds9", "content": "hidden"},
+            ],
+            "doc_aggs": [{"doc_id": "d1"}, {"doc_id": "secret"}],
+        }
+        deps, events = self._run(
+            [
+                {"code": 0, "data": {"answer": "a", "reference": {}}},
+                {"code": 0, "data": {"answer": "a ##0$$", "reference": reference}},
+                {"code": 0, "data": True},
+            ]
+        )
+
+        self.assertEqual(deps.ragflow_chat_service.retrievals, 0)
+        sources = [e["data"]["sources"] for e in events if isinstance(e.get("data"), dict) and "sources" in e["data"]]
+        self.assertEqual(len(sources), 1)
+        self.assertEqual(sources[0][0], {"doc_id": "d1", "dataset": "KB", "filename": "d1.pdf", "chunk": "first"})
+        self.assertEqual(sources[0][1]["doc_id"], "")
+
+        relayed = [e for e in events if isinstance(e.get("data"), dict) and e["data"].get("reference")][0]
+        self.assertEqual(relayed["data"]["reference"]["chunks"][1], {})
+        self.assertEqual(relayed["data"]["reference"]["doc_aggs"], [{"doc_id": "d1"}])
+        self.assertNotIn("hidden", json.dumps(events))
+
+    def test_falls_back_to_retrieval_without_references(self):
+        deps, events = self._run([{"code": 0, "data": {"answer": "a"}}, {"code": 0, "data": True}])
+
+        self.assertEqual(deps.ragflow_chat_service.retrievals, 1)
+        sources = [e["data"]["sources"] for e in events if isinstance(e.get("data"), dict) and "sources" in e["data"]]
+        self.assertEqual(sources, [[{"doc_id": "r1", "dataset": "KB", "filename": "r1.pdf", "chunk": "retrieved"}]])
+
+    def test_delta_protocol_keeps_sources_and_ends_with_full_answer(self):
+        reference = {"chunks": [{"document_id": "d1", "dataset_id": "ds1", "content": "first"}]}
+        _, events = self._run(
+            [
+                {"code": 0, "data": {"answer": "Hel", "reference": {}, "session_id": "s1"}},
+                {"code": 0, "data": {"answer": "Hello", "reference": reference, "session_id": "s1"}},
+                {"code": 0, "data": True},
+            ],
+            stream_protocol="delta",
+        )
+
+        self.assertTrue(any("sources" in e["data"] for e in events if isinstance(e.get("data"), dict)))
+        deltas = [e["data"]["delta"] for e in events if e.get("v") == 2 and "delta" in e["data"]]
+        self.assertEqual(deltas, ["Hel", "lo"])
+        final = [e for e in events if e.get("v") == 2 and e["data"].get("final")]
+        self.assertEqual(final[0]["data"]["answer"], "Hello")
+        self.assertEqual(final[0]["data"]["reference"]["chunks"][0]["document_id"], "d1")
+        self.assertEqual(events[-1], {"code": 0, "data": True})
+
+    def test_passthrough_relays_raw_frames_and_screens_reference_frames(self):
+        reference = {"chunks": [{"document_id": "secret", "dataset_id": "ds9", "content": "hidden"}]}
+        store = _FakeSourcesStore()
+        deps, events = self._run(
+            [
+                {"code": 0, "data": {"answer": "答", "session_id": "s9", "reference": {}}},
+                {"code": 0, "data": {"answer": "答案", "session_id": "s9", "reference": reference}},
+                {"code": 0, "data": True},
+            ],
+            chat_service_cls=_FakeFrameChatService,
+            sources_store=store,
+            session_id=None,
+        )
+
+        self.assertTrue(deps.ragflow_chat_service.frames_used)
+        self.assertEqual(events[0], {"code": 0, "data": {"answer": "答", "session_id": "s9", "reference": {}}})
+        self.assertNotIn("hidden", json.dumps(events, ensure_ascii=False))
+        self.assertIn({"code": 0, "data": True}, events)
+        self.assertEqual(store.calls[0]["session_id"], "s9")
+        self.assertEqual(store.calls[0]["assistant_text"], "答案")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from types import SimpleNamespace
+
+from backend.services.document_name_resolver import DocumentNameResolver
+
+
+class _KbStore:
+    def __init__(self, records):
+        self.records = records
+        self.calls: list[list[str]] = []
+
+    def get_documents_by_ragflow_ids(self, ids):
+        self.calls.append(list(ids))
+        return {k: v for k, v in self.records.items() if k in ids}
+
+
+class _Ragflow:
+    def __init__(self, names):
+        self.names = names
+        self.calls: list[list[tuple]] = []
+
+    def normalize_dataset_id(self, ref):
+        return {"KB": "ds1", "ds1": "ds1"}.get(ref)
+
+    def resolve_dataset_name(self, ref):
+        return {"KB": "KB", "ds1": "KB"}.get(ref)
+
+    def resolve_document_names(self, refs):
+        self.calls.append(list(refs))
+        return {doc_id: self.names[doc_id] for doc_id, _ in refs if doc_id in self.names}
+
+
+def _local(filename, kb_id="KB", kb_dataset_id="ds1", kb_name="KB"):
+    return SimpleNamespace(filename=filename, kb_id=kb_id, kb_dataset_id=kb_dataset_id, kb_name=kb_name)
+
+
+class TestDocumentNameResolverUnit(unittest.TestCase):
+    def test_local_names_win_and_rest_go_to_catalog_in_one_call(self):
+        kb = _KbStore({"a": [_local("原始文件.docx")]})
+        rf = _Ragflow({"b": {"name": "b.pdf", "dataset": "KB"}})
+        resolver = DocumentNameResolver(kb_store=kb, ragflow_service=rf)
+
+        out = resolver.resolve([("a", "ds1"), ("b", "ds1"), ("a", "ds1"), ("missing", "ds1")])
+
+        self.assertEqual(out, {"a": ("原始文件.docx", "KB"), "b": ("b.pdf", "KB")})
+        self.assertEqual(kb.calls, [["a", "b", "missing"]])
+        self.assertEqual(rf.calls, [[("b", "ds1"), ("missing", "ds1")]])
+
+    def test_local_record_from_other_dataset_is_ignored(self):
+        kb = _KbStore({"a": [_local("wrong.txt", kb_id="Other", kb_dataset_id="ds9", kb_name="Other")]})
+        rf = _Ragflow({"a": {"name": "a.pdf", "dataset": "KB"}})
+        resolver = DocumentNameResolver(kb_store=kb, ragflow_service=rf)
+
+        self.assertEqual(resolver.resolve([("a", "ds1")]), {"a": ("a.pdf", "KB")})
+
+    def test_results_are_cached_across_calls(self):
+        kb = _KbStore({})
+        rf = _Ragflow({"b": {"name": "b.pdf", "dataset": "KB"}})
+        resolver = DocumentNameResolver(kb_store=kb, ragflow_service=rf)
+
+        resolver.resolve([("b", "ds1")])
+        out = resolver.resolve([("b", "ds1")])
+
+        self.assertEqual(out, {"b": ("b.pdf", "KB")})
+        self.assertEqual(len(rf.calls), 1)
+        self.assertEqual(resolver.stats()["hits"], 1)
+
+    def test_lru_is_bounded(self):
+        rf = _Ragflow({str(i): {"name": f"{i}.txt", "dataset": "KB"} for i in range(5)})
+        resolver = DocumentNameResolver(kb_store=None, ragflow_service=rf, max_entries=2)
+
+        resolver.resolve([(str(i), "ds1") for i in range(5)])
+
+        self.assertEqual(resolver.stats()["entries"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -70,15 +70,34 @@ class _RagflowService:
     def delete_document(self, document_id: str, dataset_name: str = "kb1"):  # noqa: ARG002
         return True
 
-    def batch_download_documents(self, documents_info):  # noqa: ARG002
+    def iter_batch_download(self, documents_info, **kwargs):  # noqa: ARG002
         buf = io.BytesIO()
         with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
             zf.writestr("a.txt", b"hello")
-        return buf.getvalue(), "ragflow_docs.zip"
+        yield buf.getvalue()
+
+
+class _UnconfiguredRagflowService(_RagflowService):
+    def iter_batch_download(self, documents_info, **kwargs):  # noqa: ARG002
+        raise ValueError("RAGFlow client not initialized")
+        yield b""
+
+
+class _RecordingRagflowService(_RagflowService):
+    def __init__(self):
+        self.batches = []
+
+    def iter_batch_download(self, documents_info, **kwargs):
+        self.batches.append(list(documents_info))
+        yield from super().iter_batch_download(documents_info, **kwargs)
 
 
 class _DownloadLogStore:
-    def log_download(self, **kwargs):  # noqa: ARG002
+    def __init__(self):
+        self.entries = []
+
+    def log_download(self, **kwargs):
+        self.entries.append(kwargs)
         return None
 
 
@@ -195,3 +214,59 @@ class TestDocumentsUnifiedRouterUnit(unittest.TestCase):
                 self.assertEqual(zf.read("a.txt"), b"hello")
         finally:
             cleanup_dir(td)
+
+    def test_unified_batch_download_ragflow_setup_error_is_500_and_not_logged(self):
+        td = make_temp_dir(prefix="ragflowauth_documents_router")
+        try:
+            path = os.path.join(str(td), "a.txt")
+            with open(path, "wb") as f:
+                f.write(b"hello")
+
+            deps = _Deps(_KbDoc(doc_id="k1", kb_id="ds1", file_path=path, filename="a.txt"))
+            deps.ragflow_service = _UnconfiguredRagflowService()
+            app = FastAPI()
+            app.state.deps = deps
+            app.include_router(documents_router, prefix="/api")
+            app.dependency_overrides[auth_module.get_current_payload] = _override_get_current_payload
+
+            with TestClient(app, raise_server_exceptions=False) as client:
+                resp = client.post(
+                    "/api/documents/ragflow/batch/download",
+                    json={"documents": [{"doc_id": "r1", "name": "a.txt", "dataset": "ds1"}]},
+                )
+
+            self.assertEqual(resp.status_code, 500)
+            self.assertEqual(deps.download_log_store.entries, [])
+        finally:
+            cleanup_dir(td)
+
+    def test_unified_batch_download_ragflow_passes_only_the_authorized_dataset(self):
+        td = make_temp_dir(prefix="ragflowauth_documents_router")
+        try:
+            path = os.path.join(str(td), "a.txt")
+            with open(path, "wb") as f:
+                f.write(b"hello")
+
+            deps = _Deps(_KbDoc(doc_id="k1", kb_id="ds1", file_path=path, filename="a.txt"))
+            deps.ragflow_service = _RecordingRagflowService()
+            app = FastAPI()
+            app.state.deps = deps
+            app.include_router(documents_router, prefix="/api")
+            app.dependency_overrides[auth_module.get_current_payload] = _override_get_current_payload
+
+            with TestClient(app) as client:
+                resp = client.post(
+                    "/api/documents/ragflow/batch/download",
+                    json={
+                        "documents": [
+                            {"doc_id": "r1", "name": "a.txt", "dataset": "ds1", "dataset_name": "other"},
+                            {"name": "no-id.txt", "dataset": "ds1"},
+                        ]
+                    },
+                )
+
+            self.assertEqual(resp.status_code, 200, resp.text)
+            self.assertEqual(deps.ragflow_service.batches, [[{"doc_id": "r1", "dataset": "ds1", "name": "a.txt"}]])
+            self.assertEqual([e["doc_id"] for e in deps.download_log_store.entries], ["r1"])
+        finally:
+            cleanup_dir(td)
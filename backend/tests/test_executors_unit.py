@@ -0,0 +1,110 @@
+import asyncio
+import contextvars
+import threading
+import unittest
+
+from fastapi import HTTPException
+
+from backend.app.core import executors
+from backend.app.core.executors import BoundedExecutor, ExecutorSaturated, offload
+
+
+class TestBoundedExecutorUnit(unittest.TestCase):
+    def test_runs_on_named_threads_and_records_metrics(self):
+        pool = BoundedExecutor("unit", max_workers=2, max_queue=8)
+        try:
+            names = [pool.submit(lambda: threading.current_thread().name).result(timeout=5) for _ in range(3)]
+            self.assertTrue(all(name.startswith("unit_worker") for name in names))
+            stats = pool.stats()
+            self.assertEqual(stats["submitted"], 3)
+            self.assertEqual(stats["completed"], 3)
+            self.assertEqual(stats["queued"], 0)
+            self.assertEqual(stats["running"], 0)
+        finally:
+            pool.shutdown()
+
+    def test_rejects_when_backlog_is_full(self):
+        pool = BoundedExecutor("unit", max_workers=1, max_queue=1)
+        gate = threading.Event()
+        started = threading.Event()
+
+        def block():
+            started.set()
+            gate.wait(5)
+
+        try:
+            running = pool.submit(block)
+            self.assertTrue(started.wait(5))
+            queued = pool.submit(lambda: None)
+            with self.assertRaises(ExecutorSaturated):
+                pool.submit(lambda: None)
+            self.assertEqual(pool.stats()["queued"], 1)
+            self.assertEqual(pool.stats()["rejected"], 1)
+            gate.set()
+            running.result(timeout=5)
+            queued.result(timeout=5)
+            self.assertGreater(pool.stats()["wait_max_ms"], 0.0)
+        finally:
+            gate.set()
+            pool.shutdown()
+
+    def test_failures_are_counted_and_reraised(self):
+        pool = BoundedExecutor("unit", max_workers=1, max_queue=4)
+        try:
+            with self.assertRaises(ValueError):
+                pool.submit(lambda: (_ for _ in ()).throw(ValueError("boom"))).result(timeout=5)
+            self.assertEqual(pool.stats()["failed"], 1)
+        finally:
+            pool.shutdown()
+
+
+class TestOffloadUnit(unittest.TestCase):
+    def tearDown(self):
+        executors.shutdown_executors()
+
+    def test_offload_keeps_loop_free_and_propagates_context(self):
+        var: contextvars.ContextVar[str] = contextvars.ContextVar("rid", default="")
+        gate = threading.Event()
+
+        def blocking():
+            gate.wait(5)
+            return var.get(), threading.current_thread().name
+
+        async def run():
+            var.set("req-1")
+            task = asyncio.create_task(offload(executors.SQLITE, blocking))
+            # The loop keeps serving other coroutines while the pool thread is blocked.
+            await asyncio.sleep(0)
+            gate.set()
+            return await task
+
+        rid, thread_name = asyncio.run(run())
+        self.assertEqual(rid, "req-1")
+        self.assertTrue(thread_name.startswith("sqlite_worker"))
+        self.assertIn("sqlite", executors.executor_stats())
+
+    def test_saturated_pool_maps_to_503(self):
+        saturated = BoundedExecutor("ragflow_io", max_workers=1, max_queue=1)
+        gate = threading.Event()
+        executors._executors[executors.RAGFLOW_IO] = saturated
+        try:
+            saturated.submit(gate.wait, 5)
+            saturated.submit(lambda: None)
+
+            async def run():
+                return await offload(executors.RAGFLOW_IO, lambda: None)
+
+            with self.assertRaises(HTTPException) as ctx:
+                asyncio.run(run())
+            self.assertEqual(ctx.exception.status_code, 503)
+            self.assertEqual(ctx.exception.detail, "server_busy:ragflow_io")
+        finally:
+            gate.set()
+
+    def test_unknown_pool_is_rejected(self):
+        with self.assertRaises(KeyError):
+            executors.get_executor("nope")
+
+
+if __name__ == "__main__":
+    unittest.main()
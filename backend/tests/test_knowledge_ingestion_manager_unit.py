@@ -1,22 +1,33 @@
+import hashlib
 import tempfile
+import threading
 import unittest
 from dataclasses import dataclass
 from pathlib import Path
 from types import SimpleNamespace
+from unittest.mock import patch
 
 from backend.app.core.config import settings
+from backend.app.core.executors import ARCHIVE, get_executor
 from backend.app.core.permission_resolver import PermissionSnapshot, ResourceScope
 from backend.services.knowledge_ingestion import KnowledgeIngestionError, KnowledgeIngestionManager
+from backend.services.knowledge_ingestion import manager as manager_module
 
 
 class _UploadFile:
     def __init__(self, filename: str, content: bytes, content_type: str | None = None):
         self.filename = filename
         self._content = content
+        self._pos = 0
         self.content_type = content_type
+        self.reads = 0
 
-    async def read(self) -> bytes:
-        return self._content
+    async def read(self, size: int = -1) -> bytes:
+        self.reads += 1
+        end = len(self._content) if size < 0 else self._pos + size
+        chunk = self._content[self._pos : end]
+        self._pos += len(chunk)
+        return chunk
 
 
 class _KbStore:
@@ -32,6 +43,7 @@ class _KbStore:
             kb_id=kwargs["kb_id"],
             kb_dataset_id=kwargs["kb_dataset_id"],
             kb_name=kwargs["kb_name"],
+            content_sha256=kwargs.get("content_sha256"),
         )
 
 
@@ -101,6 +113,45 @@ class TestKnowledgeIngestionManagerUnit(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(Path(doc.file_path).read_bytes(), b"abc")
         self.assertTrue(str(doc.file_path).endswith(str(Path("folder") / "sub" / "123.txt")))
 
+    async def test_stage_upload_records_size_and_digest(self):
+        upload = _UploadFile(filename="a.txt", content=b"hello", content_type=None)
+        doc = await self.manager.stage_upload_knowledge(kb_ref="kb1", upload_file=upload, ctx=self.ctx)
+        self.assertEqual(doc.file_size, 5)
+        self.assertEqual(doc.content_sha256, hashlib.sha256(b"hello").hexdigest())
+
+    async def test_stage_upload_writes_off_the_event_loop(self):
+        loop_thread = threading.get_ident()
+        threads = []
+        real_write = manager_module._write_chunk
+
+        def _tracked_write(out, digest, chunk):
+            threads.append(threading.get_ident())
+            real_write(out, digest, chunk)
+
+        upload = _UploadFile(filename="a.txt", content=b"y" * (3 * 1024 * 1024), content_type=None)
+        archive_jobs = get_executor(ARCHIVE).stats()["submitted"]
+        with patch.object(manager_module, "_write_chunk", _tracked_write):
+            doc = await self.manager.stage_upload_knowledge(kb_ref="kb1", upload_file=upload, ctx=self.ctx)
+
+        self.assertEqual(len(threads), 3)
+        self.assertNotIn(loop_thread, threads)
+        # Uploads must not queue behind batch ZIP streams on the ARCHIVE pool.
+        self.assertEqual(get_executor(ARCHIVE).stats()["submitted"], archive_jobs)
+        self.assertEqual(doc.content_sha256, hashlib.sha256(b"y" * (3 * 1024 * 1024)).hexdigest())
+
+    async def test_stage_upload_stops_reading_once_too_large(self):
+        old_max = settings.MAX_FILE_SIZE
+        settings.MAX_FILE_SIZE = 10
+        self.addCleanup(setattr, settings, "MAX_FILE_SIZE", old_max)
+        upload = _UploadFile(filename="big.txt", content=b"x" * (5 * 1024 * 1024), content_type=None)
+
+        with self.assertRaises(KnowledgeIngestionError) as cm:
+            await self.manager.stage_upload_knowledge(kb_ref="kb1", upload_file=upload, ctx=self.ctx)
+
+        self.assertEqual(cm.exception.code, "file_too_large")
+        self.assertEqual(upload.reads, 1)
+        self.assertEqual(list(Path(self._tmp.name).iterdir()), [])
+
     async def test_stage_upload_rejects_parent_traversal_path(self):
         upload = _UploadFile(filename="../evil.txt", content=b"abc", content_type=None)
         with self.assertRaises(KnowledgeIngestionError) as cm:
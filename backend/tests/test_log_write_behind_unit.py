@@ -0,0 +1,140 @@
+import json
+import os
+import unittest
+
+from backend.database.schema.ensure import ensure_schema
+from backend.database.write_behind import WriteBehindLog
+from backend.services.audit_log_store import AuditLogStore
+from backend.services.download_log_store import DownloadLogStore
+from backend.tests._util_tempdir import cleanup_dir, make_temp_dir
+
+
+class TestLogWriteBehindUnit(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = make_temp_dir(prefix="ragflowauth_write_behind")
+        self.db_path = os.path.join(str(self._tmp), "auth.db")
+        ensure_schema(self.db_path)
+
+    def tearDown(self) -> None:
+        cleanup_dir(self._tmp)
+
+    def test_rows_are_batched_into_one_flush(self):
+        wb = WriteBehindLog(self.db_path, batch_size=1000, flush_interval_s=60)
+        wb.start()
+        try:
+            audit = AuditLogStore(db_path=self.db_path, write_behind=wb)
+            downloads = DownloadLogStore(db_path=self.db_path, write_behind=wb)
+            for i in range(5):
+                self.assertEqual(audit.log_event(action="document_preview", actor="u1", doc_id=f"d{i}").id, 0)
+            downloads.log_download(doc_id="d1", filename="a.pdf", kb_id="KB", downloaded_by="u1")
+
+            self.assertEqual(audit.list_events()[0], 0)
+            self.assertEqual(wb.flush(), 6)
+        finally:
+            wb.stop()
+
+        total, rows = audit.list_events()
+        self.assertEqual(total, 5)
+        self.assertEqual(len(downloads.list_downloads()), 1)
+        stats = wb.stats()
+        self.assertEqual(stats["flushes"], 1)
+        self.assertEqual(stats["rows_written"], 6)
+        self.assertEqual(stats["queued"], 0)
+        self.assertFalse(os.path.exists(wb.spool_path))
+
+    def test_full_queue_and_stopped_writer_fall_back_to_sync_writes(self):
+        wb = WriteBehindLog(self.db_path, max_queue=1, batch_size=1000, flush_interval_s=60)
+        audit = AuditLogStore(db_path=self.db_path, write_behind=wb)
+
+        self.assertGreater(audit.log_event(action="a", actor="u1").id, 0)
+
+        wb.start()
+        try:
+            self.assertEqual(audit.log_event(action="b", actor="u1").id, 0)
+            self.assertGreater(audit.log_event(action="c", actor="u1").id, 0)
+            self.assertEqual(wb.stats()["sync_fallbacks"], 2)
+        finally:
+            wb.stop()
+        self.assertEqual(audit.list_events()[0], 3)
+
+    def test_spooled_rows_survive_a_crash_and_are_replayed(self):
+        wb = WriteBehindLog(self.db_path, batch_size=1000, flush_interval_s=60)
+        wb.start()
+        audit = AuditLogStore(db_path=self.db_path, write_behind=wb)
+        audit.log_event(action="auth_login", actor="u1", meta={"ip": "127.0.0.1"})
+        audit.log_event(action="auth_logout", actor="u1")
+
+        def crash(items):
+            raise OSError("disk gone")
+
+        # The process "dies" before any flush commits: only the spool segments are left behind.
+        wb._insert_rows = crash
+        wb.stop()
+        self.assertEqual(audit.list_events()[0], 0)
+        self.assertEqual(wb.stats()["flush_errors"], 1)
+
+        recovered = WriteBehindLog(self.db_path, batch_size=1000, flush_interval_s=60)
+        recovered.start()
+        recovered.stop()
+
+        total, rows = audit.list_events()
+        self.assertEqual(total, 2)
+        self.assertEqual({r.action for r in rows}, {"auth_login", "auth_logout"})
+        self.assertEqual(recovered.stats()["replayed"], 2)
+
+
+    def _bad_download_row(self):
+        return {"doc_id": None, "filename": "x.pdf", "kb_id": "KB", "downloaded_by": "u1", "downloaded_at_ms": 1}
+
+    def test_constraint_violation_is_dead_lettered_without_blocking_later_rows(self):
+        wb = WriteBehindLog(self.db_path, batch_size=1000, flush_interval_s=60)
+        wb.start()
+        try:
+            audit = AuditLogStore(db_path=self.db_path, write_behind=wb)
+            self.assertTrue(wb.submit("download_logs", self._bad_download_row()))
+            audit.log_event(action="a", actor="u1")
+            audit.log_event(action="b", actor="u1")
+
+            self.assertEqual(wb.flush(), 2)
+            audit.log_event(action="c", actor="u1")
+            self.assertEqual(wb.flush(), 1)
+        finally:
+            wb.stop()
+
+        self.assertEqual(audit.list_events()[0], 3)
+        self.assertEqual(wb.stats()["rejected"], 1)
+        self.assertEqual(wb.stats()["queued"], 0)
+        rejected = [json.loads(line) for line in wb.rejected_path.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual([r["t"] for r in rejected], ["download_logs"])
+
+    def test_replay_sets_aside_rejected_rows(self):
+        wb = WriteBehindLog(self.db_path)
+        wb.spool_path.write_text(
+            json.dumps({"t": "download_logs", "r": self._bad_download_row()})
+            + "\n"
+            + json.dumps({"t": "audit_events", "r": {"action": "a", "actor": "u1", "created_at_ms": 1}})
+            + "\n",
+            encoding="utf-8",
+        )
+        wb.start()
+        wb.stop()
+
+        self.assertEqual(AuditLogStore(db_path=self.db_path).list_events()[0], 1)
+        self.assertEqual(wb.stats()["replayed"], 1)
+        self.assertEqual(wb.stats()["rejected"], 1)
+        self.assertFalse(wb.spool_path.exists())
+
+    def test_log_download_validates_not_null_fields_before_queueing(self):
+        wb = WriteBehindLog(self.db_path, batch_size=1000, flush_interval_s=60)
+        wb.start()
+        try:
+            downloads = DownloadLogStore(db_path=self.db_path, write_behind=wb)
+            with self.assertRaises(ValueError):
+                downloads.log_download(doc_id=None, filename="a.pdf", kb_id="KB", downloaded_by="u1")
+            self.assertEqual(wb.stats()["enqueued"], 0)
+        finally:
+            wb.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,278 @@
+import os
+import stat
+import sys
+import textwrap
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from backend.services.office_worker_pool import (
+    OfficeConversionPool,
+    OfficeConversionTimeout,
+    OfficePoolBusy,
+    SofficeWorker,
+    set_office_pool,
+)
+from backend.tests._util_tempdir import cleanup_dir, make_temp_dir
+
+
+class _FakeWorker:
+    instances = []
+
+    def __init__(self, index, profile_dir, *, behavior=None):
+        self.index = index
+        self.profile_dir = Path(profile_dir)
+        self.behavior = behavior
+        self.started = 0
+        self.stopped = 0
+        self.jobs = 0
+        self.dead = False
+        _FakeWorker.instances.append(self)
+
+    mode = "fake"
+
+    def alive(self):
+        return not self.dead
+
+    def start(self):
+        self.started += 1
+
+    def stop(self):
+        self.stopped += 1
+
+    def convert(self, input_path, outdir, fmt, *, timeout_s):
+        self.jobs += 1
+        if self.behavior is not None:
+            self.behavior(self)
+        out = Path(outdir) / f"{Path(input_path).stem}.{fmt}"
+        out.write_bytes(b"converted:" + Path(input_path).read_bytes())
+        return out
+
+
+class TestOfficeWorkerPoolUnit(unittest.TestCase):
+    def setUp(self):
+        self.td = Path(make_temp_dir(prefix="ragflowauth_office_pool"))
+        _FakeWorker.instances = []
+
+    def tearDown(self):
+        set_office_pool(None)
+        cleanup_dir(self.td)
+
+    def _pool(self, behavior=None, **kwargs):
+        pool = OfficeConversionPool(
+            profile_root=self.td / "profiles",
+            worker_factory=lambda index, profile_dir: _FakeWorker(index, profile_dir, behavior=behavior),
+            **kwargs,
+        )
+        self.addCleanup(pool.shutdown)
+        return pool
+
+    def _input(self, name="input.docx", data=b"doc"):
+        outdir = self.td / name
+        outdir.mkdir()
+        src = outdir / name
+        src.write_bytes(data)
+        return src, outdir
+
+    def test_worker_is_reused_across_jobs(self):
+        pool = self._pool(workers=1)
+        for i in range(3):
+            src, outdir = self._input(f"in{i}.docx", b"x")
+            self.assertEqual(pool.convert(src, outdir, "pdf").read_bytes(), b"converted:x")
+        self.assertEqual(len(_FakeWorker.instances), 1)
+        self.assertEqual(_FakeWorker.instances[0].jobs, 3)
+        self.assertEqual(pool.stats()["completed"], 3)
+
+    def test_workers_get_isolated_profiles(self):
+        gate = threading.Event()
+        pool = self._pool(behavior=lambda w: gate.wait(5), workers=2)
+        threads = []
+        for i in range(2):
+            src, outdir = self._input(f"p{i}.docx")
+            threads.append(threading.Thread(target=pool.convert, args=(src, outdir, "pdf")))
+        for t in threads:
+            t.start()
+        while len(_FakeWorker.instances) < 2:
+            threading.Event().wait(0.01)
+        gate.set()
+        for t in threads:
+            t.join()
+        dirs = {w.profile_dir for w in _FakeWorker.instances}
+        self.assertEqual(len(dirs), 2)
+
+    def test_recycles_after_max_jobs(self):
+        pool = self._pool(workers=1, max_jobs_per_worker=2)
+        for i in range(3):
+            src, outdir = self._input(f"r{i}.docx")
+            pool.convert(src, outdir, "pdf")
+        self.assertEqual(len(_FakeWorker.instances), 2)
+        self.assertEqual(_FakeWorker.instances[0].stopped, 1)
+        self.assertEqual(pool.stats()["recycles"], 1)
+
+    def test_dead_worker_is_restarted(self):
+        def crash_once(worker):
+            if len(_FakeWorker.instances) == 1:
+                worker.dead = True
+                raise RuntimeError("soffice convert failed: crashed")
+
+        pool = self._pool(behavior=crash_once, workers=1)
+        src, outdir = self._input("c0.docx")
+        with self.assertRaisesRegex(RuntimeError, "crashed"):
+            pool.convert(src, outdir, "pdf")
+        src, outdir = self._input("c1.docx", b"ok")
+        self.assertEqual(pool.convert(src, outdir, "pdf").read_bytes(), b"converted:ok")
+        self.assertEqual(pool.stats()["restarts"], 1)
+
+    def test_timeout_discards_worker(self):
+        def timeout_once(worker):
+            if len(_FakeWorker.instances) == 1:
+                raise OfficeConversionTimeout(1)
+
+        pool = self._pool(behavior=timeout_once, workers=1)
+        src, outdir = self._input("t0.docx")
+        with self.assertRaises(OfficeConversionTimeout):
+            pool.convert(src, outdir, "pdf")
+        src, outdir = self._input("t1.docx")
+        pool.convert(src, outdir, "pdf")
+        self.assertEqual(len(_FakeWorker.instances), 2)
+        self.assertEqual(pool.stats()["timeouts"], 1)
+
+    def test_full_queue_rejects(self):
+        gate = threading.Event()
+        entered = threading.Event()
+
+        def block(worker):
+            entered.set()
+            gate.wait(5)
+
+        pool = self._pool(behavior=block, workers=1, max_queue=1)
+        src, outdir = self._input("q0.docx")
+        first = threading.Thread(target=pool.convert, args=(src, outdir, "pdf"))
+        first.start()
+        entered.wait(5)
+        src, outdir = self._input("q1.docx")
+        second = threading.Thread(target=pool.convert, args=(src, outdir, "pdf"))
+        second.start()
+        while pool.stats()["queued"] < 1:
+            threading.Event().wait(0.01)
+        src, outdir = self._input("q2.docx")
+        with self.assertRaises(OfficePoolBusy):
+            pool.convert(src, outdir, "pdf")
+        gate.set()
+        first.join()
+        second.join()
+        self.assertEqual(pool.stats()["rejected"], 1)
+
+    def test_office_to_pdf_submits_to_pool(self):
+        from backend.services.doc_to_pdf import convert_doc_bytes_to_pdf_bytes
+
+        set_office_pool(self._pool(workers=1))
+        with patch("backend.services.office_to_pdf.ensure_soffice_available", return_value="soffice"):
+            self.assertEqual(convert_doc_bytes_to_pdf_bytes(b"abc", filename="a.doc"), b"converted:abc")
+
+
+
+_FAKE_UNO = textwrap.dedent(
+    """
+    import os
+    from pathlib import Path
+    from urllib.parse import unquote, urlparse
+
+
+    def systemPathToFileUrl(path):
+        return Path(path).as_uri()
+
+
+    class _Doc:
+        def supportsService(self, name):
+            return False
+
+        def storeToURL(self, url, props):
+            Path(unquote(urlparse(url).path)).write_bytes(b"converted:" + props[0].Value.encode())
+
+        def close(self, deliver):
+            pass
+
+
+    class _Desktop:
+        def loadComponentFromURL(self, url, frame, flags, props):
+            return _Doc()
+
+        def terminate(self):
+            Path(os.environ["FAKE_SOFFICE_DIR"], "terminated").write_text("1")
+
+
+    class _Manager:
+        def createInstanceWithContext(self, name, ctx):
+            return _Desktop() if name.endswith("Desktop") else _Resolver()
+
+
+    class _Ctx:
+        ServiceManager = _Manager()
+
+
+    class _Resolver:
+        def resolve(self, url):
+            return _Ctx()
+
+
+    def getComponentContext():
+        return _Ctx()
+    """
+)
+
+
+@unittest.skipIf(os.name == "nt", "fake soffice is a POSIX shell script")
+class TestSofficeWorkerBridgeUnit(unittest.TestCase):
+    def setUp(self):
+        self.td = Path(make_temp_dir(prefix="ragflowauth_soffice_bridge"))
+        fake_path = self.td / "fake_uno"
+        (fake_path / "com" / "sun" / "star" / "beans").mkdir(parents=True)
+        (fake_path / "uno.py").write_text(_FAKE_UNO, encoding="utf-8")
+        for pkg in ("com", "com/sun", "com/sun/star"):
+            (fake_path / pkg / "__init__.py").write_text("", encoding="utf-8")
+        (fake_path / "com/sun/star/beans/__init__.py").write_text(
+            "class PropertyValue:\n    Name = None\n    Value = None\n", encoding="utf-8"
+        )
+        soffice = self.td / "soffice"
+        soffice.write_text(
+            '#!/bin/sh\necho started >> "$FAKE_SOFFICE_DIR/launches"\n'
+            'while [ ! -f "$FAKE_SOFFICE_DIR/terminated" ]; do sleep 0.05; done\n',
+            encoding="utf-8",
+        )
+        soffice.chmod(soffice.stat().st_mode | stat.S_IEXEC)
+        self.soffice = str(soffice)
+        env = patch.dict(os.environ, {"PYTHONPATH": str(fake_path), "FAKE_SOFFICE_DIR": str(self.td)})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def tearDown(self):
+        cleanup_dir(self.td)
+
+    def test_listener_mode_without_in_process_uno(self):
+        worker = SofficeWorker(0, exe=self.soffice, profile_dir=self.td / "profile", uno_python=sys.executable)
+        self.assertEqual(worker.mode, "listener")
+        self.assertEqual(worker.bridge, "helper")
+
+        worker.start()
+        try:
+            self.assertTrue(worker.alive())
+            for i in range(3):
+                outdir = self.td / f"job{i}"
+                outdir.mkdir()
+                src = outdir / f"in{i}.docx"
+                src.write_bytes(b"doc")
+                out = worker.convert(src, outdir, "pdf", timeout_s=30)
+                self.assertEqual(out.read_bytes(), b"converted:writer_pdf_Export")
+        finally:
+            worker.stop()
+
+        # One listener served every job, and stopping the helper shut it down.
+        self.assertEqual((self.td / "launches").read_text().split(), ["started"])
+        self.assertTrue((self.td / "terminated").exists())
+        self.assertFalse(worker.alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import unittest
+from types import SimpleNamespace
+
+from backend.app.core.authz import AuthContext
+from backend.database.schema.ensure import ensure_schema
+from backend.services.org_directory import OrgDirectoryStore
+from backend.tests._util_tempdir import cleanup_dir, make_temp_dir
+
+
+class _CountingOrgStore:
+    def __init__(self, store):
+        self.store = store
+        self.calls = 0
+
+    def get_company(self, company_id):
+        self.calls += 1
+        return self.store.get_company(company_id)
+
+    def get_department(self, department_id):
+        self.calls += 1
+        return self.store.get_department(department_id)
+
+
+class TestOrgDirectoryCacheUnit(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = make_temp_dir(prefix="ragflowauth_org_cache")
+        self.db_path = os.path.join(str(self._tmp), "auth.db")
+        ensure_schema(self.db_path)
+        self.store = OrgDirectoryStore(db_path=self.db_path)
+
+    def tearDown(self) -> None:
+        cleanup_dir(self._tmp)
+
+    def test_lookups_are_served_from_one_load_and_writes_invalidate(self):
+        company = self.store.create_company(name="Acme", actor_user_id="admin")
+        department = self.store.create_department(name="R&D", actor_user_id="admin")
+
+        for _ in range(5):
+            self.assertEqual(self.store.get_company(company.company_id).name, "Acme")
+            self.assertEqual(self.store.get_department(department.department_id).name, "R&D")
+        self.assertEqual(self.store.cache_stats()["loads"], 1)
+
+        self.store.update_company(company_id=company.company_id, name="Acme Ltd", actor_user_id="admin")
+        self.assertEqual(self.store.get_company(company.company_id).name, "Acme Ltd")
+
+        self.store.delete_department(department_id=department.department_id, actor_user_id="admin")
+        self.assertIsNone(self.store.get_department(department.department_id))
+
+    def test_load_racing_a_write_is_not_cached(self):
+        company = self.store.create_company(name="Acme", actor_user_id="admin")
+        get_connection = self.store._get_connection
+        raced = []
+        store = self.store
+
+        class _RacingConnection:
+            # The rename commits (and invalidates) after the load read its rows.
+            def __init__(self, conn):
+                self._conn = conn
+
+            def __getattr__(self, name):
+                return getattr(self._conn, name)
+
+            def close(self):
+                self._conn.close()
+                if not raced:
+                    raced.append(True)
+                    store.update_company(company_id=company.company_id, name="Acme Ltd", actor_user_id="admin")
+
+        self.store._get_connection = lambda: _RacingConnection(get_connection())
+        self.assertEqual(self.store.get_company(company.company_id).name, "Acme")
+        self.assertTrue(raced)
+        self.assertFalse(self.store.cache_stats()["loaded"])
+        self.assertEqual(self.store.get_company(company.company_id).name, "Acme Ltd")
+
+    def test_auth_context_resolves_actor_fields_once(self):
+        company = self.store.create_company(name="Acme", actor_user_id="admin")
+        org = _CountingOrgStore(self.store)
+        user = SimpleNamespace(username="alice", company_id=company.company_id, department_id=None)
+        ctx = AuthContext(deps=SimpleNamespace(org_directory_store=org), payload=None, user=user, snapshot=None)
+
+        for _ in range(3):
+            self.assertEqual(ctx.actor_fields["company_name"], "Acme")
+
+        self.assertEqual(org.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
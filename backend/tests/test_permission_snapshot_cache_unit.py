@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+
+from backend.app.core.permission_cache import PermissionSnapshotCache, bump_permission_generation
+from backend.app.core.permission_resolver import resolve_permissions_cached
+from backend.database.schema.ensure import ensure_schema
+from backend.services.knowledge_directory.store import KnowledgeDirectoryStore
+
+
+class _User:
+    def __init__(self, user_id: str = "u1", role: str = "viewer", group_ids=None):
+        self.user_id = user_id
+        self.role = role
+        self.group_ids = list(group_ids if group_ids is not None else [1])
+
+
+class _PermissionGroupStore:
+    def __init__(self):
+        self.calls = 0
+        self.can_upload = False
+
+    def get_group(self, group_id: int):  # noqa: ARG002
+        self.calls += 1
+        return {
+            "can_upload": self.can_upload,
+            "can_review": False,
+            "can_download": True,
+            "can_delete": False,
+            "accessible_kbs": ["KB-1"],
+            "accessible_kb_nodes": [],
+            "accessible_chats": [],
+        }
+
+
+class _Deps:
+    def __init__(self, **kwargs):
+        self.permission_group_store = _PermissionGroupStore()
+        self.permission_snapshot_cache = PermissionSnapshotCache(**kwargs)
+
+
+class TestPermissionSnapshotCacheUnit(unittest.TestCase):
+    def test_steady_state_is_served_from_cache(self):
+        deps = _Deps()
+        user = _User()
+        first = resolve_permissions_cached(deps, user)
+        for _ in range(5):
+            self.assertIs(resolve_permissions_cached(deps, user), first)
+        self.assertEqual(deps.permission_group_store.calls, 1)
+        stats = deps.permission_snapshot_cache.stats()
+        self.assertEqual(stats["hits"], 5)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_generation_bump_invalidates(self):
+        deps = _Deps()
+        user = _User()
+        self.assertFalse(resolve_permissions_cached(deps, user).can_upload)
+        deps.permission_group_store.can_upload = True
+        bump_permission_generation()
+        self.assertTrue(resolve_permissions_cached(deps, user).can_upload)
+        self.assertEqual(deps.permission_group_store.calls, 2)
+
+    def test_user_role_or_group_change_invalidates(self):
+        deps = _Deps()
+        resolve_permissions_cached(deps, _User(group_ids=[1]))
+        snapshot = resolve_permissions_cached(deps, _User(group_ids=[1, 2]))
+        self.assertEqual(deps.permission_group_store.calls, 3)
+        self.assertTrue(resolve_permissions_cached(deps, _User(role="admin")).is_admin)
+        self.assertIsNot(snapshot, resolve_permissions_cached(deps, _User(group_ids=[1])))
+
+    def test_ttl_expiry(self):
+        deps = _Deps(ttl_s=-1.0)
+        user = _User()
+        resolve_permissions_cached(deps, user)
+        resolve_permissions_cached(deps, user)
+        self.assertEqual(deps.permission_group_store.calls, 2)
+        self.assertEqual(deps.permission_snapshot_cache.stats()["hits"], 0)
+
+    def test_snapshot_resolved_across_a_write_is_not_cached(self):
+        cache = PermissionSnapshotCache()
+        user = _User()
+        cache.put(user, object(), generation=bump_permission_generation() - 1)  # type: ignore[arg-type]
+        self.assertIsNone(cache.get(user))
+
+    def test_knowledge_directory_writes_bump_generation(self):
+        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as td:
+            db_path = os.path.join(td, "auth.db")
+            ensure_schema(db_path)
+            store = KnowledgeDirectoryStore(db_path)
+            node = store.create_node("Root", None, created_by="u1")
+
+            deps = _Deps()
+            user = _User()
+            resolve_permissions_cached(deps, user)
+            store.assign_dataset("ds_1", node["node_id"])
+            resolve_permissions_cached(deps, user)
+            self.assertEqual(deps.permission_group_store.calls, 2)
+
+            # Pruning with nothing to prune must not flush every cached snapshot.
+            store.remove_bindings_for_unknown_datasets({"ds_1"})
+            resolve_permissions_cached(deps, user)
+            self.assertEqual(deps.permission_group_store.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import base64
+import hashlib
+import os
+import unittest
+from unittest.mock import patch
+
+from backend.services.preview_blobs import PreviewBlobError, PreviewBlobStore, parse_byte_range, set_preview_blob_store
+from backend.services.preview_cache import PreviewCache
+from backend.services.unified_preview import build_preview_payload, file_preview_payload
+from backend.tests._util_tempdir import cleanup_dir, make_temp_dir
+
+
+class TestPreviewBlobsUnit(unittest.TestCase):
+    def setUp(self):
+        self.td = make_temp_dir(prefix="ragflowauth_preview_blobs")
+        self.store = PreviewBlobStore(PreviewCache(self.td), secret="secret", ttl_s=60)
+
+    def tearDown(self):
+        set_preview_blob_store(None)
+        cleanup_dir(self.td)
+
+    def _token(self, ref):
+        return ref["url"].rsplit("/", 1)[1]
+
+    def test_publish_and_resolve(self):
+        ref = self.store.publish(b"%PDF-1.4 body", media_type="application/pdf", filename="a.pdf")
+        self.assertEqual(ref["delivery"], "url")
+        self.assertEqual(ref["size"], 13)
+        blob = self.store.resolve(self._token(ref))
+        self.assertEqual(blob.path.read_bytes(), b"%PDF-1.4 body")
+        self.assertEqual((blob.media_type, blob.filename, blob.etag), ("application/pdf", "a.pdf", ref["etag"]))
+
+    def test_tampered_token_rejected(self):
+        ref = self.store.publish(b"x", media_type="application/pdf", filename="a.pdf")
+        other = PreviewBlobStore(PreviewCache(self.td), secret="other")
+        with self.assertRaises(PreviewBlobError) as cm:
+            other.resolve(self._token(ref))
+        self.assertEqual(cm.exception.status_code, 403)
+
+    def test_expired_token_rejected(self):
+        ref = self.store.publish(b"x", media_type="application/pdf", filename="a.pdf")
+        with patch("backend.services.preview_blobs.time.time", return_value=ref["expires_at"] + 1):
+            with self.assertRaises(PreviewBlobError) as cm:
+                self.store.resolve(self._token(ref))
+        self.assertEqual(cm.exception.status_code, 410)
+
+    def test_parse_byte_range(self):
+        self.assertIsNone(parse_byte_range(None, 10))
+        self.assertEqual(parse_byte_range("bytes=2-5", 10), (2, 5))
+        self.assertEqual(parse_byte_range("bytes=4-", 10), (4, 9))
+        self.assertEqual(parse_byte_range("bytes=-3", 10), (7, 9))
+        self.assertEqual(parse_byte_range("bytes=8-100", 10), (8, 9))
+        self.assertIsNone(parse_byte_range("bytes=0-1,4-5", 10))
+        with self.assertRaises(PreviewBlobError):
+            parse_byte_range("bytes=10-", 10)
+
+    def test_build_preview_payload_url_delivery(self):
+        set_preview_blob_store(self.store)
+        data = build_preview_payload(b"%PDF-1.4 body", "a.pdf", render="default", delivery="url")
+        self.assertEqual(data["type"], "pdf")
+        self.assertNotIn("content", data)
+        self.assertTrue(data["url"].startswith("/api/preview/blobs/"))
+
+    def test_build_preview_payload_falls_back_inline_when_disabled(self):
+        set_preview_blob_store(PreviewBlobStore(PreviewCache(self.td, max_bytes=0), secret="secret"))
+        data = build_preview_payload(b"\x89PNG", "a.png", delivery="url")
+        self.assertEqual(base64.b64decode(data["content"]), b"\x89PNG")
+        self.assertEqual(data["image_type"], "png")
+
+
+    def test_publish_file_uses_known_digest_without_reading(self):
+        data = b"%PDF-1.4 staged body"
+        src = os.path.join(self.td, "staged.pdf")
+        with open(src, "wb") as f:
+            f.write(data)
+        digest = hashlib.sha256(data).hexdigest()
+
+        with patch.object(PreviewCache, "make_key", side_effect=AssertionError("rehashed")):
+            ref = self.store.publish_file(src, content_sha256=digest, media_type="application/pdf", filename="a.pdf")
+        self.assertEqual(ref["size"], len(data))
+        blob = self.store.resolve(self._token(ref))
+        self.assertEqual(blob.path.read_bytes(), data)
+
+        # Same content-addressed blob as publishing the bytes.
+        self.assertEqual(self.store.publish(data, media_type="application/pdf", filename="a.pdf")["etag"], ref["etag"])
+
+    def test_file_preview_payload_only_short_circuits_url_delivery_with_digest(self):
+        set_preview_blob_store(self.store)
+        src = os.path.join(self.td, "pic.jpg")
+        with open(src, "wb") as f:
+            f.write(b"\xff\xd8jpeg")
+        digest = hashlib.sha256(b"\xff\xd8jpeg").hexdigest()
+
+        data = file_preview_payload(src, "pic.jpg", delivery="url", content_sha256=digest)
+        self.assertEqual((data["type"], data["image_type"], data["media_type"]), ("image", "jpg", "image/jpeg"))
+        self.assertNotIn("content", data)
+
+        self.assertIsNone(file_preview_payload(src, "pic.jpg", delivery="inline", content_sha256=digest))
+        self.assertIsNone(file_preview_payload(src, "pic.jpg", delivery="url", content_sha256=None))
+        self.assertIsNone(file_preview_payload(src, "a.docx", delivery="url", content_sha256=digest))
+
+
+if __name__ == "__main__":
+    unittest.main()
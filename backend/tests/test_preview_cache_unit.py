@@ -0,0 +1,113 @@
+import hashlib
+import os
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from backend.services.preview_cache import PreviewCache, set_preview_cache
+from backend.services.unified_preview import build_preview_payload
+from backend.tests._util_tempdir import cleanup_dir, make_temp_dir
+
+
+class TestPreviewCacheUnit(unittest.TestCase):
+    def setUp(self):
+        self.td = make_temp_dir(prefix="ragflowauth_preview_cache")
+
+    def tearDown(self):
+        set_preview_cache(None)
+        cleanup_dir(self.td)
+
+    def test_hit_after_miss(self):
+        cache = PreviewCache(self.td)
+        key = cache.make_key(b"doc", "office_html.docx", "1")
+        calls = []
+
+        def produce():
+            calls.append(1)
+            return b"<html/>"
+
+        self.assertEqual(cache.get_or_create(key, produce), b"<html/>")
+        self.assertEqual(cache.get_or_create(key, produce), b"<html/>")
+        self.assertEqual(len(calls), 1)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["stores"]), (1, 1, 1))
+
+    def test_key_depends_on_render_mode_and_version(self):
+        self.assertNotEqual(PreviewCache.make_key(b"x", "a", "1"), PreviewCache.make_key(b"x", "b", "1"))
+        self.assertNotEqual(PreviewCache.make_key(b"x", "a", "1"), PreviewCache.make_key(b"x", "a", "2"))
+
+    def test_key_from_known_digest_matches_content_key(self):
+        digest = hashlib.sha256(b"x").hexdigest()
+        self.assertEqual(PreviewCache.make_key_for_digest(digest, "a", "1"), PreviewCache.make_key(b"x", "a", "1"))
+
+    def test_concurrent_misses_convert_once(self):
+        cache = PreviewCache(self.td)
+        key = cache.make_key(b"doc", "k")
+        gate = threading.Event()
+        calls = []
+
+        def produce():
+            calls.append(1)
+            gate.wait(5)
+            return b"out"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_create(key, produce))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        while cache.stats()["coalesced"] + cache.stats()["hits"] < 4 and len(results) < 4:
+            time.sleep(0.01)
+        gate.set()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, [b"out"] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_failed_conversion_is_not_cached(self):
+        cache = PreviewCache(self.td)
+        key = cache.make_key(b"doc", "k")
+
+        def boom():
+            raise RuntimeError("soffice failed")
+
+        with self.assertRaises(RuntimeError):
+            cache.get_or_create(key, boom)
+        self.assertEqual(cache.get_or_create(key, lambda: b"ok"), b"ok")
+
+    def test_lru_eviction_by_size(self):
+        cache = PreviewCache(self.td, max_bytes=35)
+        keys = [cache.make_key(str(i).encode(), "k") for i in range(3)]
+        base = time.time() - 100
+        for i, key in enumerate(keys):
+            cache.get_or_create(key, lambda: b"x" * 10)
+            os.utime(cache._path(key), (base + i, base + i))
+        # Touch the oldest so the middle entry becomes least recently used.
+        os.utime(cache._path(keys[0]), None)
+        cache.get_or_create(cache.make_key(b"new", "k"), lambda: b"y" * 10)
+
+        self.assertTrue(cache._path(keys[0]).exists())
+        self.assertFalse(cache._path(keys[1]).exists())
+        self.assertEqual(cache.stats()["bytes"], 30)
+
+    def test_expired_entries_are_reconverted(self):
+        cache = PreviewCache(self.td, max_age_s=60)
+        key = cache.make_key(b"doc", "k")
+        cache.get_or_create(key, lambda: b"old")
+        os.utime(cache._path(key), (time.time() - 120, time.time() - 120))
+        self.assertEqual(cache.get_or_create(key, lambda: b"new"), b"new")
+
+    def test_build_preview_payload_reuses_office_conversion(self):
+        set_preview_cache(PreviewCache(self.td))
+        with patch(
+            "backend.services.office_to_html.convert_office_bytes_to_html_bytes", return_value=b"<html>ok</html>"
+        ) as convert:
+            first = build_preview_payload(b"docx-bytes", "a.docx", doc_id="d1")
+            second = build_preview_payload(b"docx-bytes", "b.docx", doc_id="d2")
+        self.assertEqual(convert.call_count, 1)
+        self.assertEqual(first["content"], second["content"])
+        self.assertEqual(second["filename"], "b.html")
+
+
+if __name__ == "__main__":
+    unittest.main()
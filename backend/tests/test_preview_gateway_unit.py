@@ -1,11 +1,14 @@
 import os
+import threading
 import unittest
+from unittest.mock import patch
 
 from authx import TokenPayload
 from fastapi import FastAPI, Request
 from fastapi.testclient import TestClient
 
 from backend.app.core import auth as auth_module
+from backend.app.core.executors import CONVERSION, get_executor
 from backend.app.modules.preview.router import router as preview_router
 from backend.tests._util_tempdir import cleanup_dir, make_temp_dir
 
@@ -56,6 +59,16 @@ class _RagflowService:
         return self._content, self._filename
 
 
+class _ThreadRecordingRagflowService(_RagflowService):
+    def __init__(self, content: bytes, filename: str):
+        super().__init__(content, filename)
+        self.download_threads: list[str] = []
+
+    def download_document(self, doc_id: str, dataset: str):
+        self.download_threads.append(threading.current_thread().name)
+        return super().download_document(doc_id, dataset)
+
+
 class _Deps:
     def __init__(self, kb_doc: _KbDoc):
         self.user_store = _UserStore(_User(role="admin"))
@@ -234,3 +247,79 @@ class TestPreviewGatewayUnit(unittest.TestCase):
             self.assertIn("content", data)
         finally:
             cleanup_dir(td)
+
+    def test_gateway_url_delivery_streams_ranges(self):
+        from backend.services.preview_blobs import PreviewBlobStore, set_preview_blob_store
+        from backend.services.preview_cache import PreviewCache
+
+        td = make_temp_dir(prefix="ragflowauth_preview_gateway")
+        set_preview_blob_store(PreviewBlobStore(PreviewCache(td), secret="s"))
+        try:
+            app = FastAPI()
+            kb_doc = _KbDoc(doc_id="k1", kb_id="kb1", file_path=__file__, filename="a.txt")
+            app.state.deps = _Deps(kb_doc)
+            app.include_router(preview_router, prefix="/api")
+            app.dependency_overrides[auth_module.get_current_payload] = _override_get_current_payload
+
+            with TestClient(app) as client:
+                data = client.get("/api/preview/documents/ragflow/r1/preview?dataset=kb1&delivery=url").json()
+                self.assertEqual(data.get("type"), "pdf")
+                self.assertNotIn("content", data)
+                self.assertEqual(data.get("size"), len(b"%PDF-1.4 test"))
+
+                full = client.get(data["url"])
+                self.assertEqual(full.status_code, 200)
+                self.assertEqual(full.content, b"%PDF-1.4 test")
+                self.assertEqual(full.headers["content-length"], str(len(b"%PDF-1.4 test")))
+                self.assertEqual(full.headers["etag"], data["etag"])
+
+                part = client.get(data["url"], headers={"Range": "bytes=0-3"})
+                self.assertEqual(part.status_code, 206)
+                self.assertEqual(part.content, b"%PDF")
+                self.assertEqual(part.headers["content-range"], "bytes 0-3/13")
+
+                cached = client.get(data["url"], headers={"If-None-Match": data["etag"]})
+                self.assertEqual(cached.status_code, 304)
+
+                self.assertEqual(client.get(data["url"] + "x").status_code, 403)
+        finally:
+            set_preview_blob_store(None)
+            cleanup_dir(td)
+
+    def test_gateway_only_office_conversion_runs_on_the_conversion_pool(self):
+        from backend.services.preview_cache import PreviewCache, set_preview_cache
+
+        td = make_temp_dir(prefix="ragflowauth_preview_gateway")
+        set_preview_cache(PreviewCache(td))
+        convert_threads = []
+
+        def _convert(content, filename):  # noqa: ARG001
+            convert_threads.append(threading.current_thread().name)
+            return b"<html>ok</html>"
+
+        try:
+            app = FastAPI()
+            deps = _Deps(_KbDoc(doc_id="k1", kb_id="kb1", file_path=__file__, filename="a.txt"))
+            app.state.deps = deps
+            app.include_router(preview_router, prefix="/api")
+            app.dependency_overrides[auth_module.get_current_payload] = _override_get_current_payload
+
+            with patch("backend.services.office_to_html.convert_office_bytes_to_html_bytes", side_effect=_convert):
+                with TestClient(app) as client:
+                    conversions = get_executor(CONVERSION).stats()["submitted"]
+                    pdf_service = deps.ragflow_service = _ThreadRecordingRagflowService(b"%PDF-1.4 test", "x.pdf")
+                    pdf = client.get("/api/preview/documents/ragflow/r1/preview?dataset=kb1")
+                    self.assertEqual(get_executor(CONVERSION).stats()["submitted"], conversions)
+                    docx_service = deps.ragflow_service = _ThreadRecordingRagflowService(b"docx-gateway-bytes", "x.docx")
+                    docx = client.get("/api/preview/documents/ragflow/r2/preview?dataset=kb1")
+
+            self.assertEqual(pdf.status_code, 200, pdf.text)
+            self.assertEqual(docx.status_code, 200, docx.text)
+            self.assertEqual(docx.json().get("type"), "html")
+            for service in (pdf_service, docx_service):
+                self.assertTrue(service.download_threads[0].startswith("ragflow_io_worker"))
+            self.assertEqual(len(convert_threads), 1)
+            self.assertTrue(convert_threads[0].startswith("conversion_worker"))
+        finally:
+            set_preview_cache(None)
+            cleanup_dir(td)
@@ -0,0 +1,180 @@
+import asyncio
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from backend.services.ragflow_async_http_client import AsyncRagflowHttpClient
+from backend.services.ragflow_chat_service import RagflowChatService
+from backend.services.ragflow_connection import RagflowConnection
+from backend.services.ragflow_http_client import RagflowHttpClientConfig
+from backend.tests._util_tempdir import cleanup_dir, make_temp_dir
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args, **kwargs):  # noqa: ARG002
+        return None
+
+    def do_GET(self):  # noqa: N802
+        body = json.dumps({"code": 0, "data": [{"id": "c1"}]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):  # noqa: N802
+        length = int(self.headers.get("Content-Length") or 0)
+        question = json.loads(self.rfile.read(length) or b"{}").get("question", "")
+        events = [
+            f'data: {{"code": 0, "data": {{"answer": "{question}-1"}}}}\n\n'.encode("utf-8"),
+            b"data: not-json\n\n",
+            f'data: {{"code": 0, "data": {{"answer": "{question}-2"}}}}\n\n'.encode("utf-8"),
+            b"data: [DONE]\n\n",
+        ]
+        body = b"".join(events)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _Server(ThreadingHTTPServer):
+    request_queue_size = 128
+
+
+class TestRagflowAsyncHttpClientUnit(unittest.TestCase):
+    def setUp(self):
+        self.server = _Server(("127.0.0.1", 0), _Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.config = RagflowHttpClientConfig(
+            base_url=f"http://127.0.0.1:{self.server.server_address[1]}",
+            api_key="k",
+            max_retries=0,
+        )
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _write_config(self, payload: dict):
+        td = make_temp_dir(prefix="ragflowauth_async_http")
+        self.addCleanup(cleanup_dir, td)
+        path = td / "ragflow_config.json"
+        path.write_text(json.dumps(payload), encoding="utf-8")
+        return path
+
+    def test_get_list_and_sse(self):
+        client = AsyncRagflowHttpClient(self.config)
+
+        async def run():
+            try:
+                chats = await client.get_list("/api/v1/chats", context="list_chats")
+                events = [obj async for obj in client.post_sse("/api/v1/chats/c1/completions", body={"question": "q"})]
+                return chats, events, client.pool_stats()
+            finally:
+                await client.aclose()
+
+        chats, events, stats = asyncio.run(run())
+        self.assertEqual(chats, [{"id": "c1"}])
+        self.assertEqual([e["data"]["answer"] for e in events], ["q-1", "q-2"])
+        self.assertEqual(stats["in_flight"], 0)
+        self.assertEqual(stats["requests_total"], 2)
+
+    def test_sse_frames_are_raw_payload_bytes(self):
+        client = AsyncRagflowHttpClient(self.config)
+
+        async def run():
+            try:
+                return [f async for f in client.post_sse_frames("/c", body={"question": "q"})]
+            finally:
+                await client.aclose()
+
+        frames = asyncio.run(run())
+        self.assertEqual(frames, [b'{"code": 0, "data": {"answer": "q-1"}}', b"not-json", b'{"code": 0, "data": {"answer": "q-2"}}'])
+
+    def test_concurrent_streams_share_one_loop(self):
+        client = AsyncRagflowHttpClient(self.config)
+
+        async def one(i: int) -> list[str]:
+            return [obj["data"]["answer"] async for obj in client.post_sse("/c", body={"question": str(i)})]
+
+        async def run():
+            try:
+                return await asyncio.gather(*(one(i) for i in range(20)))
+            finally:
+                await client.aclose()
+
+        results = asyncio.run(run())
+        self.assertEqual(results[7], ["7-1", "7-2"])
+        self.assertEqual(client.pool_stats()["in_flight"], 0)
+
+    def test_connection_error_yields_error_object(self):
+        client = AsyncRagflowHttpClient(RagflowHttpClientConfig(base_url="http://127.0.0.1:1", api_key="k", max_retries=0))
+
+        async def run():
+            return [obj async for obj in client.post_sse("/c", body={})]
+
+        events = asyncio.run(run())
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["code"], -1)
+        self.assertEqual(client.pool_stats()["errors_total"], 1)
+
+    def test_chat_service_streams_via_async_client(self):
+        class _NoSyncHttp:
+            def set_config(self, _cfg):  # noqa: ARG002
+                return None
+
+            def post_sse(self, *args, **kwargs):  # noqa: ARG002
+                raise AssertionError("sync SSE must not be used when an async client is available")
+
+        config = {"base_url": self.config.base_url, "api_key": "k"}
+        conn = RagflowConnection(
+            config_path=self._write_config(config),
+            config=config,
+            http=_NoSyncHttp(),
+            async_http=AsyncRagflowHttpClient(self.config),
+        )
+        svc = RagflowChatService(connection=conn)
+
+        async def run():
+            try:
+                return [obj async for obj in svc.chat(chat_id="c1", question="hi")]
+            finally:
+                await svc.aclose()
+
+        events = asyncio.run(run())
+        self.assertEqual([e["data"]["answer"] for e in events], ["hi-1", "hi-2"])
+
+    def test_chat_service_falls_back_to_threaded_sync_stream(self):
+        class _SyncHttp:
+            def set_config(self, _cfg):  # noqa: ARG002
+                return None
+
+            def post_sse(self, path, body=None, timeout_s=None):  # noqa: ARG002
+                self.thread_name = threading.current_thread().name
+                yield {"code": 0, "data": {"answer": "x"}}
+
+        http = _SyncHttp()
+        config = {"base_url": "http://x", "api_key": "k"}
+        conn = RagflowConnection(
+            config_path=self._write_config(config),
+            config=config,
+            http=http,
+        )
+        svc = RagflowChatService(connection=conn)
+
+        async def run():
+            return [obj async for obj in svc.chat(chat_id="c1", question="hi")]
+
+        events = asyncio.run(run())
+        self.assertEqual(events, [{"code": 0, "data": {"answer": "x"}}])
+        self.assertNotEqual(http.thread_name, threading.main_thread().name)
+
+
+if __name__ == "__main__":
+    unittest.main()
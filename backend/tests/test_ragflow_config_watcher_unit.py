@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from backend.services import ragflow_config_watcher
+from backend.services.ragflow_chat_service import RagflowChatService
+from backend.services.ragflow_connection import create_ragflow_connection
+
+
+def _wait_for(predicate, timeout_s: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+class TestRagflowConfigWatcherUnit(unittest.TestCase):
+    def setUp(self) -> None:
+        self._td = tempfile.TemporaryDirectory()
+        self.cfg_path = Path(self._td.name) / "ragflow_config.json"
+        self._bump = 0
+        self._write({"base_url": "http://10.0.0.1:9380", "api_key": "K1", "timeout": 10})
+
+    def tearDown(self) -> None:
+        self._td.cleanup()
+
+    def _write(self, payload: dict) -> None:
+        self.cfg_path.write_text(json.dumps(payload), encoding="utf-8")
+        # Coarse filesystem timestamps must not hide a rewrite.
+        self._bump += 1
+        stamp = time.time() + self._bump
+        os.utime(self.cfg_path, (stamp, stamp))
+
+    def _connect(self, **kwargs):
+        conn = create_ragflow_connection(config_path=self.cfg_path, **kwargs)
+        return conn, RagflowChatService(connection=conn)
+
+    def _assert_reload_reaches_pool_and_service(self, conn, chat):
+        conn.watcher.start()
+        try:
+            self._write({"base_url": "http://10.0.0.2:9380", "api_key": "K2", "timeout": 10})
+            self.assertTrue(_wait_for(lambda: chat.config.get("base_url") == "http://10.0.0.2:9380"))
+        finally:
+            conn.watcher.stop()
+        self.assertEqual(chat.config["api_key"], "K2")
+        self.assertEqual(conn.http.config.base_url, "http://10.0.0.2:9380")
+        self.assertEqual(conn.async_http.config.api_key, "K2")
+        self.assertEqual(conn.watcher.current.version, 1)
+
+    def test_polling_watcher_publishes_changes_to_subscribers(self):
+        conn, chat = self._connect(poll_interval_s=0.05, force_polling=True)
+        self._assert_reload_reaches_pool_and_service(conn, chat)
+        self.assertEqual(conn.watcher.stats()["reloads"], 1)
+
+    def test_inotify_watcher_publishes_changes_to_subscribers(self):
+        if ragflow_config_watcher.watchfiles is None:
+            self.skipTest("watchfiles not installed")
+        conn, chat = self._connect()
+        self._assert_reload_reaches_pool_and_service(conn, chat)
+
+    def test_hot_path_does_not_stat_until_poll_interval(self):
+        conn, chat = self._connect(poll_interval_s=60)
+        self._write({"base_url": "http://10.0.0.3:9380", "api_key": "K3", "timeout": 10})
+
+        for _ in range(50):
+            chat._reload_config_if_changed()
+        self.assertEqual(conn.watcher.stats()["checks"], 0)
+        self.assertEqual(chat.config["base_url"], "http://10.0.0.1:9380")
+
+        conn.watcher._last_check_s -= 60
+        chat._reload_config_if_changed()
+        self.assertEqual(chat.config["base_url"], "http://10.0.0.3:9380")
+
+    def test_rewrite_without_effective_change_is_not_published(self):
+        conn, _chat = self._connect()
+        seen = []
+        conn.watcher.subscribe(seen.append)
+        self._write({"base_url": "http://10.0.0.1:9380", "api_key": "K1", "timeout": 10, "note": "touched"})
+        self.assertFalse(conn.watcher.check())
+        self.assertEqual(seen, [])
+        self.assertEqual(conn.watcher.current.version, 0)
+
+    def test_transport_only_change_is_published_to_the_pool(self):
+        conn, _chat = self._connect()
+        self.assertEqual(conn.http.config.max_retries, 2)
+        self._write(
+            {"base_url": "http://10.0.0.1:9380", "api_key": "K1", "timeout": 10, "max_retries": 0, "pool_maxsize": 8}
+        )
+        self.assertTrue(conn.watcher.check())
+        self.assertEqual(conn.watcher.current.version, 1)
+        self.assertEqual(conn.http.config.max_retries, 0)
+        self.assertEqual(conn.http.config.pool_maxsize, 8)
+        self.assertEqual(conn.async_http.config.pool_maxsize, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
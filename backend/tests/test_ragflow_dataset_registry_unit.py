@@ -0,0 +1,144 @@
+import threading
+import time
+import unittest
+
+from backend.services.ragflow.dataset_registry import DatasetRegistry, DatasetSnapshot
+from backend.services.ragflow.mixins.datasets import RagflowDatasetsMixin
+
+
+class _Fetch:
+    def __init__(self, datasets: list[dict]):
+        self.datasets = datasets
+        self.calls = 0
+        self.gate: threading.Event | None = None
+
+    def __call__(self):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(2)
+        return [dict(ds) for ds in self.datasets]
+
+
+class _PagedHttp:
+    def __init__(self, datasets: list[dict]):
+        self._datasets = datasets
+        self.calls: list[dict] = []
+
+    def get_list(self, path: str, *, params=None, context: str, data_field: str = "data", ok_code: int = 0):
+        self.calls.append(dict(params or {}))
+        page = int((params or {}).get("page", 1))
+        size = int((params or {}).get("page_size", 30))
+        return list(self._datasets[(page - 1) * size : page * size])
+
+
+class _StubSvc(RagflowDatasetsMixin):
+    def __init__(self, datasets: list[dict]):
+        self._http = _PagedHttp(datasets)
+        self.config = {"api_key": "NOT_PLACEHOLDER"}
+        self.client = None
+        self.logger = None
+
+    def _reload_config_if_changed(self):
+        return None
+
+
+class TestDatasetSnapshotUnit(unittest.TestCase):
+    def test_lookup_by_id_and_name(self):
+        snap = DatasetSnapshot.build(
+            [{"id": "ds1", "name": "A"}, {"id": "ds2", "name": "B"}, {"name": "no-id"}, "junk"],
+            loaded_at_s=0.0,
+        )
+        self.assertEqual(len(snap.datasets), 2)
+        self.assertEqual(snap.get("ds2")["name"], "B")
+        self.assertEqual(snap.get("A")["id"], "ds1")
+        self.assertIsNone(snap.get("missing"))
+        self.assertEqual(snap.index, {"by_id": {"ds1": "A", "ds2": "B"}, "by_name": {"A": "ds1", "B": "ds2"}})
+
+
+class TestDatasetRegistryUnit(unittest.TestCase):
+    def test_fresh_snapshot_is_reused(self):
+        fetch = _Fetch([{"id": "ds1", "name": "A"}])
+        reg = DatasetRegistry(fetch, ttl_s=60)
+        self.assertEqual(reg.get("A")["id"], "ds1")
+        self.assertEqual(reg.get("ds1")["name"], "A")
+        self.assertEqual(fetch.calls, 1)
+
+    def test_invalidate_forces_reload(self):
+        fetch = _Fetch([{"id": "ds1", "name": "A"}])
+        reg = DatasetRegistry(fetch, ttl_s=60)
+        reg.snapshot()
+        fetch.datasets = [{"id": "ds1", "name": "A"}, {"id": "ds2", "name": "B"}]
+        reg.invalidate()
+        self.assertEqual(reg.get("B")["id"], "ds2")
+        self.assertEqual(fetch.calls, 2)
+
+    def test_stale_snapshot_served_while_refreshing_in_background(self):
+        fetch = _Fetch([{"id": "ds1", "name": "A"}])
+        changes: list[int] = []
+        reg = DatasetRegistry(fetch, ttl_s=0.01, max_stale_s=60, on_change=lambda: changes.append(1))
+        reg.snapshot()
+        time.sleep(0.02)
+
+        fetch.datasets = [{"id": "ds1", "name": "A2"}]
+        self.assertEqual(reg.get("ds1")["name"], "A")
+
+        deadline = time.monotonic() + 2
+        while reg.stats()["background_loads"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(reg.snapshot(max_age_s=60).get("ds1")["name"], "A2")
+        self.assertEqual(changes, [1])
+
+    def test_concurrent_cold_loads_collapse_into_one_listing(self):
+        fetch = _Fetch([{"id": "ds1", "name": "A"}])
+        fetch.gate = threading.Event()
+        reg = DatasetRegistry(fetch, ttl_s=60)
+        results: list[dict | None] = []
+        threads = [threading.Thread(target=lambda: results.append(reg.get("A"))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        time.sleep(0.05)
+        fetch.gate.set()
+        for t in threads:
+            t.join(2)
+        self.assertEqual(fetch.calls, 1)
+        self.assertEqual([r["id"] for r in results], ["ds1"] * 5)
+
+    def test_failed_listing_keeps_previous_snapshot(self):
+        fetch = _Fetch([{"id": "ds1", "name": "A"}])
+        reg = DatasetRegistry(fetch, ttl_s=0)
+        reg.snapshot()
+
+        def boom():
+            raise RuntimeError("down")
+
+        reg._fetch = boom
+        time.sleep(0.001)
+        self.assertEqual(reg.get("A", max_age_s=0)["id"], "ds1")
+        self.assertEqual(reg.stats()["errors"], 1)
+
+
+class TestRagflowDatasetsMixinRegistryUnit(unittest.TestCase):
+    def test_listing_pages_through_all_datasets(self):
+        datasets = [{"id": f"ds{i}", "name": f"KB{i}"} for i in range(150)]
+        svc = _StubSvc(datasets)
+        self.assertEqual(len(svc.list_datasets()), 150)
+        self.assertEqual([c["page"] for c in svc._http.calls], [1, 2])
+
+    def test_lookups_share_one_listing(self):
+        svc = _StubSvc([{"id": "ds1", "name": "A"}])
+        svc.list_datasets()
+        svc.get_dataset_index()
+        self.assertEqual(svc.resolve_dataset_name("ds1"), "A")
+        self.assertEqual(svc.get_dataset_detail("A")["id"], "ds1")
+        self.assertEqual(len(svc._http.calls), 1)
+
+    def test_detail_miss_retries_with_fresh_listing(self):
+        svc = _StubSvc([{"id": "ds1", "name": "A"}])
+        svc.list_datasets()
+        svc._http._datasets = [{"id": "ds1", "name": "A"}, {"id": "ds2", "name": "B"}]
+        self.assertEqual(svc.get_dataset_detail("B")["id"], "ds2")
+        self.assertEqual(len(svc._http.calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
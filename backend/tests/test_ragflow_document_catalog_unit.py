@@ -0,0 +1,149 @@
+import unittest
+from types import SimpleNamespace
+
+from backend.database.schema.ensure import ensure_schema
+from backend.services.ragflow.document_catalog import RagflowDocumentCatalog
+from backend.services.ragflow.mixins.documents import RagflowDocumentsMixin
+from backend.tests._util_tempdir import cleanup_dir, make_temp_dir
+
+
+class _CatalogHttp:
+    def __init__(self, docs: list[dict]):
+        self.docs = docs
+        self.calls: list[dict] = []
+
+    def get_json(self, path, *, params=None):
+        params = dict(params or {})
+        self.calls.append(params)
+        docs = list(self.docs)
+        if "id" in params:
+            docs = [d for d in docs if d.get("id") == params["id"]]
+        if params.get("orderby") == "update_time":
+            docs.sort(key=lambda d: d.get("update_time") or 0, reverse=True)
+        page, size = int(params.get("page", 1)), int(params.get("page_size", 30))
+        return {"code": 0, "data": {"docs": docs[(page - 1) * size : page * size]}}
+
+
+class _Svc(RagflowDocumentsMixin):
+    def __init__(self, catalog, docs):
+        self.client = object()
+        self.logger = SimpleNamespace(info=lambda *a, **k: None, warning=lambda *a, **k: None, error=lambda *a, **k: None)
+        self.document_catalog = catalog
+        self._http = _CatalogHttp(docs)
+
+    def _normalize_dataset_name_for_ops(self, dataset_name):
+        return dataset_name
+
+    def _lookup_dataset(self, *refs):
+        return {"id": "ds1", "name": "KB"} if any(r in ("ds1", "KB") for r in refs) else None
+
+
+def _doc(doc_id: str, name: str, updated: int, **extra) -> dict:
+    return {"id": doc_id, "name": name, "status": "1", "run": "DONE", "size": 10, "chunk_method": "naive", "update_time": updated, **extra}
+
+
+class TestRagflowDocumentCatalogUnit(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = make_temp_dir(prefix="ragflowauth_test_doc_catalog")
+        self._db_path = self._tmp / "auth.db"
+        ensure_schema(self._db_path)
+        self.catalog = RagflowDocumentCatalog(db_path=str(self._db_path))
+
+    def tearDown(self) -> None:
+        cleanup_dir(self._tmp)
+
+    def test_full_sync_then_lookup_without_http(self):
+        svc = _Svc(self.catalog, [_doc("a", "a.pdf", 1), _doc("b", "b.txt", 2)])
+        self.assertEqual(svc.sync_document_catalog("KB"), 2)
+        svc._http.calls.clear()
+
+        detail = svc.get_document_detail("b", "KB")
+
+        self.assertEqual(detail["name"], "b.txt")
+        self.assertEqual(detail["chunk_method"], "naive")
+        self.assertEqual(detail["size"], 10)
+        self.assertEqual(svc._http.calls, [])
+
+    def test_miss_fetches_single_document_and_caches_it(self):
+        svc = _Svc(self.catalog, [_doc("a", "a.pdf", 1)])
+
+        self.assertEqual(svc.get_document_detail("a", "KB")["name"], "a.pdf")
+        self.assertEqual(svc._http.calls, [{"id": "a", "page": 1, "page_size": 1}])
+        self.assertEqual(self.catalog.get("a")["dataset_id"], "ds1")
+        self.assertIsNone(svc.get_document_detail("zzz", "KB"))
+
+    def test_incremental_sync_pages_only_changes(self):
+        docs = [_doc(str(i), f"{i}.txt", i) for i in range(1, 401)]
+        svc = _Svc(self.catalog, docs)
+        svc.sync_document_catalog("ds1")
+        svc._http.calls.clear()
+
+        docs.append(_doc("new", "new.txt", 1000))
+        svc.sync_document_catalog("ds1")
+
+        self.assertEqual(len(svc._http.calls), 1)
+        self.assertEqual(svc._http.calls[0]["orderby"], "update_time")
+        self.assertEqual(self.catalog.get("new")["name"], "new.txt")
+
+    def test_full_sync_drops_documents_deleted_upstream(self):
+        docs = [_doc("a", "a.pdf", 1), _doc("b", "b.txt", 2)]
+        svc = _Svc(self.catalog, docs)
+        svc.sync_document_catalog("ds1")
+        del docs[0]
+
+        svc.sync_document_catalog("ds1", full=True)
+
+        self.assertIsNone(self.catalog.get("a"))
+        self.assertEqual(self.catalog.sync_state("ds1").document_count, 1)
+
+    def test_parse_invalidates_catalog_rows(self):
+        svc = _Svc(self.catalog, [_doc("a", "a.pdf", 1)])
+        svc.sync_document_catalog("ds1")
+        svc.normalize_dataset_id = lambda ref: "ds1"
+        svc._http.post_json = lambda path, body=None: {"code": 0}
+
+        self.assertTrue(svc.parse_documents(dataset_ref="ds1", document_ids=["a"]))
+        self.assertIsNone(self.catalog.get("a"))
+
+    def test_resolve_document_names_groups_misses_per_dataset(self):
+        docs = [_doc(str(i), f"{i}.txt", i) for i in range(10)]
+        svc = _Svc(self.catalog, docs)
+
+        out = svc.resolve_document_names([("1", "ds1"), ("2", "KB")])
+        self.assertEqual(out["1"], {"name": "1.txt", "dataset_id": "ds1", "dataset": "KB"})
+        self.assertEqual([c.get("id") for c in svc._http.calls], ["1", "2"])
+
+        svc._http.calls.clear()
+        out = svc.resolve_document_names([(str(i), "ds1") for i in range(10)])
+        self.assertEqual(len(out), 10)
+        self.assertEqual(len(svc._http.calls), 1)
+
+    def test_upload_document_file_streams_to_registry_dataset(self):
+        svc = _Svc(self.catalog, [])
+        path = self._tmp / "a.pdf"
+        path.write_bytes(b"x" * 1024)
+        sent = {}
+
+        def post_multipart_file(api_path, body, *, timeout_s=None):
+            sent.update(path=api_path, size=len(body.read()), timeout_s=timeout_s)
+            return SimpleNamespace(status_code=200, json=lambda: {"code": 0, "data": [_doc("new", "a.pdf", 5)]})
+
+        svc._http.post_multipart_file = post_multipart_file
+
+        self.assertEqual(svc.upload_document_file(str(path), kb_id="KB"), "new")
+        self.assertEqual(sent["path"], "/api/v1/datasets/ds1/documents")
+        self.assertGreater(sent["size"], 1024)
+        self.assertGreaterEqual(sent["timeout_s"], svc._upload_timeout_s(1024))
+        self.assertEqual(self.catalog.get("new")["name"], "a.pdf")
+
+    def test_retain_datasets_drops_removed_datasets(self):
+        self.catalog.replace_dataset("ds1", [{"document_id": "a", "dataset_id": "ds1"}])
+        self.catalog.replace_dataset("ds2", [{"document_id": "b", "dataset_id": "ds2"}])
+
+        self.assertEqual(self.catalog.retain_datasets(["ds2"]), 1)
+        self.assertIsNone(self.catalog.get("a"))
+        self.assertIsNotNone(self.catalog.get("b"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,16 @@
+import asyncio
+import io
+import tempfile
+import threading
+import time
 import unittest
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from types import SimpleNamespace
+from unittest import mock
 
+from backend.app.core.executors import ARCHIVE, get_executor, iterate_offloaded
+from backend.services.ragflow.mixins import documents as documents_module
 from backend.services.ragflow.mixins.documents import RagflowDocumentsMixin
 
 
@@ -55,6 +65,32 @@ class _HttpStub:
         return {"Authorization": "Bearer test"}
 
 
+class _DownloadHttpStub(_HttpStub):
+    def __init__(self, bodies, delays=None):
+        super().__init__({1: [{"id": k, "name": f"meta-{k}.txt"} for k in bodies]})
+        self.bodies = bodies
+        self.delays = delays or {}
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def download_to(self, path, dest, **kwargs):  # noqa: ARG002
+        doc_id = path.rsplit("/", 1)[1]
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delays.get(doc_id, 0.02))
+            body = self.bodies.get(doc_id)
+            if body is None:
+                return None
+            dest.write(body)
+            return len(body)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
 class _Svc(RagflowDocumentsMixin):
     def __init__(self, dataset, http=None):
         self.client = object()
@@ -70,6 +106,7 @@ class _Svc(RagflowDocumentsMixin):
         return dataset_name
 
     def _find_dataset_by_name(self, dataset_name):  # noqa: ARG002
+        self.dataset_lookups = getattr(self, "dataset_lookups", 0) + 1
         return self._dataset
 
 
@@ -142,5 +179,143 @@ class TestRagflowDocumentsMixinUnit(unittest.TestCase):
         )
 
 
+    def test_iter_batch_download_streams_zip_in_order(self):
+        http = _DownloadHttpStub({"d1": b"%PDF-1.4 one", "d2": b"text " * 100, "d3": b"three"}, delays={"d1": 0.1})
+        svc = _Svc(_DatasetWithoutPaging(), http=http)
+        docs = [
+            {"doc_id": "d1", "dataset": "kb", "name": "a.pdf"},
+            {"doc_id": "d2", "dataset": "kb", "name": "b.txt"},
+            {"doc_id": "missing", "dataset": "kb", "name": "c.txt"},
+            {"id": "d3", "dataset_name": "kb"},
+        ]
+
+        chunks = list(svc.iter_batch_download(docs, max_workers=3))
+
+        with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as zf:
+            self.assertEqual(zf.namelist(), ["a.pdf", "b.txt", "meta-d3.txt"])
+            self.assertEqual(zf.read("b.txt"), b"text " * 100)
+            self.assertEqual(zf.getinfo("a.pdf").compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(zf.getinfo("b.txt").compress_type, zipfile.ZIP_DEFLATED)
+        self.assertEqual(svc.dataset_lookups, 1)
+        self.assertGreater(http.max_active, 1)
+        self.assertLessEqual(http.max_active, 3)
+
+    def test_batch_download_documents_returns_bytes(self):
+        http = _DownloadHttpStub({"d1": b"x"})
+        svc = _Svc(_DatasetWithoutPaging(), http=http)
+
+        content, filename = svc.batch_download_documents([{"doc_id": "d1", "dataset": "kb", "name": "a.txt"}])
+
+        self.assertTrue(filename.endswith(".zip"))
+        with zipfile.ZipFile(io.BytesIO(content)) as zf:
+            self.assertEqual(zf.read("a.txt"), b"x")
+
+    def test_client_disconnect_mid_stream_releases_pool_and_spools(self):
+        self._disconnect_mid_stream(yield_waits=False)
+
+    def test_client_disconnect_while_waiting_on_the_loop_releases_pool_and_spools(self):
+        self._disconnect_mid_stream(yield_waits=True)
+
+    def _disconnect_mid_stream(self, *, yield_waits: bool):
+        gate = threading.Event()
+        fetching_d2 = threading.Event()
+
+        class _GatedHttp(_DownloadHttpStub):
+            def download_to(self, path, dest, **kwargs):
+                if not path.endswith("/d1"):
+                    fetching_d2.set()
+                    gate.wait(5)
+                return super().download_to(path, dest, **kwargs)
+
+        pools: list[ThreadPoolExecutor] = []
+        spools: list = []
+
+        class _TrackedPool(ThreadPoolExecutor):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                pools.append(self)
+
+        real_spool = tempfile.SpooledTemporaryFile
+
+        def _tracked_spool(*args, **kwargs):
+            spool = real_spool(*args, **kwargs)
+            spools.append(spool)
+            return spool
+
+        http = _GatedHttp({"d1": b"one", "d2": b"two", "d3": b"three"}, delays={"d1": 0})
+        svc = _Svc(_DatasetWithoutPaging(), http=http)
+        docs = [{"doc_id": d, "dataset": "kb", "name": f"{d}.txt"} for d in ("d1", "d2", "d3")]
+
+        async def scenario():
+            received: list[bytes] = []
+
+            async def consume():
+                chunks = svc.iter_batch_download(docs, max_workers=2, yield_waits=yield_waits)
+                async for chunk in iterate_offloaded(ARCHIVE, chunks):
+                    received.append(chunk)
+
+            task = asyncio.create_task(consume())
+            while not (received and fetching_d2.is_set()):
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)
+            # next() (or, with yield_waits, the event loop) is waiting for d2 when the client goes away.
+            task.cancel()
+            threading.Timer(0.1, gate.set).start()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        with mock.patch.object(documents_module, "ThreadPoolExecutor", _TrackedPool), mock.patch.object(
+            documents_module.tempfile, "SpooledTemporaryFile", _tracked_spool
+        ):
+            asyncio.run(scenario())
+
+        deadline = time.monotonic() + 5
+        while not all(s.closed for s in spools) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(pools), 1)
+        self.assertTrue(pools[0]._shutdown)
+        self.assertEqual(len(spools), 3)
+        self.assertTrue(all(s.closed for s in spools))
+
+
+    def test_yielded_fetch_waits_do_not_hold_an_archive_worker(self):
+        gate = threading.Event()
+        fetching_d2 = threading.Event()
+
+        class _GatedHttp(_DownloadHttpStub):
+            def download_to(self, path, dest, **kwargs):
+                if path.endswith("/d2"):
+                    fetching_d2.set()
+                    gate.wait(5)
+                return super().download_to(path, dest, **kwargs)
+
+        http = _GatedHttp({"d1": b"one", "d2": b"two", "d3": b"three"}, delays={"d1": 0})
+        svc = _Svc(_DatasetWithoutPaging(), http=http)
+        docs = [{"doc_id": d, "dataset": "kb", "name": f"{d}.txt"} for d in ("d1", "d2", "d3")]
+        running_while_blocked = []
+
+        async def scenario():
+            received: list[bytes] = []
+
+            async def consume():
+                chunks = svc.iter_batch_download(docs, max_workers=2, yield_waits=True)
+                async for chunk in iterate_offloaded(ARCHIVE, chunks):
+                    received.append(chunk)
+
+            task = asyncio.create_task(consume())
+            while not fetching_d2.is_set():
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.1)
+            running_while_blocked.append(get_executor(ARCHIVE).stats()["running"])
+            gate.set()
+            await task
+            return b"".join(received)
+
+        content = asyncio.run(scenario())
+        self.assertEqual(running_while_blocked, [0])
+        with zipfile.ZipFile(io.BytesIO(content)) as zf:
+            self.assertEqual([zf.read(f"{d}.txt") for d in ("d1", "d2", "d3")], [b"one", b"two", b"three"])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,178 @@
+import hashlib
+import io
+import json
+import threading
+import unittest
+from email import policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from backend.services.ragflow_http_client import MultipartFileBody, RagflowHttpClient, RagflowHttpClientConfig
+from backend.tests._util_tempdir import cleanup_dir, make_temp_dir
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args, **kwargs):  # noqa: ARG002
+        return None
+
+    def _send_json(self, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):  # noqa: N802
+        if self.path.endswith("/documents/bin"):
+            body = b"\x00\x01" * 100_000
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if self.path.endswith("/documents/missing"):
+            self._send_json({"code": 102, "message": "Document not found"})
+            return
+        self._send_json({"code": 0, "data": [{"id": "d1"}]})
+
+    def do_POST(self):  # noqa: N802
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if self.path.endswith("/documents"):
+            head = f"Content-Type: {self.headers.get('Content-Type')}\r\n\r\n".encode("ascii")
+            part = next(BytesParser(policy=policy.default).parsebytes(head + body).iter_parts())
+            content = part.get_payload(decode=True)
+            self._send_json(
+                {
+                    "code": 0,
+                    "data": [{"id": "new", "name": part.get_filename(), "sha": hashlib.sha256(content).hexdigest()}],
+                }
+            )
+            return
+        if self.path.endswith("/completions"):
+            events = [
+                b'data: {"code": 0, "data": {"answer": "a"}}\n\n',
+                b'data: {"code": 0, "data": {"answer": "ab"}}\n\n',
+                b"data: [DONE]\n\n",
+            ]
+            body = b"".join(events)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self._send_json({"code": 0, "data": {}})
+
+
+class TestRagflowHttpClientPoolUnit(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_requests_reuse_keep_alive_connection(self):
+        client = RagflowHttpClient(RagflowHttpClientConfig(base_url=self.base_url, api_key="k", max_retries=0))
+        try:
+            for _ in range(5):
+                self.assertEqual(client.get_list("/api/v1/datasets", context="t"), [{"id": "d1"}])
+            stats = client.pool_stats()
+            self.assertEqual(stats["requests_total"], 5)
+            self.assertEqual(stats["connections_opened"], 1)
+            self.assertEqual(stats["in_flight"], 0)
+            self.assertGreaterEqual(stats["reuse_ratio"], 0.8)
+        finally:
+            client.close()
+
+    def test_sse_releases_connection_and_in_flight(self):
+        client = RagflowHttpClient(RagflowHttpClientConfig(base_url=self.base_url, api_key="k", max_retries=0))
+        try:
+            events = list(client.post_sse("/api/v1/chats/c1/completions", body={"question": "q"}))
+            self.assertEqual([e["data"]["answer"] for e in events], ["a", "ab"])
+            self.assertEqual(client.pool_stats()["in_flight"], 0)
+            client.get_json("/api/v1/datasets")
+            self.assertEqual(client.pool_stats()["connections_opened"], 1)
+        finally:
+            client.close()
+
+    def test_download_to_streams_body_and_detects_error_envelope(self):
+        client = RagflowHttpClient(RagflowHttpClientConfig(base_url=self.base_url, api_key="k", max_retries=0))
+        try:
+            buf = io.BytesIO()
+            self.assertEqual(client.download_to("/api/v1/datasets/ds/documents/bin", buf, chunk_size=4096), 200_000)
+            self.assertEqual(buf.getvalue(), b"\x00\x01" * 100_000)
+            self.assertIsNone(client.download_to("/api/v1/datasets/ds/documents/missing", io.BytesIO()))
+            self.assertEqual(client.pool_stats()["in_flight"], 0)
+        finally:
+            client.close()
+
+    def test_multipart_file_upload_streams_from_disk(self):
+        td = make_temp_dir(prefix="ragflowauth_multipart")
+        self.addCleanup(cleanup_dir, td)
+        path = td / "big.bin"
+        data = bytes(range(256)) * 8192
+        path.write_bytes(data)
+        progress: list[tuple[int, int]] = []
+        client = RagflowHttpClient(RagflowHttpClientConfig(base_url=self.base_url, api_key="k", max_retries=0))
+        try:
+            body = MultipartFileBody(path, filename='报告 "v2".pdf', progress=lambda sent, total: progress.append((sent, total)))
+            resp = client.post_multipart_file("/api/v1/datasets/ds/documents", body)
+            doc = resp.json()["data"][0]
+            self.assertEqual(doc["sha"], hashlib.sha256(data).hexdigest())
+            self.assertEqual(doc["name"], '报告 %22v2%22.pdf')
+            self.assertEqual(progress[-1], (len(body), len(body)))
+            self.assertGreater(len(progress), 1)
+            self.assertEqual(client.pool_stats()["in_flight"], 0)
+        finally:
+            client.close()
+
+    def test_set_config_rebuilds_pool_only_on_change(self):
+        cfg = RagflowHttpClientConfig(base_url=self.base_url, api_key="k", max_retries=0)
+        client = RagflowHttpClient(cfg)
+        try:
+            client.get_json("/api/v1/datasets")
+            client.set_config(RagflowHttpClientConfig(base_url=self.base_url, api_key="k", max_retries=0))
+            self.assertEqual(client.pool_stats()["pool_rebuilds"], 0)
+
+            client.set_config(RagflowHttpClientConfig(base_url=self.base_url, api_key="k2", max_retries=0))
+            client.get_json("/api/v1/datasets")
+            stats = client.pool_stats()
+            self.assertEqual(stats["pool_rebuilds"], 1)
+            self.assertEqual(stats["connections_opened"], 2)
+            self.assertEqual(client.headers()["Authorization"], "Bearer k2")
+        finally:
+            client.close()
+
+    def test_config_from_ragflow_config(self):
+        cfg = RagflowHttpClientConfig.from_ragflow_config(
+            {"timeout": 60, "max_retries": 0, "retry_delay": 1.0, "pool_maxsize": "8"},
+            base_url="http://x",
+            api_key="k",
+        )
+        self.assertEqual(cfg.timeout_s, 60.0)
+        self.assertEqual(cfg.max_retries, 0)
+        self.assertEqual(cfg.retry_backoff_s, 1.0)
+        self.assertEqual(cfg.pool_maxsize, 8)
+        self.assertEqual(cfg.pool_connections, 4)
+
+    def test_status_retries_only_cover_safe_methods(self):
+        client = RagflowHttpClient(RagflowHttpClientConfig(base_url="http://x", api_key="k", max_retries=2))
+        try:
+            retry = client._session.get_adapter("http://x").max_retries
+            self.assertEqual(set(retry.allowed_methods), {"GET", "HEAD", "OPTIONS"})
+            self.assertEqual(retry.connect, 2)
+        finally:
+            client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
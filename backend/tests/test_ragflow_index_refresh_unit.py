@@ -0,0 +1,133 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from backend.services.ragflow.refresh import RefreshScheduler, StaleWhileRevalidate
+from backend.services.ragflow_chat_service import RagflowChatService
+from backend.services.ragflow_connection import RagflowConnection
+
+
+class _Fetch:
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+        self.gate: threading.Event | None = None
+
+    def __call__(self):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(2)
+        return dict(self.value)
+
+
+def _wait_for(predicate, timeout_s: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+class _ListHttp:
+    def __init__(self):
+        self.chats = [{"id": "c1"}]
+        self.agents = [{"id": "a1"}]
+        self.list_calls = 0
+        self.fail_listings = False
+
+    def set_config(self, _cfg):  # noqa: ARG002
+        return None
+
+    def get_list(self, path, *, params=None, context="", data_field="data", ok_code=0):
+        return self.try_get_list(path, params=params, context=context, data_field=data_field, ok_code=ok_code) or []
+
+    def try_get_list(self, path, *, params=None, context="", data_field="data", ok_code=0):  # noqa: ARG002
+        self.list_calls += 1
+        if self.fail_listings and "agents" in path:
+            return None
+        return list(self.agents if "agents" in path else self.chats)
+
+    def post_json(self, path, body=None, params=None):  # noqa: ARG002
+        self.chats.append({"id": "c2"})
+        return {"code": 0, "data": {"id": "c2"}}
+
+
+class TestStaleWhileRevalidateUnit(unittest.TestCase):
+    def test_stale_reads_trigger_one_background_refresh(self):
+        fetch = _Fetch({"v": 1})
+        cache = StaleWhileRevalidate("test", fetch, ttl_s=0.01, max_stale_s=60, scheduler=RefreshScheduler("test_refresh"))
+        cache.get()
+        time.sleep(0.02)
+
+        fetch.value = {"v": 2}
+        fetch.gate = threading.Event()
+        for _ in range(10):
+            self.assertEqual(cache.get()["v"], 1)
+        fetch.gate.set()
+
+        self.assertTrue(_wait_for(lambda: cache.stats()["background_loads"] == 1))
+        self.assertEqual(cache.get(max_age_s=60)["v"], 2)
+        self.assertEqual(fetch.calls, 2)
+        stats = cache.stats()
+        self.assertEqual(stats["stale_hits"], 10)
+        self.assertIsNotNone(stats["age_s"])
+        self.assertGreaterEqual(stats["max_refresh_ms"], stats["last_refresh_ms"])
+
+    def test_invalidate_re_warms_index_in_background(self):
+        fetch = _Fetch({"v": 1})
+        cache = StaleWhileRevalidate("test", fetch, ttl_s=60, scheduler=RefreshScheduler("test_refresh"))
+        cache.invalidate()
+        self.assertEqual(fetch.calls, 0)
+
+        cache.get()
+        fetch.value = {"v": 2}
+        cache.invalidate()
+        self.assertTrue(_wait_for(lambda: cache.peek() is not None))
+        self.assertEqual(cache.get()["v"], 2)
+        self.assertEqual(fetch.calls, 2)
+        self.assertEqual(cache.stats()["forced_refreshes"], 1)
+
+
+class TestRagflowChatRefIndexUnit(unittest.TestCase):
+    def setUp(self) -> None:
+        self._td = tempfile.TemporaryDirectory()
+        self.cfg_path = Path(self._td.name) / "ragflow_config.json"
+        self.cfg_path.write_text('{"base_url":"http://127.0.0.1:9380","api_key":"k","timeout":10}', encoding="utf-8")
+
+    def tearDown(self) -> None:
+        self._td.cleanup()
+
+    def test_index_is_shared_and_refreshed_after_create(self):
+        http = _ListHttp()
+        conn = RagflowConnection(config_path=self.cfg_path, config={"base_url": "http://127.0.0.1:9380", "api_key": "k", "timeout": 10}, http=http)
+        svc = RagflowChatService(connection=conn)
+        self.assertEqual(svc.normalize_chat_ref("c1"), "chat_c1")
+        self.assertEqual(svc.normalize_chat_ref("a1"), "agent_a1")
+        listings = http.list_calls
+
+        svc.create_chat({"name": "n"})
+        self.assertTrue(_wait_for(lambda: svc.chat_ref_index_stats()["refs"] == 3))
+        self.assertEqual(svc.normalize_chat_ref("c2"), "chat_c2")
+        self.assertEqual(http.list_calls, 2 * listings)
+
+
+    def test_failed_background_refresh_keeps_previous_index(self):
+        http = _ListHttp()
+        conn = RagflowConnection(config_path=self.cfg_path, config={"base_url": "http://127.0.0.1:9380", "api_key": "k", "timeout": 10}, http=http)
+        svc = RagflowChatService(connection=conn)
+        self.assertEqual(svc.normalize_chat_ref("a1"), "agent_a1")
+
+        http.fail_listings = True
+        svc._chat_ref_index._loaded_at_s -= 60  # past ttl, within max_stale: served stale + refreshed
+        self.assertEqual(svc.normalize_chat_ref("c1"), "chat_c1")
+        self.assertTrue(_wait_for(lambda: svc.chat_ref_index_stats()["errors"] == 1))
+
+        self.assertEqual(svc.chat_ref_index_stats()["refs"], 2)
+        self.assertEqual(svc.normalize_chat_ref("a1"), "agent_a1")
+
+
+if __name__ == "__main__":
+    unittest.main()
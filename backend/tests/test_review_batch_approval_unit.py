@@ -0,0 +1,156 @@
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+from authx import TokenPayload
+from fastapi import FastAPI
+from fastapi import Request
+from fastapi.testclient import TestClient
+
+from backend.app.core import auth as auth_module
+from backend.app.modules.review.router import router as review_router
+from backend.tests._util_tempdir import cleanup_dir, make_temp_dir
+
+
+class _FakeUser:
+    def __init__(self):
+        self.user_id = "u1"
+        self.username = "admin"
+        self.role = "admin"
+        self.group_id = None
+
+
+class _FakeUserStore:
+    def get_by_user_id(self, user_id: str):
+        return _FakeUser()
+
+
+class _FakePermissionGroupStore:
+    def get_group(self, group_id: int):
+        return None
+
+
+class _KbStore:
+    def __init__(self, docs):
+        self.docs = {d.doc_id: d for d in docs}
+
+    def get_document(self, doc_id):
+        return self.docs.get(doc_id)
+
+    def update_document_status(self, doc_id, status, reviewed_by=None, review_notes=None, ragflow_doc_id=None):
+        doc = self.docs[doc_id]
+        doc.status, doc.ragflow_doc_id = status, ragflow_doc_id
+        return doc
+
+
+class _Ragflow:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.parse_calls = []
+
+    def upload_document_file(self, file_path, file_filename=None, kb_id=None):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        if file_filename == "bad.txt":
+            return None
+        return f"rf-{file_filename}"
+
+    def parse_documents(self, *, dataset_ref, document_ids):
+        self.parse_calls.append((dataset_ref, sorted(document_ids)))
+        return True
+
+
+def _doc(doc_id, file_path, dataset, status="pending"):
+    return SimpleNamespace(
+        doc_id=doc_id,
+        filename=f"{doc_id}.txt",
+        file_path=str(file_path),
+        file_size=1,
+        mime_type="text/plain",
+        uploaded_by="u2",
+        status=status,
+        uploaded_at_ms=0,
+        reviewed_by=None,
+        reviewed_at_ms=None,
+        review_notes=None,
+        ragflow_doc_id=None,
+        kb_id=dataset,
+        kb_dataset_id=dataset,
+        kb_name=dataset,
+    )
+
+
+class TestReviewBatchApprovalUnit(unittest.TestCase):
+    def setUp(self):
+        self._tmp = make_temp_dir(prefix="ragflowauth_batch_approve")
+        path = self._tmp / "f.txt"
+        path.write_bytes(b"x")
+        docs = [_doc(f"a{i}", path, "ds1") for i in range(6)] + [_doc("b0", path, "ds2"), _doc("bad", path, "ds2")]
+        docs.append(_doc("done", path, "ds1", status="approved"))
+        self.ragflow = _Ragflow()
+        app = FastAPI()
+        app.state.deps = SimpleNamespace(
+            user_store=_FakeUserStore(),
+            permission_group_store=_FakePermissionGroupStore(),
+            kb_store=_KbStore(docs),
+            ragflow_service=self.ragflow,
+        )
+        app.include_router(review_router, prefix="/api/knowledge")
+
+        def _override_get_current_payload(request: Request) -> TokenPayload:  # noqa: ARG001
+            return TokenPayload(sub="u1")
+
+        app.dependency_overrides[auth_module.get_current_payload] = _override_get_current_payload
+        self.app = app
+
+    def tearDown(self):
+        cleanup_dir(self._tmp)
+
+    def test_background_job_uploads_concurrently_and_parses_once_per_dataset(self):
+        doc_ids = [f"a{i}" for i in range(6)] + ["b0", "bad", "done", "missing"]
+        with TestClient(self.app) as client:
+            started = client.post("/api/knowledge/documents/batch/approve/jobs", json={"doc_ids": doc_ids})
+            self.assertEqual(started.status_code, 200)
+            job_id = started.json()["job_id"]
+            for _ in range(200):
+                job = client.get(f"/api/knowledge/documents/batch/approve/jobs/{job_id}").json()
+                if job["status"] not in ("queued", "running"):
+                    break
+                time.sleep(0.02)
+
+        self.assertEqual(job["status"], "completed")
+        self.assertEqual((job["total"], job["processed"]), (10, 10))
+        self.assertEqual(job["success_count"], 7)
+        self.assertEqual(
+            sorted((item["doc_id"], item["status_code"]) for item in job["failed_items"]),
+            [("bad", 500), ("done", 400), ("missing", 404)],
+        )
+        self.assertGreater(self.ragflow.max_active, 1)
+        self.assertEqual(
+            sorted(self.ragflow.parse_calls),
+            [("ds1", sorted(f"rf-a{i}.txt" for i in range(6))), ("ds2", ["rf-b0.txt"])],
+        )
+
+    def test_inline_batch_endpoint_keeps_response_shape(self):
+        with TestClient(self.app) as client:
+            resp = client.post("/api/knowledge/documents/batch/approve", json={"doc_ids": ["a0", "missing"]})
+
+        body = resp.json()
+        self.assertEqual((body["total"], body["success_count"], body["failed_count"]), (2, 1, 1))
+        self.assertEqual(body["succeeded_doc_ids"], ["a0"])
+
+    def test_unknown_job_is_404(self):
+        with TestClient(self.app) as client:
+            resp = client.get("/api/knowledge/documents/batch/approve/jobs/nope")
+        self.assertEqual(resp.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
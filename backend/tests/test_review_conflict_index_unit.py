@@ -0,0 +1,235 @@
+import hashlib
+import sqlite3
+import threading
+import unittest
+
+from authx import TokenPayload
+from fastapi import FastAPI
+from fastapi import Request
+from fastapi.testclient import TestClient
+
+from backend.app.core import auth as auth_module
+from backend.app.modules.review.router import router as review_router
+from backend.database.schema.ensure import ensure_schema
+from backend.services.kb import KbStore
+from backend.services.kb.content_hash_backfill import KbContentHashBackfill
+from backend.tests._util_tempdir import cleanup_dir, make_temp_dir
+
+
+class _FakeUser:
+    def __init__(self):
+        self.user_id = "u1"
+        self.username = "admin"
+        self.role = "admin"
+        self.group_id = None
+
+
+class _FakeUserStore:
+    def __init__(self):
+        self.lookup_threads = []
+
+    def get_by_user_id(self, user_id: str):
+        return _FakeUser()
+
+    def get_usernames_by_ids(self, user_ids):
+        self.lookup_threads.append(threading.get_ident())
+        return {uid: f"name-{uid}" for uid in user_ids}
+
+
+class _FakePermissionGroupStore:
+    def get_group(self, group_id: int):
+        return None
+
+
+class _ThreadRecordingRagflowService:
+    def __init__(self):
+        self.calls = []
+
+    def _record(self, name):
+        self.calls.append((name, threading.get_ident()))
+
+    def delete_document(self, document_id, dataset_name=None):  # noqa: ARG002
+        self._record("delete_document")
+        return True
+
+    def upload_document_file(self, *, file_path, file_filename, kb_id):  # noqa: ARG002
+        self._record("upload_document_file")
+        return "r-new"
+
+    def parse_document(self, *, dataset_ref, document_id):  # noqa: ARG002
+        self._record("parse_document")
+        return True
+
+
+class _FakeDeletionLogStore:
+    def __init__(self):
+        self.entries = []
+
+    def log_deletion(self, **kwargs):
+        self.entries.append(kwargs)
+
+
+class _FakeDeps:
+    def __init__(self, kb_store):
+        self.user_store = _FakeUserStore()
+        self.permission_group_store = _FakePermissionGroupStore()
+        self.kb_store = kb_store
+        self.ragflow_service = _ThreadRecordingRagflowService()
+        self.deletion_log_store = _FakeDeletionLogStore()
+
+
+class TestReviewConflictIndexUnit(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = make_temp_dir(prefix="ragflowauth_test_conflict_index")
+        self._db_path = self._tmp / "auth.db"
+        ensure_schema(self._db_path)
+        self.store = KbStore(db_path=str(self._db_path))
+
+    def tearDown(self) -> None:
+        cleanup_dir(self._tmp)
+
+    def _create(self, filename, *, status="pending", kb_id="KB", sha=None):
+        return self.store.create_document(
+            filename=filename,
+            file_path=str(self._tmp / filename),
+            file_size=1,
+            mime_type="text/plain",
+            uploaded_by="u2",
+            kb_id=kb_id,
+            kb_dataset_id=f"ds-{kb_id}",
+            kb_name=kb_id,
+            status=status,
+            content_sha256=sha,
+        )
+
+    def test_filename_and_content_matches_within_same_kb(self):
+        approved_name = self._create("report.txt", status="approved", sha="aaa")
+        approved_bytes = self._create("other.txt", status="approved", sha="bbb")
+        self._create("report.txt", status="approved", kb_id="OtherKB", sha="ccc")
+
+        by_name = self._create("report(1).txt", sha="zzz")
+        by_content = self._create("renamed.txt", sha="bbb")
+        clean = self._create("fresh.txt", sha="ddd")
+        elsewhere = self._create("report_副本.txt", kb_id="ThirdKB", sha="eee")
+
+        found = self.store.find_approved_conflicts()
+
+        self.assertEqual(found[by_name.doc_id][0].doc_id, approved_name.doc_id)
+        self.assertEqual(found[by_name.doc_id][1], "filename")
+        self.assertEqual(found[by_content.doc_id][0].doc_id, approved_bytes.doc_id)
+        self.assertEqual(found[by_content.doc_id][1], "content")
+        self.assertNotIn(clean.doc_id, found)
+        self.assertNotIn(elsewhere.doc_id, found)
+
+        self.assertEqual(list(self.store.find_approved_conflicts([by_content.doc_id])), [by_content.doc_id])
+        self.assertEqual(self.store.find_approved_conflicts(kb_refs=["OtherKB"]), {})
+
+    def test_conflict_lookup_uses_indexes(self):
+        conn = sqlite3.connect(self._db_path)
+        try:
+            plan = " ".join(
+                str(row[-1])
+                for row in conn.execute(
+                    "EXPLAIN QUERY PLAN SELECT doc_id FROM kb_documents WHERE normalized_filename = ? AND status = 'approved'",
+                    ("a.txt",),
+                )
+            )
+        finally:
+            conn.close()
+        self.assertIn("idx_docs_normalized_filename", plan)
+
+    def test_backfill_fills_rows_staged_before_the_columns_existed(self):
+        staged = self._tmp / "legacy(2).txt"
+        staged.write_bytes(b"legacy bytes")
+        conn = sqlite3.connect(self._db_path)
+        try:
+            conn.execute(
+                """
+                INSERT INTO kb_documents (doc_id, filename, file_path, file_size, mime_type, uploaded_by, status, uploaded_at_ms)
+                VALUES ('old', 'legacy(2).txt', ?, 12, 'text/plain', 'u2', 'pending', 0),
+                       ('gone', 'gone.txt', ?, 1, 'text/plain', 'u2', 'pending', 0)
+                """,
+                (str(staged), str(self._tmp / "missing.txt")),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+        ensure_schema(self._db_path)
+
+        # The schema step only fills the cheap column; hashing is left to the background backfill.
+        old = self.store.get_document("old")
+        self.assertEqual(old.normalized_filename, "legacy.txt")
+        self.assertIsNone(old.content_sha256)
+
+        backfill = KbContentHashBackfill(self.store, batch_size=1, pause_s=0)
+        self.assertEqual(backfill.run(), 2)
+        self.assertEqual(self.store.get_document("old").content_sha256, hashlib.sha256(b"legacy bytes").hexdigest())
+        self.assertEqual(self.store.get_document("gone").content_sha256, "")
+        self.assertEqual(backfill.run_once(), 0)
+
+    def test_batch_endpoint_reports_whole_queue(self):
+        existing = self._create("plan.docx", status="approved", sha="aaa")
+        pending = self._create("plan (1).docx", sha="bbb")
+        self._create("unique.docx", sha="ccc")
+
+        app = FastAPI()
+        deps = _FakeDeps(self.store)
+        app.state.deps = deps
+        app.include_router(review_router, prefix="/api/knowledge")
+        loop_threads = []
+
+        async def _override_get_current_payload(request: Request) -> TokenPayload:  # noqa: ARG001
+            loop_threads.append(threading.get_ident())
+            return TokenPayload(sub="u1")
+
+        app.dependency_overrides[auth_module.get_current_payload] = _override_get_current_payload
+        with TestClient(app) as client:
+            batch = client.post("/api/knowledge/documents/batch/conflicts", json={})
+            single = client.get(f"/api/knowledge/documents/{pending.doc_id}/conflict")
+
+        self.assertEqual(batch.status_code, 200)
+        conflicts = batch.json()["conflicts"]
+        self.assertEqual(list(conflicts), [pending.doc_id])
+        self.assertEqual(conflicts[pending.doc_id]["existing"]["doc_id"], existing.doc_id)
+        self.assertEqual(conflicts[pending.doc_id]["existing"]["uploaded_by_name"], "name-u2")
+        self.assertEqual(conflicts[pending.doc_id]["normalized_name"], "plan.docx")
+        self.assertEqual(single.json(), conflicts[pending.doc_id])
+        # Username lookups run on the SQLite pool, not the event loop.
+        self.assertEqual(len(deps.user_store.lookup_threads), 2)
+        self.assertFalse(set(deps.user_store.lookup_threads) & set(loop_threads))
+
+
+    def test_approve_overwrite_runs_ragflow_calls_off_the_event_loop(self):
+        old = self._create("plan.docx", status="approved", sha="aaa")
+        self.store.update_document_status(old.doc_id, "approved", reviewed_by="u1", ragflow_doc_id="r-old")
+        new = self._create("plan (1).docx", sha="bbb")
+        (self._tmp / "plan (1).docx").write_bytes(b"new")
+
+        app = FastAPI()
+        deps = _FakeDeps(self.store)
+        app.state.deps = deps
+        app.include_router(review_router, prefix="/api/knowledge")
+        loop_threads = []
+
+        async def _override_get_current_payload(request: Request) -> TokenPayload:  # noqa: ARG001
+            loop_threads.append(threading.get_ident())
+            return TokenPayload(sub="u1")
+
+        app.dependency_overrides[auth_module.get_current_payload] = _override_get_current_payload
+        with TestClient(app) as client:
+            resp = client.post(
+                f"/api/knowledge/documents/{new.doc_id}/approve-overwrite", json={"replace_doc_id": old.doc_id}
+            )
+
+        self.assertEqual(resp.status_code, 200, resp.text)
+        self.assertEqual(resp.json()["ragflow_doc_id"], "r-new")
+        self.assertIsNone(self.store.get_document(old.doc_id))
+        calls = deps.ragflow_service.calls
+        self.assertEqual([name for name, _ in calls], ["delete_document", "upload_document_file", "parse_document"])
+        self.assertTrue(loop_threads)
+        self.assertFalse({thread for _, thread in calls} & set(loop_threads))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from backend.app.core.sse import AnswerDeltaEncoder, wants_delta
+
+
+def _msg(answer: str, **extra) -> dict:
+    return {"code": 0, "data": {"answer": answer, **extra}}
+
+
+class TestAnswerDeltaEncoderUnit(unittest.TestCase):
+    def test_sends_only_appended_text(self):
+        enc = AnswerDeltaEncoder()
+
+        first = enc.encode(_msg("ab", session_id="s1", reference={"chunks": []}))
+        self.assertEqual(first, [{"code": 0, "v": 2, "data": {"session_id": "s1", "delta": "ab"}}])
+        self.assertEqual(enc.encode(_msg("abcd", session_id="s1"))[0]["data"], {"delta": "cd"})
+        self.assertEqual(enc.encode(_msg("abcd", session_id="s1")), [])
+
+    def test_rewritten_answer_resets(self):
+        enc = AnswerDeltaEncoder()
+        enc.encode(_msg("hello"))
+
+        out = enc.encode(_msg("world"))
+
+        self.assertEqual(out[0]["data"], {"delta": "world", "reset": True})
+
+    def test_terminator_is_preceded_by_full_final_message(self):
+        enc = AnswerDeltaEncoder()
+        enc.encode(_msg("a", reference={"chunks": [1]}))
+        enc.encode(_msg("ab", reference={"chunks": [1, 2]}))
+
+        out = enc.encode({"code": 0, "data": True})
+
+        self.assertEqual(out[0]["data"], {"answer": "ab", "reference": {"chunks": [1, 2]}, "final": True})
+        self.assertEqual(out[1], {"code": 0, "data": True})
+        self.assertEqual(enc.finish(), [])
+
+    def test_errors_and_sources_pass_through(self):
+        enc = AnswerDeltaEncoder()
+        err = {"code": 102, "message": "boom"}
+        sources = {"code": 0, "data": {"sources": []}}
+
+        self.assertEqual(enc.encode(err), [err])
+        self.assertEqual(enc.encode(sources), [sources])
+        self.assertEqual(enc.finish(), [])
+
+    def test_wants_delta(self):
+        self.assertTrue(wants_delta(" Delta "))
+        self.assertFalse(wants_delta(None))
+        self.assertFalse(wants_delta("full"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 from unittest.mock import patch
 
-from backend.services.unified_preview import build_preview_payload
+from backend.services.unified_preview import build_preview_payload, needs_office_conversion
 
 
 class TestUnifiedPreviewHelperUnit(unittest.TestCase):
@@ -35,3 +35,9 @@ class TestUnifiedPreviewHelperUnit(unittest.TestCase):
         self.assertTrue(p["filename"].endswith(".html"))
         self.assertTrue(isinstance(p.get("content"), str))
 
+    def test_needs_office_conversion(self):
+        self.assertTrue(needs_office_conversion("a.DOCX"))
+        self.assertTrue(needs_office_conversion("a.xlsx", render="html"))
+        self.assertFalse(needs_office_conversion("a.xlsx"))
+        self.assertFalse(needs_office_conversion("a.pdf", render="html"))
+        self.assertFalse(needs_office_conversion(None))
@@ -6,6 +6,14 @@ export const reviewApi = {
     return httpClient.requestJson(authBackendUrl(`/api/knowledge/documents/${docId}/conflict`), { method: 'GET' });
   },
 
+  // One query for many pending documents; only conflicting doc ids are present in `conflicts`.
+  getBatchConflicts(docIds = null) {
+    return httpClient.requestJson(authBackendUrl('/api/knowledge/documents/batch/conflicts'), {
+      method: 'POST',
+      body: JSON.stringify({ doc_ids: docIds }),
+    });
+  },
+
   approve(docId, reviewNotes = null) {
     return httpClient.requestJson(authBackendUrl(`/api/knowledge/documents/${docId}/approve`), {
       method: 'POST',
@@ -13,13 +21,30 @@ export const reviewApi = {
     });
   },
 
-  approveBatch(docIds, reviewNotes = null) {
-    return httpClient.requestJson(authBackendUrl('/api/knowledge/documents/batch/approve'), {
+  startApproveBatchJob(docIds, reviewNotes = null) {
+    return httpClient.requestJson(authBackendUrl('/api/knowledge/documents/batch/approve/jobs'), {
       method: 'POST',
       body: JSON.stringify({ doc_ids: docIds, review_notes: reviewNotes }),
     });
   },
 
+  getApproveBatchJob(jobId) {
+    return httpClient.requestJson(authBackendUrl(`/api/knowledge/documents/batch/approve/jobs/${jobId}`), { method: 'GET' });
+  },
+
+  // Runs as a background job on the server; resolves with the finished job (same counters as the old batch response).
+  async approveBatch(docIds, reviewNotes = null, { onProgress, pollIntervalMs = 1000 } = {}) {
+    let job = await reviewApi.startApproveBatchJob(docIds, reviewNotes);
+    while (job.status === 'queued' || job.status === 'running') {
+      if (onProgress) onProgress(job);
+      await new Promise((resolve) => setTimeout(resolve, pollIntervalMs));
+      job = await reviewApi.getApproveBatchJob(job.job_id);
+    }
+    if (onProgress) onProgress(job);
+    if (job.status !== 'completed') throw new Error('批量审核任务失败');
+    return job;
+  },
+
   approveOverwrite(docId, replaceDocId, reviewNotes = null) {
     return httpClient.requestJson(authBackendUrl(`/api/knowledge/documents/${docId}/approve-overwrite`), {
       method: 'POST',
@@ -7,7 +7,9 @@ import { countLines, isTextComparable } from './utils';
 const buildConflictSummaryItem = (item) => ({
   docId: item.doc.doc_id,
   filename: item.doc.filename,
-  detail: item.conflict?.existing?.filename ? `与已通过文档重名：${item.conflict.existing.filename}` : '检测到命名冲突',
+  detail: item.conflict?.existing?.filename
+    ? `${item.conflict.match === 'content' ? '与已通过文档内容相同' : '与已通过文档重名'}：${item.conflict.existing.filename}`
+    : '检测到命名冲突',
   existing: item.conflict?.existing || null,
   normalized: item.conflict?.normalized_name || '',
 });
@@ -303,16 +305,13 @@ export const useDocumentReview = () => {
     resetBatchSummaryState();
     setError(null);
     try {
-      const conflictChecks = await Promise.all(
-        documents.map(async (doc) => {
-          try {
-            const conflict = await reviewApi.getConflict(doc.doc_id);
-            return { doc, conflict };
-          } catch (err) {
-            return { doc, conflictError: err.message || '冲突检查失败' };
-          }
-        })
-      );
+      let conflictChecks;
+      try {
+        const { conflicts = {} } = await reviewApi.getBatchConflicts(documents.map((doc) => doc.doc_id));
+        conflictChecks = documents.map((doc) => ({ doc, conflict: conflicts[doc.doc_id] || { conflict: false } }));
+      } catch (err) {
+        conflictChecks = documents.map((doc) => ({ doc, conflictError: err.message || '冲突检查失败' }));
+      }
 
       const conflicted = conflictChecks.filter((item) => item.conflict?.conflict && item.conflict?.existing);
       const conflictCheckFailed = conflictChecks.filter((item) => item.conflictError);
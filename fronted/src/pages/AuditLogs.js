@@ -109,10 +109,12 @@ const AuditLogs = () => {
     from: '',
     to: '',
     limit: 200,
-    offset: 0,
+    // Keyset paging: `cursor` is the server's next_cursor for this page, `cursorHistory` the pages before it.
+    cursor: '',
+    cursorHistory: [],
   });
 
-  const [result, setResult] = useState({ total: 0, items: [] });
+  const [result, setResult] = useState({ total: 0, items: [], next_cursor: null });
 
   const loadDirectory = async () => {
     const [c, d] = await Promise.all([orgDirectoryApi.listCompanies(), orgDirectoryApi.listDepartments()]);
@@ -127,8 +129,9 @@ const AuditLogs = () => {
     try {
       const params = {
         limit: f.limit || 200,
-        offset: f.offset || 0,
+        total_mode: 'cached',
       };
+      if (f.cursor) params.cursor = f.cursor;
       if (f.action) params.action = f.action;
       if (f.username) params.username = f.username;
       if (f.company_id) params.company_id = f.company_id;
@@ -143,10 +146,11 @@ const AuditLogs = () => {
       setResult({
         total: data?.total || 0,
         items: Array.isArray(data?.items) ? data.items : [],
+        next_cursor: data?.next_cursor || null,
       });
     } catch (e) {
       setError(e.message || String(e));
-      setResult({ total: 0, items: [] });
+      setResult({ total: 0, items: [], next_cursor: null });
     } finally {
       setLoading(false);
     }
@@ -167,21 +171,21 @@ const AuditLogs = () => {
   const rows = useMemo(() => result.items || [], [result.items]);
 
   const onApply = async () => {
-    const next = { ...filters, offset: 0 };
+    const next = { ...filters, cursor: '', cursorHistory: [] };
     setFilters(next);
     await loadLogs(next);
   };
 
   const onPrev = async () => {
-    const nextOffset = Math.max(0, (filters.offset || 0) - (filters.limit || 200));
-    const next = { ...filters, offset: nextOffset };
+    const history = filters.cursorHistory || [];
+    const next = { ...filters, cursor: history[history.length - 1] || '', cursorHistory: history.slice(0, -1) };
     setFilters(next);
     await loadLogs(next);
   };
 
   const onNext = async () => {
-    const nextOffset = (filters.offset || 0) + (filters.limit || 200);
-    const next = { ...filters, offset: nextOffset };
+    if (!result.next_cursor) return;
+    const next = { ...filters, cursor: result.next_cursor, cursorHistory: [...(filters.cursorHistory || []), filters.cursor] };
     setFilters(next);
     await loadLogs(next);
   };
@@ -317,7 +321,7 @@ const AuditLogs = () => {
             <button
               type="button"
               onClick={onPrev}
-              disabled={loading || (filters.offset || 0) <= 0}
+              disabled={loading || (filters.cursorHistory || []).length === 0}
               style={{
                 padding: '8px 12px',
                 backgroundColor: '#f3f4f6',
@@ -333,7 +337,7 @@ const AuditLogs = () => {
             <button
               type="button"
               onClick={onNext}
-              disabled={loading || (filters.offset || 0) + rows.length >= result.total}
+              disabled={loading || !result.next_cursor}
               style={{
                 padding: '8px 12px',
                 backgroundColor: '#f3f4f6',
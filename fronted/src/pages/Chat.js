@@ -533,7 +533,7 @@ const Chat = () => {
       const response = await httpClient.request(`/api/chats/${selectedChatId}/completions`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ question, stream: true, session_id: selectedSessionId }),
+        body: JSON.stringify({ question, stream: true, session_id: selectedSessionId, stream_protocol: 'delta' }),
       });
 
       if (!response.ok) {
@@ -564,6 +564,17 @@ const Chat = () => {
             if (data?.code === 0 && data?.data && Array.isArray(data.data.sources)) {
               upsertAssistantSources(data.data.sources);
             }
+            // Delta framing (v2): only the appended text; `reset` replaces the answer so far.
+            // The closing `final` event carries the full answer and goes through the path below.
+            if (data?.v === 2 && data?.data && typeof data.data.delta === 'string') {
+              const current = String(assistantMessageRef.current || '');
+              const next = (data.data.reset ? '' : current) + data.data.delta;
+              if (next !== current) {
+                assistantMessageRef.current = next;
+                upsertAssistantMessage(next);
+              }
+              continue;
+            }
             // Some streaming implementations omit `code` (or use non-0 codes) but still carry `data.answer`.
             if (data?.data && typeof data.data.answer === 'string') {
               const incoming = String(data.data.answer ?? '');
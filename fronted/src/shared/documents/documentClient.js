@@ -56,20 +56,21 @@ class DocumentClient {
     const source = String(ref?.source || '').toLowerCase();
     const docId = ref?.docId;
     const render = ref?.render;
+    const delivery = ref?.delivery;
     if (!docId) throw new Error('missing_doc_id');
 
     if (source === DOCUMENT_SOURCE.RAGFLOW) {
       const datasetName = ref?.datasetName || ref?.dataset || '';
       if (!datasetName) throw new Error('missing_dataset');
       return httpClient.requestJson(
-        `/api/preview/documents/ragflow/${encodeURIComponent(docId)}/preview${buildQuery({ dataset: datasetName, render })}`,
+        `/api/preview/documents/ragflow/${encodeURIComponent(docId)}/preview${buildQuery({ dataset: datasetName, render, delivery })}`,
         { method: 'GET' }
       );
     }
 
     if (source === DOCUMENT_SOURCE.KNOWLEDGE) {
       return httpClient.requestJson(
-        `/api/preview/documents/knowledge/${encodeURIComponent(docId)}/preview${buildQuery({ render })}`,
+        `/api/preview/documents/knowledge/${encodeURIComponent(docId)}/preview${buildQuery({ render, delivery })}`,
         { method: 'GET' }
       );
     }
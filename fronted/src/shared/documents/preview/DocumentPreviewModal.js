@@ -4,6 +4,7 @@ import { ensureTablePreviewStyles } from '../../preview/tablePreviewStyles';
 import { isMarkdownFilename, MarkdownPreview } from '../../preview/markdownPreview';
 import { loadDocumentPreview } from '../../preview/ragflowPreviewManager';
 import documentClient, { DOCUMENT_SOURCE } from '../documentClient';
+import { authBackendUrl } from '../../../config/backend';
 
 const isCsvFilename = (name) => String(name || '').toLowerCase().endsWith('.csv');
 
@@ -14,6 +15,22 @@ const base64ToBytes = (base64) => {
   return bytes;
 };
 
+// Bodies published with `delivery: 'url'` are streamed from a signed backend URL; others arrive inline.
+const bodyUrl = (data, mime) => {
+  if (data?.url) return authBackendUrl(data.url);
+  if (!data?.content) return '';
+  return window.URL.createObjectURL(new Blob([base64ToBytes(data.content)], { type: mime }));
+};
+
+const revokeIfBlobUrl = (url) => {
+  if (!String(url || '').startsWith('blob:')) return;
+  try {
+    window.URL.revokeObjectURL(url);
+  } catch {
+    // ignore
+  }
+};
+
 const escapeHtml = (s) =>
   String(s ?? '')
     .replace(/&/g, '&amp;')
@@ -148,6 +165,7 @@ export const DocumentPreviewModal = ({ open, target, onClose, canDownloadFiles =
             documentClient.preview({
               source,
               docId: _id,
+              delivery: 'url',
               datasetName: source === DOCUMENT_SOURCE.RAGFLOW ? dataset : undefined,
               sessionId:
                 source === DOCUMENT_SOURCE.PATENT || source === DOCUMENT_SOURCE.PAPER
@@ -177,30 +195,20 @@ export const DocumentPreviewModal = ({ open, target, onClose, canDownloadFiles =
 
         // Cleanup old URL
         if (lastUrlRef.current) {
-          try {
-            window.URL.revokeObjectURL(lastUrlRef.current);
-          } catch {
-            // ignore
-          }
+          revokeIfBlobUrl(lastUrlRef.current);
           lastUrlRef.current = '';
           setObjectUrl('');
         }
 
-        if (data?.type === 'pdf' && data?.content) {
-          const blob = new Blob([base64ToBytes(data.content)], { type: 'application/pdf' });
-          const url = window.URL.createObjectURL(blob);
-          lastUrlRef.current = url;
-          setObjectUrl(url);
-        } else if (data?.type === 'html' && data?.content) {
-          const blob = new Blob([base64ToBytes(data.content)], { type: 'text/html; charset=utf-8' });
-          const url = window.URL.createObjectURL(blob);
-          lastUrlRef.current = url;
-          setObjectUrl(url);
-        } else if (data?.type === 'image' && data?.content) {
-          const imageType = data?.image_type || 'png';
-          const mime = `image/${imageType}`;
-          const blob = new Blob([base64ToBytes(data.content)], { type: mime });
-          const url = window.URL.createObjectURL(blob);
+        let url = '';
+        if (data?.type === 'pdf') {
+          url = bodyUrl(data, 'application/pdf');
+        } else if (data?.type === 'html') {
+          url = bodyUrl(data, 'text/html; charset=utf-8');
+        } else if (data?.type === 'image') {
+          url = bodyUrl(data, `image/${data?.image_type || 'png'}`);
+        }
+        if (url) {
           lastUrlRef.current = url;
           setObjectUrl(url);
         }
@@ -222,11 +230,7 @@ export const DocumentPreviewModal = ({ open, target, onClose, canDownloadFiles =
     if (!open) return;
     return () => {
       if (lastUrlRef.current) {
-        try {
-          window.URL.revokeObjectURL(lastUrlRef.current);
-        } catch {
-          // ignore
-        }
+        revokeIfBlobUrl(lastUrlRef.current);
         lastUrlRef.current = '';
       }
     };
@@ -251,24 +255,20 @@ export const DocumentPreviewModal = ({ open, target, onClose, canDownloadFiles =
             ? target.sessionId
             : undefined,
         render: 'html',
+        delivery: 'url',
       });
-      if (data?.type !== 'html' || !data?.content) throw new Error(data?.message || '此文件类型不支持原样预览(HTML)');
+      if (data?.type !== 'html' || !(data?.content || data?.url)) throw new Error(data?.message || '此文件类型不支持原样预览(HTML)');
 
       const name = String(data?.filename || effectiveName || '');
       setEffectiveName(name);
       setPayload(data);
 
       if (lastUrlRef.current) {
-        try {
-          window.URL.revokeObjectURL(lastUrlRef.current);
-        } catch {
-          // ignore
-        }
+        revokeIfBlobUrl(lastUrlRef.current);
         lastUrlRef.current = '';
         setObjectUrl('');
       }
-      const blob = new Blob([base64ToBytes(data.content)], { type: 'text/html; charset=utf-8' });
-      const url = window.URL.createObjectURL(blob);
+      const url = bodyUrl(data, 'text/html; charset=utf-8');
       lastUrlRef.current = url;
       setObjectUrl(url);
     } catch (e) {